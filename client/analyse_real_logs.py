@@ -10,13 +10,22 @@ Usage:
 """
 
 import argparse
+import functools
+import hashlib
+import inspect
 import json
 import os
-import re
+import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from poker_logic import preflop_action, postflop_action, STRATEGIES, analyze_hand, THE_LORD_VS_RAISE
+import hand_cache
+import hh_parser
+from hand_query import HandIndex
+
+HERO = hh_parser.HERO_NAME
 
 ALL_STRATEGIES = ['the_lord', 'value_lord', 'kiro_lord', 'kiro_optimal', 'sonnet', 'nit', 'tag', 'lag', 'fish', 'maniac']
 
@@ -54,280 +63,129 @@ def hand_to_str(cards):
     else:
         return r1 + r2 + 'o'
 
-def parse_all_hands(hh_dir):
-    """Parse all hand histories."""
+HH_DIR = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
+STAKES_BB = (0.05, 0.10, 0.25)  # 5NL, 10NL, 25NL
+INGEST_WORKERS = 1  # processes for parsing new/changed files (0 = all cores), set by --workers
+
+
+def parse_all_hands(hh_dir, workers=None):
+    """Parse all hand histories, ordered by hand_id (same order for any worker count)."""
+    workers = INGEST_WORKERS if workers is None else workers
     all_hands = []
-    
-    for filename in os.listdir(hh_dir):
-        if not filename.endswith('.txt'):
-            continue
-        
-        if '€0.02-€0.05' in filename:
-            bb = 0.05
-        elif '€0.05-€0.10' in filename:
-            bb = 0.10
-        elif '€0.10-€0.25' in filename:
-            bb = 0.25
-        else:
+    for rec in hand_cache.iter_hands(hh_dir, workers=workers):
+        if rec.bb not in STAKES_BB:
             continue
-        
-        filepath = os.path.join(hh_dir, filename)
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-        
-        for hand_text in re.split(r'\n\n\n+', content):
-            hand = parse_hand(hand_text, bb)
-            if hand:
-                all_hands.append(hand)
-    
+        hand = parse_hand(rec)
+        if hand:
+            all_hands.append(hand)
+    all_hands.sort(key=lambda h: h['hand_id'])
     return all_hands
 
-def parse_hand(text, bb):
-    """Parse a single hand."""
-    if 'Dealt to idealistslp' not in text:
+
+def index_hands(hh_dir, workers=None):
+    """HandIndex over parse_all_hands, with the preflop situation hero faced as field 'facing'."""
+    return HandIndex(parse_all_hands(hh_dir, workers), {'facing': lambda h: get_preflop_facing(h)[0]})
+
+def parse_hand(rec):
+    """Build the analysis dict for one hh_parser.Hand record (None if hero not dealt in)."""
+    if rec.hero != HERO or not rec.hero_cards:
         return None
-    
-    lines = text.strip().split('\n')
+    bb = rec.bb
     
     hand = {
+        'hand_id': rec.hand_id,
         'bb': bb,
-        'hero_cards': None,
-        'hero_position': None,
-        'board': [],
+        'hero_cards': list(rec.hero_cards),
+        'hero_position': hh_parser.position(rec, HERO),
+        'board': list(rec.board),
         'preflop_actions': [],
         'postflop_actions': [],
-        'hero_invested': 0,
-        'hero_won': 0,
+        'hero_invested': hh_parser.invested(rec, HERO),
+        'hero_won': hh_parser.collected(rec, HERO),
         'hero_preflop_action': None,
         'preflop_pot': 0,  # Track pot going to flop
         'preflop_raiser': None,  # Who raised preflop (for the_lord)
         'postflop_bettor': {},  # Who bet on each street (for the_lord)
         'villain_raises_before_hero': 0,  # Count of raises before hero acted
         'last_raise_amount': 0,  # Amount of last raise hero faced
-        'num_opponents_at_flop': 1,  # Number of opponents at flop (for multiway)
+        # Number of opponents at flop (for multiway), from SUMMARY "folded before Flop"
+        'num_opponents_at_flop': max(1, len(rec.flop_players) - 1),
     }
     
-    current_street = 'preflop'
-    hero_seat = None
-    button_seat = None
-    seats = {}
     preflop_pot = 0  # Track all preflop contributions
     last_raiser = None  # Track who raised preflop
     hero_has_acted = False  # Track if hero has acted yet
     raises_before_hero = 0  # Count raises before hero acts
     last_raise_amt = 0  # Track last raise amount
+    hero_verbs = {'raises': 'raise', 'calls': 'call', 'bets': 'bet', 'folds': 'fold', 'checks': 'check'}
     
-    # Track hero's investment per street
-    # Key insight: "raises to €X" means hero's TOTAL on this street is X
-    # "calls €X" means hero adds X more to their current street investment
-    # "bets €X" means hero adds X (first action on street)
-    street_invested = {'preflop': 0, 'flop': 0, 'turn': 0, 'river': 0}
-    
-    for line in lines:
-        # Button
-        m = re.match(r"Table.*Seat #(\d+) is the button", line)
-        if m:
-            button_seat = int(m.group(1))
-            continue
-        
-        # Seats
-        m = re.match(r'Seat (\d+): (\S+)', line)
-        if m:
-            seat_num = int(m.group(1))
-            player = m.group(2)
-            seats[seat_num] = player
-            if player == 'idealistslp':
-                hero_seat = seat_num
-            continue
-        
-        # Hero cards
-        m = re.match(r'Dealt to idealistslp \[(\w\w) (\w\w)\]', line)
-        if m:
-            hand['hero_cards'] = [m.group(1), m.group(2)]
-            continue
+    for a in rec.actions:
+        street = 'river' if a.street == 'showdown' else a.street
         
         # Track ALL preflop contributions (blinds, calls, raises)
-        if current_street == 'preflop':
-            if ': posts small blind' in line or ': posts big blind' in line:
-                m = re.search(r'€([\d.]+)', line)
-                if m:
-                    preflop_pot += float(m.group(1))
-            elif ': calls' in line:
-                m = re.search(r'€([\d.]+)', line)
-                if m:
-                    preflop_pot += float(m.group(1))
-            elif ': raises' in line:
+        if street == 'preflop':
+            if a.verb in ('posts_sb', 'posts_bb', 'calls'):
+                preflop_pot += a.amount
+            elif a.verb == 'raises':
                 # "raises €X to €Y" - Y is total put in by this player
-                m = re.search(r'to €([\d.]+)', line)
-                if m:
-                    raise_amt = float(m.group(1))
-                    preflop_pot += raise_amt
-                    last_raise_amt = raise_amt
+                preflop_pot += a.to
+                last_raise_amt = a.to
                 # Track who raised (for the_lord)
-                raiser_match = re.match(r'^([^:]+):', line)
-                if raiser_match:
-                    raiser_name = raiser_match.group(1)
-                    if raiser_name != 'idealistslp':
-                        last_raiser = raiser_name
-                        if not hero_has_acted:
-                            raises_before_hero += 1
+                if a.player != HERO:
+                    last_raiser = a.player
+                    if not hero_has_acted:
+                        raises_before_hero += 1
             
             # Check if hero acted
-            if line.startswith('idealistslp:') and ': posts' not in line:
+            if a.player == HERO and a.verb in hero_verbs:
                 hero_has_acted = True
                 hand['villain_raises_before_hero'] = raises_before_hero
                 hand['last_raise_amount'] = last_raise_amt
         
         # Track postflop bets/raises (for the_lord)
-        if current_street in ['flop', 'turn', 'river']:
-            if ': bets' in line or ': raises' in line:
-                bettor_match = re.match(r'^([^:]+):', line)
-                if bettor_match and bettor_match.group(1) != 'idealistslp':
-                    hand['postflop_bettor'][current_street] = bettor_match.group(1)
-        
-        # Streets
-        if '*** FLOP ***' in line:
-            current_street = 'flop'
-            # Save preflop pot and raiser before moving to flop
-            hand['preflop_pot'] = preflop_pot
-            hand['preflop_raiser'] = last_raiser
-            m = re.search(r'\[(\w\w) (\w\w) (\w\w)\]', line)
-            if m:
-                hand['board'] = [m.group(1), m.group(2), m.group(3)]
-        elif '*** TURN ***' in line:
-            current_street = 'turn'
-            m = re.search(r'\] \[(\w\w)\]', line)
-            if m:
-                hand['board'].append(m.group(1))
-        elif '*** RIVER ***' in line:
-            current_street = 'river'
-            m = re.search(r'\] \[(\w\w)\]', line)
-            if m:
-                hand['board'].append(m.group(1))
-        
-        # Uncalled bet returned - subtract from current street
-        if 'returned to idealistslp' in line:
-            m = re.search(r'€([\d.]+)', line)
-            if m:
-                street_invested[current_street] -= float(m.group(1))
+        if street != 'preflop' and a.verb in ('bets', 'raises') and a.player != HERO:
+            hand['postflop_bettor'][street] = a.player
         
         # Hero actions
-        if line.startswith('idealistslp:'):
-            action = None
-            amt = 0
-            
-            if ': raises' in line:
-                # "raises €X to €Y" - Y is hero's TOTAL on this street (replaces prior)
-                m = re.search(r'to €([\d.]+)', line)
-                if m:
-                    amt = float(m.group(1))
-                    street_invested[current_street] = amt  # REPLACE, not add
-                action = 'raise'
-            elif ': calls' in line:
-                # "calls €X" - X is ADDITIONAL amount
-                m = re.search(r'€([\d.]+)', line)
-                if m:
-                    amt = float(m.group(1))
-                    street_invested[current_street] += amt
-                action = 'call'
-            elif ': bets' in line:
-                # "bets €X" - X is the amount (first action on street)
-                m = re.search(r'€([\d.]+)', line)
-                if m:
-                    amt = float(m.group(1))
-                    street_invested[current_street] += amt
-                action = 'bet'
-            elif ': posts small blind' in line:
-                m = re.search(r'€([\d.]+)', line)
-                if m:
-                    amt = float(m.group(1))
-                    street_invested['preflop'] += amt
-            elif ': posts big blind' in line:
-                m = re.search(r'€([\d.]+)', line)
-                if m:
-                    amt = float(m.group(1))
-                    street_invested['preflop'] += amt
-            elif ': folds' in line:
-                action = 'fold'
-            elif ': checks' in line:
-                action = 'check'
-            
-            if action and current_street == 'preflop' and hand['hero_preflop_action'] is None:
+        if a.player == HERO and a.verb in hero_verbs:
+            action = hero_verbs[a.verb]
+            amt = a.to if action == 'raise' else a.amount
+            if street == 'preflop' and hand['hero_preflop_action'] is None:
                 hand['hero_preflop_action'] = action
-            
-            if action and current_street != 'preflop':
+            if street != 'preflop':
                 hand['postflop_actions'].append({
-                    'street': current_street,
+                    'street': street,
                     'action': action,
                     'amount': amt
                 })
         
         # Villain actions (for facing detection)
-        for player in seats.values():
-            if player != 'idealistslp' and line.startswith(f'{player}:'):
-                if ': raises' in line:
-                    m = re.search(r'to €([\d.]+)', line)
-                    amt = float(m.group(1)) if m else 0
-                    if current_street == 'preflop':
-                        hand['preflop_actions'].append({'action': 'raise', 'amount': amt})
-                    else:
-                        hand['postflop_actions'].append({
-                            'street': current_street,
-                            'action': 'villain_raise',
-                            'amount': amt
-                        })
-                elif ': bets' in line:
-                    m = re.search(r'€([\d.]+)', line)
-                    amt = float(m.group(1)) if m else 0
-                    if current_street != 'preflop':
-                        hand['postflop_actions'].append({
-                            'street': current_street,
-                            'action': 'villain_bet',
-                            'amount': amt
-                        })
-        
-        # Won - only count 'from pot' to avoid double-counting with summary line
-        if 'idealistslp collected €' in line and 'from pot' in line:
-            m = re.search(r'€([\d.]+)', line)
-            if m:
-                hand['hero_won'] += float(m.group(1))
-        
-        # Count players at flop from SUMMARY section
-        # "folded before Flop" = didn't see flop
-        if 'folded before Flop' in line:
-            pass  # Don't count
-        elif '*** SUMMARY ***' in line:
-            # Count players who saw flop by checking SUMMARY lines
-            # Players who saw flop: showed, won, folded on Flop/Turn/River, mucked
-            players_at_flop = 0
-            for summary_line in lines[lines.index(line):]:
-                if re.match(r'Seat \d+:', summary_line):
-                    if 'folded before Flop' not in summary_line:
-                        players_at_flop += 1
-            # num_opponents = players_at_flop - 1 (excluding hero)
-            hand['num_opponents_at_flop'] = max(1, players_at_flop - 1)
-    
-    # Calculate total invested from per-street tracking
-    hand['hero_invested'] = sum(street_invested.values())
-    
-    # Calculate position
-    if hero_seat and button_seat and seats:
-        active_seats = sorted(seats.keys())
-        n = len(active_seats)
-        btn_idx = active_seats.index(button_seat) if button_seat in active_seats else 0
-        hero_idx = active_seats.index(hero_seat) if hero_seat in active_seats else 0
-        rel_pos = (hero_idx - btn_idx) % n
-        
-        positions = ['BTN', 'SB', 'BB', 'UTG', 'MP', 'CO'][:n] if n <= 6 else ['BTN', 'SB', 'BB', 'UTG', 'MP', 'CO']
-        hand['hero_position'] = positions[rel_pos] if rel_pos < len(positions) else 'BTN'
+        elif a.player != HERO:
+            if a.verb == 'raises':
+                if street == 'preflop':
+                    hand['preflop_actions'].append({'action': 'raise', 'amount': a.to})
+                else:
+                    hand['postflop_actions'].append({
+                        'street': street,
+                        'action': 'villain_raise',
+                        'amount': a.to
+                    })
+            elif a.verb == 'bets' and street != 'preflop':
+                hand['postflop_actions'].append({
+                    'street': street,
+                    'action': 'villain_bet',
+                    'amount': a.amount
+                })
+    
+    # Preflop pot and raiser as they stood when the flop was dealt
+    if len(rec.board) >= 3:
+        hand['preflop_pot'] = preflop_pot
+        hand['preflop_raiser'] = last_raiser
     
     hand['hero_profit'] = hand['hero_won'] - hand['hero_invested']
     hand['profit_bb'] = hand['hero_profit'] / bb
     hand['hand_str'] = hand_to_str(hand['hero_cards'])
-    
-    if hand['hero_cards']:
-        return hand
-    return None
+    return hand
 
 def get_preflop_facing(hand):
     """Determine what hero faces preflop based on actual actions parsed from hand history."""
@@ -536,17 +394,355 @@ def evaluate_postflop(hand, situation, strategy_name):
     except:
         return None, None
 
+def evaluate_bet_check(hand, street, strategy_name, villain_aware=False):
+    """Would the strategy bet when checked to on this street? (pot=1.0 probe).
+
+    villain_aware passes the_lord's villain archetype and the multiway count.
+    """
+    board_len = {'flop': 3, 'turn': 4, 'river': 5}[street]
+    villain_arch = None
+    num_opponents = 1
+    if villain_aware:
+        num_opponents = hand.get('num_opponents_at_flop', 1)
+        if strategy_name == 'the_lord':
+            bettor = hand.get('postflop_bettor', {}).get(street)
+            if bettor:
+                villain_arch = get_player_archetype(bettor)
+    try:
+        action, size, reason = postflop_action(
+            hand['hero_cards'], hand['board'][:board_len],
+            pot=1.0, to_call=0,
+            street=street,
+            is_ip=True,
+            is_aggressor=hand['hero_preflop_action'] == 'raise',
+            archetype=villain_arch,
+            strategy=strategy_name,
+            num_opponents=num_opponents
+        )
+        return action, reason
+    except:
+        return None, None
+
+# ── Cached, parallel evaluation ──────────────────────────────────────
+# Every decision is keyed by (hand_id, strategy, situation) and kept in
+# eval_cache.db. Each strategy has a fingerprint over its ranges, its
+# postflop code/config and the shared evaluation code; when it changes only
+# that strategy's rows are dropped. Missing decisions are fanned out across
+# a process pool, one task per hand.
+
+EVAL_CACHE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eval_cache.db')
+EVAL_WORKERS = 1  # processes for evaluating uncached decisions (0 = all cores), set by --eval-workers
+
+# Config-driven postflop strategies (mirrors poker_logic.postflop_action dispatch)
+_POSTFLOP_CONFIG = {'kiro_lord': 'kiro_lord', 'kiro_optimal': 'kiro', 'kiro5': 'kiro', 'kiro_v2': 'kiro'}
+_POSTFLOP_MODULES = {
+    'value_lord': ('poker_logic.postflop_value_lord',),
+    'the_lord': ('poker_logic.postflop_the_lord', 'poker_logic.postflop_value_lord'),
+    'optimal_stats': ('poker_logic.postflop_inactive',),
+    'value_max': ('poker_logic.postflop_inactive',),
+    'gpt3': ('poker_logic.postflop_inactive',),
+    'gpt4': ('poker_logic.postflop_inactive',),
+    'sonnet_max': ('poker_logic.postflop_inactive',),
+}
+
+EVAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS strategies (
+    name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS decisions (
+    hand_id INTEGER NOT NULL,
+    strategy TEXT NOT NULL,
+    situation TEXT NOT NULL,
+    action TEXT,
+    reason TEXT,
+    PRIMARY KEY (strategy, hand_id, situation)
+);
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _source(obj):
+    return inspect.getsource(obj)
+
+
+def _shared_sources():
+    import poker_logic._monolith, poker_logic.card_utils, poker_logic.hand_analysis, poker_logic.preflop
+    return [_source(obj) for obj in (
+        poker_logic._monolith.postflop_action, poker_logic.preflop.preflop_action,
+        poker_logic.preflop.expand_range, poker_logic.card_utils, poker_logic.hand_analysis,
+        parse_hand, get_preflop_facing, get_postflop_situations,
+        evaluate_preflop, evaluate_postflop, evaluate_bet_check)]
+
+
+def strategy_fingerprint(strategy_name):
+    """Hash of everything a strategy's decisions depend on."""
+    import importlib
+    from poker_logic.postflop_base import STRATEGY_CONFIGS, postflop_config_driven
+    h = hashlib.sha1()
+    for part in _shared_sources():
+        h.update(part.encode())
+    h.update(json.dumps(STRATEGIES.get(strategy_name), sort_keys=True, default=sorted).encode())
+    if strategy_name in _POSTFLOP_MODULES:
+        for module in _POSTFLOP_MODULES[strategy_name]:
+            h.update(_source(importlib.import_module(module)).encode())
+    else:
+        config = STRATEGY_CONFIGS[_POSTFLOP_CONFIG.get(strategy_name, 'sonnet')]
+        h.update(_source(postflop_config_driven).encode())
+        h.update(json.dumps(config, sort_keys=True).encode())
+    if strategy_name == 'the_lord':
+        h.update(json.dumps(THE_LORD_VS_RAISE, sort_keys=True, default=sorted).encode())
+        h.update(json.dumps({p: s.get('archetype') for p, s in PLAYER_STATS.items()}, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def situation_key(kind, arg=None):
+    """'pre', 'post:<street>:<pot>:<to_call>:<aggr>:<facing raise>' or 'bet[_mw]:<street>'."""
+    if kind == 'pre':
+        return 'pre'
+    if kind == 'post':
+        return (f"post:{arg['street']}:{arg['pot']!r}:{arg['to_call']!r}:"
+                f"{int(arg['is_aggressor'])}:{int(arg.get('is_facing_raise', False))}")
+    return f"{kind}:{arg}"
+
+
+def decide(hand, strategy_name, kind, arg=None):
+    """Uncached decision: kind 'pre', 'post' (arg = situation), 'bet' / 'bet_mw' (arg = street)."""
+    if kind == 'pre':
+        return evaluate_preflop(hand, strategy_name)
+    if kind == 'post':
+        return evaluate_postflop(hand, arg, strategy_name)
+    return evaluate_bet_check(hand, arg, strategy_name, villain_aware=(kind == 'bet_mw'))
+
+
+class _Miss(Exception):
+    """Decision not cached (raised while checking a plan against the cache)."""
+
+
+class Decisions:
+    """Decision lookups for one set of strategies, computed on a miss.
+
+    known: {(strategy, hand_id): {situation_key: (action, reason)}}. New
+    decisions are recorded in self.new as (hand_id, strategy, key, action, reason).
+    """
+
+    def __init__(self, known=None):
+        self.known = known if known is not None else {}
+        self.new = []
+        self.strict = False
+
+    def _get(self, hand, strategy, kind, arg=None):
+        key = situation_key(kind, arg)
+        per_hand = self.known.get((strategy, hand['hand_id']))
+        hit = per_hand.get(key) if per_hand else None
+        if hit is None:
+            if self.strict:
+                raise _Miss()
+            hit = tuple(decide(hand, strategy, kind, arg))
+            self.known.setdefault((strategy, hand['hand_id']), {})[key] = hit
+            self.new.append((hand['hand_id'], strategy, key) + hit)
+        return hit
+
+    def preflop(self, hand, strategy):
+        return self._get(hand, strategy, 'pre')
+
+    def postflop(self, hand, situation, strategy):
+        return self._get(hand, strategy, 'post', situation)
+
+    def bet_check(self, hand, street, strategy, villain_aware=False):
+        return self._get(hand, strategy, 'bet_mw' if villain_aware else 'bet', street)
+
+
+def _run_plan(task):
+    """Worker: run plan(ev, hand, strategy) for each strategy, return new decisions."""
+    hand, strategies, plan, known = task
+    ev = Decisions(known)
+    for strategy in strategies:
+        plan(ev, hand, strategy)
+    return ev.new
+
+
+class StrategyEvaluator(Decisions):
+    """Persistent, fingerprint-invalidated cache of strategy decisions.
+
+        ev = StrategyEvaluator(ALL_STRATEGIES)
+        ev.prefetch(all_hands, judge_hand)       # evaluate what's missing in parallel
+        action, reason = ev.preflop(hand, 'value_lord')
+        ev.close()                               # store decisions computed on demand
+
+    prefetch() replays a report's per-(hand, strategy) plan against the cache;
+    only pairs that hit a missing decision are sent to the process pool, so
+    workers evaluate exactly what the report will ask for.
+    """
+
+    def __init__(self, strategies, db_path=EVAL_CACHE_DB, workers=None):
+        super().__init__()
+        self.strategies = list(strategies)
+        self.workers = EVAL_WORKERS if workers is None else workers
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(EVAL_SCHEMA)
+        self.invalidated = []
+        stored = dict(self.conn.execute('SELECT name, fingerprint FROM strategies'))
+        for s in self.strategies:
+            fp = strategy_fingerprint(s)
+            if stored.get(s) != fp:
+                self.conn.execute('DELETE FROM decisions WHERE strategy = ?', (s,))
+                self.conn.execute('INSERT OR REPLACE INTO strategies VALUES (?, ?)', (s, fp))
+                if s in stored:
+                    self.invalidated.append(s)
+        self.conn.commit()
+        for s in self.strategies:
+            for hand_id, key, action, reason in self.conn.execute(
+                    'SELECT hand_id, situation, action, reason FROM decisions WHERE strategy = ?', (s,)):
+                self.known.setdefault((s, hand_id), {})[key] = (action, reason)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def flush(self):
+        if self.new:
+            self.conn.executemany('INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?, ?)', self.new)
+            self.conn.commit()
+            self.new = []
+
+    def prefetch(self, hands, plan):
+        """Evaluate the decisions plan needs that aren't cached. Returns (cached, evaluated) pair counts."""
+        tasks = []
+        pairs = 0
+        self.strict = True
+        try:
+            for hand in hands:
+                todo = []
+                for s in self.strategies:
+                    pairs += 1
+                    try:
+                        plan(self, hand, s)
+                    except _Miss:
+                        todo.append(s)
+                if todo:
+                    known = {(s, hand['hand_id']): self.known.get((s, hand['hand_id']), {}) for s in todo}
+                    tasks.append((hand, todo, plan, known))
+        finally:
+            self.strict = False
+
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or len(tasks) <= 1:
+            results = [_run_plan(task) for task in tasks]
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_run_plan, tasks, chunksize=chunksize))
+        for rows in results:
+            for hand_id, strategy, key, action, reason in rows:
+                self.known.setdefault((strategy, hand_id), {})[key] = (action, reason)
+                self.new.append((hand_id, strategy, key, action, reason))
+        self.flush()
+        evaluated = sum(len(todo) for _, todo, _, _ in tasks)
+        return pairs - evaluated, evaluated
+
+
+def evaluator_for(hands, strategies, plan):
+    """Open the decision cache for strategies and evaluate what plan still needs on hands."""
+    ev = StrategyEvaluator(strategies)
+    cached, evaluated = ev.prefetch(hands, plan)
+    msg = f"Strategy decisions: {cached} hand/strategy pairs cached, {evaluated} evaluated"
+    if ev.invalidated:
+        msg += f" (changed: {', '.join(ev.invalidated)})"
+    print(msg)
+    print()
+    return ev
+
+def judge_hand(ev, hand, strategy):
+    """Where strategy departs from hero's play in one hand, as (results category, item) pairs.
+
+    Also the prefetch plan for main(): it asks ev exactly the decisions main needs.
+    """
+    if not hand['hero_position'] or not hand['hand_str']:
+        return []
+    findings = []
+    hero_played = hand['hero_preflop_action'] and hand['hero_preflop_action'] != 'fold'
+    strat_action, _ = ev.preflop(hand, strategy)
+    
+    if strat_action == 'fold' and hero_played:
+        # Strategy would fold, hero played
+        findings.append(('pf_would_fold', hand))
+    elif strat_action and strat_action != 'fold' and not hero_played:
+        # Strategy would play, hero folded
+        findings.append(('pf_would_play', hand))
+    
+    # Postflop evaluation - only for hands strategy would PLAY preflop
+    # (if strategy folds preflop, it never sees postflop)
+    if not hero_played or strat_action == 'fold':
+        return findings
+    
+    # Only count FIRST postflop fold (if fold flop, won't see turn)
+    found_fold = False
+    for sit in get_postflop_situations(hand):
+        strat_action, reason = ev.postflop(hand, sit, strategy)
+        if strat_action == 'fold' and sit['hero_action'] != 'fold':
+            findings.append(('post_would_fold', {
+                'hand': hand,
+                'situation': sit,
+                'reason': reason
+            }))
+            found_fold = True
+            break  # Only count first fold per hand
+    
+    # Check for betting leaks: hero bet but strategy would check
+    if not found_fold:
+        for street in ['flop', 'turn', 'river']:
+            board_len = {'flop': 3, 'turn': 4, 'river': 5}[street]
+            if len(hand['board']) < board_len:
+                continue
+            
+            # Did hero bet on this street?
+            hero_bet = None
+            for a in hand['postflop_actions']:
+                if a['street'] == street and a['action'] in ['bet', 'raise']:
+                    hero_bet = a['amount']
+                    break
+            
+            if hero_bet is None:
+                continue
+            
+            # What would strategy do?
+            action, reason = ev.bet_check(hand, street, strategy)
+            
+            if action == 'check':
+                findings.append(('post_would_check', {
+                    'hand': hand,
+                    'street': street,
+                    'hero_bet': hero_bet,
+                    'reason': reason
+                }))
+                found_fold = True  # Count as handled
+                break
+    
+    # Track unsaved losses: strategy plays through but loses
+    if not found_fold and hand['profit_bb'] < -10:  # Only significant losses
+        findings.append(('unsaved_losses', hand))
+    return findings
+
 def main(min_bb=None, focus_strategy=None):
-    hh_dir = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
-    all_hands = parse_all_hands(hh_dir)
+    index = index_hands(HH_DIR)
     
     # Filter by BB threshold if specified
+    selected = index.all()
     if min_bb:
-        all_hands = [h for h in all_hands if abs(h['profit_bb']) >= min_bb]
-        print(f"Filtered to {len(all_hands)} hands with >= {min_bb} BB swing")
+        selected = index.swing(min_bb)
+        print(f"Filtered to {len(selected)} hands with >= {min_bb} BB swing")
         print()
+    all_hands = selected.hands()
     
     strategies = [focus_strategy] if focus_strategy else ALL_STRATEGIES
+    ev = evaluator_for(all_hands, strategies, judge_hand)
     
     print("=" * 100)
     print("STRATEGY ANALYSIS ON REAL POKERSTARS HANDS")
@@ -556,28 +752,25 @@ def main(min_bb=None, focus_strategy=None):
     # Basic stats
     print(f"Total hands: {len(all_hands)}")
     
-    total_profit = sum(h['hero_profit'] for h in all_hands)
-    total_bb = sum(h['profit_bb'] for h in all_hands)
-    
+    total = selected.summary()
     if all_hands:
-        print(f"Actual results: €{total_profit:.2f} ({total_bb:.1f} BB, {total_bb/len(all_hands)*100:.1f} BB/100)")
+        print(f"Actual results: €{total['profit']:.2f} ({total['profit_bb']:.1f} BB, {total['bb_100']:.1f} BB/100)")
     print()
     
     # By stakes
+    by_stakes = selected.group_by('bb')
     for stakes, bb_val in [('5NL', 0.05), ('10NL', 0.10), ('25NL', 0.25)]:
-        hands = [h for h in all_hands if h['bb'] == bb_val]
-        if hands:
-            profit = sum(h['hero_profit'] for h in hands)
-            profit_bb = sum(h['profit_bb'] for h in hands)
-            print(f"  {stakes}: {len(hands)} hands, €{profit:.2f} ({profit_bb:.1f} BB, {profit_bb/len(hands)*100:.1f} BB/100)")
+        if bb_val in by_stakes:
+            s = by_stakes[bb_val].summary()
+            print(f"  {stakes}: {s['hands']} hands, €{s['profit']:.2f} ({s['profit_bb']:.1f} BB, {s['bb_100']:.1f} BB/100)")
     print()
     
     # Hands played vs folded
-    played = [h for h in all_hands if h['hero_preflop_action'] and h['hero_preflop_action'] != 'fold']
-    folded = [h for h in all_hands if h['hero_preflop_action'] == 'fold' or h['hero_preflop_action'] is None]
+    played = len(selected.where(played=True))
+    folded = len(selected) - played
     
-    print(f"Hands played: {len(played)} ({len(played)/len(all_hands)*100:.1f}%)" if all_hands else "")
-    print(f"Hands folded preflop: {len(folded)} ({len(folded)/len(all_hands)*100:.1f}%)" if all_hands else "")
+    print(f"Hands played: {played} ({played/len(all_hands)*100:.1f}%)" if all_hands else "")
+    print(f"Hands folded preflop: {folded} ({folded/len(all_hands)*100:.1f}%)" if all_hands else "")
     print()
     
     # Evaluate strategies
@@ -592,85 +785,9 @@ def main(min_bb=None, focus_strategy=None):
         }
     
     for hand in all_hands:
-        if not hand['hero_position'] or not hand['hand_str']:
-            continue
-        
         for strategy in strategies:
-            strat_action, _ = evaluate_preflop(hand, strategy)
-            
-            if strat_action == 'fold' and hand['hero_preflop_action'] and hand['hero_preflop_action'] != 'fold':
-                # Strategy would fold, hero played
-                results[strategy]['pf_would_fold'].append(hand)
-            elif strat_action and strat_action != 'fold' and (hand['hero_preflop_action'] == 'fold' or hand['hero_preflop_action'] is None):
-                # Strategy would play, hero folded
-                results[strategy]['pf_would_play'].append(hand)
-        
-        # Postflop evaluation - only for hands strategy would PLAY preflop
-        # (if strategy folds preflop, it never sees postflop)
-        if hand['hero_preflop_action'] and hand['hero_preflop_action'] != 'fold':
-            situations = get_postflop_situations(hand)
-            is_aggressor = hand['hero_preflop_action'] == 'raise'
-            
-            for strategy in strategies:
-                # Skip if strategy would fold preflop (already counted above)
-                strat_pf_action, _ = evaluate_preflop(hand, strategy)
-                if strat_pf_action == 'fold':
-                    continue
-                
-                # Only count FIRST postflop fold (if fold flop, won't see turn)
-                found_fold = False
-                for sit in situations:
-                    strat_action, reason = evaluate_postflop(hand, sit, strategy)
-                    if strat_action == 'fold' and sit['hero_action'] != 'fold':
-                        results[strategy]['post_would_fold'].append({
-                            'hand': hand,
-                            'situation': sit,
-                            'reason': reason
-                        })
-                        found_fold = True
-                        break  # Only count first fold per hand
-                
-                # Check for betting leaks: hero bet but strategy would check
-                if not found_fold:
-                    for street in ['flop', 'turn', 'river']:
-                        board_len = {'flop': 3, 'turn': 4, 'river': 5}[street]
-                        if len(hand['board']) < board_len:
-                            continue
-                        
-                        # Did hero bet on this street?
-                        hero_bet = None
-                        for a in hand['postflop_actions']:
-                            if a['street'] == street and a['action'] in ['bet', 'raise']:
-                                hero_bet = a['amount']
-                                break
-                        
-                        if hero_bet is None:
-                            continue
-                        
-                        # What would strategy do?
-                        board = hand['board'][:board_len]
-                        action, size, reason = postflop_action(
-                            hand['hero_cards'], board,
-                            pot=1.0, to_call=0,
-                            street=street,
-                            is_ip=True,
-                            is_aggressor=is_aggressor,
-                            strategy=strategy
-                        )
-                        
-                        if action == 'check':
-                            results[strategy]['post_would_check'].append({
-                                'hand': hand,
-                                'street': street,
-                                'hero_bet': hero_bet,
-                                'reason': reason
-                            })
-                            found_fold = True  # Count as handled
-                            break
-                
-                # Track unsaved losses: strategy plays through but loses
-                if not found_fold and hand['profit_bb'] < -10:  # Only significant losses
-                    results[strategy]['unsaved_losses'].append(hand)
+            for category, item in judge_hand(ev, hand, strategy):
+                results[strategy][category].append(item)
     
     # Calculate impact
     print("=" * 100)
@@ -840,7 +957,7 @@ def main(min_bb=None, focus_strategy=None):
         
         actions = {}
         for strategy in strategies:
-            action, _ = evaluate_preflop(hand, strategy)
+            action, _ = ev.preflop(hand, strategy)
             if action:
                 actions[strategy] = action
         
@@ -873,14 +990,14 @@ def main(min_bb=None, focus_strategy=None):
             print(f"       FOLD: {', '.join(d['folds'])}")
         if len(d['plays']) <= 4:
             print(f"       PLAY: {', '.join(d['plays'])}")
+    ev.close()
 
 def test_range_changes(min_bb=10):
     """Test impact of proposed range changes."""
     from poker_logic import STRATEGIES, expand_range
     
-    hh_dir = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
-    all_hands = parse_all_hands(hh_dir)
-    big_hands = [h for h in all_hands if abs(h['profit_bb']) >= min_bb]
+    index = index_hands(HH_DIR)
+    big_hands = index.swing(min_bb).hands()
     
     # Current value_lord ranges
     current_call_open_ip = STRATEGIES['value_lord']['call_open_ip']
@@ -963,17 +1080,35 @@ def test_range_changes(min_bb=10):
     print(f"  ATs 3bet: {total_ATs:>+7.1f} BB")
     print(f"  TOTAL IMPACT: {total_97s + total_76s + total_ATs:>+7.1f} BB")
 
+def first_fold(ev, hand, strategy):
+    """Returns (fold_point, reason) or (None, None) if strategy plays through."""
+    # Check preflop
+    pf_action, pf_reason = ev.preflop(hand, strategy)
+    if pf_action == 'fold':
+        return ('preflop', pf_reason)
+    
+    # Check postflop
+    if hand['hero_preflop_action'] and hand['hero_preflop_action'] != 'fold':
+        situations = get_postflop_situations(hand)
+        for sit in situations:
+            action, reason = ev.postflop(hand, sit, strategy)
+            if action == 'fold':
+                return (sit['street'], reason)
+    
+    return (None, None)
+
 def detailed_analysis(min_bb=10, strategy_name='value_lord'):
     """Hand-by-hand analysis showing exactly where strategy would fold."""
-    hh_dir = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
-    all_hands = parse_all_hands(hh_dir)
+    index = index_hands(HH_DIR)
     
     # Filter to big hands
-    big_hands = [h for h in all_hands if abs(h['profit_bb']) >= min_bb]
+    big = index.swing(min_bb)
+    big_hands = big.hands()
+    ev = evaluator_for(big_hands, [strategy_name], first_fold)
     
     # Separate winners and losers
-    winners = sorted([h for h in big_hands if h['profit_bb'] > 0], key=lambda x: -x['profit_bb'])
-    losers = sorted([h for h in big_hands if h['profit_bb'] < 0], key=lambda x: x['profit_bb'])
+    winners = sorted(big.where(result='win').hands(), key=lambda x: -x['profit_bb'])
+    losers = sorted(big.where(result='loss').hands(), key=lambda x: x['profit_bb'])
     
     print("=" * 120)
     print(f"DETAILED HAND-BY-HAND ANALYSIS: {strategy_name} on hands >= {min_bb} BB")
@@ -991,23 +1126,6 @@ def detailed_analysis(min_bb=10, strategy_name='value_lord'):
     strategy_saves = []  # Losers where strategy folds
     strategy_misses = []  # Winners where strategy folds
     
-    def analyze_single_hand(hand):
-        """Returns (fold_point, reason) or (None, None) if strategy plays through."""
-        # Check preflop
-        pf_action, pf_reason = evaluate_preflop(hand, strategy_name)
-        if pf_action == 'fold':
-            return ('preflop', pf_reason)
-        
-        # Check postflop
-        if hand['hero_preflop_action'] and hand['hero_preflop_action'] != 'fold':
-            situations = get_postflop_situations(hand)
-            for sit in situations:
-                action, reason = evaluate_postflop(hand, sit, strategy_name)
-                if action == 'fold':
-                    return (sit['street'], reason)
-        
-        return (None, None)
-    
     def get_play_analysis(hand):
         """For hands strategy plays, return analysis of hand strength and villain action."""
         from poker_logic import analyze_hand
@@ -1118,7 +1236,7 @@ def detailed_analysis(min_bb=10, strategy_name='value_lord'):
     strategy_plays = []  # Losers where strategy plays through
     
     for h in losers:
-        fold_point, reason = analyze_single_hand(h)
+        fold_point, reason = first_fold(ev, h, strategy_name)
         board_str = ' '.join(h['board']) if h['board'] else '-'
         
         if fold_point:
@@ -1140,7 +1258,7 @@ def detailed_analysis(min_bb=10, strategy_name='value_lord'):
     print("-" * 120)
     
     for h in winners:
-        fold_point, reason = analyze_single_hand(h)
+        fold_point, reason = first_fold(ev, h, strategy_name)
         board_str = ' '.join(h['board']) if h['board'] else '-'
         
         if fold_point:
@@ -1207,24 +1325,74 @@ def detailed_analysis(min_bb=10, strategy_name='value_lord'):
                 savings_str = f" [saves {savings:.1f} BB]" if savings > 0 else ""
                 print(f"    {h['hand_str']:<6} {h['hero_position']:<4} {abs(h['profit_bb']):>6.1f} BB - {p['analysis']}{savings_str}")
     
+    ev.close()
     return strategy_saves, strategy_misses
 
+def judge_postflop(ev, hand, strategy):
+    """Calling and betting leaks of strategy in one hand, as (results category, item) pairs.
+
+    Also the prefetch plan for postflop_only_analysis().
+    """
+    findings = []
+    # Check calling leaks: strategy folds, hero called (only when facing bet)
+    for sit in get_postflop_situations(hand):
+        if sit['to_call'] <= 0:  # Skip betting spots
+            continue
+        strat_action, reason = ev.postflop(hand, sit, strategy)
+        if strat_action == 'fold' and sit['hero_action'] != 'fold':
+            remaining = sit.get('remaining_investment', 0)
+            hero_won = hand['hero_won']
+            impact = remaining - hero_won  # positive = save, negative = miss
+            findings.append(('would_fold', {
+                'hand': hand,
+                'situation': sit,
+                'reason': reason,
+                'impact': impact
+            }))
+            break  # Only first fold per hand
+    
+    # Check betting leaks: strategy checks, hero bet
+    for street in ['flop', 'turn', 'river']:
+        board_len = {'flop': 3, 'turn': 4, 'river': 5}[street]
+        if len(hand['board']) < board_len:
+            continue
+        
+        # Did hero bet on this street?
+        hero_bet = None
+        for a in hand['postflop_actions']:
+            if a['street'] == street and a['action'] in ['bet', 'raise']:
+                hero_bet = a['amount']
+                break
+        
+        if hero_bet is None:
+            continue
+        
+        # Villain archetype (the_lord) and multiway count
+        action, reason = ev.bet_check(hand, street, strategy, villain_aware=True)
+        if action == 'check':
+            findings.append(('would_check', {
+                'hand': hand,
+                'street': street,
+                'hero_bet': hero_bet,
+                'reason': reason
+            }))
+            break
+    return findings
+
 def postflop_only_analysis(min_bb=None):
     """Compare strategies on postflop decisions only, ignoring preflop ranges.
     
     This assumes ALL strategies reached postflop with the same hands,
     so we can compare pure postflop skill without preflop bias.
     """
-    hh_dir = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
-    all_hands = parse_all_hands(hh_dir)
+    index = index_hands(HH_DIR)
     
     # Only hands that reached postflop (hero didn't fold preflop)
-    postflop_hands = [h for h in all_hands 
-                      if h['hero_preflop_action'] and h['hero_preflop_action'] != 'fold'
-                      and h['board']]
-    
+    selected = index.where(played=True, saw_flop=True)
     if min_bb:
-        postflop_hands = [h for h in postflop_hands if abs(h['profit_bb']) >= min_bb]
+        selected &= index.swing(min_bb)
+    postflop_hands = selected.hands()
+    ev = evaluator_for(postflop_hands, ALL_STRATEGIES, judge_postflop)
     
     print("=" * 100)
     print("POSTFLOP-ONLY STRATEGY COMPARISON")
@@ -1244,75 +1412,10 @@ def postflop_only_analysis(min_bb=None):
         }
     
     for hand in postflop_hands:
-        situations = get_postflop_situations(hand)
-        is_aggressor = hand['hero_preflop_action'] == 'raise'
-        
         for strategy in ALL_STRATEGIES:
-            # Check calling leaks: strategy folds, hero called (only when facing bet)
-            for sit in situations:
-                if sit['to_call'] <= 0:  # Skip betting spots
-                    continue
-                strat_action, reason = evaluate_postflop(hand, sit, strategy)
-                if strat_action == 'fold' and sit['hero_action'] != 'fold':
-                    remaining = sit.get('remaining_investment', 0)
-                    hero_won = hand['hero_won']
-                    impact = remaining - hero_won  # positive = save, negative = miss
-                    results[strategy]['would_fold'].append({
-                        'hand': hand,
-                        'situation': sit,
-                        'reason': reason,
-                        'impact': impact
-                    })
-                    break  # Only first fold per hand
-            
-            # Check betting leaks: strategy checks, hero bet
-            for street in ['flop', 'turn', 'river']:
-                board_len = {'flop': 3, 'turn': 4, 'river': 5}[street]
-                if len(hand['board']) < board_len:
-                    continue
-                
-                # Did hero bet on this street?
-                hero_bet = None
-                for a in hand['postflop_actions']:
-                    if a['street'] == street and a['action'] in ['bet', 'raise']:
-                        hero_bet = a['amount']
-                        break
-                
-                if hero_bet is None:
-                    continue
-                
-                board = hand['board'][:board_len]
-                num_opponents = hand.get('num_opponents_at_flop', 1)
-                
-                # Get villain archetype for the_lord
-                villain_arch = None
-                if strategy == 'the_lord':
-                    bettor = hand.get('postflop_bettor', {}).get(street)
-                    if bettor:
-                        villain_arch = get_player_archetype(bettor)
-                
-                try:
-                    action, size, reason = postflop_action(
-                        hand['hero_cards'], board,
-                        pot=1.0, to_call=0,
-                        street=street,
-                        is_ip=True,
-                        is_aggressor=is_aggressor,
-                        archetype=villain_arch,
-                        strategy=strategy,
-                        num_opponents=num_opponents
-                    )
-                    
-                    if action == 'check':
-                        results[strategy]['would_check'].append({
-                            'hand': hand,
-                            'street': street,
-                            'hero_bet': hero_bet,
-                            'reason': reason
-                        })
-                        break
-                except:
-                    pass
+            for category, item in judge_postflop(ev, hand, strategy):
+                results[strategy][category].append(item)
+    ev.close()
     
     # Calculate impact for each strategy
     print()
@@ -1391,7 +1494,12 @@ if __name__ == '__main__':
     parser.add_argument('--detailed', action='store_true', help='Hand-by-hand detailed analysis')
     parser.add_argument('--test-ranges', action='store_true', help='Test proposed range changes')
     parser.add_argument('--postflop-only', action='store_true', help='Compare postflop decisions only (ignores preflop)')
+    parser.add_argument('--workers', type=int, default=1, help='Parse new hand files in N processes (0 = all cores)')
+    parser.add_argument('--eval-workers', type=int, default=1,
+                        help='Evaluate uncached strategy decisions in N processes (0 = all cores)')
     args = parser.parse_args()
+    INGEST_WORKERS = args.workers
+    EVAL_WORKERS = args.eval_workers
     
     if args.test_ranges:
         test_range_changes(min_bb=args.big or 10)
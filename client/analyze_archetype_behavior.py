@@ -4,9 +4,10 @@ Analyze REAL postflop behavior by archetype from hand histories.
 Compare to what our simulated archetypes do.
 """
 
-import os
-import re
 from collections import defaultdict
+
+import hand_cache
+import hh_parser
 from build_player_stats import classify_archetype
 
 HH_DIR = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
@@ -17,75 +18,27 @@ def parse_all_hands():
     player_preflop = defaultdict(lambda: {'hands': 0, 'vpip': 0, 'pfr': 0})
     player_postflop = defaultdict(lambda: {'check': 0, 'bet': 0, 'call': 0, 'fold': 0, 'raise': 0})
     
-    for filename in os.listdir(HH_DIR):
-        if not filename.endswith('.txt'):
-            continue
-        filepath = os.path.join(HH_DIR, filename)
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-        
-        for hand_text in re.split(r'\n\n\n+', content):
-            if not hand_text.strip():
-                continue
-            parse_hand(hand_text, player_preflop, player_postflop)
+    for hand in hand_cache.iter_hands(HH_DIR):
+        parse_hand(hand, player_preflop, player_postflop)
     
     return player_preflop, player_postflop
 
 
-def parse_hand(text, player_preflop, player_postflop):
-    """Parse single hand for preflop stats and postflop actions."""
-    lines = text.strip().split('\n')
-    
-    # Get players
-    players = set()
-    for line in lines:
-        m = re.match(r'Seat \d+: (\S+)', line)
-        if m and m.group(1) != 'idealistslp':
-            players.add(m.group(1))
-    
-    # Track preflop
-    in_preflop = False
-    preflop_raisers = set()
-    preflop_callers = set()
-    
-    # Track postflop
-    in_postflop = False
-    
-    for line in lines:
-        if '*** HOLE CARDS ***' in line:
-            in_preflop = True
-            continue
-        if '*** FLOP ***' in line:
-            in_preflop = False
-            in_postflop = True
-            continue
-        if '*** SUMMARY ***' in line:
-            in_postflop = False
-            continue
-        
-        for player in players:
-            if not line.startswith(f'{player}:'):
-                continue
-            
-            if in_preflop:
-                if ': raises' in line or ': bets' in line:
-                    preflop_raisers.add(player)
-                elif ': calls' in line:
-                    preflop_callers.add(player)
-            
-            if in_postflop:
-                if ': checks' in line:
-                    player_postflop[player]['check'] += 1
-                elif ': bets' in line:
-                    player_postflop[player]['bet'] += 1
-                elif ': calls' in line:
-                    player_postflop[player]['call'] += 1
-                elif ': folds' in line:
-                    player_postflop[player]['fold'] += 1
-                elif ': raises' in line:
-                    player_postflop[player]['raise'] += 1
+POSTFLOP_VERBS = {'checks': 'check', 'bets': 'bet', 'calls': 'call', 'folds': 'fold', 'raises': 'raise'}
+
+
+def parse_hand(hand, player_preflop, player_postflop):
+    """Update preflop stats and postflop action counts from a Hand record."""
+    players = set(hh_parser.players(hand)) - {hh_parser.HERO_NAME}
+    
+    for a in hand.actions:
+        if a.street in ('flop', 'turn', 'river', 'showdown') and a.player in players:
+            key = POSTFLOP_VERBS.get(a.verb)
+            if key:
+                player_postflop[a.player][key] += 1
     
     # Update preflop stats
+    preflop_raisers, preflop_callers = hh_parser.preflop_actors(hand)
     for player in players:
         player_preflop[player]['hands'] += 1
         if player in preflop_raisers or player in preflop_callers:
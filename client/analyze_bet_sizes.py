@@ -2,10 +2,12 @@
 """Analyze real bet sizes by archetype from hand histories."""
 
 import os
-import re
 import json
 from collections import defaultdict
 
+import hand_cache
+import hh_parser
+
 HH_DIR = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
 DB_PATH = '/home/ubuntu/mcpprojects/onyxpoker/client/player_stats.json'
 
@@ -22,109 +24,54 @@ def parse_all_hands():
     # bet_sizes[player] = list of (bet_amount, pot_before_bet) tuples
     player_bets = defaultdict(list)
     
-    for filename in os.listdir(HH_DIR):
-        if not filename.endswith('.txt'):
-            continue
-        with open(os.path.join(HH_DIR, filename), 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-        
-        for hand_text in re.split(r'\n\n\n+', content):
-            if hand_text.strip():
-                parse_hand(hand_text, player_preflop, player_bets)
+    for hand in hand_cache.iter_hands(HH_DIR):
+        parse_hand(hand, player_preflop, player_bets)
     
     return player_preflop, player_bets
 
 
-def parse_hand(text, player_preflop, player_bets):
-    lines = text.strip().split('\n')
-    
-    # Get players
-    players = set()
-    for line in lines:
-        m = re.match(r'Seat \d+: (\S+)', line)
-        if m and m.group(1) != 'idealistslp':
-            players.add(m.group(1))
+def parse_hand(hand, player_preflop, player_bets):
+    """Update per-player preflop counts and postflop (bet, street_pot) pairs from a Hand record."""
+    players = set(hh_parser.players(hand)) - {hh_parser.HERO_NAME}
     
     # Track pot per street
     pot = 0
     street_pot = 0  # Pot at start of current street
-    in_preflop = False
-    in_postflop = False
-    preflop_raisers = set()
-    preflop_callers = set()
+    street = 'preflop'
     
-    for line in lines:
-        # Track blinds (€ or $)
-        if ': posts small blind' in line:
-            m = re.search(r'posts small blind [€$]?([\d.]+)', line)
-            if m:
-                pot += float(m.group(1))
-        elif ': posts big blind' in line:
-            m = re.search(r'posts big blind [€$]?([\d.]+)', line)
-            if m:
-                pot += float(m.group(1))
-        
-        if '*** HOLE CARDS ***' in line:
-            in_preflop = True
+    for a in hand.actions:
+        if a.verb in ('posts_sb', 'posts_bb'):
+            pot += a.amount
             continue
-        if '*** FLOP ***' in line:
-            in_preflop = False
-            in_postflop = True
-            street_pot = pot  # Record pot at start of flop
+        if a.street != street:
+            street = a.street
+            street_pot = pot  # Record pot at start of flop/turn/river
+        if a.player not in players:
             continue
-        if '*** TURN ***' in line:
-            street_pot = pot  # Record pot at start of turn
-            continue
-        if '*** RIVER ***' in line:
-            street_pot = pot  # Record pot at start of river
-            continue
-        if '*** SUMMARY ***' in line:
-            in_postflop = False
-            continue
-        
-        # Track preflop actions for VPIP/PFR
-        if in_preflop:
-            for player in players:
-                if line.startswith(f'{player}:'):
-                    if ': raises' in line or ': bets' in line:
-                        preflop_raisers.add(player)
-                        m = re.search(r'to [€$]?([\d.]+)', line)
-                        if m:
-                            pot = float(m.group(1)) + pot * 0.5  # Approximate
-                    elif ': calls' in line:
-                        preflop_callers.add(player)
-                        m = re.search(r'calls [€$]?([\d.]+)', line)
-                        if m:
-                            pot += float(m.group(1))
         
-        # Track postflop bets
-        if in_postflop:
-            for player in players:
-                if not line.startswith(f'{player}:'):
-                    continue
-                
-                # Track bets only
-                m = re.search(r': bets [€$]?([\d.]+)', line)
-                if m:
-                    bet = float(m.group(1))
-                    if street_pot > 0.01:
-                        player_bets[player].append((bet, street_pot))
-                    pot += bet
-                
-                # Track calls/raises for pot
-                m = re.search(r': calls [€$]?([\d.]+)', line)
-                if m:
-                    pot += float(m.group(1))
-                m = re.search(r': raises [€$]?[\d.]+ to [€$]?([\d.]+)', line)
-                if m:
-                    pot += float(m.group(1))
+        if street == 'preflop':
+            if a.verb in ('raises', 'bets'):
+                if a.to:
+                    pot = a.to + pot * 0.5  # Approximate
+            elif a.verb == 'calls':
+                pot += a.amount
+        elif street in ('flop', 'turn', 'river'):
+            if a.verb == 'bets':
+                if street_pot > 0.01:
+                    player_bets[a.player].append((a.amount, street_pot))
+                pot += a.amount
+            elif a.verb == 'calls':
+                pot += a.amount
+            elif a.verb == 'raises':
+                pot += a.to
     
     # Update preflop stats
+    raisers, callers = hh_parser.preflop_actors(hand)
     for player in players:
         player_preflop[player]['hands'] += 1
-        if player in preflop_raisers or player in preflop_callers:
+        if player in raisers or player in callers:
             player_preflop[player]['vpip'] += 1
-        if player in preflop_raisers:
+        if player in raisers:
             player_preflop[player]['pfr'] += 1
 
 
@@ -4,131 +4,74 @@ Analyze betting patterns from real hand histories.
 Shows win rates by hand strength, bet size, street, and aggressor status.
 """
 
-import os
-import re
 from collections import defaultdict
 
+import hand_cache
+import hh_parser
+
 HH_DIR = '../idealistslp_extracted'
-HERO = 'idealistslp'
+HERO = hh_parser.HERO_NAME
 BB = 0.05  # €0.05 big blind
 
 def parse_hands():
     """Parse all hand histories."""
     all_hands = []
     
-    for fname in os.listdir(HH_DIR):
-        if not fname.endswith('.txt'):
+    for hand in hand_cache.iter_hands(HH_DIR):
+        if not hand.zoom or hand.hero != HERO:
             continue
         
-        with open(os.path.join(HH_DIR, fname), 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-        
-        for hand_text in re.split(r'\n\n\n+', content):
-            if 'Zoom Hand' not in hand_text or HERO not in hand_text:
-                continue
-            
-            parsed = parse_single_hand(hand_text)
-            if parsed and parsed['hero_cards']:
-                all_hands.append(parsed)
+        parsed = parse_single_hand(hand)
+        if parsed and parsed['hero_cards']:
+            all_hands.append(parsed)
     
     return all_hands
 
-def parse_single_hand(text):
-    """Parse a single hand for betting analysis."""
-    lines = text.strip().split('\n')
-    
-    hero_cards = None
-    board = []
-    current_street = 'preflop'
+def parse_single_hand(hand):
+    """Extract hero's postflop bets (with pot at start of street) from a Hand record."""
+    hero_cards = list(hand.hero_cards) if hand.hero == HERO and hand.hero_cards else None
+    board = list(hand.board)
     was_preflop_aggressor = False
     
     # Track pot at start of each street
     pot = 0
     pot_at_street = {'flop': 0, 'turn': 0, 'river': 0}
+    current_street = 'preflop'
     
     # Hero bets with context
     hero_bets = []
-    hero_won = 0
-    
-    for line in lines:
-        # Hero cards
-        if f'Dealt to {HERO}' in line:
-            m = re.search(r'\[(\w\w) (\w\w)\]', line)
-            if m:
-                hero_cards = [m.group(1), m.group(2)]
-        
-        # Preflop aggression
-        if current_street == 'preflop' and HERO in line and ': raises' in line:
-            was_preflop_aggressor = True
-        
-        # Track pot
-        if current_street == 'preflop':
-            for pattern in [r': posts small blind €([\d.]+)', r': posts big blind €([\d.]+)',
-                           r': calls €([\d.]+)']:
-                m = re.search(pattern, line)
-                if m:
-                    pot += float(m.group(1))
-            if ': raises' in line:
-                m = re.search(r'to €([\d.]+)', line)
-                if m:
-                    pot = float(m.group(1)) * 2  # Rough estimate
-        
-        # Street transitions
-        if '*** FLOP ***' in line:
-            pot_at_street['flop'] = pot
-            current_street = 'flop'
-            m = re.search(r'\[(\w\w) (\w\w) (\w\w)\]', line)
-            if m:
-                board = [m.group(1), m.group(2), m.group(3)]
-        elif '*** TURN ***' in line:
-            pot_at_street['turn'] = pot
-            current_street = 'turn'
-            m = re.search(r'\] \[(\w\w)\]', line)
-            if m:
-                board.append(m.group(1))
-        elif '*** RIVER ***' in line:
-            pot_at_street['river'] = pot
-            current_street = 'river'
-            m = re.search(r'\] \[(\w\w)\]', line)
-            if m:
-                board.append(m.group(1))
-        
-        # Track pot growth
-        if current_street in ['flop', 'turn', 'river']:
-            for pattern in [r': bets €([\d.]+)', r': calls €([\d.]+)']:
-                m = re.search(pattern, line)
-                if m:
-                    pot += float(m.group(1))
-            if ': raises' in line:
-                m = re.search(r'to €([\d.]+)', line)
-                if m:
-                    pot += float(m.group(1))
+    
+    for a in hand.actions:
+        if a.street in pot_at_street and a.street != current_street:
+            current_street = a.street
+            pot_at_street[current_street] = pot
         
-        # Hero bets
-        if HERO in line and current_street in ['flop', 'turn', 'river']:
-            if ': bets' in line:
-                m = re.search(r'bets €([\d.]+)', line)
-                if m:
-                    bet_amt = float(m.group(1))
-                    hero_bets.append({
-                        'street': current_street,
-                        'bet': bet_amt,
-                        'pot_before': pot_at_street[current_street],
-                        'board': board.copy()
-                    })
-    
-    # Check if hero won
-    for line in lines:
-        if HERO in line and 'collected' in line:
-            m = re.search(r'collected €([\d.]+)', line)
-            if m:
-                hero_won = float(m.group(1))
+        if a.street == 'preflop':
+            if a.player == HERO and a.verb == 'raises':
+                was_preflop_aggressor = True
+            if a.verb in ('posts_sb', 'posts_bb', 'calls'):
+                pot += a.amount
+            elif a.verb == 'raises':
+                pot = a.to * 2  # Rough estimate
+        elif a.street in pot_at_street:
+            if a.verb in ('bets', 'calls'):
+                pot += a.amount
+            elif a.verb == 'raises':
+                pot += a.to
+            
+            if a.player == HERO and a.verb == 'bets':
+                hero_bets.append({
+                    'street': a.street,
+                    'bet': a.amount,
+                    'pot_before': pot_at_street[a.street],
+                    'board': board[:{'flop': 3, 'turn': 4, 'river': 5}[a.street]]
+                })
     
     return {
         'hero_cards': hero_cards,
         'board': board,
         'hero_bets': hero_bets,
-        'hero_won': hero_won,
+        'hero_won': hh_parser.collected(hand, HERO),
         'was_aggressor': was_preflop_aggressor
     }
 
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Analyze hero's hole card combinations - BB won/lost per hand."""
 
-import os
-import re
 from collections import defaultdict
 
+import hand_cache
+import hh_parser
+
 def normalize_hand(c1, c2):
     """Normalize to standard format: AA, AKs, AKo"""
     r1, s1 = c1[0], c1[1]
@@ -26,84 +27,16 @@ def parse_hand_histories():
     results = defaultdict(lambda: {'hands': 0, 'bb_won': 0.0})
     
     hh_dir = '../idealistslp_extracted'
-    for fname in os.listdir(hh_dir):
-        if not fname.startswith('HH') or not fname.endswith('.txt'):
+    for hand in hand_cache.iter_hands(hh_dir, prefix='HH'):
+        # Find hero and their cards
+        if not hand.hero or not hand.hero_cards or not hand.bb:
             continue
+        combo = normalize_hand(*hand.hero_cards)
         
-        with open(os.path.join(hh_dir, fname), 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        # Split into individual hands
-        hands = re.split(r'\n(?=PokerStars)', content)
-        
-        for hand in hands:
-            if not hand.strip():
-                continue
-            
-            # Find hero and their cards
-            hero_match = re.search(r'Dealt to (\w+) \[(\w\w) (\w\w)\]', hand)
-            if not hero_match:
-                continue
-            
-            hero = hero_match.group(1)
-            card1, card2 = hero_match.group(2), hero_match.group(3)
-            combo = normalize_hand(card1, card2)
-            
-            # Get BB size (€ or $)
-            bb_match = re.search(r'[€$](\d+\.?\d*)/[€$](\d+\.?\d*)', hand)
-            if not bb_match:
-                continue
-            bb = float(bb_match.group(2))
-            
-            # Parse SUMMARY section for accurate profit
-            summary_match = re.search(r'\*\*\* SUMMARY \*\*\*.*', hand, re.DOTALL)
-            if not summary_match:
-                continue
-            summary = summary_match.group(0)
-            
-            # Find hero's seat result
-            # Patterns: "won (€X)", "lost", "folded", "mucked"
-            hero_result = re.search(rf'Seat \d+: {hero}[^\n]*', summary)
-            if not hero_result:
-                continue
-            
-            result_line = hero_result.group(0)
-            
-            # Calculate profit
-            won = 0.0
-            invested = 0.0
-            
-            # Check if hero won
-            won_match = re.search(r'won \([€$](\d+\.?\d*)\)', result_line)
-            if won_match:
-                won = float(won_match.group(1))
-            
-            # Calculate invested from actions in hand
-            # Posts (blinds/antes)
-            for m in re.finditer(rf'{hero}: posts[^\n]*[€$](\d+\.?\d*)', hand):
-                invested += float(m.group(1))
-            
-            # Calls
-            for m in re.finditer(rf'{hero}: calls [€$](\d+\.?\d*)', hand):
-                invested += float(m.group(1))
-            
-            # Bets
-            for m in re.finditer(rf'{hero}: bets [€$](\d+\.?\d*)', hand):
-                invested += float(m.group(1))
-            
-            # Raises - "raises €X to €Y" means total is Y
-            for m in re.finditer(rf'{hero}: raises [€$][\d.]+ to [€$](\d+\.?\d*)', hand):
-                # This replaces previous investment on this street
-                invested += float(m.group(1))
-            
-            # Uncalled bet returned
-            uncalled = re.search(rf'Uncalled bet \([€$](\d+\.?\d*)\) returned to {hero}', hand)
-            if uncalled:
-                invested -= float(uncalled.group(1))
-            
-            profit_bb = (won - invested) / bb
-            results[combo]['hands'] += 1
-            results[combo]['bb_won'] += profit_bb
+        # Collected from all pots minus chips put in (net of uncalled bets)
+        profit_bb = hh_parser.profit(hand, hand.hero) / hand.bb
+        results[combo]['hands'] += 1
+        results[combo]['bb_won'] += profit_bb
     
     return results
 
@@ -9,7 +9,11 @@ import re
 import json
 from collections import defaultdict
 
+import hand_cache
+import hh_parser
+
 HH_DIR = '/home/ubuntu/mcpprojects/onyxpoker/idealistslp_extracted'
+TABLE_NAME_RE = re.compile(r'(Asterope|Caph|Atria)( #\d+)?')
 
 def load_player_db():
     """Load player archetypes from database."""
@@ -22,64 +26,21 @@ def parse_hand_histories():
     player_stats = defaultdict(lambda: {'hands': 0, 'vpip': 0, 'pfr': 0, 'tables': set()})
     table_hands = defaultdict(lambda: defaultdict(list))  # table -> player -> list of hands
     
-    for filename in os.listdir(HH_DIR):
-        if not filename.endswith('.txt'):
-            continue
-        
+    for hand in hand_cache.iter_hands(HH_DIR):
         # Extract table name
-        m = re.search(r'(Asterope|Caph|Atria)( #\d+)?', filename)
+        filename = os.path.basename(hand.source)
+        m = TABLE_NAME_RE.search(filename)
         table_name = m.group(0) if m else filename
         
-        filepath = os.path.join(HH_DIR, filename)
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-        
-        # Split into individual hands
-        for hand_text in re.split(r'\n\n\n+', content):
-            if not hand_text.strip():
-                continue
-            
-            parse_single_hand(hand_text, player_stats, table_hands, table_name)
+        parse_single_hand(hand, player_stats, table_hands, table_name)
     
     return player_stats, table_hands
 
 
-def parse_single_hand(text, player_stats, table_hands, table_name):
-    """Parse a single hand and update player stats."""
-    lines = text.strip().split('\n')
-    
-    # Get players at table
-    players_in_hand = set()
-    for line in lines:
-        m = re.match(r'Seat \d+: (\S+)', line)
-        if m:
-            player = m.group(1)
-            if player != 'idealistslp':
-                players_in_hand.add(player)
-    
-    # Track preflop actions
-    in_preflop = False
-    preflop_raisers = set()
-    preflop_callers = set()
-    
-    for line in lines:
-        if '*** HOLE CARDS ***' in line:
-            in_preflop = True
-            continue
-        if '*** FLOP ***' in line or '*** SUMMARY ***' in line:
-            in_preflop = False
-            continue
-        
-        if not in_preflop:
-            continue
-        
-        # Check for player actions
-        for player in players_in_hand:
-            if line.startswith(f'{player}:'):
-                if ': raises' in line or ': bets' in line:
-                    preflop_raisers.add(player)
-                elif ': calls' in line:
-                    preflop_callers.add(player)
+def parse_single_hand(hand, player_stats, table_hands, table_name):
+    """Update player stats from a Hand record."""
+    players_in_hand = set(hh_parser.players(hand)) - {hh_parser.HERO_NAME}
+    preflop_raisers, preflop_callers = hh_parser.preflop_actors(hand)
     
     # Update stats
     for player in players_in_hand:
@@ -5,81 +5,49 @@ Consolidates OCR variations of names using fuzzy matching.
 """
 
 import os
-import re
 import json
-from collections import defaultdict
-from difflib import SequenceMatcher
-from typing import Dict, List, Tuple
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import hand_cache
+import hh_parser
+import player_store
+from name_index import NameIndex
+from recent_stats import RecentCounters
 
 HAND_HISTORY_DIR = "../idealistslp_extracted"
-HERO_NAME = "idealistslp"
+HERO_NAME = hh_parser.HERO_NAME
 FUZZY_THRESHOLD = 0.82  # 82% similarity to merge names
+MIN_HANDS = 5  # sample needed before a player gets stats
+
+ACTION_VERBS = ('folds', 'calls', 'raises', 'checks', 'bets')
+COUNTERS_PATH = os.path.join(os.path.dirname(__file__), 'player_counters.json')
+COUNTER_KEYS = ('hands', 'vpip', 'pfr', 'three_bet_opps', 'three_bets', 'postflop_bets',
+                'postflop_calls', 'postflop_raises', 'af_actions', 'af_passive')
 
 def parse_hand_file(filepath: str) -> List[Dict]:
     """Parse a hand history file into individual hands."""
-    with open(filepath, 'r', encoding='utf-8-sig') as f:
-        content = f.read()
-    
-    hands = []
-    hand_texts = re.split(r'\n\n\n+', content)
-    
-    for hand_text in hand_texts:
-        if not hand_text.strip() or 'PokerStars' not in hand_text:
-            continue
-        hands.append(parse_single_hand(hand_text))
-    
+    hands = [parse_single_hand(rec) for rec in hh_parser.iter_file(filepath)]
     return [h for h in hands if h]
 
-def parse_single_hand(text: str) -> Dict:
-    """Parse a single hand into structured data."""
-    lines = text.strip().split('\n')
-    
-    # Extract players
-    players = {}
-    for line in lines:
-        seat_match = re.match(r'Seat (\d+): (\S+) \(.*€([\d.]+)', line)
-        if seat_match:
-            seat, name, stack = seat_match.groups()
-            players[name] = {'seat': int(seat), 'stack': float(stack)}
-    
+def parse_single_hand(rec: hh_parser.Hand) -> Dict:
+    """Convert one hh_parser.Hand record into the stats input structure."""
+    players = {name: {'seat': seat, 'stack': stack} for seat, name, stack in rec.seats}
     if not players:
         return None
     
-    # Find preflop actions
-    preflop_start = False
     preflop_actions = []
     postflop_actions = []
-    current_section = None
-    
-    for line in lines:
-        if '*** HOLE CARDS ***' in line:
-            current_section = 'preflop'
-            continue
-        elif '*** FLOP ***' in line:
-            current_section = 'flop'
-            continue
-        elif '*** TURN ***' in line:
-            current_section = 'turn'
+    for a in rec.actions:
+        if a.verb not in ACTION_VERBS:
             continue
-        elif '*** RIVER ***' in line:
-            current_section = 'river'
-            continue
-        elif '*** SUMMARY ***' in line:
-            break
-        
-        if current_section == 'preflop':
-            # Parse preflop action
-            action_match = re.match(r'(\S+): (folds|calls|raises|checks|bets)', line)
-            if action_match:
-                player, action = action_match.groups()
-                preflop_actions.append((player, action))
-        elif current_section in ['flop', 'turn', 'river']:
-            action_match = re.match(r'(\S+): (folds|calls|raises|checks|bets)', line)
-            if action_match:
-                player, action = action_match.groups()
-                postflop_actions.append((player, action, current_section))
+        if a.street == 'preflop':
+            preflop_actions.append((a.player, a.verb))
+        elif a.street in ('flop', 'turn', 'river'):
+            postflop_actions.append((a.player, a.verb, a.street))
     
     return {
+        'hand_id': rec.hand_id,
         'players': players,
         'preflop_actions': preflop_actions,
         'postflop_actions': postflop_actions
@@ -88,6 +56,7 @@ def parse_single_hand(text: str) -> Dict:
 def consolidate_names(stats: Dict[str, Dict]) -> Dict[str, Dict]:
     """Merge similar player names, keeping the one with most hands."""
     names = list(stats.keys())
+    index = NameIndex(names, FUZZY_THRESHOLD)  # only scores plausible pairs
     merged = {}  # canonical_name -> list of merged names
     name_map = {}  # any_name -> canonical_name
     
@@ -97,13 +66,12 @@ def consolidate_names(stats: Dict[str, Dict]) -> Dict[str, Dict]:
         
         # Find similar names not yet assigned
         similar = [name]
-        for other in names:
+        for idx, _ in index.matches(name):
+            other = names[idx]
             if other == name or other in name_map:
                 continue
-            ratio = SequenceMatcher(None, name.lower(), other.lower()).ratio()
-            if ratio > FUZZY_THRESHOLD:
-                similar.append(other)
-                name_map[other] = name
+            similar.append(other)
+            name_map[other] = name
         
         name_map[name] = name
         merged[name] = similar
@@ -133,92 +101,187 @@ def consolidate_names(stats: Dict[str, Dict]) -> Dict[str, Dict]:
     
     return result
 
-def calculate_stats(hands: List[Dict]) -> Dict[str, Dict]:
-    """Calculate VPIP, PFR, AF, 3-bet% for each player."""
-    stats = defaultdict(lambda: {
-        'hands': 0,
-        'vpip': 0,  # Voluntarily put $ in pot
-        'pfr': 0,   # Preflop raise
-        'three_bet_opps': 0,
-        'three_bets': 0,
-        'postflop_bets': 0,
-        'postflop_calls': 0,
-        'postflop_raises': 0,
-        'af_actions': 0,  # bets + raises
-        'af_passive': 0,  # calls
-    })
+def _new_counters() -> Dict[str, int]:
+    return dict.fromkeys(COUNTER_KEYS, 0)
+
+def accumulate_hand(stats: Dict[str, Dict], hand: Dict) -> None:
+    """Add one hand's raw VPIP/PFR/3-bet/AF counts to per-player counters."""
+    preflop = hand['preflop_actions']
     
-    for hand in hands:
-        if not hand:
-            continue
+    # Track who has acted and how
+    first_raiser = None
+    players_acted = set()
+    
+    for player, action in preflop:
+        if player == HERO_NAME:
+            continue  # Skip hero stats
         
-        players_in_hand = set(hand['players'].keys())
-        preflop = hand['preflop_actions']
+        s = stats.get(player)
+        if s is None:
+            s = stats[player] = _new_counters()
+        s['hands'] += 1
         
-        # Track who has acted and how
-        first_raiser = None
-        players_acted = set()
+        # VPIP: any voluntary action (call or raise, not fold/check)
+        if action in ['calls', 'raises']:
+            s['vpip'] += 1
         
-        for player, action in preflop:
-            if player == HERO_NAME:
-                continue  # Skip hero stats
-            
-            stats[player]['hands'] += 1
-            
-            # VPIP: any voluntary action (call or raise, not fold/check)
-            if action in ['calls', 'raises']:
-                stats[player]['vpip'] += 1
-            
-            # PFR: raised preflop
-            if action == 'raises':
-                if first_raiser is None:
-                    first_raiser = player
-                    stats[player]['pfr'] += 1
-                else:
-                    # This is a 3-bet or higher
-                    stats[player]['pfr'] += 1
-                    stats[player]['three_bets'] += 1
-            
-            # 3-bet opportunity: someone raised before you
-            if first_raiser and player != first_raiser and player not in players_acted:
-                stats[player]['three_bet_opps'] += 1
-            
-            players_acted.add(player)
+        # PFR: raised preflop
+        if action == 'raises':
+            if first_raiser is None:
+                first_raiser = player
+                s['pfr'] += 1
+            else:
+                # This is a 3-bet or higher
+                s['pfr'] += 1
+                s['three_bets'] += 1
         
-        # Postflop aggression
-        for player, action, street in hand['postflop_actions']:
-            if player == HERO_NAME:
-                continue
-            
-            if action in ['bets', 'raises']:
-                stats[player]['af_actions'] += 1
-            elif action == 'calls':
-                stats[player]['af_passive'] += 1
+        # 3-bet opportunity: someone raised before you
+        if first_raiser and player != first_raiser and player not in players_acted:
+            s['three_bet_opps'] += 1
+        
+        players_acted.add(player)
     
-    # Calculate final percentages
-    result = {}
-    for player, s in stats.items():
-        if s['hands'] < 5:  # Need minimum sample
+    # Postflop aggression
+    for player, action, street in hand['postflop_actions']:
+        if player == HERO_NAME:
             continue
         
-        vpip_pct = (s['vpip'] / s['hands'] * 100) if s['hands'] > 0 else 0
-        pfr_pct = (s['pfr'] / s['hands'] * 100) if s['hands'] > 0 else 0
-        three_bet_pct = (s['three_bets'] / s['three_bet_opps'] * 100) if s['three_bet_opps'] > 0 else 0
-        af = (s['af_actions'] / s['af_passive']) if s['af_passive'] > 0 else s['af_actions']
-        
-        archetype = classify_archetype(vpip_pct, pfr_pct, af)
-        result[player] = {
-            'hands': s['hands'],
-            'vpip': round(vpip_pct, 1),
-            'pfr': round(pfr_pct, 1),
-            '3bet': round(three_bet_pct, 1),
-            'af': round(af, 2),
-            'archetype': archetype,
-            'advice': get_advice(archetype, {})
-        }
+        s = stats.get(player)
+        if s is None:
+            s = stats[player] = _new_counters()
+        if action in ['bets', 'raises']:
+            s['af_actions'] += 1
+        elif action == 'calls':
+            s['af_passive'] += 1
+
+def derive_player(s: Dict[str, int]) -> Optional[Dict]:
+    """One player's raw counters -> VPIP/PFR/3-bet %, AF and archetype (None below 5 hands)."""
+    if s['hands'] < MIN_HANDS:  # Need minimum sample
+        return None
+    
+    vpip_pct = (s['vpip'] / s['hands'] * 100) if s['hands'] > 0 else 0
+    pfr_pct = (s['pfr'] / s['hands'] * 100) if s['hands'] > 0 else 0
+    three_bet_pct = (s['three_bets'] / s['three_bet_opps'] * 100) if s['three_bet_opps'] > 0 else 0
+    af = (s['af_actions'] / s['af_passive']) if s['af_passive'] > 0 else s['af_actions']
     
+    archetype = classify_archetype(vpip_pct, pfr_pct, af)
+    return {
+        'hands': s['hands'],
+        'vpip': round(vpip_pct, 1),
+        'pfr': round(pfr_pct, 1),
+        '3bet': round(three_bet_pct, 1),
+        'af': round(af, 2),
+        'archetype': archetype,
+        'advice': get_advice(archetype, {})
+    }
+
+def derive_view(counters: Dict[str, int], recent: Optional[RecentCounters] = None,
+                view: str = 'lifetime') -> Optional[Dict]:
+    """Derived stats from the lifetime, 'decayed' or 'recent' (last N hands) counters.
+
+    Falls back to lifetime when the chosen view has fewer than MIN_HANDS (effective) hands.
+    """
+    if view != 'lifetime' and recent is not None:
+        derived = derive_player(recent.counters(view))
+        if derived:
+            derived['hands'] = round(derived['hands'], 1)
+            return derived
+    return derive_player(counters)
+
+def derive_stats(stats: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Raw counters -> derived stats per player (5+ hands)."""
+    result = {}
+    for player, s in stats.items():
+        derived = derive_player(s)
+        if derived:
+            result[player] = derived
     return result
 
+def calculate_stats(hands: List[Dict]) -> Dict[str, Dict]:
+    """Calculate VPIP, PFR, AF, 3-bet% for each player."""
+    stats = {}
+    for hand in hands:
+        if hand:
+            accumulate_hand(stats, hand)
+    return derive_stats(stats)
+
+# ── Persistent counters ──────────────────────────────────────────────
+# Raw counts survive between runs so a refresh only applies new hands.
+# State: {'files': {path: [size, mtime]}, 'hand_ids': set, 'players': {name: counters},
+#         'recent': {name: RecentCounters}}
+
+def new_counter_state() -> Dict:
+    return {'files': {}, 'hand_ids': set(), 'players': {}, 'recent': {}}
+
+def load_counters(path: str = COUNTERS_PATH) -> Dict:
+    if not os.path.exists(path):
+        return new_counter_state()
+    with open(path) as f:
+        state = json.load(f)
+    state['hand_ids'] = set(state['hand_ids'])
+    state['recent'] = {n: RecentCounters.from_json(r) for n, r in state.get('recent', {}).items()}
+    return state
+
+def save_counters(state: Dict, path: str = COUNTERS_PATH) -> None:
+    data = dict(state, hand_ids=sorted(state['hand_ids']),
+                recent={n: r.to_json() for n, r in state['recent'].items()})
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+def apply_hands(state: Dict, hands) -> int:
+    """Accumulate hands not seen before (by hand_id). Returns number applied.
+
+    Hands should arrive in play order - the decayed/recent views depend on it.
+    """
+    seen = state['hand_ids']
+    players = state['players']
+    recent = state['recent']
+    applied = 0
+    for hand in hands:
+        if not hand or hand['hand_id'] in seen:
+            continue
+        seen.add(hand['hand_id'])
+        deltas = {}
+        accumulate_hand(deltas, hand)
+        for player, delta in deltas.items():
+            s = players.get(player)
+            if s is None:
+                s = players[player] = _new_counters()
+            for k in COUNTER_KEYS:
+                s[k] += delta[k]
+            r = recent.get(player)
+            if r is None:
+                r = recent[player] = RecentCounters()
+            r.add_hand(delta)
+        applied += 1
+    return applied
+
+def refresh_counters(state: Dict, hh_dir: str, workers: int = 1,
+                     db_path: str = hand_cache.DEFAULT_DB) -> int:
+    """Apply hands from new/changed files under hh_dir. Returns number of new hands.
+
+    Changed files can interleave in time, so their hands are applied together
+    in hand_id (play) order.
+    """
+    parse = partial(hh_parser.parse_files, workers=workers) if workers != 1 else None
+    hands = []
+    stale = {}
+    with hand_cache.HandCache(db_path) as cache:
+        cache.update(hh_dir, prefix='HH', parse=parse)
+        for filepath in hh_parser.iter_hand_files(hh_dir, prefix='HH'):
+            key = os.path.abspath(filepath)
+            st = os.stat(key)
+            if state['files'].get(key) == [st.st_size, st.st_mtime]:
+                continue
+            hands.extend(h for h in map(parse_single_hand, cache.iter_hands(filepath)) if h)
+            stale[key] = [st.st_size, st.st_mtime]
+    hands.sort(key=lambda h: h['hand_id'])
+    applied = apply_hands(state, hands)
+    state['files'].update(stale)
+    return applied
+
 def classify_archetype(vpip: float, pfr: float, af: float) -> str:
     """
     Classify player into archetype based on comprehensive research.
@@ -291,21 +354,17 @@ def get_advice(archetype: str, stats: Dict) -> str:
     }
     return advice.get(archetype, "no reads")
 
-def main():
-    # Parse all hand histories
-    all_hands = []
+def main(workers=1, rebuild=False):
+    # Apply only hands from new/changed histories to the persistent counters
     hh_dir = os.path.join(os.path.dirname(__file__), HAND_HISTORY_DIR)
+    state = new_counter_state() if rebuild else load_counters()
+    applied = refresh_counters(state, hh_dir, workers)
+    save_counters(state)
     
-    for filename in os.listdir(hh_dir):
-        if filename.startswith('HH') and filename.endswith('.txt'):
-            filepath = os.path.join(hh_dir, filename)
-            hands = parse_hand_file(filepath)
-            all_hands.extend(hands)
-    
-    print(f"Parsed {len(all_hands)} hands")
+    print(f"Applied {applied} new hands ({len(state['hand_ids'])} total)")
     
     # Calculate stats
-    player_stats = calculate_stats(all_hands)
+    player_stats = derive_stats(state['players'])
     before_count = len(player_stats)
     
     # Consolidate similar names
@@ -326,11 +385,30 @@ def main():
         advice = get_advice(s['archetype'], s)
         print(f"{player:<20} {s['hands']:>6} {s['vpip']:>5.1f}% {s['pfr']:>5.1f}% {s['3bet']:>5.1f}% {s['af']:>6.2f} {s['archetype']:<8} {advice}")
     
-    # Save to JSON for helper_bar to use
+    # Save to the SQLite store (helper_bar / opponent_lookup) with raw counters
+    # summed over merged aliases, so online updates keep counting from here
+    counters = {}
+    for player, s in player_stats.items():
+        names = [player] + s.get('aliases', [])
+        counters[player] = {k: sum(state['players'][n][k] for n in names if n in state['players'])
+                            for k in player_store.COUNTERS}
+    # Recent-form views follow the canonical name only (alias histories can't be interleaved)
+    recent = {p: state['recent'][p].to_json() for p in player_stats if p in state['recent']}
+    # Live-tracked hands the histories don't include yet are kept on top
+    with player_store.PlayerStore() as store:
+        kept = store.rebuild(player_stats, counters, recent, state['hand_ids'])
+    print(f"\nSaved stats to {player_store.DEFAULT_DB} (kept {kept} live-only hands)")
+    
+    # JSON export for the analysis scripts
     output_path = os.path.join(os.path.dirname(__file__), 'player_stats.json')
     with open(output_path, 'w') as f:
         json.dump(player_stats, f, indent=2)
-    print(f"\nSaved stats to {output_path}")
+    print(f"Saved stats to {output_path}")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description='Build player_stats.json from hand histories')
+    parser.add_argument('--workers', type=int, default=1, help='Parse new hand files in N processes (0 = all cores)')
+    parser.add_argument('--rebuild', action='store_true', help='Discard saved counters and recount all hands')
+    args = parser.parse_args()
+    main(workers=args.workers, rebuild=args.rebuild)
@@ -14,7 +14,7 @@ Algorithm:
   Level 2+: Repeat with heap hits as new targets.
 """
 
-import sys, os, json, struct, time, bisect
+import sys, os, json, time
 from collections import defaultdict
 
 sys.path.insert(0, os.path.dirname(__file__))
@@ -36,38 +36,26 @@ def log(msg):
 
 
 class DumpSnapshot:
-    """Entire dump loaded into memory for fast access."""
+    """Dump memory-mapped for fast random access (mc.DumpReader)."""
 
     def __init__(self, meta, buf_addr):
         self.dump_id = meta['dump_id']
         self.buf_addr = buf_addr
         self.module_base = meta['module_base']
-        self.regions = sorted(meta['regions'], key=lambda r: r['base'])
-        self._bases = [r['base'] for r in self.regions]
-
-        # Load ALL regions into a dict: base_addr -> bytes
-        log(f"  Loading {self.dump_id} into memory...")
-        t0 = time.time()
-        self._data = {}
-        total = 0
-        with open(meta['_bin_path'], 'rb') as f:
-            for r in self.regions:
-                f.seek(r['file_offset'])
-                self._data[r['base']] = f.read(r['size'])
-                total += r['size']
-        log(f"  Loaded {len(self.regions)} regions, {total/1024/1024:.0f} MB "
-            f"({time.time()-t0:.1f}s)")
-
-    def read_u32(self, addr):
-        idx = bisect.bisect_right(self._bases, addr) - 1
-        if idx < 0:
-            return None
-        r = self.regions[idx]
-        off = addr - r['base']
-        if off < 0 or off + 4 > r['size']:
-            return None
-        d = self._data[r['base']]
-        return struct.unpack('<I', d[off:off+4])[0]
+        self.reader = mc.DumpReader(meta['_bin_path'], meta['regions'])
+        self.regions = self.reader.regions
+        self.read_u32 = self.reader.read_u32
+        total = sum(r['size'] for r in self.regions)
+        log(f"  Mapped {self.dump_id}: {len(self.regions)} regions, {total/1024/1024:.0f} MB")
+
+    def close(self):
+        self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def is_module(self, addr):
         return 0 <= (addr - self.module_base) < 0x2000000
@@ -123,7 +111,7 @@ def scan_level(snap_a, snap_b, targets_a, targets_b, level):
     for ri, region in enumerate(snap_b.regions):
         rbase = region['base']
         rsize = region['size']
-        data = snap_b._data[rbase]
+        data = snap_b.reader.region_data(region)
 
         # Progress every ~50MB
         if ri % 30 == 0 or scanned + rsize >= total_bytes:
@@ -135,10 +123,11 @@ def scan_level(snap_a, snap_b, targets_a, targets_b, level):
 
         scanned += rsize
 
-        for j in range(0, len(data) - 3, ALIGN):
-            val = struct.unpack('<I', data[j:j+4])[0]
+        # Every aligned u32 (ALIGN == 4); dumps and scanning hosts are little-endian
+        for k, val in enumerate(data[:len(data) // 4 * 4].cast('I')):
             if val < MIN_PTR or val > MAX_PTR:
                 continue
+            j = k * 4
 
             for ti in range(len(targets_b)):
                 diff = targets_b[ti] - val
@@ -211,34 +200,32 @@ def main():
     log(f"Distance: 0x{abs(b['_buf']-a['_buf']):X}")
 
     log("\nLoading snapshots...")
-    snap_a = DumpSnapshot(a, a['_buf'])
-    snap_b = DumpSnapshot(b, b['_buf'])
-
-    targets_a = [snap_a.buf_addr]
-    targets_b = [snap_b.buf_addr]
-
-    for level in range(1, args.max_depth + 1):
-        if not targets_a:
-            log("No targets remain."); break
-
-        mod_hits, heap_addrs = scan_level(
-            snap_a, snap_b, targets_a, targets_b, level)
-
-        if mod_hits:
-            log(f"\n*** FOUND {len(mod_hits)} STATIC POINTER(S)! ***")
-            for mo, off in mod_hits:
-                log(f"  module + 0x{mo:07X} + 0x{off:X} = target")
-            break
-
-        if not heap_addrs:
-            log("No heap hits to follow. Chain not found at this depth.")
-            break
-
-        log(f"\n  {len(heap_addrs)} heap addresses become targets for level {level+1}")
-        # Next level: find what points to these heap addresses
-        # The heap address is the same in both dumps (stable allocation)
-        targets_a = heap_addrs
-        targets_b = heap_addrs
+    with DumpSnapshot(a, a['_buf']) as snap_a, DumpSnapshot(b, b['_buf']) as snap_b:
+        targets_a = [snap_a.buf_addr]
+        targets_b = [snap_b.buf_addr]
+
+        for level in range(1, args.max_depth + 1):
+            if not targets_a:
+                log("No targets remain."); break
+
+            mod_hits, heap_addrs = scan_level(
+                snap_a, snap_b, targets_a, targets_b, level)
+
+            if mod_hits:
+                log(f"\n*** FOUND {len(mod_hits)} STATIC POINTER(S)! ***")
+                for mo, off in mod_hits:
+                    log(f"  module + 0x{mo:07X} + 0x{off:X} = target")
+                break
+
+            if not heap_addrs:
+                log("No heap hits to follow. Chain not found at this depth.")
+                break
+
+            log(f"\n  {len(heap_addrs)} heap addresses become targets for level {level+1}")
+            # Next level: find what points to these heap addresses
+            # The heap address is the same in both dumps (stable allocation)
+            targets_a = heap_addrs
+            targets_b = heap_addrs
 
     log("\nDone.")
 
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Cross-engine validation: poker_sim.simulate_hand vs pokerkit_adapter.run_hand.
+
+Every deal comes from a seed: table (random_5nl_table mix), seat order and
+the full deck. Both engines play the identical deal - same hole cards per
+seat, same board, same blinds, same decision RNG seed - so results are
+paired per deal and compared with paired tests:
+
+  BB/100          paired z-test on per-deal BB difference
+  VPIP/PFR/WTSD   McNemar test on per-deal yes/no
+
+Deals run in batches across a process pool (both engines in parallel).
+After each batch the cumulative tests are re-run; a metric is flagged as
+diverged once p < alpha / (looks * metrics) (Bonferroni over all planned
+looks), so early stopping does not inflate false alarms.
+
+Usage:
+    python3 engine_crosscheck.py 20000 the_lord
+    python3 engine_crosscheck.py 20000 the_lord --workers 8 --batch 2000 --alpha 0.01
+    python3 engine_crosscheck.py 5000 value_lord --no-stop
+"""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from poker_logic import STRATEGIES
+from poker_sim import simulate_hand, Player
+from pokerkit_adapter import run_hand, random_5nl_table, seeded_random
+
+ENGINES = ('poker_sim', 'pokerkit')
+METRICS = ('bb100', 'vpip', 'pfr', 'wtsd')
+DECK = [r + s for r in 'AKQJT98765432' for s in 'hdcs']
+DECISION_SALT = 0x5EED
+# poker_sim dealer_pos that gives seat i the same blinds PokerKit does
+# (PokerKit: seat 0 posts SB, seat 1 BB, seat 5 is the button)
+SIM_DEALER_POS = 1
+MIN_DISCORDANT = 10  # McNemar needs some discordant pairs before it means anything
+
+
+# ── Deals ────────────────────────────────────────────────────────────
+
+def make_deal(hero, seed):
+    """Seed -> (table strategies, deck). Seat i holds deck[2i:2i+2], board is deck[12:17]."""
+    rng = random.Random(seed)
+    table = [hero] + random_5nl_table(rng)
+    rng.shuffle(table)
+    deck = list(DECK)
+    rng.shuffle(deck)
+    return table, deck
+
+
+def hand_metrics(details, hero_idx, bb):
+    """(bb, vpip, pfr, wtsd) for the hero seat from a details dict."""
+    vpip = pfr = False
+    folded = set()
+    for seat, _, action, to_call, _, street, amount in details['actions']:
+        if action == 'fold' and to_call > 0:
+            folded.add(seat)
+        if seat == hero_idx and street == 'preflop':
+            vpip = vpip or amount > 0
+            pfr = pfr or (action == 'raise' and amount > to_call)
+    seats = {a[0] for a in details['actions']}
+    wtsd = (len(details['board']) == 5 and hero_idx not in folded
+            and len(seats - folded) >= 2)
+    return bb, vpip, pfr, wtsd
+
+
+def play_poker_sim(table, deck, hero_idx, seed):
+    players = []
+    for i, strat in enumerate(table):
+        p = Player(f"{strat}_{i}", STRATEGIES.get(strat, STRATEGIES['value_lord']))
+        p.base_strategy = strat
+        players.append(p)
+    details = {}
+    # simulate_hand pops from the end of the deck
+    with seeded_random(seed ^ DECISION_SALT):
+        simulate_hand(players, SIM_DEALER_POS, details,
+                      deck=[(c[0], c[1]) for c in reversed(deck)])
+    return hand_metrics(details, hero_idx, players[hero_idx].profit)
+
+
+def play_pokerkit(table, deck, hero_idx, seed):
+    with seeded_random(seed ^ DECISION_SALT):
+        payoffs, details = run_hand(table, track_details=True, deck=deck)
+    return hand_metrics(details, hero_idx, payoffs[hero_idx] / 0.02)
+
+
+PLAYERS = {'poker_sim': play_poker_sim, 'pokerkit': play_pokerkit}
+
+
+def _engine_chunk(args):
+    """Play seeds on one engine. Returns (rows, seconds); rows[i] is None on error."""
+    engine, hero, seeds = args
+    play = PLAYERS[engine]
+    rows = []
+    t = time.perf_counter()
+    for seed in seeds:
+        table, deck = make_deal(hero, seed)
+        try:
+            rows.append(play(table, deck, table.index(hero), seed))
+        except Exception:
+            rows.append(None)
+    return rows, time.perf_counter() - t
+
+
+# ── Paired tests ─────────────────────────────────────────────────────
+
+def _p_two_sided(z):
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def paired_mean_test(xs, ys):
+    """Paired z-test on xs - ys. Returns (mean_x, mean_y, z, p)."""
+    n = len(xs)
+    d = [x - y for x, y in zip(xs, ys)]
+    mean_d = sum(d) / n
+    var_d = sum((v - mean_d) ** 2 for v in d) / (n - 1) if n > 1 else 0
+    se = math.sqrt(var_d / n) if var_d > 0 else 0
+    z = mean_d / se if se else 0.0
+    return sum(xs) / n, sum(ys) / n, z, (_p_two_sided(z) if se else 1.0)
+
+
+def mcnemar_test(xs, ys):
+    """McNemar test for paired booleans. Returns (rate_x, rate_y, z, p)."""
+    n = len(xs)
+    b = sum(1 for x, y in zip(xs, ys) if x and not y)
+    c = sum(1 for x, y in zip(xs, ys) if y and not x)
+    rate_x, rate_y = sum(xs) / n, sum(ys) / n
+    if b + c < MIN_DISCORDANT:
+        return rate_x, rate_y, 0.0, 1.0
+    z = (b - c) / math.sqrt(b + c)
+    return rate_x, rate_y, z, _p_two_sided(z)
+
+
+def compare(sim_rows, pk_rows):
+    """Run all paired tests on deals both engines completed."""
+    pairs = [(a, b) for a, b in zip(sim_rows, pk_rows) if a is not None and b is not None]
+    out = {'deals': len(pairs)}
+    if len(pairs) < 2:
+        return out
+    for i, metric in enumerate(METRICS):
+        xs = [a[i] for a, _ in pairs]
+        ys = [b[i] for _, b in pairs]
+        if metric == 'bb100':
+            mx, my, z, p = paired_mean_test(xs, ys)
+            out[metric] = (mx * 100, my * 100, z, p)
+        else:
+            rx, ry, z, p = mcnemar_test(xs, ys)
+            out[metric] = (rx * 100, ry * 100, z, p)
+    return out
+
+
+# ── Harness ──────────────────────────────────────────────────────────
+
+def crosscheck(hero, num_hands=10000, workers=None, batch=1000, alpha=0.01, seed=None, stop_early=True):
+    """Run both engines on num_hands identical deals; return the final report dict.
+
+    report keys: deals, per-metric (sim, pokerkit, z, p), 'diverged' (metrics
+    flagged at any look), 'threshold', 'throughput' {engine: hands/s per core},
+    'wall' seconds.
+    """
+    workers = workers or os.cpu_count() or 1
+    base = random.randrange(1 << 31) if seed is None else seed
+    batches = [list(range((base << 32) + start, (base << 32) + min(start + batch, num_hands)))
+               for start in range(0, num_hands, batch)]
+    threshold = alpha / (len(batches) * len(METRICS))
+
+    rows = {e: [] for e in ENGINES}
+    busy = {e: 0.0 for e in ENGINES}
+    diverged = {}
+    report = {}
+    t0 = time.perf_counter()
+
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        if pool:
+            futures = [{e: pool.submit(_engine_chunk, (e, hero, seeds)) for e in ENGINES} for seeds in batches]
+            results = ({e: f[e].result() for e in ENGINES} for f in futures)
+        else:
+            results = ({e: _engine_chunk((e, hero, seeds)) for e in ENGINES} for seeds in batches)
+
+        for look, res in enumerate(results, 1):
+            for e in ENGINES:
+                rows[e].extend(res[e][0])
+                busy[e] += res[e][1]
+            report = compare(rows['poker_sim'], rows['pokerkit'])
+            flags = [m for m in METRICS if m in report and report[m][3] < threshold]
+            for m in flags:
+                diverged.setdefault(m, report['deals'])
+            line = ' | '.join(f"{m} {report[m][0]:.1f}/{report[m][1]:.1f} p={report[m][3]:.3g}"
+                              for m in METRICS if m in report)
+            print(f"  [{look}/{len(batches)}] {report['deals']} deals | {line}", flush=True)
+            if diverged and stop_early:
+                print(f"  Divergence flagged ({', '.join(diverged)}), stopping early", flush=True)
+                break
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    report['diverged'] = diverged
+    report['threshold'] = threshold
+    report['wall'] = time.perf_counter() - t0
+    report['throughput'] = {e: (len(rows[e]) / busy[e] if busy[e] else 0) for e in ENGINES}
+    report['errors'] = {e: sum(1 for r in rows[e] if r is None) for e in ENGINES}
+    return report
+
+
+def print_report(hero, r):
+    labels = {'bb100': 'BB/100', 'vpip': 'VPIP %', 'pfr': 'PFR %', 'wtsd': 'WTSD %'}
+    print(f"\n{'=' * 60}")
+    print(f"CROSS-ENGINE CHECK: {hero} ({r['deals']} paired deals)")
+    print(f"{'=' * 60}")
+    print(f"{'Metric':<10} {'poker_sim':>10} {'pokerkit':>10} {'z':>8} {'p':>10}  ")
+    for m in METRICS:
+        if m not in r:
+            continue
+        sim, pk, z, p = r[m]
+        flag = 'DIVERGED' if m in r['diverged'] else 'ok'
+        print(f"{labels[m]:<10} {sim:>+10.2f} {pk:>+10.2f} {z:>8.2f} {p:>10.3g}  {flag}")
+    print(f"\nFlag threshold: p < {r['threshold']:.2g} (Bonferroni over looks x metrics)")
+    if r['diverged']:
+        print("Diverged: " + ', '.join(f"{m} (after {n} deals)" for m, n in r['diverged'].items()))
+    else:
+        print("No divergence: poker_sim can be trusted for this strategy/table mix")
+
+    print("\nThroughput (per core):")
+    for e in ENGINES:
+        print(f"  {e:<10} {r['throughput'][e]:>8.0f} hands/s  ({r['errors'][e]} errors)")
+    fast, slow = r['throughput']['poker_sim'], r['throughput']['pokerkit']
+    if slow:
+        print(f"  poker_sim is {fast / slow:.1f}x faster")
+    print(f"  Wall time: {r['wall']:.1f}s")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='poker_sim vs pokerkit cross-check')
+    parser.add_argument('hands', type=int, nargs='?', default=10000)
+    parser.add_argument('strategy', nargs='?', default='value_lord')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size (default: all cores)')
+    parser.add_argument('--batch', type=int, default=1000, help='deals per look')
+    parser.add_argument('--alpha', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--no-stop', action='store_true', help='run all deals even after a divergence')
+    args = parser.parse_args()
+
+    print(f"Cross-checking {args.strategy} on {args.hands} identical deals...", flush=True)
+    report = crosscheck(args.strategy, args.hands, args.workers, args.batch, args.alpha,
+                        args.seed, stop_early=not args.no_stop)
+    print_report(args.strategy, report)
@@ -12,17 +12,12 @@ DUMP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'server
 
 # Import from memory_calibrator
 sys.path.insert(0, os.path.dirname(__file__))
-from memory_calibrator import find_buffer_in_dump, _make_read_fns
+from memory_calibrator import find_buffer_in_dump, DumpReader
 import json
 
-def find_pointers_to(data, target_addr):
-    """Find all 4-byte aligned pointers to target_addr."""
-    target_bytes = struct.pack('<I', target_addr)
-    hits = []
-    for i in range(0, len(data) - 4, 4):
-        if data[i:i+4] == target_bytes:
-            hits.append(i)
-    return hits
+def find_pointers_to(reader, target_addr):
+    """Find all 4-byte aligned pointers to target_addr (addresses)."""
+    return reader.find_all(struct.pack('<I', target_addr), align=4)
 
 def analyze_one_dump(dump_path, meta_path):
     """Deep analysis of one dump to find structure start.
@@ -38,9 +33,13 @@ def analyze_one_dump(dump_path, meta_path):
     
     regions = meta['regions']
     module_base = meta.get('module_base', 0)
-    
+    with DumpReader(dump_path, regions) as reader:
+        return _analyze(reader, dump_path, regions, module_base)
+
+
+def _analyze(reader, dump_path, regions, module_base):
     # Find container
-    buf_addr, entries = find_buffer_in_dump(dump_path, regions)
+    buf_addr, entries = find_buffer_in_dump(dump_path, regions, reader=reader)
     if not buf_addr or not hasattr(find_buffer_in_dump, '_last_container_addr'):
         print("Container not found")
         return
@@ -69,12 +68,7 @@ def analyze_one_dump(dump_path, meta_path):
     print(f"  Heap regions: {len(heap_regions)} ({sum(r['size'] for r in heap_regions)//1024//1024}MB)")
     print(f"  Stack/other regions: {len(stack_regions)} ({sum(r['size'] for r in stack_regions)//1024//1024}MB)")
     
-    # Load full dump
-    print(f"\nLoading dump ({os.path.getsize(dump_path)//1024//1024}MB)...")
-    with open(dump_path, 'rb') as f:
-        data = f.read()
-    
-    print(f"Loaded {len(data)//1024//1024}MB")
+    print(f"\nMapped dump ({os.path.getsize(dump_path)//1024//1024}MB)")
     
     # Search ALL memory (module, heap, stack) for pointers to container-N
     print("\n=== SEARCHING ALL MEMORY for pointers ===")
@@ -93,30 +87,18 @@ def analyze_one_dump(dump_path, meta_path):
         if target < 0:
             continue
         
-        target_bytes = struct.pack('<I', target)
-        
         # Search in ALL regions (don't categorize yet)
-        for r in regions:
-            region_data = data[r['file_offset']:r['file_offset']+r['size']]
-            idx = 0
-            while True:
-                idx = region_data.find(target_bytes, idx)
-                if idx == -1:
-                    break
-                if idx % 4 == 0:
-                    abs_addr = r['base'] + idx
-                    
-                    # Categorize
-                    if abs_addr < 0x08000000:
-                        region_type = 'MODULE'
-                    elif 0x08000000 <= abs_addr < 0x30000000:
-                        region_type = 'HEAP'
-                    else:
-                        region_type = 'STACK'
-                    
-                    all_results.append((offset, abs_addr, region_type))
-                    print(f"  container{offset:+5d}: FOUND at 0x{abs_addr:08X} [{region_type}]")
-                idx += 4
+        for abs_addr in find_pointers_to(reader, target):
+            # Categorize
+            if abs_addr < 0x08000000:
+                region_type = 'MODULE'
+            elif 0x08000000 <= abs_addr < 0x30000000:
+                region_type = 'HEAP'
+            else:
+                region_type = 'STACK'
+            
+            all_results.append((offset, abs_addr, region_type))
+            print(f"  container{offset:+5d}: FOUND at 0x{abs_addr:08X} [{region_type}]")
     
     print(f"  Progress: {total}/{total} offsets checked.")
     
@@ -177,24 +159,20 @@ if __name__ == '__main__':
     if result and len(dumps) > 1:
         print(f"\n{'='*60}")
         print("VERIFICATION: Checking offset on other dumps...")
-        offset = result['offset']
+        offset = result['results'][0][0]
         
         for bin_path, json_path in dumps[1:4]:  # Check next 3 dumps
             dump_name = os.path.basename(bin_path).replace('.bin', '')
             with open(json_path) as f:
                 meta = json.load(f)
             
-            buf_addr, entries = find_buffer_in_dump(bin_path, meta['regions'])
-            if not buf_addr or not hasattr(find_buffer_in_dump, '_last_container_addr'):
-                continue
-            
-            container_addr = find_buffer_in_dump._last_container_addr
-            target = container_addr + offset
-            
-            with open(bin_path, 'rb') as f:
-                data = f.read()
-            
-            hits = find_pointers_to(data, target)
+            with DumpReader(bin_path, meta['regions']) as reader:
+                buf_addr, entries = find_buffer_in_dump(bin_path, meta['regions'], reader=reader)
+                if not buf_addr or not hasattr(find_buffer_in_dump, '_last_container_addr'):
+                    continue
+                
+                container_addr = find_buffer_in_dump._last_container_addr
+                hits = find_pointers_to(reader, container_addr + offset)
             module_hits = [h for h in hits if h < 0x08000000]
             
             print(f"  {dump_name}: container{offset:+d} = {len(hits)} pointers (module={len(module_hits)})")
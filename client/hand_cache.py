@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of parsed hand histories (SQLite, stdlib only).
+
+Source files are tracked by path, size and mtime: on each load only new or
+changed files are parsed (with hh_parser), deleted files are dropped, and
+everything else is read straight from the database.
+
+    import hand_cache
+    for hand in hand_cache.iter_hands(HH_DIR):       # same records as hh_parser
+        ...
+
+Tables:
+  files         path, size, mtime
+  hands         one row per hand (file_id, idx order), indexed on hand_id and bb
+  hand_players  (hand_id, player, seat, stack, position), indexed on player, position
+
+Usage:
+    python3 hand_cache.py ../idealistslp_extracted            # update + timing
+    python3 hand_cache.py ../idealistslp_extracted --rebuild  # drop and re-parse
+"""
+
+import json
+import os
+import sqlite3
+from functools import partial
+
+import hh_parser
+from hh_parser import Hand, Action
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_cache.db')
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hands (
+    file_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    hand_id INTEGER NOT NULL,
+    zoom INTEGER NOT NULL,
+    tbl TEXT,
+    sb REAL,
+    bb REAL,
+    button INTEGER,
+    hero TEXT,
+    hero_cards TEXT,
+    board TEXT,
+    seats TEXT,
+    actions TEXT,
+    flop_players TEXT,
+    PRIMARY KEY (file_id, idx)
+);
+CREATE INDEX IF NOT EXISTS hands_hand_id ON hands(hand_id);
+CREATE INDEX IF NOT EXISTS hands_bb ON hands(bb);
+CREATE TABLE IF NOT EXISTS hand_players (
+    hand_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    seat INTEGER,
+    stack REAL,
+    position TEXT
+);
+CREATE INDEX IF NOT EXISTS hand_players_player ON hand_players(player);
+CREATE INDEX IF NOT EXISTS hand_players_position ON hand_players(position);
+CREATE INDEX IF NOT EXISTS hand_players_file ON hand_players(file_id);
+"""
+
+
+def _hand_row(file_id, idx, hand):
+    return (file_id, idx, hand.hand_id, int(hand.zoom), hand.table, hand.sb, hand.bb, hand.button,
+            hand.hero, ' '.join(hand.hero_cards) if hand.hero_cards else None, ' '.join(hand.board),
+            json.dumps(hand.seats, separators=(',', ':')),
+            json.dumps([tuple(a) for a in hand.actions], separators=(',', ':')),
+            json.dumps(hand.flop_players, separators=(',', ':')))
+
+
+def _row_hand(row, source):
+    (hand_id, zoom, table, sb, bb, button, hero, hero_cards, board, seats, actions, flop_players) = row
+    return Hand(hand_id, bool(zoom), table, sb, bb, button,
+                [tuple(s) for s in json.loads(seats)], hero,
+                tuple(hero_cards.split()) if hero_cards else None,
+                board.split() if board else [],
+                [Action(*a) for a in json.loads(actions)],
+                json.loads(flop_players), source)
+
+
+class HandCache:
+    """SQLite-backed store of hh_parser.Hand records for a set of files."""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.conn.executescript('DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS hands;'
+                                    ' DROP TABLE IF EXISTS hand_players;')
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Sync ─────────────────────────────────────────────────────────
+
+    def _drop_file(self, file_id):
+        self.conn.execute('DELETE FROM hands WHERE file_id = ?', (file_id,))
+        self.conn.execute('DELETE FROM hand_players WHERE file_id = ?', (file_id,))
+        self.conn.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    def _store_file(self, filepath, size, mtime, hands):
+        cur = self.conn.execute('INSERT INTO files (path, size, mtime) VALUES (?, ?, ?)',
+                                (filepath, size, mtime))
+        file_id = cur.lastrowid
+        self.conn.executemany('INSERT INTO hands VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)',
+                              (_hand_row(file_id, i, h) for i, h in enumerate(hands)))
+        self.conn.executemany(
+            'INSERT INTO hand_players VALUES (?,?,?,?,?,?)',
+            ((h.hand_id, file_id, name, seat, stack, hh_parser.position(h, name))
+             for h in hands for seat, name, stack in h.seats))
+
+    def update(self, path, prefix='', parse=None):
+        """Parse new/changed files under path into the cache. Returns (parsed, cached) file counts.
+
+        parse(list_of_paths) -> {path: [Hand]} may be supplied to parse files in bulk
+        (e.g. in parallel); default parses serially with hh_parser.iter_file.
+        """
+        known = {p: (fid, size, mtime) for fid, p, size, mtime in
+                 self.conn.execute('SELECT id, path, size, mtime FROM files')}
+        stale = []
+        cached = 0
+        for filepath in hh_parser.iter_hand_files(path, prefix):
+            filepath = os.path.abspath(filepath)
+            st = os.stat(filepath)
+            entry = known.get(filepath)
+            if entry and entry[1] == st.st_size and entry[2] == st.st_mtime:
+                cached += 1
+                continue
+            stale.append((filepath, st.st_size, st.st_mtime, entry))
+
+        # Files that vanished from a scanned directory
+        root = os.path.abspath(path)
+        if os.path.isdir(root):
+            for p, (fid, _, _) in known.items():
+                if os.path.dirname(p) == root and not os.path.exists(p):
+                    self._drop_file(fid)
+
+        if stale:
+            paths = [s[0] for s in stale]
+            parsed = parse(paths) if parse else {p: list(hh_parser.iter_file(p)) for p in paths}
+            for filepath, size, mtime, entry in stale:
+                if entry:
+                    self._drop_file(entry[0])
+                self._store_file(filepath, size, mtime, parsed[filepath])
+        self.conn.commit()
+        return len(stale), cached
+
+    # ── Queries ──────────────────────────────────────────────────────
+
+    def iter_hands(self, path, prefix='', bb=None, player=None, position=None):
+        """Yield cached Hand records for files under path, in file then hand order.
+
+        Optional filters use the indexes: bb (big blind), player (seated),
+        position (player's position; with player, that player's position).
+        """
+        files = list(hh_parser.iter_hand_files(path, prefix))
+        ids = {p: fid for fid, p in self.conn.execute('SELECT id, path FROM files')}
+        cols = ('h.hand_id, h.zoom, h.tbl, h.sb, h.bb, h.button, h.hero, h.hero_cards,'
+                ' h.board, h.seats, h.actions, h.flop_players')
+        where = ['h.file_id = ?']
+        args = []
+        joins = ''
+        if bb is not None:
+            where.append('h.bb = ?')
+            args.append(bb)
+        if player is not None or position is not None:
+            joins = ' JOIN hand_players p ON p.file_id = h.file_id AND p.hand_id = h.hand_id'
+            if player is not None:
+                where.append('p.player = ?')
+                args.append(player)
+            if position is not None:
+                where.append('p.position = ?')
+                args.append(position)
+        sql = (f'SELECT DISTINCT {cols}, h.idx FROM hands h{joins} WHERE {" AND ".join(where)}'
+               f' ORDER BY h.idx')
+        for filepath in files:
+            fid = ids.get(os.path.abspath(filepath))
+            if fid is None:
+                continue
+            for row in self.conn.execute(sql, [fid] + args):
+                yield _row_hand(row[:-1], filepath)
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM hands').fetchone()[0]
+
+
+def iter_hands(path, prefix='', db_path=DEFAULT_DB, workers=1, **filters):
+    """Drop-in for hh_parser.iter_hands: sync the cache, then stream from it.
+
+    workers != 1 parses new/changed files across a process pool (None = all cores).
+    """
+    parse = partial(hh_parser.parse_files, workers=workers) if workers != 1 else None
+    with HandCache(db_path) as cache:
+        cache.update(path, prefix, parse=parse)
+        yield from cache.iter_hands(path, prefix, **filters)
+
+
+def iter_file(filepath, db_path=DEFAULT_DB):
+    """Drop-in for hh_parser.iter_file backed by the cache."""
+    yield from iter_hands(filepath, db_path=db_path)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description='Parsed hand history cache')
+    parser.add_argument('path', nargs='?',
+                        default=os.path.join(os.path.dirname(__file__), '..', 'idealistslp_extracted'))
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--rebuild', action='store_true', help='delete the cache and re-parse')
+    parser.add_argument('--workers', type=int, default=1, help='parse processes (0 = all cores)')
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(args.db):
+        os.remove(args.db)
+    with HandCache(args.db) as cache:
+        t = time.time()
+        parse = partial(hh_parser.parse_files, workers=args.workers) if args.workers != 1 else None
+        parsed, cached = cache.update(args.path, parse=parse)
+        t_update = time.time() - t
+        t = time.time()
+        n = sum(1 for _ in cache.iter_hands(args.path))
+        t_load = time.time() - t
+    print(f"Update: {parsed} files parsed, {cached} unchanged ({t_update:.2f}s)")
+    print(f"Load:   {n} hands from cache ({t_load:.2f}s)")
@@ -0,0 +1,246 @@
+"""
+Indexed queries over parsed hands (analyse_real_logs.parse_hand dicts).
+
+HandIndex builds one inverted index per field (value -> bitset of hand
+positions) and a sorted column for numeric fields, once. Filters are
+bitset ANDs/ORs and range lookups are bisects, so a query over the whole
+history costs milliseconds instead of a list comprehension per question.
+
+    idx = HandIndex(hands)
+    q = idx.where(bb=0.05, position=('BTN', 'CO'), hand_class='pair')
+    q &= idx.swing(10)                         # |profit_bb| >= 10
+    q = q | idx.where(flop='raise')            # composable: & | ~ and .where()
+    q.hands()                                  # dicts, in index (hand_id) order
+    q.summary()                                # {'hands', 'profit', 'profit_bb', 'bb_100'}
+    idx.all().group_by('position')             # {'BTN': Query, ...}
+
+Fields are functions of the hand dict (FIELDS); callers can pass extra ones,
+e.g. analyse_real_logs adds the preflop situation hero faced.
+
+    python3 hand_query.py --where position=BTN,CO --swing 10 --group-by hand_class
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import compress
+from typing import Callable, Dict, Iterable, List, Optional
+
+STREETS = ('flop', 'turn', 'river')
+
+
+def hand_class(hand: Dict) -> str:
+    s = hand['hand_str']
+    return 'pair' if len(s) == 2 else 'suited' if s.endswith('s') else 'offsuit'
+
+
+def profit_bucket(hand: Dict) -> str:
+    """'even', or small/medium/big (<5, <20, >=20 BB) + _win/_loss."""
+    bb = hand['profit_bb']
+    if bb == 0:
+        return 'even'
+    size = 'big' if abs(bb) >= 20 else 'medium' if abs(bb) >= 5 else 'small'
+    return f"{size}_{'win' if bb > 0 else 'loss'}"
+
+
+def hero_action(street: str) -> Callable[[Dict], Optional[str]]:
+    """Field: hero's first action on street (None if hero didn't act there)."""
+    def field(hand):
+        for a in hand['postflop_actions']:
+            if a['street'] == street and not a['action'].startswith('villain_'):
+                return a['action']
+        return None
+    return field
+
+
+FIELDS = {
+    'bb': lambda h: h['bb'],
+    'position': lambda h: h['hero_position'],
+    'hand': lambda h: h['hand_str'],
+    'hand_class': hand_class,
+    'profit_bucket': profit_bucket,
+    'result': lambda h: 'win' if h['profit_bb'] > 0 else 'loss' if h['profit_bb'] < 0 else 'even',
+    'played': lambda h: h['hero_preflop_action'] not in (None, 'fold'),
+    'saw_flop': lambda h: len(h['board']) >= 3,
+    'opponents_at_flop': lambda h: h['num_opponents_at_flop'] if len(h['board']) >= 3 else 0,
+    'preflop': lambda h: h['hero_preflop_action'],
+}
+FIELDS.update((street, hero_action(street)) for street in STREETS)
+
+NUMERIC = ('profit_bb', 'hero_profit')
+
+
+def _mask(ids: Iterable[int], n: int) -> int:
+    bits = bytearray((n + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+_BITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def _ids(mask: int) -> List[int]:
+    """Set bit positions, ascending."""
+    bits = bin(mask)[:1:-1].encode().translate(_BITS)
+    return list(compress(range(len(bits)), bits))
+
+
+class Query:
+    """A set of hands of one HandIndex (bitset); combine with & | ~."""
+    __slots__ = ('index', 'mask')
+
+    def __init__(self, index: 'HandIndex', mask: int):
+        self.index = index
+        self.mask = mask
+
+    def __and__(self, other: 'Query') -> 'Query':
+        return Query(self.index, self.mask & other.mask)
+
+    def __or__(self, other: 'Query') -> 'Query':
+        return Query(self.index, self.mask | other.mask)
+
+    def __invert__(self) -> 'Query':
+        return Query(self.index, self.index.full & ~self.mask)
+
+    def __len__(self) -> int:
+        return bin(self.mask).count('1')
+
+    def __iter__(self):
+        return iter(self.hands())
+
+    def where(self, **conditions) -> 'Query':
+        return self & self.index.where(**conditions)
+
+    def hands(self) -> List[Dict]:
+        hands = self.index.hands
+        return [hands[i] for i in _ids(self.mask)]
+
+    def sum(self, field: str) -> float:
+        """Sum of a NUMERIC field (or any hand key) in hand order."""
+        column = self.index.values_at.get(field)
+        if column is None:
+            return sum(h[field] for h in self.hands())
+        return sum([column[i] for i in _ids(self.mask)])
+
+    def summary(self) -> Dict:
+        ids = _ids(self.mask)
+        profit = self.index.values_at['hero_profit']
+        profit_bb = self.index.values_at['profit_bb']
+        total_bb = sum([profit_bb[i] for i in ids])
+        return {'hands': len(ids), 'profit': sum([profit[i] for i in ids]), 'profit_bb': total_bb,
+                'bb_100': total_bb / len(ids) * 100 if ids else 0.0}
+
+    def group_by(self, field: str) -> Dict:
+        """{value: Query} for each value of field present in this set."""
+        out = {}
+        for value, mask in self.index.postings[field].items():
+            if mask & self.mask:
+                out[value] = Query(self.index, mask & self.mask)
+        return out
+
+
+class HandIndex:
+    """Inverted indexes over a list of parsed hands (positions are list order)."""
+
+    def __init__(self, hands: List[Dict], fields: Optional[Dict[str, Callable]] = None):
+        self.hands = list(hands)
+        self.fields = dict(FIELDS, **(fields or {}))
+        n = len(self.hands)
+        self.full = (1 << n) - 1
+        self.postings = {}
+        for name, fn in self.fields.items():
+            ids = defaultdict(list)
+            for i, h in enumerate(self.hands):
+                ids[fn(h)].append(i)
+            self.postings[name] = {value: _mask(pos, n) for value, pos in ids.items()}
+        self.values_at = {}   # numeric field -> value per position
+        self.columns = {}     # numeric field -> (sorted values, positions in that order)
+        for name in NUMERIC:
+            column = self.values_at[name] = [h[name] for h in self.hands]
+            order = sorted(range(n), key=column.__getitem__)
+            self.columns[name] = ([column[i] for i in order], order)
+        self._ranges = {}
+
+    def __len__(self) -> int:
+        return len(self.hands)
+
+    def all(self) -> Query:
+        return Query(self, self.full)
+
+    def where(self, **conditions) -> Query:
+        """Hands matching every field=value; a tuple/list/set value matches any of its items."""
+        mask = self.full
+        for name, value in conditions.items():
+            postings = self.postings[name]
+            if isinstance(value, (tuple, list, set, frozenset)):
+                m = 0
+                for v in value:
+                    m |= postings.get(v, 0)
+            else:
+                m = postings.get(value, 0)
+            mask &= m
+        return Query(self, mask)
+
+    def between(self, field: str, lo: Optional[float] = None, hi: Optional[float] = None) -> Query:
+        """Hands with lo <= field <= hi (either bound optional) on a NUMERIC field."""
+        key = (field, lo, hi)
+        mask = self._ranges.get(key)
+        if mask is None:
+            values, order = self.columns[field]
+            start = 0 if lo is None else bisect_left(values, lo)
+            end = len(values) if hi is None else bisect_right(values, hi)
+            mask = self._ranges[key] = _mask(order[start:end], len(self.hands))
+        return Query(self, mask)
+
+    def swing(self, min_bb: float) -> Query:
+        """Hands won or lost by at least min_bb big blinds."""
+        return self.between('profit_bb', lo=min_bb) | self.between('profit_bb', hi=-min_bb)
+
+    def values(self, field: str) -> List:
+        return list(self.postings[field])
+
+
+def _parse_condition(index: HandIndex, text: str):
+    """'position=BTN,CO' -> ('position', ('BTN', 'CO')) using the indexed values' types."""
+    name, _, raw = text.partition('=')
+    if name not in index.postings:
+        raise SystemExit(f"Unknown field {name!r} (fields: {', '.join(index.postings)})")
+    by_str = {str(v): v for v in index.postings[name]}
+    return name, tuple(by_str.get(s, s) for s in raw.split(','))
+
+
+def main(argv=None):
+    import argparse
+    import time
+    import analyse_real_logs  # builds the hand dicts; imports this module
+
+    parser = argparse.ArgumentParser(description='Query parsed real hands')
+    parser.add_argument('--hh-dir', default=analyse_real_logs.HH_DIR)
+    parser.add_argument('--where', action='append', default=[], metavar='FIELD=V1,V2',
+                        help='filter (repeatable, ANDed; comma = any of)')
+    parser.add_argument('--swing', type=float, help='only hands won/lost by >= N BB')
+    parser.add_argument('--group-by', metavar='FIELD', help='summary per value of FIELD')
+    parser.add_argument('--list', action='store_true', help='print matching hands')
+    args = parser.parse_args(argv)
+
+    index = analyse_real_logs.index_hands(args.hh_dir)
+    t = time.perf_counter()
+    q = index.where(**dict(_parse_condition(index, c) for c in args.where))
+    if args.swing:
+        q &= index.swing(args.swing)
+    groups = q.group_by(args.group_by) if args.group_by else {'all': q}
+    rows = {value: g.summary() for value, g in groups.items()}
+    elapsed = (time.perf_counter() - t) * 1000
+
+    print(f"{len(q)} of {len(index)} hands ({elapsed:.1f} ms)")
+    for value, s in sorted(rows.items(), key=lambda kv: -kv[1]['hands']):
+        print(f"  {str(value):<14} {s['hands']:>6} hands  €{s['profit']:>8.2f}  {s['profit_bb']:>8.1f} BB"
+              f"  {s['bb_100']:>8.1f} BB/100")
+    if args.list:
+        for h in q.hands():
+            board = ' '.join(h['board']) or '-'
+            print(f"  {h['hand_id']}  {h['hand_str']:<4} {h['hero_position']:<4} {h['profit_bb']:>+7.1f} BB  {board}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Compact binary hand traces for simulator output.
+
+Append-only file of fixed-width records so million-hand runs can be kept
+and mined later without re-simulating.
+
+File layout (.oxt):
+  header   8s magic 'OXTRACE1' + version/record sizes
+  block*   block header, strategy name table, hand records, action records
+
+Block header (BLOCK_HDR):  b'BLK1', n_hands, n_actions, n_names, byte length,
+                           first hand_no, min payoff (centi-BB, any seat)
+Hand record (HAND_REC):    hand_no, seed, n_players, hero_idx, board len,
+                           board[5], holes[6x2], strategy ids[6], payoffs[6],
+                           first action, action count
+Action record (ACTION_REC): seat, street, action code, to_call, pot, amount
+
+Cards are ints (RANK_VAL * 4 + suit index), amounts are centi-BB ints.
+Every block is also appended to a sidecar index (<path>.idx) of
+(offset, n_hands, first hand_no, min payoff) so readers skip whole blocks
+that cannot match a loss filter. The index is rebuilt from block headers
+if it is missing or stale.
+
+Usage:
+    python3 hand_trace.py sim.oxt                              # summary
+    python3 hand_trace.py sim.oxt --strategy the_lord --lost 50
+    python3 hand_trace.py sim.oxt --strategy the_lord --lost 50 --hero
+"""
+
+import os
+import struct
+
+from poker_logic import RANKS, SUITS, RANK_VAL
+
+MAGIC = b'OXTRACE1'
+VERSION = 1
+MAX_SEATS = 6
+NO_CARD = 0xFF
+NO_HERO = 0xFF
+BLOCK_HANDS = 4096
+
+FILE_HDR = struct.Struct('<8sHHHH')
+BLOCK_HDR = struct.Struct('<4sIIIIQi')
+BLOCK_MAGIC = b'BLK1'
+HAND_REC = struct.Struct('<QQBBB5B12B6B6iIH')
+ACTION_REC = struct.Struct('<BBBxiii')
+INDEX_REC = struct.Struct('<QIQi')
+
+ACTIONS = ('fold', 'check', 'call', 'bet', 'raise', 'other')
+ACTION_CODE = {a: i for i, a in enumerate(ACTIONS)}
+STREETS = ('preflop', 'flop', 'turn', 'river')
+STREET_CODE = {s: i for i, s in enumerate(STREETS)}
+
+
+# ── Encoding helpers ─────────────────────────────────────────────────
+
+def card_to_int(card):
+    """'As' or ('A', 's') -> int 0-51."""
+    return RANK_VAL[card[0]] * 4 + SUITS.index(card[1])
+
+
+def int_to_card(c):
+    """int 0-51 -> 'As'."""
+    return RANKS[c // 4] + SUITS[c % 4]
+
+
+def to_cbb(amount, bb=1.0):
+    """Amount in chips -> centi-BB int."""
+    return int(round(amount / bb * 100))
+
+
+# ── Writer ───────────────────────────────────────────────────────────
+
+class TraceWriter:
+    """Streaming append-only trace writer. Buffers one block in memory."""
+
+    def __init__(self, path, block_hands=BLOCK_HANDS):
+        self.path = path
+        self.idx_path = path + '.idx'
+        self.block_hands = block_hands
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._f = open(path, 'ab')
+        if new:
+            self._f.write(FILE_HDR.pack(MAGIC, VERSION, HAND_REC.size, ACTION_REC.size, BLOCK_HDR.size))
+            self.next_hand = 0
+        else:
+            # Resume numbering after the last hand already on disk
+            blocks = read_index(path)
+            self.next_hand = (blocks[-1][2] + blocks[-1][1]) if blocks else 0
+        self._reset()
+
+    def _reset(self):
+        self._names = {}
+        self._hands = []
+        self._actions = []
+        self._min_payoff = 0
+
+    def _name_id(self, name):
+        if name not in self._names:
+            self._names[name] = len(self._names)
+        return self._names[name]
+
+    def add_hand(self, strategies, holes, board, actions, payoffs, hero_idx=None, seed=0, bb=1.0):
+        """Append one hand. Amounts (payoffs, action to_call/pot/amount) are divided by bb.
+
+        actions: iterable of (seat, strategy, action, to_call, pot, street, amount)
+        tuples as produced by the simulators' details dicts.
+        seed: pokerkit_adapter.play_seeded_hand seed, 0 if the hand has none.
+        """
+        n = len(strategies)
+        if n > MAX_SEATS:
+            raise ValueError(f"trace supports at most {MAX_SEATS} seats, got {n}")
+        board_ints = [card_to_int(c) for c in board] + [NO_CARD] * (5 - len(board))
+        hole_ints = []
+        for i in range(MAX_SEATS):
+            hole = holes[i] if i < n and holes[i] else ()
+            hole_ints += [card_to_int(c) for c in hole] + [NO_CARD] * (2 - len(hole))
+        strat_ids = [self._name_id(s) for s in strategies] + [0] * (MAX_SEATS - n)
+        pay = [to_cbb(p, bb) for p in payoffs] + [0] * (MAX_SEATS - n)
+        first_action = len(self._actions)
+        for a in actions:
+            seat, _, act, to_call, pot = a[:5]
+            street = a[5] if len(a) > 5 else 'preflop'
+            amount = a[6] if len(a) > 6 else 0
+            self._actions.append(ACTION_REC.pack(
+                seat, STREET_CODE.get(street, 0), ACTION_CODE.get(act, ACTION_CODE['other']),
+                to_cbb(to_call, bb), to_cbb(pot, bb), to_cbb(amount, bb)))
+        self._hands.append(HAND_REC.pack(
+            self.next_hand, seed & 0xFFFFFFFFFFFFFFFF, n,
+            NO_HERO if hero_idx is None else hero_idx, len(board),
+            *board_ints, *hole_ints, *strat_ids, *pay,
+            first_action, len(self._actions) - first_action))
+        self._min_payoff = min(self._min_payoff, min(pay))
+        self.next_hand += 1
+        if len(self._hands) >= self.block_hands:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered block and its index entry."""
+        if not self._hands:
+            return
+        names = b''.join(struct.pack('<B', len(s)) + s for s in (n.encode()[:255] for n in self._names))
+        body = names + b''.join(self._hands) + b''.join(self._actions)
+        first = self.next_hand - len(self._hands)
+        offset = self._f.tell()
+        self._f.write(BLOCK_HDR.pack(BLOCK_MAGIC, len(self._hands), len(self._actions), len(self._names),
+                                     len(body), first, self._min_payoff))
+        self._f.write(body)
+        self._f.flush()
+        with open(self.idx_path, 'ab') as idx:
+            idx.write(INDEX_REC.pack(offset, len(self._hands), first, self._min_payoff))
+        self._reset()
+
+    def close(self):
+        self.flush()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Index ────────────────────────────────────────────────────────────
+
+def _scan_blocks(path):
+    """Rebuild the block index by walking block headers."""
+    blocks = []
+    with open(path, 'rb') as f:
+        hdr = f.read(FILE_HDR.size)
+        if len(hdr) < FILE_HDR.size or hdr[:8] != MAGIC:
+            raise ValueError(f"{path}: not a hand trace file")
+        size = os.fstat(f.fileno()).st_size
+        offset = FILE_HDR.size
+        while offset + BLOCK_HDR.size <= size:
+            f.seek(offset)
+            magic, n_hands, _, _, length, first, min_pay = BLOCK_HDR.unpack(f.read(BLOCK_HDR.size))
+            if magic != BLOCK_MAGIC or offset + BLOCK_HDR.size + length > size:
+                break  # truncated tail from an interrupted run
+            blocks.append((offset, n_hands, first, min_pay))
+            offset += BLOCK_HDR.size + length
+    return blocks
+
+
+def read_index(path):
+    """Return [(offset, n_hands, first_hand_no, min_payoff_cbb), ...] for all blocks."""
+    idx_path = path + '.idx'
+    if os.path.exists(idx_path):
+        with open(idx_path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_REC.size
+        blocks = [tuple(r) for r in INDEX_REC.iter_unpack(data[:usable])]
+        # Trust the sidecar only if it covers the whole data file
+        if blocks:
+            end = blocks[-1][0]
+            with open(path, 'rb') as f:
+                f.seek(end)
+                hdr = f.read(BLOCK_HDR.size)
+                size = os.fstat(f.fileno()).st_size
+            if len(hdr) == BLOCK_HDR.size:
+                magic, _, _, _, length, _, _ = BLOCK_HDR.unpack(hdr)
+                if magic == BLOCK_MAGIC and end + BLOCK_HDR.size + length == size:
+                    return blocks
+    return _scan_blocks(path)
+
+
+# ── Reader ───────────────────────────────────────────────────────────
+
+class TraceReader:
+    """Streams hands from a trace file one block at a time."""
+
+    def __init__(self, path):
+        self.path = path
+        self.blocks = read_index(path)
+
+    def __len__(self):
+        return sum(b[1] for b in self.blocks)
+
+    def _read_block(self, f, offset):
+        f.seek(offset)
+        _, n_hands, n_actions, n_names, length, _, _ = BLOCK_HDR.unpack(f.read(BLOCK_HDR.size))
+        body = f.read(length)
+        names = []
+        pos = 0
+        for _ in range(n_names):
+            ln = body[pos]
+            names.append(body[pos + 1:pos + 1 + ln].decode())
+            pos += 1 + ln
+        hands_end = pos + n_hands * HAND_REC.size
+        return names, memoryview(body)[pos:hands_end], memoryview(body)[hands_end:]
+
+    def iter_hands(self, strategy=None, max_bb=None, hero_only=False):
+        """Yield hand dicts, optionally only where `strategy` (hero seat if
+        hero_only) finished at or below max_bb. Blocks whose min payoff is
+        above max_bb are skipped without being read."""
+        max_cbb = None if max_bb is None else to_cbb(max_bb)
+        with open(self.path, 'rb') as f:
+            for offset, _, _, min_pay in self.blocks:
+                if max_cbb is not None and min_pay > max_cbb:
+                    continue
+                names, hands, actions = self._read_block(f, offset)
+                want = names.index(strategy) if strategy in names else None
+                if strategy is not None and want is None:
+                    continue
+                for rec in HAND_REC.iter_unpack(hands):
+                    n, hero = rec[2], rec[3]
+                    strat_ids = rec[22:22 + n]
+                    pays = rec[28:28 + n]
+                    seats = [hero] if hero_only and hero != NO_HERO else range(n)
+                    if strategy is not None:
+                        seats = [i for i in seats if strat_ids[i] == want]
+                    if max_cbb is not None:
+                        seats = [i for i in seats if pays[i] <= max_cbb]
+                    if (strategy is not None or max_cbb is not None or hero_only) and not seats:
+                        continue
+                    yield self._decode(rec, names, actions)
+
+    @staticmethod
+    def _decode(rec, names, actions):
+        n, hero, n_board = rec[2], rec[3], rec[4]
+        strategies = [names[i] for i in rec[22:22 + n]]
+        first, count = rec[34], rec[35]
+        acts = []
+        for seat, street, code, to_call, pot, amount in ACTION_REC.iter_unpack(
+                actions[first * ACTION_REC.size:(first + count) * ACTION_REC.size]):
+            acts.append((seat, strategies[seat], ACTIONS[code], to_call / 100,
+                         pot / 100, STREETS[street], amount / 100))
+        return {
+            'hand_no': rec[0], 'seed': rec[1],
+            'hero_idx': None if hero == NO_HERO else hero,
+            'strategies': strategies,
+            'board': [int_to_card(c) for c in rec[5:5 + n_board]],
+            'holes': [[int_to_card(c) for c in rec[10 + i * 2:12 + i * 2] if c != NO_CARD] for i in range(n)],
+            'payoffs': [p / 100 for p in rec[28:28 + n]],
+            'actions': acts,
+        }
+
+
+def filter_hands(path, strategy=None, lost_bb=None, hero_only=False):
+    """Yield hands where `strategy` lost at least lost_bb BB."""
+    max_bb = None if lost_bb is None else -abs(lost_bb)
+    return TraceReader(path).iter_hands(strategy, max_bb, hero_only)
+
+
+def print_hand(h):
+    """One-hand summary in the simulate_disasters style."""
+    hero = h['hero_idx']
+    seats = [hero] if hero is not None else range(len(h['strategies']))
+    for i in seats:
+        print(f"#{h['hand_no']} seat {i} {h['strategies'][i]}: {h['payoffs'][i]:+.1f} BB")
+        print(f"   Hole: {' '.join(h['holes'][i])}")
+        print(f"   Board: {' '.join(h['board']) if h['board'] else '(preflop)'}")
+        acts = [f"{a[5][0]}:{a[2]}" + (f"(${a[3]:.1f}/{a[4]:.1f})" if a[3] > 0 else '')
+                for a in h['actions'] if a[0] == i]
+        print(f"   Actions: {' -> '.join(acts)}")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Mine a binary hand trace')
+    parser.add_argument('path')
+    parser.add_argument('--strategy', help='only hands where this strategy is seated')
+    parser.add_argument('--lost', type=float, help='only hands where it lost at least this many BB')
+    parser.add_argument('--hero', action='store_true', help='match the hero seat only')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    reader = TraceReader(args.path)
+    print(f"{args.path}: {len(reader):,} hands in {len(reader.blocks)} blocks")
+    if args.strategy or args.lost is not None:
+        matched = 0
+        for h in filter_hands(args.path, args.strategy, args.lost, args.hero):
+            matched += 1
+            if matched <= args.limit:
+                print_hand(h)
+                print()
+        print(f"{matched:,} matching hands")
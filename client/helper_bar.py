@@ -23,6 +23,8 @@ import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from strategy_engine import DEFAULT_STRATEGY
+import opponent_lookup
+from live_stats import LiveStatsTracker
 
 # Parse command line arguments
 import argparse
@@ -33,6 +35,8 @@ parser.add_argument('--v2', action='store_true', default=True, help='Use V2 visi
 parser.add_argument('--strategy', type=str, default=DEFAULT_STRATEGY, help=f'Strategy to use (default: {DEFAULT_STRATEGY})')
 parser.add_argument('--calibrate', action='store_true', help='Memory calibration mode: scan memory alongside screenshots')
 parser.add_argument('--bot', action='store_true', help='Enable bot mode: auto-plays using strategy + clicks buttons')
+parser.add_argument('--stats-view', choices=['lifetime', 'decayed', 'recent'], default='lifetime',
+                    help='Opponent stats: lifetime, time-decayed, or last 100 hands')
 args = parser.parse_args()
 
 # Default: V2 vision with player names + opponent stats
@@ -45,6 +49,7 @@ VISION_V2_MODE = args.v2
 STRATEGY = args.strategy
 CALIBRATE_MODE = args.calibrate
 BOT_MODE = args.bot
+STATS_VIEW = args.stats_view
 
 if AI_ONLY_MODE:
     from vision_detector import VisionDetector, MODEL
@@ -101,10 +106,13 @@ class HelperBar:
         self._mem_polling = False  # Whether polling loop is active
         self._mem_poll_generation = 0  # Increment on F9 to invalidate old polls
         self._mem_last_entries = 0 # Last known entry count (detect updates)
+        self._mem_logged_hand = None  # hand_id whose "New hand" line was logged
         self._last_result = None   # Last GPT result for re-evaluation during polling
         self._pending_mem_poll = None  # (buf_addr, hand_id) to start after display
         self._last_mem_display = None  # Last memory display data (for STALE warning)
         self._last_mem_time = None     # Timestamp of last memory update
+        self._live_stats = LiveStatsTracker(view=STATS_VIEW)  # Session VPIP/PFR/AF from memory actions
+        self._live_stats.start()
         
         # Drag state
         self._drag_start_x = 0
@@ -248,12 +256,8 @@ class HelperBar:
         self.log("Logs copied", "INFO")
 
     def _load_player_stats(self):
-        """Load player stats from JSON file"""
-        stats_path = os.path.join(os.path.dirname(__file__), 'player_stats.json')
-        if os.path.exists(stats_path):
-            with open(stats_path) as f:
-                return json.load(f)
-        return {}
+        """Load player stats (cached by opponent_lookup, reloaded when the file changes)"""
+        return opponent_lookup.load_player_stats()
 
     def _get_advice(self, archetype):
         """Get advice text for archetype - just returns what's in the DB"""
@@ -319,10 +323,13 @@ class HelperBar:
         opponent_stats = []
         for p in opponents:
             name = p.get('name', '')
-            if name in stats_db:
-                s = stats_db[name]
+            # OCR'd names are often misspelled - indexed fuzzy match
+            matched = opponent_lookup.fuzzy_match(name, stats_db) if name else None
+            if matched:
+                s = opponent_lookup.get_stats(stats_db, matched, STATS_VIEW)
                 opponent_stats.append({
                     'name': name,
+                    'db_name': matched,
                     'hands': s.get('hands', 0),
                     'archetype': s.get('archetype', 'unknown'),
                     'advice': s.get('advice', self._get_advice(s.get('archetype', 'unknown')))
@@ -334,7 +341,7 @@ class HelperBar:
                     'archetype': 'unknown',
                     'advice': 'no reads'
                 })
-        return opponent_stats
+        return self._live_stats.overlay(opponent_stats)
 
     def _format_opponent_line(self, opponent_stats):
         """Format compact opponent line for sidebar"""
@@ -627,8 +634,7 @@ class HelperBar:
                                     os.remove(json_path)
                             else:
                                 # Keep failure dumps for debugging
-                                self.root.after(0, lambda d=dump_id_holder[0]:
-                                    pass  # Dump saved silently
+                                pass  # Dump saved silently
                         except Exception as e:
                             print(f"[DUMP] Tag error: {e}")
                     threading.Thread(target=_tag_and_cleanup, daemon=True).start()
@@ -684,8 +690,11 @@ class HelperBar:
             pass  # Poll started silently
 
     def _mem_poll_loop(self, generation):
-        """Background thread: rescan buffer every 200ms, push UI updates."""
-        from memory_calibrator import rescan_buffer, scan_live
+        """Background thread: poll the buffer's new entries every 200ms, push UI updates."""
+        from memory_calibrator import scan_live
+        from memory_events import live_stream
+        stream = live_stream(self._mem_buf_addr)
+        known_addr = self._mem_buf_addr
         retry_count = 0
         start_time = time.time()
         max_duration = 300  # 5 minutes timeout
@@ -697,8 +706,12 @@ class HelperBar:
                 break
             
             try:
-                hd = rescan_buffer(self._mem_buf_addr, self._mem_hand_id)
-                if hd is None:
+                # F9 found another buffer since the last poll
+                if self._mem_buf_addr != known_addr:
+                    stream.attach(self._mem_buf_addr)
+                events = stream.poll()
+                self._mem_buf_addr = known_addr = stream.buf_addr  # the stream follows the container
+                if events is None:
                     # Buffer moved or lost - retry a few times before full rescan
                     retry_count += 1
                     if retry_count < 10:  # Try 10 times (10 * 50ms = 500ms max wait)
@@ -708,53 +721,46 @@ class HelperBar:
                         # After 500ms, do full rescan
                         fresh_data = scan_live()
                         if fresh_data and fresh_data.get('hero_cards'):
-                            self._mem_hand_id = fresh_data['hand_id']
-                            self._mem_buf_addr = fresh_data['buf_addr']
+                            self._mem_buf_addr = known_addr = fresh_data['buf_addr']
                             self._mem_last_entries = 0
-                            hd = fresh_data
+                            stream.attach(known_addr, fresh_data.get('container_addr'))
                             retry_count = 0  # Reset counter
+                            continue
                         else:
                             time.sleep(0.5)
                             continue
                 else:
                     retry_count = 0  # Reset counter on success
                 
-                # Check if hand changed
-                if hd.get('hand_id_changed'):
-                    new_hand_id = hd.get('hand_id')
-                    new_buf_addr = hd.get('buf_addr')
-                    
-                    # Update tracking
-                    self._mem_hand_id = new_hand_id
-                    self._mem_buf_addr = new_buf_addr
-                    self._mem_last_entries = 0
-                    
-                    # Log new hand
-                    cards = hd.get('hero_cards', '')
-                    if cards and len(cards) == 4:
-                        self.root.after(0, lambda h=new_hand_id, c=cards: 
-                            self.log(f"New hand: {c[0:2]} {c[2:4]}", "INFO"))
-                    
-                    # Update display immediately when hand changes
-                    if self._mem_poll_generation == generation:
-                        self.root.after(0, lambda d=hd, g=generation: 
-                            self._update_mem_display(d, hd.get('entry_count', 0), g))
+                # Nothing appended since the last poll - no decoding, no UI work
+                if not events:
+                    time.sleep(0.2)
+                    continue
                 
-                n = hd.get('entry_count', 0)
+                # Count new actions into session opponent stats
+                self._live_stats.feed_events(events)
                 
-                # Only update when something changes
-                something_changed = (
-                    n != self._mem_last_entries or  # New action
-                    hd.get('hand_id_changed')       # New hand
-                )
+                hd = stream.state.hand_data()
+                hd['buf_addr'] = stream.buf_addr
+                hd['str_cache'] = stream.str_cache.stats()
                 
-                if something_changed:
-                    self._mem_last_entries = n
-                    
-                    # Update UI only when something changed
-                    if self._mem_poll_generation == generation:
-                        self.root.after(0, lambda d=hd, cnt=n, g=generation: 
-                            self._update_mem_display(d, cnt, g))
+                # Check if hand changed
+                if hd['hand_id'] != self._mem_hand_id:
+                    hd['hand_id_changed'] = True
+                    self._mem_hand_id = hd['hand_id']
+                
+                # Log new hand once its cards are known
+                cards = hd.get('hero_cards') or ''
+                if len(cards) == 4 and self._mem_logged_hand != hd['hand_id']:
+                    self._mem_logged_hand = hd['hand_id']
+                    self.root.after(0, lambda c=cards: 
+                        self.log(f"New hand: {c[0:2]} {c[2:4]}", "INFO"))
+                
+                n = hd['entry_count']
+                self._mem_last_entries = n
+                if self._mem_poll_generation == generation:
+                    self.root.after(0, lambda d=hd, cnt=n, g=generation: 
+                        self._update_mem_display(d, cnt, g))
             except Exception as e:
                 self._mem_polling = False
                 self.root.after(0, lambda e=e: self.log(f"[MEM] Poll error: {e}", "ERROR"))
@@ -814,7 +820,8 @@ class HelperBar:
         # === PLAYERS + ACTIONS (combined) ===
         # Get opponent stats from last F9
         lr = self._last_result or {}
-        opp_stats = {o['name']: o for o in lr.get('opponent_stats', []) if o.get('hands', 0) > 0}
+        opp_stats = {o['name']: o for o in self._live_stats.overlay(lr.get('opponent_stats', []))
+                     if o.get('hands', 0) > 0}
         
         # Build player action list (skip blinds/DEAL/WIN)
         player_actions = {}
@@ -869,6 +876,7 @@ class HelperBar:
             'entry_count': hd.get('entry_count', 0),
             'buf_addr': hex(hd['buf_addr']) if hd.get('buf_addr') else None,
             'hand_id_changed': hd.get('hand_id_changed', False),
+            'str_cache': hd.get('str_cache'),
         }
         if advice:
             entry['action'] = advice.get('action')
@@ -903,87 +911,15 @@ class HelperBar:
             
             cc = hd.get('community_cards', [])
             board = cc if cc else []
-            actions = hd.get('actions', [])
-            
-            # Parse actions to calculate pot, to_call, is_aggressor, is_facing_raise
-            pot_cents = 0
-            current_street_start = 0
-            hero_acted_this_street = False
-            hero_last_action = None
-            
-            # Find current street start (last DEAL marker)
-            deal_found = False
-            for i, (name, act, amt) in enumerate(actions):
-                if act == 'DEAL':
-                    current_street_start = i + 1
-                    hero_acted_this_street = False
-                    hero_last_action = None
-                    deal_found = True
             
-            # If no DEAL marker found, use last 10 actions as current street
-            if not deal_found and len(actions) > 10:
-                current_street_start = len(actions) - 10
-            
-            # Calculate pot (all actions) and track current street
-            for i, (name, act, amt) in enumerate(actions):
-                if act not in ('DEAL',):
-                    pot_cents += amt
-                if i >= current_street_start and name == 'idealistslp' and act in ('BET', 'RAISE', 'CALL', 'CHECK'):
-                    hero_acted_this_street = True
-                    hero_last_action = act
-            
-            pot = pot_cents / 100.0 if pot_cents > 0 else 0.07
-            
-            # Calculate to_call on current street
-            to_call = 0.0
-            last_villain_bet = 0
-            hero_street_total = 0
-            
-            for i, (name, act, amt) in enumerate(actions):
-                if i < current_street_start:
-                    continue
-                if name == 'idealistslp' and act in ('BET', 'RAISE', 'CALL'):
-                    hero_street_total += amt / 100.0
-                elif act in ('BET', 'RAISE'):
-                    last_villain_bet = amt / 100.0
-            
-            if last_villain_bet > hero_street_total:
-                to_call = last_villain_bet - hero_street_total
-            
-            # is_facing_raise: hero acted, then villain raised
-            is_facing_raise = False
-            if hero_acted_this_street and to_call > 0:
-                # Check if there was a raise AFTER hero's last action
-                hero_last_idx = -1
-                for i, (name, act, amt) in enumerate(actions):
-                    if i >= current_street_start and name == 'idealistslp' and act in ('BET', 'RAISE', 'CALL', 'CHECK'):
-                        hero_last_idx = i
-                if hero_last_idx >= 0:
-                    for i, (name, act, amt) in enumerate(actions):
-                        if i > hero_last_idx and act == 'RAISE':
-                            is_facing_raise = True
-                            break
-            
-            # is_aggressor: who was last raiser on CURRENT street (or preflop if no flop action yet)
-            is_aggressor = False
-            last_raiser = None
-            search_start = 0 if not board else current_street_start
-            for i, (name, act, amt) in enumerate(actions):
-                if i < search_start:
-                    continue
-                if act == 'DEAL':
-                    break
-                if act == 'RAISE':
-                    last_raiser = name
-            if last_raiser == 'idealistslp':
-                is_aggressor = True
-            
-            # num_players: count unique players who acted (not folded)
-            active_players = set()
-            for name, act, amt in actions:
-                if name and name != 'idealistslp' and act != 'FOLD':
-                    active_players.add(name)
-            num_players = len(active_players) + 1  # +1 for hero
+            # pot, to_call, is_aggressor, is_facing_raise - kept up to date by the event stream
+            from memory_events import betting_summary
+            bet = hd.get('betting') or betting_summary(hd.get('actions', []), bool(board))
+            pot = bet['pot']
+            to_call = bet['to_call']
+            is_aggressor = bet['is_aggressor']
+            is_facing_raise = bet['is_facing_raise']
+            num_players = bet['num_players']
             
             # position from memory
             position = hd.get('position') or lr.get('position', 'BTN')
@@ -998,7 +934,7 @@ class HelperBar:
                 'num_players': num_players,
                 'is_aggressor': is_aggressor,
                 'is_facing_raise': is_facing_raise,
-                'opponent_stats': lr.get('opponent_stats', []),
+                'opponent_stats': self._live_stats.overlay(lr.get('opponent_stats', [])),
                 'opponents': lr.get('opponents', []),
             }
             
@@ -1007,11 +943,7 @@ class HelperBar:
             
             # Add debug info
             if result:
-                result['_mem_debug'] = {
-                    'pot': pot, 'to_call': to_call, 'is_aggressor': is_aggressor,
-                    'is_facing_raise': is_facing_raise, 'num_players': num_players,
-                    'hero_acted': hero_acted_this_street, 'hero_last': hero_last_action
-                }
+                result['_mem_debug'] = dict(bet)
             
             return result
             
@@ -1591,6 +1523,7 @@ class HelperBar:
         self.root.bind('<B1-Motion>', self._do_resize)
         self.root.bind('<ButtonRelease-1>', self._end_resize)
         self.root.mainloop()
+        self._live_stats.stop()  # Flush session stats to the player store
 
 
 def main():
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Shared streaming parser for PokerStars hand histories.
+
+Reads files line by line (never a whole file at once), splits hands on the
+"PokerStars ... Hand #" header and yields one compact Hand record per hand.
+All patterns are compiled once at import.
+
+    from hh_parser import iter_hands, HERO_NAME
+    for hand in iter_hands(HH_DIR):          # file or directory
+        print(hand.hand_id, hand.hero_cards, profit(hand, HERO_NAME))
+
+Hand fields:
+  hand_id, zoom, table, sb, bb, button (seat), seats [(seat, name, stack)],
+  hero (name from "Dealt to"), hero_cards, board, actions [Action],
+  flop_players (names not "folded before Flop" in SUMMARY), source (file path)
+
+Action fields: street, player, verb, amount, to, all_in
+  street: preflop | flop | turn | river | showdown
+  verb:   posts_sb | posts_bb | posts | folds | checks | calls | bets | raises |
+          returned (uncalled bet) | collected | shows
+  amount: chips added (posts/calls/bets), returned or collected; raise-by for raises
+  to:     raise-to total for raises, else 0
+
+parse_files / iter_hands_parallel shard files across a process pool; workers
+send back marshal-packed plain tuples and the merge orders hands by hand_id
+(stable, so ties keep file order) - identical output for any worker count.
+
+Usage:
+    python3 hh_parser.py ../idealistslp_extracted              # parse + timing summary
+    python3 hh_parser.py ../idealistslp_extracted --workers 8  # parallel
+"""
+
+import marshal
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+HERO_NAME = 'idealistslp'
+STREETS = ('preflop', 'flop', 'turn', 'river')
+POSITIONS = ['BTN', 'SB', 'BB', 'UTG', 'MP', 'CO']
+
+Hand = namedtuple('Hand', 'hand_id zoom table sb bb button seats hero hero_cards board actions flop_players source')
+Action = namedtuple('Action', 'street player verb amount to all_in')
+
+HEADER_RE = re.compile(r"PokerStars (Zoom )?Hand #(\d+):[^(]*\([€$]?([\d.]+)/[€$]?([\d.]+)")
+TABLE_RE = re.compile(r"Table '([^']*)'.*?Seat #(\d+) is the button")
+SEAT_RE = re.compile(r"Seat (\d+): (.+?) \([€$]?([\d.]+) in chips")
+SUMMARY_SEAT_RE = re.compile(r"Seat (\d+): ")
+DEALT_RE = re.compile(r"Dealt to (.+?) \[(\w\w) (\w\w)\]")
+STREET_RE = re.compile(r"\*\*\* (HOLE CARDS|FLOP|TURN|RIVER|SHOW DOWN|SUMMARY) \*\*\*(?: \[([^\]]*)\])?(?: \[(\w\w)\])?")
+ACTION_RE = re.compile(
+    r"(.+?): (posts small blind|posts big blind|posts small & big blinds|posts|"
+    r"folds|checks|calls|bets|raises|shows)(?: [€$]?([\d.]+))?(?: to [€$]?([\d.]+))?(.*)$")
+UNCALLED_RE = re.compile(r"Uncalled bet \([€$]?([\d.]+)\) returned to (.+)$")
+COLLECTED_RE = re.compile(r"(.+?) collected [€$]?([\d.]+) from (?:side |main )?pot")
+
+_VERBS = {
+    'posts small blind': 'posts_sb', 'posts big blind': 'posts_bb',
+    'posts small & big blinds': 'posts', 'posts': 'posts',
+}
+_STREET_NAMES = {'HOLE CARDS': 'preflop', 'FLOP': 'flop', 'TURN': 'turn', 'RIVER': 'river',
+                 'SHOW DOWN': 'showdown', 'SUMMARY': 'summary'}
+
+
+# ── Parsing ──────────────────────────────────────────────────────────
+
+def parse_lines(lines, source=None):
+    """Parse one hand's lines into a Hand record (None if not a hand)."""
+    if not lines:
+        return None
+    m = HEADER_RE.match(lines[0])
+    if not m:
+        return None
+    zoom, hand_id, sb, bb = m.group(1) is not None, int(m.group(2)), float(m.group(3)), float(m.group(4))
+
+    table = None
+    button = None
+    seats = []
+    seat_names = {}
+    hero = None
+    hero_cards = None
+    board = []
+    actions = []
+    flop_players = []
+    street = 'preflop'
+
+    for line in lines[1:]:
+        if line.startswith('***'):
+            sm = STREET_RE.match(line)
+            if sm:
+                street = _STREET_NAMES[sm.group(1)]
+                if street == 'flop' and sm.group(2):
+                    board = sm.group(2).split()
+                elif street in ('turn', 'river') and sm.group(3):
+                    board.append(sm.group(3))
+            continue
+
+        if street == 'summary':
+            sm = SUMMARY_SEAT_RE.match(line)
+            if sm and 'folded before Flop' not in line:
+                name = seat_names.get(int(sm.group(1)))
+                if name:
+                    flop_players.append(name)
+            continue
+
+        if line.startswith('Seat '):
+            sm = SEAT_RE.match(line)
+            if sm:
+                seat = int(sm.group(1))
+                seats.append((seat, sm.group(2), float(sm.group(3))))
+                seat_names[seat] = sm.group(2)
+            continue
+        if line.startswith('Table '):
+            tm = TABLE_RE.match(line)
+            if tm:
+                table, button = tm.group(1), int(tm.group(2))
+            continue
+        if line.startswith('Dealt to '):
+            dm = DEALT_RE.match(line)
+            if dm:
+                hero, hero_cards = dm.group(1), (dm.group(2), dm.group(3))
+            continue
+        if line.startswith('Uncalled bet'):
+            um = UNCALLED_RE.match(line)
+            if um:
+                actions.append(Action(street, um.group(2), 'returned', float(um.group(1)), 0.0, False))
+            continue
+        if ' collected ' in line:
+            cm = COLLECTED_RE.match(line)
+            if cm:
+                actions.append(Action(street, cm.group(1), 'collected', float(cm.group(2)), 0.0, False))
+                continue
+
+        am = ACTION_RE.match(line)
+        if am:
+            verb = _VERBS.get(am.group(2), am.group(2))
+            amount = float(am.group(3)) if am.group(3) else 0.0
+            to = float(am.group(4)) if am.group(4) else 0.0
+            actions.append(Action(street, am.group(1), verb, amount, to, 'all-in' in am.group(5)))
+
+    return Hand(hand_id, zoom, table, sb, bb, button, seats, hero, hero_cards, board,
+                actions, flop_players, source)
+
+
+def parse_hand_text(text, source=None):
+    """Parse a single hand from text."""
+    return parse_lines(text.strip().split('\n'), source)
+
+
+def iter_hand_files(path, prefix=''):
+    """Yield .txt hand history files under path (a file or directory), sorted."""
+    if os.path.isfile(path):
+        yield path
+        return
+    for fname in sorted(os.listdir(path)):
+        if fname.startswith(prefix) and fname.endswith('.txt'):
+            yield os.path.join(path, fname)
+
+
+def iter_file(filepath):
+    """Stream Hand records from one file."""
+    lines = []
+    with open(filepath, 'r', encoding='utf-8-sig', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line.startswith('PokerStars ') and lines:
+                hand = parse_lines(lines, filepath)
+                if hand:
+                    yield hand
+                lines = []
+            if line or lines:
+                lines.append(line)
+    hand = parse_lines(lines, filepath)
+    if hand:
+        yield hand
+
+
+def iter_hands(path, prefix=''):
+    """Stream Hand records from a file or every .txt file in a directory."""
+    for filepath in iter_hand_files(path, prefix):
+        yield from iter_file(filepath)
+
+
+# ── Parallel ingestion ───────────────────────────────────────────────
+
+def _pack(hand):
+    """Hand -> plain nested tuples (marshal-able, no source)."""
+    return tuple(hand[:10]) + (tuple(tuple(a) for a in hand.actions), tuple(hand.flop_players))
+
+
+def _unpack(rec, source):
+    (hand_id, zoom, table, sb, bb, button, seats, hero, hero_cards, board, actions, flop_players) = rec
+    return Hand(hand_id, zoom, table, sb, bb, button, list(seats), hero, hero_cards, list(board),
+                [Action(*a) for a in actions], list(flop_players), source)
+
+
+def _parse_file_packed(filepath):
+    return marshal.dumps([_pack(h) for h in iter_file(filepath)])
+
+
+def parse_files(paths, workers=None):
+    """Parse files, sharded across a process pool. Returns {path: [Hand]} in input order.
+
+    workers=None uses all cores; workers <= 1 (or a single file) parses in-process.
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        return {p: list(iter_file(p)) for p in paths}
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(workers) as pool:
+        packed = pool.map(_parse_file_packed, paths, chunksize=chunksize)
+        return {p: [_unpack(rec, p) for rec in marshal.loads(blob)] for p, blob in zip(paths, packed)}
+
+
+def iter_hands_parallel(path, prefix='', workers=None):
+    """Like iter_hands, but parses files in parallel and yields hands ordered by hand_id."""
+    parsed = parse_files(iter_hand_files(path, prefix), workers)
+    hands = [h for file_hands in parsed.values() for h in file_hands]
+    hands.sort(key=lambda h: h.hand_id)
+    yield from hands
+
+
+# ── Derived values ───────────────────────────────────────────────────
+
+def players(hand):
+    """Seated player names in seat order."""
+    return [name for _, name, _ in hand.seats]
+
+
+def invested(hand, player):
+    """Total chips player put in, net of uncalled bets.
+
+    "raises X to Y" sets the street total to Y; posts/calls/bets add.
+    """
+    street_total = {}
+    for a in hand.actions:
+        if a.player != player:
+            continue
+        if a.verb == 'raises':
+            street_total[a.street] = a.to
+        elif a.verb in ('posts_sb', 'posts_bb', 'posts', 'calls', 'bets'):
+            street_total[a.street] = street_total.get(a.street, 0) + a.amount
+        elif a.verb == 'returned':
+            street_total[a.street] = street_total.get(a.street, 0) - a.amount
+    return sum(street_total.values())
+
+
+def collected(hand, player):
+    """Total chips player collected from all pots."""
+    return sum(a.amount for a in hand.actions if a.verb == 'collected' and a.player == player)
+
+
+def profit(hand, player):
+    return collected(hand, player) - invested(hand, player)
+
+
+def preflop_actors(hand):
+    """(raisers, callers) name sets for preflop voluntary actions (VPIP/PFR)."""
+    raisers, callers = set(), set()
+    for a in hand.actions:
+        if a.street != 'preflop':
+            continue
+        if a.verb in ('raises', 'bets'):
+            raisers.add(a.player)
+        elif a.verb == 'calls':
+            callers.add(a.player)
+    return raisers, callers
+
+
+def position(hand, player):
+    """BTN/SB/BB/UTG/MP/CO for player (seat order relative to the button)."""
+    seat_nums = [s for s, _, _ in hand.seats]
+    seat = next((s for s, name, _ in hand.seats if name == player), None)
+    if seat is None or hand.button is None or not seat_nums:
+        return None
+    n = len(seat_nums)
+    btn_idx = seat_nums.index(hand.button) if hand.button in seat_nums else 0
+    rel_pos = (seat_nums.index(seat) - btn_idx) % n
+    positions = POSITIONS[:n]
+    return positions[rel_pos] if rel_pos < len(positions) else 'BTN'
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description='Parse PokerStars hand histories')
+    parser.add_argument('path', nargs='?',
+                        default=os.path.join(os.path.dirname(__file__), '..', 'idealistslp_extracted'))
+    parser.add_argument('--workers', type=int, default=1, help='process pool size (0 = all cores)')
+    args = parser.parse_args()
+    t = time.time()
+    count = 0
+    actions = 0
+    hands = iter_hands(args.path) if args.workers == 1 else iter_hands_parallel(args.path, workers=args.workers)
+    for hand in hands:
+        count += 1
+        actions += len(hand.actions)
+    elapsed = time.time() - t
+    print(f"Parsed {count} hands ({actions} actions) in {elapsed:.2f}s"
+          f" ({count / elapsed if elapsed else 0:.0f} hands/s)")
@@ -0,0 +1,242 @@
+"""
+Live opponent stats from the memory action stream.
+
+helper_bar's memory poll re-reads the whole message buffer every 200ms;
+LiveStatsTracker.feed() takes those decoded entries, skips any (hand_id, seq)
+it has already seen and updates per-player VPIP/PFR/3-bet/AF counters with
+the same rules as build_player_stats.accumulate_hand - O(1) per event,
+including re-deriving that player's archetype.
+
+Counters start from the player store row (so live hands add to the
+lifetime sample) and deltas are flushed to the store by a background
+thread; opponent_lookup / helper_bar see the new archetypes from there.
+Flushes also log the deltas per (player, hand_id), so a rebuild from hand
+histories keeps live hands the histories do not contain yet.
+Each player also carries RecentCounters (decayed + last-N-hands views);
+reads use the tracker's view ('lifetime', 'decayed' or 'recent').
+
+    tracker = LiveStatsTracker()
+    tracker.start()                       # background flush every 5s
+    tracker.feed(hand_data['entries'])    # from memory_calibrator
+    tracker.feed_events(stream.poll())    # or only the new ones (memory_events)
+    tracker.archetype('Jorgebcn76')       # 'fish'
+    tracker.archetype('Jorgebcn76', 'recent')
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import player_store
+from build_player_stats import derive_player, derive_view
+from recent_stats import RecentCounters
+
+HERO_NAME = 'idealistslp'
+FLUSH_INTERVAL = 5.0  # seconds between background flushes
+MAX_OPEN_HANDS = 16   # hands whose seen seqs are remembered
+
+# memory_calibrator action codes -> hand history verbs used by the stats rules
+VERBS = {0x42: 'bets', 0x43: 'calls', 0x45: 'raises', 0x46: 'folds', 0x63: 'checks'}
+MSG_ACTION, MSG_SEATED, MSG_DEAL = 0x01, 0x02, 0x05
+
+
+class _HandState:
+    """Per-hand state needed to classify the next action."""
+    __slots__ = ('seen', 'seats', 'street', 'first_raiser', 'acted')
+
+    def __init__(self):
+        self.seen = set()      # seqs applied
+        self.seats = {}        # seat -> name
+        self.street = 0        # 0 = preflop, +1 per DEAL marker
+        self.first_raiser = None
+        self.acted = set()     # players who acted preflop
+
+
+class LiveStatsTracker:
+    """Online per-player counters fed by decoded memory buffer entries."""
+
+    def __init__(self, store_path: str = player_store.DEFAULT_DB, flush_interval: float = FLUSH_INTERVAL,
+                 view: str = 'lifetime'):
+        self.store_path = store_path
+        self.flush_interval = flush_interval
+        self.view = view
+        self._store = None
+        self._lock = threading.Lock()
+        self._hands = OrderedDict()   # hand_id -> _HandState
+        self.totals = {}              # name -> counters (store base + live)
+        self.pending = {}             # name -> deltas not yet flushed
+        self.pending_hands = {}       # (name, hand_id) -> the same deltas per hand (player_live)
+        self.derived = {}             # name -> derive_player(totals) or None
+        self.recent = {}              # name -> RecentCounters
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ── Store ────────────────────────────────────────────────────────
+
+    def _get_store(self):
+        if self._store is None:
+            self._store = player_store.PlayerStore(self.store_path)
+        return self._store
+
+    def _counters(self, name):
+        c = self.totals.get(name)
+        if c is None:
+            store = self._get_store() if self.store_path else None
+            base = store.counters(name) if store else None
+            recent = store.recent(name) if store else None
+            c = self.totals[name] = dict(base) if base else dict.fromkeys(player_store.COUNTERS, 0)
+            self.recent[name] = RecentCounters.from_json(recent) if recent else RecentCounters()
+        return c
+
+    def _bump(self, name, key, hand_id):
+        self._counters(name)[key] += 1
+        self.recent[name].add(key)
+        for pending, k in ((self.pending, name), (self.pending_hands, (name, hand_id))):
+            p = pending.get(k)
+            if p is None:
+                p = pending[k] = dict.fromkeys(player_store.COUNTERS, 0)
+            p[key] += 1
+
+    # ── Events ───────────────────────────────────────────────────────
+
+    def _hand(self, hand_id):
+        h = self._hands.get(hand_id)
+        if h is None:
+            h = self._hands[hand_id] = _HandState()
+            if len(self._hands) > MAX_OPEN_HANDS:
+                self._hands.popitem(last=False)
+        return h
+
+    def on_event(self, hand_id, seq, msg_type, seat, action_code, name=None) -> bool:
+        """Apply one decoded entry. Returns False if (hand_id, seq) was already seen,
+        except a SEATED entry whose name arrives late (EventStream retries it)."""
+        with self._lock:
+            h = self._hand(hand_id)
+            if seq in h.seen:
+                if msg_type == MSG_SEATED and seat != 255 and name and h.seats.get(seat) != name:
+                    h.seats[seat] = name
+                    return True
+                return False
+            h.seen.add(seq)
+
+            if msg_type == MSG_SEATED:
+                if seat != 255 and name:
+                    h.seats[seat] = name
+                return True
+            if msg_type == MSG_DEAL:
+                h.street += 1
+                return True
+            if msg_type != MSG_ACTION:
+                return True
+            verb = VERBS.get(action_code)
+            player = h.seats.get(seat) or name
+            if verb is None or not player or player == HERO_NAME:
+                return True  # blinds, wins, unknown seat, hero
+
+            if h.street == 0:
+                if player not in h.acted:
+                    self._counters(player)
+                    self.recent[player].start_hand()  # one ring row per player per hand, as offline
+                self._bump(player, 'hands', hand_id)
+                if verb in ('calls', 'raises'):
+                    self._bump(player, 'vpip', hand_id)
+                if verb == 'raises':
+                    self._bump(player, 'pfr', hand_id)
+                    if h.first_raiser is None:
+                        h.first_raiser = player
+                    else:
+                        self._bump(player, 'three_bets', hand_id)
+                if h.first_raiser and player != h.first_raiser and player not in h.acted:
+                    self._bump(player, 'three_bet_opps', hand_id)
+                h.acted.add(player)
+            elif verb in ('bets', 'raises'):
+                self._bump(player, 'af_actions', hand_id)
+            elif verb == 'calls':
+                self._bump(player, 'af_passive', hand_id)
+            else:
+                return True
+            self.derived[player] = derive_player(self.totals[player])
+            return True
+
+    def feed(self, entries: List[Dict]) -> int:
+        """Apply memory_calibrator.decode_buffer entries; returns number of new events."""
+        applied = 0
+        for e in entries or ():
+            if self.on_event(e['hand_id'], e['seq'], e['msg_type'], e['seat'], e['action_code'], e.get('name')):
+                applied += 1
+        return applied
+
+    def feed_events(self, events) -> int:
+        """Apply memory_events.Event records (EventStream.poll); returns number of new events."""
+        applied = 0
+        for ev in events or ():
+            if self.on_event(ev.hand_id, ev.seq, ev.msg_type, ev.seat, ev.action_code, ev.name):
+                applied += 1
+        return applied
+
+    # ── Reads ────────────────────────────────────────────────────────
+
+    def player_stats(self, name: str, view: Optional[str] = None) -> Optional[Dict]:
+        """Derived stats (build_player_stats format) including live hands, or None."""
+        view = view or self.view
+        if view == 'lifetime' or name not in self.totals:
+            return self.derived.get(name)
+        with self._lock:
+            return derive_view(self.totals[name], self.recent[name], view)
+
+    def archetype(self, name: str, view: Optional[str] = None) -> Optional[str]:
+        s = self.player_stats(name, view)
+        return s['archetype'] if s else None
+
+    def overlay(self, opponent_stats: List[Dict]) -> List[Dict]:
+        """Copy of helper_bar opponent_stats with live hands/archetype where known."""
+        out = []
+        for o in opponent_stats:
+            live = self.player_stats(o.get('db_name') or o.get('name'))
+            if live:
+                o = dict(o, hands=live['hands'], archetype=live['archetype'])
+            out.append(o)
+        return out
+
+    # ── Background flush ─────────────────────────────────────────────
+
+    def flush(self) -> int:
+        """Write pending deltas to the store. Returns number of players written."""
+        with self._lock:
+            pending, self.pending = self.pending, {}
+            hands, self.pending_hands = self.pending_hands, {}
+            recent = {name: self.recent[name].to_json() for name in pending}
+        if not pending or not self.store_path:
+            return 0
+        try:
+            self._get_store().add_counters(pending, recent, hands)
+        except Exception:
+            with self._lock:  # keep deltas for the next attempt
+                for target, batch in ((self.pending, pending), (self.pending_hands, hands)):
+                    for key, delta in batch.items():
+                        p = target.setdefault(key, dict.fromkeys(player_store.COUNTERS, 0))
+                        for k, v in delta.items():
+                            p[k] += v
+            raise
+        return len(pending)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[LIVE] Flush error: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write whatever is pending."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
@@ -38,8 +38,14 @@ Performance: Magic scan 150ms vs anchor 480ms (2.9x faster, verified on 7 dumps)
 import sys
 import os
 import json
+import mmap
+import re
 import struct
 import time
+import zlib
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 IS_WINDOWS = sys.platform == 'win32'
@@ -85,6 +91,27 @@ CONTAINER_ANCHOR_OFFSET = 0x6C  # offset of anchor within container struct
 HEAP_RANGE = (0x08000000, 0x22000000)
 ACTION_NAMES = {0x42: 'BET', 0x43: 'CALL', 0x45: 'RAISE', 0x46: 'FOLD', 0x50: 'POST_BB', 0x63: 'CHECK', 0x70: 'POST_SB', 0x77: 'WIN'}
 MSG_TYPES = {0x0A: 'NEW_HAND', 0x01: 'ACTION', 0x02: 'SEATED', 0x05: 'DEAL', 0x06: 'WIN', 0x07: 'ACTION_START'}
+# Container magic number at container+0x54 (primary scan)
+CONTAINER_MAGIC = struct.pack('<I', 0x0B0207EA)
+CONTAINER_MAGIC_OFFSET = 0x54
+# Byte patterns as regexes so scans run over bytes, mmap and memoryview alike.
+# BUFFER_SIGNATURE can overlap itself (at shift 9), so match its tail (which
+# can't) and check the leading 0x00 separately.
+_SIGNATURE_TAIL_RE = re.compile(re.escape(BUFFER_SIGNATURE[1:]))
+# Container fields checked in the same pass as the magic: +0x54 magic,
+# +0x6C anchor, +0xE0 == 1 (the match ends at +0xE4)
+_CONTAINER_RE = re.compile(
+    re.escape(CONTAINER_MAGIC) + b'.{%d}' % (CONTAINER_ANCHOR_OFFSET - CONTAINER_MAGIC_OFFSET - 4) +
+    re.escape(CONTAINER_ANCHOR) + b'.{%d}' % (0xE0 - CONTAINER_ANCHOR_OFFSET - 24) +
+    re.escape(struct.pack('<I', 1)), re.DOTALL)
+CONTAINER_SIZE = 0xF0
+_CONTAINER_SIG = bytes([0xB4, 0x07, 0x8C, 0x01])   # +0x38
+_CONTAINER_U32_44 = struct.pack('<I', 0x3C)         # +0x44
+_CONTAINER_PTRS = struct.Struct('<II')              # +0xE4 buf-8, +0xE8 end
+SCAN_CHUNK = 4 * 1024 * 1024    # bytes per container scan task
+SCAN_WORKERS = min(8, os.cpu_count() or 1)
+SAMPLE_PAGES = 8                 # pages hashed per region fingerprint
+PAGE_SIZE = 0x1000
 
 
 def log(msg):
@@ -93,26 +120,69 @@ def log(msg):
 
 # ── Entry Decoder ────────────────────────────────────────────────────
 
-def decode_entry(data_40bytes, read_str_fn=None):
-    """Decode a single 0x40-byte message buffer entry."""
-    e = data_40bytes
-    hand_id = struct.unpack('<Q', e[0:8])[0]
-    seq = struct.unpack('<I', e[8:12])[0]
-    msg_type = e[0x14]
-    seat = e[0x16]
-    action_code = e[0x17]
-    amount = struct.unpack('<H', e[0x18:0x1A])[0]
-    name_ptr = struct.unpack('<I', e[0x1C:0x20])[0]
-    name_len = struct.unpack('<I', e[0x20:0x24])[0]
-    extra_ptr = struct.unpack('<I', e[0x28:0x2C])[0]
-    extra_len = struct.unpack('<I', e[0x2C:0x30])[0]
+# One entry: hand_id, seq, msg_type, seat, action_code, amount, name_ptr, name_len, extra_ptr, extra_len
+ENTRY_STRUCT = struct.Struct('<QI8xBxBBH2xII4xII16x')
+assert ENTRY_STRUCT.size == ENTRY_SIZE
+
+
+class StringCache:
+    """Strings read through pointers, kept for the current hand.
+
+    Entries carry each string's length next to its pointer (+0x20 name_len,
+    +0x2C extra_len), so a cached string is only reused for the same
+    (pointer, length): a pointer whose entry now reports another length was
+    reused for other content and is read again. A read whose length doesn't
+    match the entry's (string being rewritten) isn't kept. Moving to another
+    hand_id drops the cache.
+    """
+
+    def __init__(self):
+        self.hand_id = None
+        self.strings = {}       # ptr -> (length, string)
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0    # cached pointer seen again with another length
+
+    def for_hand(self, hand_id):
+        if hand_id != self.hand_id:
+            self.strings.clear()
+            self.hand_id = hand_id
+
+    def read(self, read_str_fn, ptr, maxlen, length=0):
+        cached = self.strings.get(ptr)
+        if cached is not None:
+            if cached[0] == length:
+                self.hits += 1
+                return cached[1]
+            del self.strings[ptr]
+            self.invalidated += 1
+        self.misses += 1
+        s = read_str_fn(ptr, maxlen)
+        if s is not None and (not 0 < length < maxlen or len(s) == length):
+            self.strings[ptr] = (length, s)
+        return s
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'invalidated': self.invalidated,
+                'hit_rate': self.hits / total if total else 0.0}
+
+
+def _read_string(read_str_fn, str_cache, ptr, maxlen, length):
+    if str_cache is None:
+        return read_str_fn(ptr, maxlen)
+    return str_cache.read(read_str_fn, ptr, maxlen, length)
+
+
+def _entry_dict(fields, read_str_fn=None, str_cache=None):
+    hand_id, seq, msg_type, seat, action_code, amount, name_ptr, name_len, extra_ptr, extra_len = fields
 
     name = None
     extra = None
     if read_str_fn and 0x01000000 < name_ptr < 0x7FFFFFFF:
-        name = read_str_fn(name_ptr, 64)
+        name = _read_string(read_str_fn, str_cache, name_ptr, 64, name_len)
     if read_str_fn and 0x01000000 < extra_ptr < 0x7FFFFFFF:
-        extra = read_str_fn(extra_ptr, 16)
+        extra = _read_string(read_str_fn, str_cache, extra_ptr, 16, extra_len)
 
     return {
         'hand_id': hand_id, 'seq': seq, 'msg_type': msg_type,
@@ -122,20 +192,46 @@ def decode_entry(data_40bytes, read_str_fn=None):
     }
 
 
-def decode_buffer(buf_addr, read_bytes_fn, read_str_fn, max_entries=30):
-    """Decode all entries from a message buffer. Returns list of entry dicts."""
-    entries = []
-    first_hid = None
+def decode_entry(data_40bytes, read_str_fn=None):
+    """Decode a single 0x40-byte message buffer entry."""
+    return _entry_dict(ENTRY_STRUCT.unpack_from(data_40bytes), read_str_fn)
+
+
+def _read_entries_one_by_one(buf_addr, read_bytes_fn, max_entries):
+    """Entries read separately, up to the first unreadable one or other hand_id."""
+    chunks = []
     for i in range(max_entries):
         data = read_bytes_fn(buf_addr + i * ENTRY_SIZE, ENTRY_SIZE)
         if not data or len(data) < ENTRY_SIZE:
             break
-        e = decode_entry(data, read_str_fn)
-        if i == 0:
-            first_hid = e['hand_id']
-        elif e['hand_id'] != first_hid:
+        data = bytes(data[:ENTRY_SIZE])
+        if chunks and data[:8] != chunks[0][:8]:
             break
-        entries.append(e)
+        chunks.append(data)
+    return b''.join(chunks)
+
+
+def decode_buffer(buf_addr, read_bytes_fn, read_str_fn, max_entries=30, str_cache=None):
+    """Decode all entries from a message buffer. Returns list of entry dicts.
+
+    The whole span is read in one call and unpacked with ENTRY_STRUCT, up to
+    the first entry of another hand. If the span can't be read in one piece
+    (it runs into an unreadable page) entries are read one at a time. Strings
+    go through str_cache (a StringCache) when given.
+    """
+    data = read_bytes_fn(buf_addr, max_entries * ENTRY_SIZE) if max_entries > 0 else None
+    if not data or len(data) < ENTRY_SIZE:
+        data = _read_entries_one_by_one(buf_addr, read_bytes_fn, max_entries)
+    entries = []
+    first_hid = None
+    for fields in ENTRY_STRUCT.iter_unpack(data[:len(data) // ENTRY_SIZE * ENTRY_SIZE]):
+        if first_hid is None:
+            first_hid = fields[0]
+            if str_cache is not None:
+                str_cache.for_hand(first_hid)
+        elif fields[0] != first_hid:
+            break
+        entries.append(_entry_dict(fields, read_str_fn, str_cache))
     return entries
 
 
@@ -223,12 +319,53 @@ def extract_hand_data(entries):
 
     return {'hand_id': hand_id, 'hero_cards': hero_cards, 'players': players,
             'actions': actions, 'community_cards': community_cards,
-            'hero_seat': hero_seat, 'bb_seat': bb_seat, 'position': position}
+            'hero_seat': hero_seat, 'bb_seat': bb_seat, 'position': position,
+            'entries': entries}
 
 
-# ── Process Reader (Windows only) ───────────────────────────────────
+# ── Process Readers ─────────────────────────────────────────────────
+
+class MemoryReader:
+    """What the live path (scan_live, rescan_buffer, save_dump, EventStream)
+    needs from the PokerStars process:
+
+        attach() -> bool          connect; sets handle (truthy), pid, module_base
+        read(addr, size)          bytes up to the end of the region, None if unmapped
+        read_str(addr, maxlen)    NUL-terminated ASCII string or None
+        iter_regions()            (base, size) of committed readable regions
+
+    ProcessReader reads the live process (Windows), ReplayReader plays back
+    stored dumps.
+    """
+    handle = None
+    pid = None
+    module_base = None
+
+    def attach(self):
+        raise NotImplementedError
+
+    def read(self, addr, size):
+        raise NotImplementedError
+
+    def iter_regions(self):
+        raise NotImplementedError
+
+    def read_str(self, addr, maxlen=64):
+        data = self.read(addr, maxlen)
+        if not data:
+            return None
+        end = data.find(b'\x00')
+        if end <= 0:
+            return None
+        try:
+            return data[:end].decode('ascii')
+        except Exception:
+            return None
+
+
+class ProcessReader(MemoryReader):
+    """PokerStars.exe via ReadProcessMemory / VirtualQueryEx (Windows only)."""
 
-class ProcessReader:
     def __init__(self):
         self.handle = None
         self.pid = None
@@ -282,18 +419,6 @@ class ProcessReader:
             self.handle, ctypes.c_void_p(addr), buf, size, ctypes.byref(nread))
         return buf.raw[:nread.value] if ok and nread.value > 0 else None
 
-    def read_str(self, addr, maxlen=64):
-        data = self.read(addr, maxlen)
-        if not data:
-            return None
-        end = data.find(b'\x00')
-        if end <= 0:
-            return None
-        try:
-            return data[:end].decode('ascii')
-        except Exception:
-            return None
-
     def iter_regions(self):
         addr = 0
         mbi = MEMORY_BASIC_INFORMATION()
@@ -308,19 +433,94 @@ class ProcessReader:
                 break
 
 
+class ReplayReader(MemoryReader):
+    """Stored dumps played back as the process, one dump per time step.
+
+    dumps are meta dicts with 'regions' and '_bin_path' (as _load_tagged_dumps
+    returns them) in time order: attach() shows dump 0, advance() the next.
+    read() copies like ReadProcessMemory, so timings include that copy.
+
+        use_reader(ReplayReader(_load_tagged_dumps()))
+        hand = scan_live()
+        while _reader.advance():
+            hand = rescan_buffer(hand['buf_addr'], hand['hand_id']) or scan_live()
+    """
+
+    def __init__(self, dumps):
+        self.dumps = list(dumps)
+        self.step = -1
+        self.dump = None
+
+    def attach(self):
+        if self.step < 0:
+            return bool(self.dumps) and self.seek(0)
+        return True
+
+    def seek(self, step):
+        """Show dump step; False if there is no such dump."""
+        if not 0 <= step < len(self.dumps):
+            return False
+        if self.dump is not None:
+            self.dump.close()
+        meta = self.dumps[step]
+        self.dump = DumpReader(meta['_bin_path'], meta['regions'])
+        self.step = step
+        self.handle = self.dump
+        self.pid = meta.get('pid')
+        self.module_base = meta.get('module_base')
+        return True
+
+    def advance(self):
+        return self.seek(self.step + 1)
+
+    def close(self):
+        if self.dump is not None:
+            self.dump.close()
+        self.dump = self.handle = None
+        self.step = -1
+
+    def read(self, addr, size):
+        data = self.dump.read(addr, size) if self.dump is not None else None
+        return bytes(data) if data else None
+
+    def iter_regions(self):
+        if self.dump is None:
+            return
+        for r in self.dump.regions:
+            yield r['base'], r['size']
+
+
 # ── Dump on F9 (called from helper_bar) ─────────────────────────────
 
 _reader = None
 
-def save_dump(timestamp=None):
-    """Called on F9. Dumps PS memory to disk. Returns dump_id or None."""
+
+def _attached_reader():
+    """The live reader (a ProcessReader unless use_reader() set one), attached; None if it can't attach."""
     global _reader
-    if not IS_WINDOWS:
-        return None
     if _reader is None:
         _reader = ProcessReader()
     if not _reader.handle and not _reader.attach():
         return None
+    return _reader
+
+
+def use_reader(reader):
+    """Point scan_live / rescan_buffer / save_dump / live_stream at reader
+    (None: the PokerStars process on next use) and drop every live cache."""
+    global _reader, _cached_container_addr, _str_cache, _scan_history, _region_map
+    _reader = reader
+    _cached_container_addr = None
+    _card_cache.clear()
+    _str_cache = StringCache()
+    _scan_history = ScanHistory()
+    _region_map = RegionMap()
+
+
+def save_dump(timestamp=None):
+    """Called on F9. Dumps PS memory to disk. Returns dump_id or None."""
+    if _attached_reader() is None:
+        return None
 
     os.makedirs(DUMP_DIR, exist_ok=True)
     ts = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -406,180 +606,419 @@ def _load_tagged_dumps():
     return dumps
 
 
-def _make_read_fns(bin_path, regions):
-    """Return (read_bytes, read_str) functions for a dump file."""
-    def read_bytes(addr, size):
-        for r in regions:
-            if r['base'] <= addr < r['base'] + r['size']:
-                off = addr - r['base']
-                with open(bin_path, 'rb') as f:
-                    f.seek(r['file_offset'] + off)
-                    return f.read(min(size, r['size'] - off))
+class DumpReader:
+    """A dump (.bin + regions) memory-mapped once, addresses resolved by bisect.
+
+    read() has ProcessReader.read semantics (bytes up to the end of the region,
+    None if unmapped) but returns zero-copy memoryview slices of the mapping;
+    copy with bytes() anything that must outlive the reader.
+
+        with DumpReader(meta['_bin_path'], meta['regions']) as reader:
+            reader.read(addr, 0x40)
+            reader.find_all(struct.pack('<I', addr), align=4)
+    """
+
+    def __init__(self, bin_path, regions):
+        self.bin_path = bin_path
+        self.regions = sorted(regions, key=lambda r: r['base'])
+        self._bases = [r['base'] for r in self.regions]
+        with open(bin_path, 'rb') as f:
+            empty = os.fstat(f.fileno()).st_size == 0
+            self._mm = None if empty else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self._mm if self._mm is not None else b'')
+
+    def close(self):
+        self.view.release()
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # slices still referenced; unmapped when they are collected
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def region_at(self, addr):
+        """Region dict containing addr, or None."""
+        i = bisect_right(self._bases, addr) - 1
+        if i >= 0:
+            r = self.regions[i]
+            if addr < r['base'] + r['size']:
+                return r
         return None
 
-    def read_str(addr, maxlen=64):
-        data = read_bytes(addr, maxlen)
-        if not data:
+    def _span(self, addr, size):
+        r = self.region_at(addr)
+        if r is None:
+            return None, None
+        off = addr - r['base']
+        start = r['file_offset'] + off
+        return start, start + min(size, r['size'] - off)
+
+    def read(self, addr, size):
+        start, end = self._span(addr, size)
+        return None if start is None else self.view[start:end]
+
+    def read_str(self, addr, maxlen=64):
+        start, end = self._span(addr, maxlen)
+        if start is None or start == end:
             return None
-        end = data.find(b'\x00')
-        if end <= 0:
+        nul = self._mm.find(b'\x00', start, end)
+        if nul <= start:
             return None
         try:
-            return data[:end].decode('ascii')
+            return self._mm[start:nul].decode('ascii')
         except Exception:
             return None
 
-    return read_bytes, read_str
+    def read_u32(self, addr):
+        data = self.read(addr, 4)
+        return struct.unpack('<I', data)[0] if data is not None and len(data) == 4 else None
+
+    def region_data(self, r):
+        """Whole region as a memoryview."""
+        return self.view[r['file_offset']:r['file_offset'] + r['size']]
+
+    def iter_regions(self, addr_range=None, min_size=0):
+        """(base, memoryview) per region, optionally only bases inside addr_range=(lo, hi)."""
+        for r in self.regions:
+            if addr_range and not addr_range[0] <= r['base'] < addr_range[1]:
+                continue
+            if r['size'] < min_size:
+                continue
+            yield r['base'], self.region_data(r)
+
+    def find_all(self, pattern, align=1, limit=None):
+        """Addresses of every occurrence of pattern inside a region, ascending.
+
+        align keeps only hits at addresses that are a multiple of align.
+        """
+        hits = []
+        if self._mm is None:
+            return hits
+        for r in self.regions:
+            pos, end = r['file_offset'], r['file_offset'] + r['size']
+            while True:
+                pos = self._mm.find(pattern, pos, end)
+                if pos < 0:
+                    break
+                addr = r['base'] + pos - r['file_offset']
+                if addr % align == 0:
+                    hits.append(addr)
+                    if limit and len(hits) >= limit:
+                        return hits
+                pos += 1
+        return hits
+
+
+def _make_read_fns(bin_path, regions):
+    """Return (read_bytes, read_str) functions for a dump file (bound to a DumpReader)."""
+    reader = DumpReader(bin_path, regions)
+    return reader.read, reader.read_str
 
 
 # ── Signature-Based Buffer Finder ────────────────────────────────────
 
-def _find_buffer_via_container(data_iter, read_bytes_fn, debug=False):
+def _scan_chunk(read_fn, base, region_size, lo, hi, containers=True, signatures=False):
+    """Container layouts and 0x88 signature candidates starting in [base+lo, base+hi)
+    of one region, from a single read of the chunk."""
+    end = min(region_size, hi + CONTAINER_SIZE)
+    data = read_fn(base + lo, end - lo)
+    if not data:
+        return [], []
+    hits = []
+    for m in _CONTAINER_RE.finditer(data) if containers else ():
+        sb = m.start() - CONTAINER_MAGIC_OFFSET
+        if sb < 0 or lo + sb >= hi or sb + CONTAINER_SIZE > len(data):
+            continue   # owned by the previous chunk / runs past the region
+        if data[sb+0x38:sb+0x3C] != _CONTAINER_SIG or data[sb+0x44:sb+0x48] != _CONTAINER_U32_44:
+            continue
+        bp, ep = _CONTAINER_PTRS.unpack_from(data, sb + 0xE4)
+        n_entries = (ep - bp) // ENTRY_SIZE
+        if bp < 0x100000 or n_entries < 3 or n_entries > 200:
+            continue
+        hits.append((base + lo + sb, bp + 8, n_entries))
+    candidates = _signature_candidates(base + lo, data, hi - lo) if signatures else []
+    return hits, candidates
+
+
+def scan_buffers(regions, read_fn, workers=None, chunk_size=SCAN_CHUNK, containers=True, signatures=True):
+    """Container layouts and 0x88 signature candidates in (base, size) regions.
+
+    Returns ([(container_addr, buf_addr, n_entries)], [(buf_addr, hand_id)]),
+    both in address order. Regions are cut into chunk_size tasks (each reads
+    its chunk plus one container's overlap) run on a thread pool; each chunk
+    is read once and searched for both patterns. The container regex matches
+    magic, anchor and +0xE0 in one go; +0x38, +0x44 and the buffer pointers
+    are checked on the few full matches. Live reads (ReadProcessMemory)
+    release the GIL, so reading and matching of different chunks overlap; on
+    a dump the reads are mmap slices.
+    """
+    tasks = [(base, size, lo, min(lo + chunk_size, size))
+             for base, size in regions for lo in range(0, size, chunk_size)]
+    scan = lambda t: _scan_chunk(read_fn, *t, containers=containers, signatures=signatures)
+    workers = SCAN_WORKERS if workers is None else workers
+    if workers <= 1 or len(tasks) <= 1:
+        results = [scan(t) for t in tasks]
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(scan, tasks))
+    return ([hit for hits, _ in results for hit in hits],
+            [c for _, candidates in results for c in candidates])
+
+
+def scan_containers(regions, read_fn, workers=None, chunk_size=SCAN_CHUNK):
+    """Container candidates in (base, size) regions, in address order (see scan_buffers)."""
+    return scan_buffers(regions, read_fn, workers, chunk_size, signatures=False)[0]
+
+
+def _best_container(candidates, read_bytes_fn):
+    """(buf_addr, entry_count, hand_id, container_addr) of the candidate whose
+    buffer holds the highest valid hand_id, or (None, 0, 0, None)."""
+    best = None
+    for container_addr, buf_addr, n_entries in candidates:
+        # Read hand_id from first buffer entry
+        hid_data = read_bytes_fn(buf_addr, 8)
+        if not hid_data or len(hid_data) < 8:
+            continue
+        hid = struct.unpack('<Q', hid_data[:8])[0]
+        if not (200_000_000_000 < hid < 300_000_000_000):
+            continue
+        if not best or hid > best[2]:
+            best = (buf_addr, n_entries, hid, container_addr)
+    return best or (None, 0, 0, None)
+
+
+class ScanHistory:
+    """Where full scans found the container, so the next one looks there first.
+
+    Keeps the last container address and hand_id and the bases of the last
+    few heap regions that held it. After a table change the container is
+    nearly always back in one of those regions or a neighbouring one.
+    """
+
+    def __init__(self, size=8):
+        self.container_addr = None
+        self.hand_id = 0
+        self.regions = deque(maxlen=size)   # region bases, most recent last
+
+    def record(self, container_addr, region_base, hand_id):
+        self.container_addr = container_addr
+        self.hand_id = max(self.hand_id, hand_id)
+        if region_base in self.regions:
+            self.regions.remove(region_base)
+        self.regions.append(region_base)
+
+    def order(self, regions):
+        """Previous hit regions first (most recent first), then the rest by
+        distance from the last container address, nearest first."""
+        if self.container_addr is None:
+            return list(regions)
+        rank = {base: i for i, base in enumerate(reversed(self.regions))}
+        addr = self.container_addr
+
+        def key(region):
+            base, size = region
+            dist = 0 if base <= addr < base + size else min(abs(base - addr), abs(base + size - addr))
+            return rank.get(base, len(rank)), dist
+        return sorted(regions, key=key)
+
+
+def _locate_container(heap, read_fn, history, accept, workers=None, scan=scan_buffers):
+    """Container scan in history order, stopping at the first good hit.
+
+    Regions are scanned (scan_buffers or RegionMap.scan) in batches of
+    1, 2, 4, ... in ScanHistory.order; once a hand_id is known, the first
+    batch whose best container has hand_id >= history.hand_id and passes
+    accept(best) ends the scan (a cold scan has nothing to compare against
+    and keeps the newest). Returns (best, signature candidates seen so far,
+    accept's result). Without such a hit every region is scanned and best
+    is the highest hand_id overall (accept not applied).
+    """
+    ordered = history.order(heap)
+    containers, signatures = [], []
+    i, batch = 0, 1
+    while i < len(ordered):
+        group = ordered[i:i + batch]
+        i += batch
+        batch *= 2
+        found, candidates = scan(group, read_fn, workers)
+        containers += found
+        signatures += candidates
+        best = _best_container(found, read_fn)
+        if best[0] and history.hand_id and best[2] >= history.hand_id:
+            result = accept(best)
+            if result:
+                return best, sorted(signatures), result
+    return _best_container(sorted(containers), read_fn), sorted(signatures), None
+
+
+def _region_of(regions, addr):
+    return next((base for base, size in regions if base <= addr < base + size), None)
+
+
+class RegionMap:
+    """Regions scanned before, so repeated scans only read new or changed memory.
+
+    Per region base: (size, fingerprint, n_containers, candidates), where the
+    fingerprint is a crc32 over SAMPLE_PAGES pages spread across the region
+    and n_containers is None if containers weren't searched. scan() has
+    scan_buffers' signature and results; a region whose size and fingerprint
+    are unchanged and that held no container is not read again, its cached
+    0x88 candidates are returned instead. Regions that held a container are
+    always rescanned (the container's pointers change every hand).
+
+    Sampling can miss a change confined to unhashed pages; callers clear()
+    the map and scan again when a scan that skipped regions finds only an
+    older hand than the last known one, or nothing.
+    """
+
+    def __init__(self, sample_pages=SAMPLE_PAGES):
+        self.sample_pages = sample_pages
+        self.regions = {}
+        self.bytes_scanned = 0
+        self.bytes_skipped = 0
+
+    def fingerprint(self, read_fn, base, size):
+        """crc32 of sample_pages pages (first, last and evenly spaced between)."""
+        if size <= self.sample_pages * PAGE_SIZE:
+            return zlib.crc32(read_fn(base, size) or b'')
+        step = (size - PAGE_SIZE) // (self.sample_pages - 1) // PAGE_SIZE * PAGE_SIZE
+        crc = 0
+        for i in range(self.sample_pages):
+            off = size - PAGE_SIZE if i == self.sample_pages - 1 else i * step
+            crc = zlib.crc32(read_fn(base + off, PAGE_SIZE) or b'', crc)
+        return crc
+
+    def scan(self, regions, read_fn, workers=None, chunk_size=SCAN_CHUNK, containers=True, signatures=True):
+        """scan_buffers over the regions that are new, changed or held a container."""
+        fresh, cached, prints = [], [], {}
+        for base, size in regions:
+            fp = self.fingerprint(read_fn, base, size)
+            known = self.regions.get(base)
+            if known and known[:2] == (size, fp) and (not containers or known[2] == 0):
+                cached += known[3]
+                self.bytes_skipped += size
+            else:
+                fresh.append((base, size))
+                prints[base] = fp
+        hits, candidates = scan_buffers(fresh, read_fn, workers, chunk_size, containers, signatures)
+        self.bytes_scanned += sum(size for _, size in fresh)
+
+        bounds = sorted(fresh)
+        bases = [base for base, _ in bounds]
+        per_region = {base: (0 if containers else None, []) for base in bases}
+        for c in hits:
+            base = bases[bisect_right(bases, c[0]) - 1]
+            per_region[base] = (per_region[base][0] + 1, per_region[base][1])
+        for c in candidates:
+            base = bases[bisect_right(bases, c[0]) - 1]
+            per_region[base][1].append(c)
+        for base, size in fresh:
+            n_containers, found = per_region[base]
+            self.regions[base] = (size, prints[base], n_containers, found)
+        return hits, sorted(candidates + cached)
+
+    def prune(self, regions):
+        """Forget regions no longer mapped (regions: the current (base, size) list)."""
+        live = {base for base, _ in regions}
+        for base in [b for b in self.regions if b not in live]:
+            del self.regions[base]
+
+    def clear(self):
+        self.regions.clear()
+
+
+def _find_buffer_via_container(regions, read_bytes_fn, debug=False, workers=None):
     """Find buffer by scanning for magic number 0x0B0207EA at container+0x54.
     
     This is 2.9x faster than 24-byte anchor scan (verified across 7 dumps).
     Magic number is 100% stable and appears at container+0x54 in all cases.
     We validate with the 24-byte anchor to ensure correct container.
 
-    data_iter yields (base_addr, data_bytes) for each memory region.
+    regions are (base_addr, size) pairs read through read_bytes_fn (see
+    scan_buffers); the candidate with the highest hand_id wins.
     Returns (buf_addr, entry_count, hand_id, container_addr) or (None, 0, 0, None).
     """
-    best = None  # (buf_addr, entry_count, hand_id, container_addr)
-    regions_scanned = 0
-    magic_hits = 0
-    validated = 0
-    
-    MAGIC_NUMBER = struct.pack('<I', 0x0B0207EA)
-    MAGIC_OFFSET = 0x54  # Magic appears at container+0x54
-    
-    for base, data in data_iter:
-        regions_scanned += 1
-        idx = 0
-        while True:
-            # Scan for magic number (2.9x faster than anchor)
-            idx = data.find(MAGIC_NUMBER, idx)
-            if idx < 0:
-                break
-            magic_hits += 1
-            
-            # Container would be at: idx - MAGIC_OFFSET
-            sb = idx - MAGIC_OFFSET  # struct_base offset within data
-            if sb < 0 or sb + 0xF0 > len(data):
-                idx += 1; continue
-            
-            # Validate with 24-byte anchor at +0x6C
-            anchor_offset = sb + CONTAINER_ANCHOR_OFFSET
-            if anchor_offset + 24 > len(data):
-                idx += 1; continue
-            if data[anchor_offset:anchor_offset+24] != CONTAINER_ANCHOR:
-                idx += 1; continue
-            
-            # Confirm signature at +0x38
-            if data[sb+0x38] != 0xB4 or data[sb+0x39] != 0x07 or data[sb+0x3A] != 0x8C or data[sb+0x3B] != 0x01:
-                idx += 1; continue
-            # Validate +0x44 == 0x3C
-            if struct.unpack('<I', data[sb+0x44:sb+0x48])[0] != 0x3C:
-                idx += 1; continue
-            # Validate +0xE0 == 1
-            if struct.unpack('<I', data[sb+0xE0:sb+0xE4])[0] != 1:
-                idx += 1; continue
-            # Read buf-8 pointer from +0xE4
-            bp = struct.unpack('<I', data[sb+0xE4:sb+0xE8])[0]
-            if bp < 0x100000:
-                idx += 1; continue
-            # Entry count from +0xE8
-            ep = struct.unpack('<I', data[sb+0xE8:sb+0xEC])[0]
-            n_entries = (ep - bp) // ENTRY_SIZE
-            if n_entries < 3 or n_entries > 200:
-                idx += 1; continue
-            # Read hand_id from first buffer entry (bp + 8)
-            hid_data = read_bytes_fn(bp + 8, 8)
-            if not hid_data or len(hid_data) < 8:
-                idx += 1; continue
-            hid = struct.unpack('<Q', hid_data)[0]
-            if not (200_000_000_000 < hid < 300_000_000_000):
-                idx += 1; continue
-            validated += 1
-            container_addr = base + sb
-            if not best or hid > best[2]:
-                best = (bp + 8, n_entries, hid, container_addr)
-            idx += 1
-    
+    regions = list(regions)
+    candidates = scan_containers(regions, read_bytes_fn, workers)
+    best = _best_container(candidates, read_bytes_fn)
     if debug:
-        log(f"[CONTAINER] Scanned {regions_scanned} regions, {magic_hits} magic hits, {validated} validated, best={best is not None}")
-    
-    return best or (None, 0, 0, None)
+        log(f"[CONTAINER] Scanned {len(regions)} regions, {len(candidates)} candidates, "
+            f"best={best[0] is not None}")
+    return best
+
+
+def _signature_candidates(base, data, limit=None):
+    """(buf_addr, hand_id) for each 0x88 signature in data (starting before
+    offset limit, if given) followed by a seq=1 first entry."""
+    candidates = []
+    for m in _SIGNATURE_TAIL_RE.finditer(data):
+        idx = m.start() - 1
+        if idx < 0 or data[idx] != BUFFER_SIGNATURE[0]:
+            continue
+        if limit is not None and idx >= limit:
+            break
+        entry_off = idx + 10  # signature is 10 bytes before first entry
+        if entry_off + 16 <= len(data):
+            hid = struct.unpack('<Q', data[entry_off:entry_off+8])[0]
+            seq = struct.unpack('<I', data[entry_off+8:entry_off+12])[0]
+            if 200_000_000_000 < hid < 300_000_000_000 and seq == 1:
+                candidates.append((base + entry_off, hid))
+    return candidates
 
 
-def find_buffer_in_dump(bin_path, regions, expected_cards_ascii=None):
+def find_buffer_in_dump(bin_path, regions, expected_cards_ascii=None, reader=None):
     """Find the message buffer. Tries container anchor first (~2.3x faster),
-    falls back to 0x88 signature scan.
+    falls back to 0x88 signature scan. Heap regions are read once for both.
 
-    Returns (buf_addr, entries) or (None, None).
+    Returns (buf_addr, entries) or (None, None). Pass an open DumpReader to
+    reuse its mapping; otherwise one is opened for this call.
     
     Note: Expects uncompressed .bin files. If .bin.gz uploaded, decompress first.
     """
-    read_bytes, read_str = _make_read_fns(bin_path, regions)
-
-    # Try container scan first — only scan heap range for speed
-    def _region_iter():
-        with open(bin_path, 'rb') as f:
-            for r in regions:
-                if r['base'] < HEAP_RANGE[0] or r['base'] >= HEAP_RANGE[1]:
-                    continue
-                if r['size'] < 0x200:
-                    continue
-                f.seek(r['file_offset'])
-                yield r['base'], f.read(r['size'])
-
-    buf_addr, n_entries, hid, container_addr = _find_buffer_via_container(_region_iter(), read_bytes)
+    if reader is None:
+        with DumpReader(bin_path, regions) as reader:
+            return find_buffer_in_dump(bin_path, regions, expected_cards_ascii, reader)
+    read_bytes, read_str = reader.read, reader.read_str
+    str_cache = StringCache()
+
+    # Container scan first — only heap range; 0x88 candidates collected in the same pass
+    heap = [(base, len(data)) for base, data in reader.iter_regions(HEAP_RANGE, min_size=0x200)]
+    containers, candidates = scan_buffers(heap, read_bytes)  # candidates: (buf_addr, hand_id)
+    buf_addr, n_entries, hid, container_addr = _best_container(containers, read_bytes)
     if buf_addr:
         # Save container address for pointer scan
         find_buffer_in_dump._last_container_addr = container_addr
-        entries = decode_buffer(buf_addr, read_bytes, read_str, n_entries)
+        entries = decode_buffer(buf_addr, read_bytes, read_str, n_entries, str_cache)
         if len(entries) >= 3:
             return buf_addr, entries
 
-    # Fallback: 0x88 signature scan
-    candidates = []  # (buf_addr, hand_id)
-
-    with open(bin_path, 'rb') as f:
-        for r in regions:
-            f.seek(r['file_offset'])
-            data = f.read(r['size'])
-            idx = 0
-            while True:
-                idx = data.find(BUFFER_SIGNATURE, idx)
-                if idx < 0:
-                    break
-                entry_off = idx + 10  # signature is 10 bytes before first entry
-                if entry_off + 16 <= len(data):
-                    hid = struct.unpack('<Q', data[entry_off:entry_off+8])[0]
-                    seq = struct.unpack('<I', data[entry_off+8:entry_off+12])[0]
-                    if 200_000_000_000 < hid < 300_000_000_000 and seq == 1:
-                        candidates.append((r['base'] + entry_off, hid))
-                idx += 1
+    # Fallback: 0x88 signature scan — only memory outside the heap pass is read now
+    scanned = set(heap)
+    rest = [(base, len(data)) for base, data in reader.iter_regions() if (base, len(data)) not in scanned]
+    candidates = sorted(candidates + scan_buffers(rest, read_bytes, containers=False)[1])
 
     if not candidates:
         return None, None
 
-        # Pick highest hand_id
-        max_hid = max(c[1] for c in candidates)
-        best = [c for c in candidates if c[1] == max_hid]
+    # Pick highest hand_id
+    max_hid = max(c[1] for c in candidates)
+    best = [c for c in candidates if c[1] == max_hid]
+
+    buf_addr = best[0][0]
+    if len(best) > 1:
+        # Tiebreak: find the one with readable hero name in SEATED entries
+        for ba, hid in best:
+            entries = decode_buffer(ba, read_bytes, read_str, str_cache=str_cache)
+            if any(e['msg_type'] == 0x02 and e['name'] == HERO_NAME for e in entries):
+                buf_addr = ba
+                break
 
-        if len(best) == 1:
-            buf_addr = best[0][0]
-        else:
-            # Tiebreak: find the one with readable hero name in SEATED entries
-            buf_addr = best[0][0]
-            for ba, hid in best:
-                entries = decode_buffer(ba, read_bytes, read_str)
-                for e in entries:
-                    if e['msg_type'] == 0x02 and e['name'] == HERO_NAME:
-                        buf_addr = ba
-                        break
-
-    entries = decode_buffer(buf_addr, read_bytes, read_str)
+    entries = decode_buffer(buf_addr, read_bytes, read_str, str_cache=str_cache)
     return (buf_addr, entries) if len(entries) >= 3 else (None, None)
 
 
@@ -607,20 +1046,14 @@ def _fuzzy_match(a, b):
 
 # ── Deep Pointer Analysis ────────────────────────────────────────────
 
-def _find_pointers_to_address(data, target_addr, base_addr=0):
+def _find_pointers_to_address(reader, target_addr):
     """Find all 4-byte aligned locations containing target_addr as pointer.
     Returns list of absolute addresses where pointer was found.
     """
-    target_bytes = struct.pack('<I', target_addr)
-    pointers = []
-    # Search every 4-byte aligned location
-    for i in range(0, len(data) - 4, 4):
-        if data[i:i+4] == target_bytes:
-            pointers.append(base_addr + i)
-    return pointers
+    return reader.find_all(struct.pack('<I', target_addr), align=4)
 
 
-def _analyze_container_structure(bin_path, regions, container_addr):
+def _analyze_container_structure(reader, container_addr):
     """Deep analysis of memory before container to find structure boundaries.
     
     Compares bytes before container across multiple dumps to find:
@@ -628,23 +1061,22 @@ def _analyze_container_structure(bin_path, regions, container_addr):
     2. Stable patterns that indicate structure boundaries
     3. Pointers to the structure from elsewhere in memory
     """
-    read_bytes, _ = _make_read_fns(bin_path, regions)
-    
     # Read 1KB before container to analyze structure boundaries
     LOOKBACK = 1024
-    pre_data = read_bytes(container_addr - LOOKBACK, LOOKBACK)
+    pre_data = reader.read(container_addr - LOOKBACK, LOOKBACK)
     if not pre_data:
         return None
     
     # Read container itself (known to be ~0x1E8 bytes)
-    container_data = read_bytes(container_addr, 0x200)
+    container_data = reader.read(container_addr, 0x200)
     if not container_data:
         return None
     
+    # Copies - the results outlive the reader
     return {
         'container_addr': container_addr,
-        'pre_data': pre_data,
-        'container_data': container_data,
+        'pre_data': bytes(pre_data),
+        'container_data': bytes(container_data),
     }
 
 
@@ -675,46 +1107,38 @@ def _deep_pointer_scan(dumps_data):
         
         log(f"    [{i}/{len(dumps_data)}] {dump_name}...")
         
-        # Find container
-        buf_addr, entries = find_buffer_in_dump(bin_path, regions)
-        if not buf_addr or not hasattr(find_buffer_in_dump, '_last_container_addr'):
-            log(f"      SKIP (no container)")
-            continue
-        
-        container_addr = find_buffer_in_dump._last_container_addr
-        log(f"      Container: 0x{container_addr:08X}")
-        
-        # Analyze structure boundaries
-        struct_info = _analyze_container_structure(bin_path, regions, container_addr)
-        if not struct_info:
-            log(f"      SKIP (can't read structure)")
-            continue
-        
-        # Load full dump for pointer scanning
-        log(f"      Loading dump ({os.path.getsize(bin_path)//1024//1024}MB)...")
-        with open(bin_path, 'rb') as f:
-            full_data = f.read()
-        
-        # Search for pointers to container and nearby addresses
-        log(f"      Scanning for pointers to {len(SEARCH_OFFSETS)} target addresses...")
-        for offset in SEARCH_OFFSETS:
-            target_addr = container_addr + offset
-            if target_addr < 0:
+        with DumpReader(bin_path, regions) as reader:
+            # Find container
+            buf_addr, entries = find_buffer_in_dump(bin_path, regions, reader=reader)
+            if not buf_addr or not hasattr(find_buffer_in_dump, '_last_container_addr'):
+                log(f"      SKIP (no container)")
                 continue
             
-            # Find all pointers to this address
-            pointers = []
-            for r in regions:
-                region_data = full_data[r['file_offset']:r['file_offset']+r['size']]
-                ptrs = _find_pointers_to_address(region_data, target_addr, r['base'])
-                pointers.extend(ptrs)
+            container_addr = find_buffer_in_dump._last_container_addr
+            log(f"      Container: 0x{container_addr:08X}")
             
-            if pointers:
-                log(f"        container{offset:+4d}: {len(pointers)} pointers")
+            # Analyze structure boundaries
+            struct_info = _analyze_container_structure(reader, container_addr)
+            if not struct_info:
+                log(f"      SKIP (can't read structure)")
+                continue
             
-            # Store results
-            for ptr_addr in pointers:
-                pointer_map[ptr_addr].append((dump_name, container_addr, offset))
+            # Search for pointers to container and nearby addresses
+            log(f"      Scanning for pointers to {len(SEARCH_OFFSETS)} target addresses...")
+            for offset in SEARCH_OFFSETS:
+                target_addr = container_addr + offset
+                if target_addr < 0:
+                    continue
+                
+                # Find all pointers to this address
+                pointers = _find_pointers_to_address(reader, target_addr)
+                
+                if pointers:
+                    log(f"        container{offset:+4d}: {len(pointers)} pointers")
+                
+                # Store results
+                for ptr_addr in pointers:
+                    pointer_map[ptr_addr].append((dump_name, container_addr, offset))
         
         results.append({
             'dump_name': dump_name,
@@ -742,13 +1166,14 @@ def _compare_pre_container_bytes(dumps_data):
         dump_name = os.path.basename(bin_path).replace('.bin', '')
         
         log(f"    [{i}/{len(dumps_data)}] {dump_name}...")
-        buf_addr, entries = find_buffer_in_dump(bin_path, regions)
-        if not buf_addr or not hasattr(find_buffer_in_dump, '_last_container_addr'):
-            log(f"      SKIP (no container)")
-            continue
-        
-        container_addr = find_buffer_in_dump._last_container_addr
-        struct_info = _analyze_container_structure(bin_path, regions, container_addr)
+        with DumpReader(bin_path, regions) as reader:
+            buf_addr, entries = find_buffer_in_dump(bin_path, regions, reader=reader)
+            if not buf_addr or not hasattr(find_buffer_in_dump, '_last_container_addr'):
+                log(f"      SKIP (no container)")
+                continue
+            
+            container_addr = find_buffer_in_dump._last_container_addr
+            struct_info = _analyze_container_structure(reader, container_addr)
         if struct_info:
             pre_data_list.append({
                 'dump': dump_name,
@@ -899,84 +1324,71 @@ def cmd_analyze():
         print(f"[ANALYZE] {'='*60}", flush=True)
         print(f"[ANALYZE] [{i}/{len(dumps)}] {dump_id}: cards={hero_cards} opps={opps}", flush=True)
 
-        t0 = time.time()
-        buf_addr, entries = find_buffer_in_dump(bin_path, regions, expected)
-        elapsed = time.time() - t0
+        with DumpReader(bin_path, regions) as reader:
+            t0 = time.time()
+            buf_addr, entries = find_buffer_in_dump(bin_path, regions, expected, reader)
+            elapsed = time.time() - t0
 
-        if not buf_addr:
-            print(f"[ANALYZE]   FAIL: buffer not found ({elapsed:.1f}s)", flush=True)
-            errors += 1
-            continue
+            if not buf_addr:
+                print(f"[ANALYZE]   FAIL: buffer not found ({elapsed:.1f}s)", flush=True)
+                errors += 1
+                continue
 
-        hand_data = extract_hand_data(entries)
-        found_cards = hand_data['hero_cards']
-        found_community = hand_data['community_cards']
-
-        # Verify cards (allow reversed order)
-        cards_ok = False
-        if found_cards and expected:
-            cards_ok = found_cards == expected
-            if not cards_ok and len(found_cards) == 4:
-                cards_ok = found_cards[2:4] + found_cards[0:2] == expected
-
-        # Verify community cards against GPT
-        comm_expected = meta.get('community_cards', [])
-        comm_ok = set(found_community) == set(comm_expected) if comm_expected and found_community else True
-
-        # Verify opponent names (fuzzy: allow 1-char difference for GPT vision errors)
-        real_players = {s: n for s, n in hand_data['players'].items() if s != 255 and n}
-        found_names = set(real_players.values())
-        opps_ok = True
-        for opp in opps:
-            if opp not in found_names:
-                # Fuzzy: check if any name is close (1-char diff or O/0 swap)
-                fuzzy = any(_fuzzy_match(opp, fn) for fn in found_names)
-                if not fuzzy:
-                    opps_ok = False
-
-        if not cards_ok:
-            errors += 1
-
-        print(f"[ANALYZE]   Buffer: 0x{buf_addr:08X} ({len(entries)} entries, {elapsed:.1f}s)", flush=True)
-        print(f"[ANALYZE]   Hand ID: {hand_data['hand_id']}", flush=True)
-        print(f"[ANALYZE]   Cards: '{found_cards}' {'OK' if cards_ok else 'FAIL (expected '+str(expected)+')'}", flush=True)
-        print(f"[ANALYZE]   Players: {dict(real_players)} {'OK' if opps_ok else 'MISMATCH (GPT: '+str(opps)+')'}", flush=True)
-        if found_community:
-            print(f"[ANALYZE]   Community: {found_community} {'OK' if comm_ok else 'MISMATCH (GPT: '+str(comm_expected)+')'}", flush=True)
-        print(f"[ANALYZE]   Actions: {len(hand_data['actions'])}", flush=True)
-        for e in entries:
-            log(f"    {format_entry(e)}")
+            hand_data = extract_hand_data(entries)
+            found_cards = hand_data['hero_cards']
+            found_community = hand_data['community_cards']
+
+            # Verify cards (allow reversed order)
+            cards_ok = False
+            if found_cards and expected:
+                cards_ok = found_cards == expected
+                if not cards_ok and len(found_cards) == 4:
+                    cards_ok = found_cards[2:4] + found_cards[0:2] == expected
+
+            # Verify community cards against GPT
+            comm_expected = meta.get('community_cards', [])
+            comm_ok = set(found_community) == set(comm_expected) if comm_expected and found_community else True
+
+            # Verify opponent names (fuzzy: allow 1-char difference for GPT vision errors)
+            real_players = {s: n for s, n in hand_data['players'].items() if s != 255 and n}
+            found_names = set(real_players.values())
+            opps_ok = True
+            for opp in opps:
+                if opp not in found_names:
+                    # Fuzzy: check if any name is close (1-char diff or O/0 swap)
+                    fuzzy = any(_fuzzy_match(opp, fn) for fn in found_names)
+                    if not fuzzy:
+                        opps_ok = False
+
+            if not cards_ok:
+                errors += 1
+
+            print(f"[ANALYZE]   Buffer: 0x{buf_addr:08X} ({len(entries)} entries, {elapsed:.1f}s)", flush=True)
+            print(f"[ANALYZE]   Hand ID: {hand_data['hand_id']}", flush=True)
+            print(f"[ANALYZE]   Cards: '{found_cards}' {'OK' if cards_ok else 'FAIL (expected '+str(expected)+')'}", flush=True)
+            print(f"[ANALYZE]   Players: {dict(real_players)} {'OK' if opps_ok else 'MISMATCH (GPT: '+str(opps)+')'}", flush=True)
+            if found_community:
+                print(f"[ANALYZE]   Community: {found_community} {'OK' if comm_ok else 'MISMATCH (GPT: '+str(comm_expected)+')'}", flush=True)
+            print(f"[ANALYZE]   Actions: {len(hand_data['actions'])}", flush=True)
+            for e in entries:
+                log(f"    {format_entry(e)}")
         
-        # Scan for pointers to container (if found via container method)
-        if hasattr(find_buffer_in_dump, '_last_container_addr'):
-            container_addr = find_buffer_in_dump._last_container_addr
-            log(f"  Scanning for pointers to container 0x{container_addr:08X}...")
+            # Scan for pointers to container (if found via container method)
+            if hasattr(find_buffer_in_dump, '_last_container_addr'):
+                container_addr = find_buffer_in_dump._last_container_addr
+                log(f"  Scanning for pointers to container 0x{container_addr:08X}...")
             
-            # Load full dump
-            with open(bin_path, 'rb') as f:
-                mem = f.read()
+                # Search for container address as 4-byte LE pointer (first 20)
+                hits = reader.find_all(struct.pack('<I', container_addr), limit=20)
             
-            # Search for container address as 4-byte LE pointer
-            target_bytes = struct.pack('<I', container_addr)
-            hits = []
-            offset = 0
-            while True:
-                idx = mem.find(target_bytes, offset)
-                if idx == -1:
-                    break
-                hits.append(idx)
-                offset = idx + 4
-                if len(hits) >= 20:  # Limit to first 20
-                    break
-            
-            log(f"  Found {len(hits)} pointers to container:")
-            for addr in hits[:10]:
-                if 0x00C00000 <= addr < 0x02000000:
-                    log(f"    0x{addr:08X} [MODULE]")
-                elif 0x08000000 <= addr < 0x22000000:
-                    log(f"    0x{addr:08X} [HEAP]")
-                else:
-                    log(f"    0x{addr:08X}")
+                log(f"  Found {len(hits)} pointers to container:")
+                for addr in hits[:10]:
+                    if 0x00C00000 <= addr < 0x02000000:
+                        log(f"    0x{addr:08X} [MODULE]")
+                    elif 0x08000000 <= addr < 0x22000000:
+                        log(f"    0x{addr:08X} [HEAP]")
+                    else:
+                        log(f"    0x{addr:08X}")
 
     log(f"\n{'='*60}")
     log(f"TOTAL ERRORS: {errors}")
@@ -984,6 +1396,115 @@ def cmd_analyze():
         log(f"ALL {len(dumps)} DUMPS VERIFIED")
 
 
+def cmd_bench_scan(worker_counts=None, repeat=3):
+    """Time the container scan over the heap of each stored dump."""
+    dumps = _load_tagged_dumps()
+    if not dumps:
+        log("No tagged dumps")
+        return
+    worker_counts = worker_counts or sorted({1, SCAN_WORKERS})
+    for meta in dumps:
+        with DumpReader(meta['_bin_path'], meta['regions']) as reader:
+            heap = [(base, len(data)) for base, data in reader.iter_regions(HEAP_RANGE, min_size=0x200)]
+            mb = sum(size for _, size in heap) / 1e6
+            row = []
+            for workers in worker_counts:
+                best, found = None, None
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    found = _find_buffer_via_container(heap, reader.read, workers=workers)
+                    elapsed = time.perf_counter() - t0
+                    best = elapsed if best is None else min(best, elapsed)
+                ok = 'ok' if found[0] else 'MISS'
+                row.append(f"{workers}w {best * 1000:.0f}ms {mb / best:.0f}MB/s {ok}")
+        log(f"{meta['dump_id']}: {mb:.0f}MB heap | " + ' | '.join(row))
+
+
+def _best_time(fn, repeat, setup=None):
+    """(fastest of repeat runs in seconds, result of the last run)."""
+    best, result = None, None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def cmd_bench_live(dumps=None, repeat=3, polls=1000):
+    """Time the live path on stored dumps played back by ReplayReader.
+
+    Per dump: cold scan_live (fresh caches), cached scan_live (container
+    pointer), full rescan with scan history and region map warm,
+    rescan_buffer and an idle EventStream.poll. Then all dumps in order as
+    one session: rescan_buffer, scan_live when that fails. Returns
+    {dump_id: {metric: seconds, 'hand_id': ...}, 'session': [step seconds]}.
+    """
+    import memory_events
+    dumps = _load_tagged_dumps() if dumps is None else dumps
+    if not dumps:
+        log("No tagged dumps")
+        return {}
+    previous = _reader
+
+    def replay(metas):
+        if isinstance(_reader, ReplayReader):
+            _reader.close()
+        use_reader(ReplayReader(metas))
+        return _reader
+
+    def drop_container():
+        global _cached_container_addr
+        _cached_container_addr = None
+
+    results = {}
+    try:
+        for meta in dumps:
+            row = {}
+            row['cold'], hand = _best_time(scan_live, repeat, lambda: replay([meta]))
+            if not hand:
+                log(f"{meta['dump_id']}: no hand found")
+                results[meta['dump_id']] = {'hand_id': None}
+                continue
+            row['hand_id'] = hand['hand_id']
+            row['cached'], _ = _best_time(scan_live, repeat)
+            row['warm'], _ = _best_time(scan_live, repeat, drop_container)
+            row['rescan'], _ = _best_time(lambda: rescan_buffer(hand['buf_addr'], hand['hand_id']), repeat)
+            stream = memory_events.live_stream(hand['buf_addr'])
+            stream.poll()
+            t0 = time.perf_counter()
+            for _ in range(polls):
+                stream.poll()
+            row['poll'] = (time.perf_counter() - t0) / polls
+            results[meta['dump_id']] = row
+            log(f"{meta['dump_id']}: cold {row['cold'] * 1000:.0f}ms | cached {row['cached'] * 1e6:.0f}us | "
+                f"warm full {row['warm'] * 1000:.0f}ms | rescan {row['rescan'] * 1e6:.0f}us | "
+                f"poll {row['poll'] * 1e6:.1f}us")
+
+        session = replay(dumps)
+        steps, hand, full = [], None, 0
+        playing = session.attach()
+        while playing:
+            t0 = time.perf_counter()
+            if hand:
+                hand = rescan_buffer(hand['buf_addr'], hand['hand_id'])
+            if not hand or not hand.get('hero_cards'):
+                hand = scan_live()
+                full += 1
+            steps.append(time.perf_counter() - t0)
+            playing = session.advance()
+        results['session'] = steps
+        log(f"Session: {len(steps)} dumps, {full} full scans, "
+            f"mean {sum(steps) / len(steps) * 1000:.1f}ms, max {max(steps) * 1000:.1f}ms per step")
+    finally:
+        if isinstance(_reader, ReplayReader):
+            _reader.close()
+        use_reader(previous)
+    return results
+
+
 # ── Fast Card Read (Windows runtime) ────────────────────────────────
 
 # Cached container address — stable within a table session, avoids full rescan
@@ -992,6 +1513,15 @@ _cached_container_addr = None
 # Card cache per hand_id — when string pointers become invalid, use last known cards
 _card_cache = {}  # hand_id → hero_cards (4-byte ASCII string)
 
+# Name/card strings of the live hand — the 200ms rescan reads each pointer once
+_str_cache = StringCache()
+
+# Where full scans found the container — searched first after a cache miss
+_scan_history = ScanHistory()
+
+# Fingerprints of scanned regions — unchanged regions without a container aren't reread
+_region_map = RegionMap()
+
 
 def _read_buffer_from_container(container_addr, reader):
     """Read buffer pointer from a known container. Returns (buf_addr, n_entries, hand_id) or None."""
@@ -1020,14 +1550,14 @@ def scan_live():
     """Scan live PS memory for current hand data.
 
     Uses cached container address if available (instant pointer read).
-    Otherwise scans heap for 24-byte container anchor, falls back to 0x88.
+    Otherwise scans heap for 24-byte container anchor (regions in
+    _scan_history order, unchanged ones skipped via _region_map), falls
+    back to 0x88.
     Returns dict with hand_id, hero_cards, players, actions, scan_time,
     buf_addr, container_addr, or None on failure.
     """
-    global _reader, _cached_container_addr
-    if _reader is None:
-        _reader = ProcessReader()
-    if not _reader.handle and not _reader.attach():
+    global _cached_container_addr
+    if _attached_reader() is None:
         return None
 
     t0 = time.time()
@@ -1037,9 +1567,10 @@ def scan_live():
         result = _read_buffer_from_container(_cached_container_addr, _reader)
         if result:
             buf_addr, n_entries, hid = result
-            entries = decode_buffer(buf_addr, _reader.read, _reader.read_str, n_entries)
+            entries = decode_buffer(buf_addr, _reader.read, _reader.read_str, n_entries, _str_cache)
             hand_data = extract_hand_data(entries)
             if hand_data and hand_data['hero_cards']:
+                _scan_history.hand_id = max(_scan_history.hand_id, hid)
                 hand_data['scan_time'] = round(time.time() - t0, 2)
                 hand_data['buf_addr'] = buf_addr
                 hand_data['container_addr'] = _cached_container_addr
@@ -1048,58 +1579,53 @@ def scan_live():
         # Cache miss — container moved or invalidated
         _cached_container_addr = None
 
-    # Container scan — only heap range (skips ~47% of memory)
-    def _live_iter():
-        for base, size in _reader.iter_regions():
-            if base < HEAP_RANGE[0] or base >= HEAP_RANGE[1]:
-                continue
-            if size < 0x200 or size > 100 * 1024 * 1024:
-                continue
-            data = _reader.read(base, size)
-            if data:
-                yield base, data
-
-    buf_addr, n_entries, hid, container_addr = _find_buffer_via_container(
-        _live_iter(), _reader.read, debug=True)
-    if buf_addr:
-        _cached_container_addr = container_addr
-        entries = decode_buffer(buf_addr, _reader.read, _reader.read_str, n_entries)
+    def _hand_from(best):
+        buf_addr, n_entries, hid, container_addr = best
+        entries = decode_buffer(buf_addr, _reader.read, _reader.read_str, n_entries, _str_cache)
         hand_data = extract_hand_data(entries)
         if hand_data and hand_data['hero_cards']:
-            hand_data['scan_time'] = round(time.time() - t0, 2)
             hand_data['buf_addr'] = buf_addr
             hand_data['container_addr'] = container_addr
             hand_data['entry_count'] = len(entries)
             return hand_data
+        return None
 
-    # Fallback: 0x88 signature scan (all memory)
-    candidates = []
-    for base, size in _reader.iter_regions():
-        if size > 100 * 1024 * 1024:
-            continue
-        data = _reader.read(base, size)
-        if not data:
-            continue
-        idx = 0
-        while True:
-            idx = data.find(BUFFER_SIGNATURE, idx)
-            if idx < 0:
-                break
-            entry_off = idx + 10
-            if entry_off + 16 <= len(data):
-                hid = struct.unpack('<Q', data[entry_off:entry_off+8])[0]
-                seq = struct.unpack('<I', data[entry_off+8:entry_off+12])[0]
-                if 200_000_000_000 < hid < 300_000_000_000 and seq == 1:
-                    candidates.append((base + entry_off, hid))
-            idx += 1
+    # Container scan — only heap range (skips ~47% of memory), chunks read in parallel.
+    # Regions that held the container before go first, then their neighbours;
+    # the first one with a current hand ends the scan. The same pass collects
+    # 0x88 candidates, so a container miss doesn't reread the heap.
+    regions = [(base, size) for base, size in _reader.iter_regions() if size <= 100 * 1024 * 1024]
+    heap = [(base, size) for base, size in regions if HEAP_RANGE[0] <= base < HEAP_RANGE[1] and size >= 0x200]
+    _region_map.prune(regions)
+    scanned_before, skipped_before = _region_map.bytes_scanned, _region_map.bytes_skipped
+    best, candidates, hand_data = _locate_container(heap, _reader.read, _scan_history, _hand_from,
+                                                    scan=_region_map.scan)
+    if best[2] < _scan_history.hand_id and _region_map.bytes_skipped > skipped_before:
+        # Only an older hand (or none): the live container may be in an unsampled page of a skipped region
+        _region_map.clear()
+        best, candidates, hand_data = _locate_container(heap, _reader.read, _scan_history, _hand_from,
+                                                        scan=_region_map.scan)
+    buf_addr, n_entries, hid, container_addr = best
+    log(f"[CONTAINER] {len(heap)} heap regions, best={buf_addr is not None}, "
+        f"{'early stop' if hand_data else 'full scan'}, "
+        f"{(_region_map.bytes_scanned - scanned_before) / 1e6:.0f}MB read")
+    if buf_addr:
+        _cached_container_addr = container_addr
+        hand_data = hand_data or _hand_from(best)
+        if hand_data:
+            _scan_history.record(container_addr, _region_of(heap, container_addr), hid)
+            hand_data['scan_time'] = round(time.time() - t0, 2)
+            return hand_data
 
-    if not candidates:
-        return None
+    # Fallback: 0x88 signature scan (all memory) — heap candidates are already in hand
+    scanned = set(heap)
+    rest = [r for r in regions if r not in scanned]
+    candidates = sorted(candidates + _region_map.scan(rest, _reader.read, containers=False)[1])
 
     candidates.sort(key=lambda c: c[1], reverse=True)
 
     for buf_addr, hid in candidates:
-        entries = decode_buffer(buf_addr, _reader.read, _reader.read_str)
+        entries = decode_buffer(buf_addr, _reader.read, _reader.read_str, str_cache=_str_cache)
         hand_data = extract_hand_data(entries)
         if hand_data and hand_data['hero_cards']:
             hand_data['scan_time'] = round(time.time() - t0, 2)
@@ -1107,6 +1633,8 @@ def scan_live():
             hand_data['entry_count'] = len(entries)
             return hand_data
 
+    # Nothing found: a change in unsampled pages may have been skipped, next scan reads everything
+    _region_map.clear()
     return None
 
 
@@ -1129,7 +1657,7 @@ def rescan_buffer(buf_addr, expected_hand_id=None):
             
             # If container points to a DIFFERENT hand than expected, follow it
             if new_hid != expected_hand_id:
-                entries = decode_buffer(new_buf_addr, _reader.read, _reader.read_str, n_entries)
+                entries = decode_buffer(new_buf_addr, _reader.read, _reader.read_str, n_entries, _str_cache)
                 hand_data = extract_hand_data(entries)
                 if hand_data:
                     hand_data['buf_addr'] = new_buf_addr
@@ -1138,7 +1666,7 @@ def rescan_buffer(buf_addr, expected_hand_id=None):
                 return hand_data
     
     # Container says same hand - rescan buffer at known address
-    entries = decode_buffer(buf_addr, _reader.read, _reader.read_str)
+    entries = decode_buffer(buf_addr, _reader.read, _reader.read_str, str_cache=_str_cache)
     hand_data = extract_hand_data(entries)
     if hand_data:
         # Validate: if we have actions but no player names, buffer is corrupted
@@ -1198,6 +1726,10 @@ if __name__ == '__main__':
         cmd_analyze()
     elif cmd == 'scan_pointers':
         cmd_scan_pointers()
+    elif cmd == 'bench_scan':
+        cmd_bench_scan([int(w) for w in sys.argv[2:]] or None)
+    elif cmd == 'bench_live':
+        cmd_bench_live(repeat=int(sys.argv[2]) if len(sys.argv) > 2 else 3)
     elif cmd == 'read':
         if not IS_WINDOWS:
             log("Windows only")
@@ -1221,6 +1753,8 @@ if __name__ == '__main__':
         print("Usage:")
         print("  python memory_calibrator.py analyze        # Verify message buffer in all dumps")
         print("  python memory_calibrator.py scan_pointers  # Find pointers to container")
+        print("  python memory_calibrator.py bench_scan [W] # Time container scan on dumps (W workers)")
+        print("  python memory_calibrator.py bench_live [N] # Time scan/rescan/poll replaying dumps (best of N)")
         print("  python memory_calibrator.py read           # Read cards live (Windows only)")
         print("  python memory_calibrator.py list           # Show tagged dumps")
         print("  python memory_calibrator.py dump           # Manual dump (Windows only)")
@@ -0,0 +1,338 @@
+"""
+Incremental event stream over the live message buffer.
+
+helper_bar's memory poll used to re-decode the whole buffer every 200ms,
+rebuild the hand with extract_hand_data and re-parse every action to get
+pot / to-call / aggressor. EventStream remembers the last (hand_id, seq)
+it decoded and unpacks only the entries appended since, as typed Events;
+HandState applies each event once and keeps the extract_hand_data fields
+and the betting summary (BettingState) up to date.
+
+    stream = EventStream(reader, buf_addr, container_addr)
+    events = stream.poll()            # [] = nothing new, None = buffer lost
+    for ev in events:                 # Event(kind='action', seq=9, ...)
+        ...
+    hd = stream.state.hand_data()     # extract_hand_data() dict + 'betting'
+
+A hand's SEATED entry whose name/cards string can't be read yet is retried
+on the next polls (STRING_RETRIES) and re-emitted with the same seq once
+the string is there.
+"""
+
+import struct
+from collections import namedtuple
+
+import memory_calibrator as mc
+
+KINDS = {0x0A: 'new_hand', 0x02: 'seated', 0x05: 'deal', 0x01: 'action', 0x06: 'win',
+         0x07: 'action_start'}
+MAX_ENTRIES = 64       # entries read per poll - rescan_buffer's 30 cut long hands short
+STRING_RETRIES = 25    # polls (~5s) an unreadable SEATED name/cards string is retried
+HERO_ACTS = ('BET', 'RAISE', 'CALL', 'CHECK')
+
+_U32X2 = struct.Struct('<II')
+_HAND_ID = struct.Struct('<Q')
+
+Event = namedtuple('Event', 'kind hand_id seq msg_type seat action_code amount name extra')
+
+
+def _event(entry):
+    return Event(KINDS.get(entry['msg_type'], 'other'), entry['hand_id'], entry['seq'], entry['msg_type'],
+                 entry['seat'], entry['action_code'], entry['amount'], entry['name'], entry['extra'])
+
+
+def _valid_ptr(ptr):
+    return 0x01000000 < ptr < 0x7FFFFFFF
+
+
+def _strings_missing(entry):
+    """True if a pointer of the entry is valid but its string didn't read."""
+    return (entry['name'] is None and _valid_ptr(entry['name_ptr'])) or \
+        (entry['extra'] is None and _valid_ptr(entry['extra_ptr']))
+
+
+# ── Betting state ────────────────────────────────────────────────────
+
+class _Street:
+    """Running totals over the current street's actions."""
+    __slots__ = ('hero_acted', 'hero_last', 'hero_total', 'villain_bet', 'raised_after_hero', 'last_raiser')
+
+    def __init__(self):
+        self.hero_acted = False
+        self.hero_last = None
+        self.hero_total = 0
+        self.villain_bet = 0
+        self.raised_after_hero = False
+        self.last_raiser = None
+
+    def add(self, name, act, amt):
+        if name == mc.HERO_NAME and act in HERO_ACTS:
+            self.hero_acted = True
+            self.hero_last = act
+            self.raised_after_hero = False
+        elif act == 'RAISE' and self.hero_acted:
+            self.raised_after_hero = True
+        if name == mc.HERO_NAME and act in ('BET', 'RAISE', 'CALL'):
+            self.hero_total += amt / 100.0
+        elif act in ('BET', 'RAISE'):
+            self.villain_bet = amt / 100.0
+        if act == 'RAISE':
+            self.last_raiser = name
+
+
+class BettingState:
+    """Pot, to-call, aggressor and facing-raise, updated one action at a time.
+
+    Same rules helper_bar._reeval_with_memory applied to the whole action
+    list: the current street starts after the last DEAL marker (or is the
+    last 10 actions while there is none), the aggressor is the last raiser
+    preflop or, once there is a board, on the current street.
+    """
+
+    def __init__(self):
+        self.actions = []            # (name, act, amount) / (None, 'DEAL', 0)
+        self.pot_cents = 0
+        self.dealt = False
+        self.street_start = 0        # index after the last DEAL marker
+        self.street = _Street()
+        self.preflop_raiser = None   # last raiser before the first DEAL
+        self.active = set()          # opponents with a non-fold action
+        self.named = False           # a non-blind action with a player name
+
+    def add(self, name, act, amt):
+        self.actions.append((name, act, amt))
+        if act == 'DEAL':
+            self.dealt = True
+            self.street_start = len(self.actions)
+            self.street = _Street()
+            return
+        self.pot_cents += amt
+        self.street.add(name, act, amt)
+        if act == 'RAISE' and not self.dealt:
+            self.preflop_raiser = name
+        if name and name != mc.HERO_NAME and act != 'FOLD':
+            self.active.add(name)
+        if name and name != 'None' and act not in ('POST_SB', 'POST_BB'):
+            self.named = True
+
+    def looks_corrupted(self):
+        """Actions past the blinds but no player names: a stale/garbage buffer."""
+        return len(self.actions) > 2 and not self.named
+
+    def summary(self, has_board):
+        street = self.street
+        if not self.dealt and len(self.actions) > 10:
+            street = _Street()
+            for a in self.actions[-10:]:
+                street.add(*a)
+        to_call = 0.0
+        if street.villain_bet > street.hero_total:
+            to_call = street.villain_bet - street.hero_total
+        last_raiser = street.last_raiser if has_board else self.preflop_raiser
+        return {
+            'pot': self.pot_cents / 100.0 if self.pot_cents > 0 else 0.07,
+            'to_call': to_call,
+            'is_aggressor': last_raiser == mc.HERO_NAME,
+            'is_facing_raise': street.hero_acted and to_call > 0 and street.raised_after_hero,
+            'num_players': len(self.active) + 1,
+            'hero_acted': street.hero_acted,
+            'hero_last': street.hero_last,
+        }
+
+
+def betting_summary(actions, has_board):
+    """BettingState.summary() for a whole extract_hand_data action list."""
+    betting = BettingState()
+    for a in actions:
+        betting.add(*a)
+    return betting.summary(has_board)
+
+
+# ── Hand state ───────────────────────────────────────────────────────
+
+class HandState:
+    """One hand built from its events - the fields extract_hand_data returns."""
+
+    def __init__(self, hand_id):
+        self.hand_id = hand_id
+        self.hero_cards = None
+        self.hero_seat = None
+        self.bb_seat = None
+        self.players = {}
+        self.community_cards = []
+        self.betting = BettingState()
+        self.entry_count = 0
+        self._board = {}        # seq -> cards of a seat-255 SEATED entry
+        self._named_at = {}     # seat -> seq of the SEATED entry that named it
+        self._action_seats = [] # (seq, seat) per betting.actions item
+
+    @property
+    def actions(self):
+        return self.betting.actions
+
+    @property
+    def position(self):
+        if self.hero_seat is None or self.bb_seat is None or not self.players:
+            return None
+        positions_6max = ['UTG', 'MP', 'CO', 'BTN', 'SB', 'BB']
+        dist = (self.hero_seat - self.bb_seat - 1) % len(self.players)
+        return positions_6max[dist] if dist < len(positions_6max) else None
+
+    def apply(self, ev):
+        if ev.kind == 'deal':
+            self._action_seats.append((ev.seq, None))
+            self.betting.add(None, 'DEAL', 0)
+        elif ev.kind == 'seated':
+            self._seated(ev)
+        elif ev.kind == 'action':
+            act = mc.ACTION_NAMES.get(ev.action_code, f"0x{ev.action_code:02X}")
+            self._action_seats.append((ev.seq, ev.seat))
+            self.betting.add(self.players.get(ev.seat, ev.name), act, ev.amount)
+            if ev.action_code == 0x50 and self.bb_seat is None:   # POST_BB
+                self.bb_seat = ev.seat
+
+    def _seated(self, ev):
+        if ev.seat == 255 and ev.extra:
+            cc = ev.extra
+            self._board[ev.seq] = [cc[i:i+2] for i in range(0, len(cc) - 1, 2)]
+            self.community_cards = [c for seq in sorted(self._board) for c in self._board[seq]]
+            if self._named_at.get(255) == ev.seq:   # retried board entry read without cards before
+                del self.players[255], self._named_at[255]
+            return
+        if self._named_at.get(ev.seat, -1) <= ev.seq:
+            self.players[ev.seat] = ev.name
+            self._named_at[ev.seat] = ev.seq
+        if ev.extra and ev.name == mc.HERO_NAME:
+            self.hero_cards = ev.extra
+            self.hero_seat = ev.seat
+
+    def update_seated(self, ev):
+        """A retried SEATED entry whose strings are readable now."""
+        self._seated(ev)
+        if ev.seat == 255 or self._named_at.get(ev.seat) != ev.seq or not ev.name:
+            return
+        # Actions of that seat decoded while its name was missing
+        old, self.betting = self.betting, BettingState()
+        for (seq, seat), (name, act, amt) in zip(self._action_seats, old.actions):
+            if seat == ev.seat and seq > ev.seq and name is None:
+                name = ev.name
+            self.betting.add(name, act, amt)
+
+    def hand_data(self):
+        """extract_hand_data()-shaped dict, plus entry_count and the betting summary."""
+        return {'hand_id': self.hand_id, 'hero_cards': self.hero_cards, 'players': dict(self.players),
+                'actions': list(self.actions), 'community_cards': list(self.community_cards),
+                'hero_seat': self.hero_seat, 'bb_seat': self.bb_seat, 'position': self.position,
+                'entry_count': self.entry_count,
+                'betting': self.betting.summary(bool(self.community_cards))}
+
+
+# ── Stream ───────────────────────────────────────────────────────────
+
+class EventStream:
+    """Events appended to a message buffer since the last poll.
+
+    reader needs read(addr, size) and read_str(addr, maxlen) - a
+    ProcessReader or a DumpReader. With container_addr the stream follows
+    the container to a new buffer the way rescan_buffer did.
+    """
+
+    def __init__(self, reader, buf_addr, container_addr=None, str_cache=None, max_entries=MAX_ENTRIES):
+        self.reader = reader
+        self.buf_addr = buf_addr
+        self.container_addr = container_addr
+        self.str_cache = str_cache if str_cache is not None else mc.StringCache()
+        self.max_entries = max_entries
+        self.state = None
+        self.last = None        # (hand_id, seq) of the last decoded entry
+        self._pending = {}      # entry index -> polls left, SEATED entries with unread strings
+
+    def attach(self, buf_addr, container_addr=None):
+        """Follow another buffer (after a full scan_live)."""
+        self.buf_addr = buf_addr
+        if container_addr:
+            self.container_addr = container_addr
+        self._reset()
+
+    def _reset(self):
+        self.state = None
+        self.last = None
+        self._pending.clear()
+
+    def _follow_container(self):
+        data = self.reader.read(self.container_addr + 0xE0, 8)
+        if not data or len(data) < 8:
+            return
+        flag, bp = _U32X2.unpack_from(data)
+        if flag != 1 or bp + 8 == self.buf_addr:
+            return
+        result = mc._read_buffer_from_container(self.container_addr, self.reader)
+        if result:
+            # Same hand_id at the new address (buffer grew) keeps the state
+            self.buf_addr = result[0]
+
+    def _retry(self, data):
+        events = []
+        for index, left in list(self._pending.items()):
+            fields = mc.ENTRY_STRUCT.unpack_from(data, index * mc.ENTRY_SIZE) \
+                if len(data) >= (index + 1) * mc.ENTRY_SIZE else None
+            if fields is None or fields[0] != self.state.hand_id:
+                del self._pending[index]
+                continue
+            entry = mc._entry_dict(fields, self.reader.read_str, self.str_cache)
+            if _strings_missing(entry):
+                if left > 1:
+                    self._pending[index] = left - 1
+                else:
+                    del self._pending[index]
+                continue
+            del self._pending[index]
+            ev = _event(entry)
+            self.state.update_seated(ev)
+            events.append(ev)
+        return events
+
+    def poll(self):
+        """New events since the last poll: [] if nothing new, None if the buffer is lost."""
+        if self.container_addr:
+            self._follow_container()
+        size = mc.ENTRY_SIZE
+        data = self.reader.read(self.buf_addr, self.max_entries * size)
+        if not data or len(data) < size:
+            data = mc._read_entries_one_by_one(self.buf_addr, self.reader.read, self.max_entries)
+        if len(data) < size:
+            return None
+        hand_id = _HAND_ID.unpack_from(data)[0]
+        if not (200_000_000_000 < hand_id < 300_000_000_000):
+            return None
+        if self.state is None or hand_id != self.state.hand_id:
+            self._reset()
+            self.state = HandState(hand_id)
+            self.str_cache.for_hand(hand_id)
+
+        state = self.state
+        events = self._retry(data) if self._pending else []
+        start = state.entry_count
+        last_seq = self.last[1] if self.last else -1
+        for fields in mc.ENTRY_STRUCT.iter_unpack(data[start * size:len(data) // size * size]):
+            if fields[0] != hand_id or fields[1] <= last_seq:
+                break   # slot not written yet (older hand / stale entry)
+            entry = mc._entry_dict(fields, self.reader.read_str, self.str_cache)
+            ev = _event(entry)
+            if ev.kind == 'seated' and _strings_missing(entry):
+                self._pending[state.entry_count] = STRING_RETRIES
+            state.apply(ev)
+            state.entry_count += 1
+            last_seq = ev.seq
+            events.append(ev)
+        if events:
+            self.last = (hand_id, last_seq)
+        if state.betting.looks_corrupted():
+            self._reset()
+            return None
+        return events
+
+
+def live_stream(buf_addr):
+    """EventStream on memory_calibrator's live reader (after scan_live)."""
+    return EventStream(mc._reader, buf_addr, mc._cached_container_addr, mc._str_cache)
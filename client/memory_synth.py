@@ -0,0 +1,311 @@
+"""
+Synthetic PokerStars memory images in the dump format (.bin + region .json).
+
+A generated image has a module region, heap regions inside HEAP_RANGE
+(configurable total size and count, mostly zero pages with some noise) and
+one region above the heap. Planted in it:
+
+  - the live container (+0xE4 -> buffer) and its message buffer (0x88
+    signature, NEW_HAND / SEATED / blinds / actions, hero cards) with the
+    name and card strings it points to, and a module pointer to the container
+  - stale containers and buffers of older hands (valid, lower hand_id)
+  - decoys the validators must reject: bare magic, containers with one field
+    broken, 0x88 signatures followed by a bad first entry
+
+The metadata is tagged like an F9 dump (hand_id, hero_cards, opponents) so
+_load_tagged_dumps, cmd_analyze, cmd_bench_scan, cmd_bench_live and
+cmd_pointer_scan run on a directory of them. meta['synthetic'] records what
+was planted: the live addresses and every container / signature candidate
+a correct scan must return.
+
+    meta = write_image(out_dir, 'synth_a', heap_mb=256, regions=400, seed=1)
+    metas = write_session(out_dir, 3, heap_mb=64)   # same process, new hand per dump
+
+    python3 memory_synth.py OUT_DIR --heap-mb 256 --regions 400 --dumps 2 --bench
+"""
+
+import json
+import os
+import random
+import struct
+import time
+
+import memory_calibrator as mc
+
+MODULE_BASE = 0x00C00000
+MODULE_SIZE = 0x200000
+MODULE_PTR_OFFSET = 0x1A2B30       # module + this holds the container address
+REST_BASE = 0x30000000             # non-heap region (0x88 fallback only)
+REST_SIZE = 0x100000
+HEAP_START = mc.HEAP_RANGE[0] + 0x10000
+PAGE = 0x1000
+HAND_ID = 254_000_000_000
+PLAYERS = ['fishy_joe', 'NicSticker', mc.HERO_NAME, 'rock solid', 'LagMonster', 'nitwit99']
+HERO_CARDS = 'AhKd'
+BROKEN_FIELDS = ('anchor', 0x38, 0x44, 0xE0, 'count', 'low_ptr')
+
+
+def entry(hand_id, seq, msg_type, seat=0, action=0, amount=0, name=(0, 0), extra=(0, 0)):
+    """One 0x40-byte buffer entry; name / extra are (pointer, length)."""
+    e = bytearray(mc.ENTRY_SIZE)
+    struct.pack_into('<QI', e, 0, hand_id, seq)
+    e[0x14], e[0x16], e[0x17] = msg_type, seat, action
+    struct.pack_into('<H', e, 0x18, amount)
+    struct.pack_into('<II', e, 0x1C, *name)
+    struct.pack_into('<II', e, 0x28, *extra)
+    return bytes(e)
+
+
+def container(buf_addr, n_entries, broken=None):
+    """0xF0-byte container pointing at buf_addr; broken names one field to corrupt."""
+    c = bytearray(mc.CONTAINER_SIZE)
+    c[0x38:0x3C] = bytes([0xB4, 0x07, 0x8C, 0x01])
+    struct.pack_into('<I', c, 0x44, 0x3C)
+    c[mc.CONTAINER_MAGIC_OFFSET:mc.CONTAINER_MAGIC_OFFSET + 4] = mc.CONTAINER_MAGIC
+    c[mc.CONTAINER_ANCHOR_OFFSET:mc.CONTAINER_ANCHOR_OFFSET + 24] = mc.CONTAINER_ANCHOR
+    bp = buf_addr - 8
+    struct.pack_into('<III', c, 0xE0, 1, bp, bp + n_entries * mc.ENTRY_SIZE)
+    if broken == 'anchor':
+        c[mc.CONTAINER_ANCHOR_OFFSET + 8] ^= 0x01
+    elif broken == 'count':
+        struct.pack_into('<I', c, 0xE8, bp + 250 * mc.ENTRY_SIZE)
+    elif broken == 'low_ptr':
+        struct.pack_into('<II', c, 0xE4, 0x8000, 0x8000 + n_entries * mc.ENTRY_SIZE)
+    elif broken is not None:
+        c[broken] ^= 0xFF
+    return bytes(c)
+
+
+class _Image:
+    """Regions being filled, with a non-overlapping allocator."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.regions = []     # [base, bytearray]
+        self.used = {}        # base -> [(start, end)]
+
+    def add_region(self, base, size, fill, noise):
+        data = bytearray(size)
+        for page in range(0, size, PAGE):
+            if self.rng.random() < fill:
+                off = self.rng.randrange(0, len(noise) - PAGE, 16)
+                data[page:page + PAGE] = noise[off:off + PAGE]
+        self.regions.append([base, data])
+        self.used[base] = []
+
+    def alloc(self, size, align=16, heap=True):
+        """Address of a free, aligned block of size bytes in a heap region (or the rest region)."""
+        pool = [r for r in self.regions if mc.HEAP_RANGE[0] <= r[0] < mc.HEAP_RANGE[1]] if heap else \
+            [r for r in self.regions if r[0] == REST_BASE]
+        for _ in range(1000):
+            base, data = self.rng.choice(pool)
+            if len(data) < size + align:
+                continue
+            off = self.rng.randrange(0, len(data) - size) // align * align
+            if all(off + size <= s or off >= e for s, e in self.used[base]):
+                self.used[base].append((off, off + size))
+                return base + off
+        raise ValueError(f"no room for a {size}-byte block")
+
+    def write(self, addr, blob):
+        for base, data in self.regions:
+            if base <= addr < base + len(data):
+                data[addr - base:addr - base + len(blob)] = blob
+                return
+        raise ValueError(f"0x{addr:08X} is not mapped")
+
+
+def _heap_layout(rng, heap_size, n_regions):
+    """(base, size) of n_regions heap regions totalling about heap_size bytes."""
+    weights = [rng.expovariate(1.0) for _ in range(n_regions)]
+    total = sum(weights)
+    sizes = [max(0x10000, int(w / total * heap_size) // PAGE * PAGE) for w in weights]
+    layout, base = [], HEAP_START
+    for size in sizes:
+        layout.append((base, size))
+        base = (base + size + rng.randrange(1, 5) * 0x10000) // 0x10000 * 0x10000
+    if base > mc.HEAP_RANGE[1]:
+        raise ValueError(f"{heap_size >> 20} MB in {n_regions} regions doesn't fit HEAP_RANGE")
+    return layout
+
+
+def _plant_buffer(image, hand_id, players=True):
+    """Signature + buffer of one hand (strings too when players); returns (buf_addr, n_entries)."""
+    rows = [(0x0A, 0, 0, 0, (0, 0), (0, 0))]
+    if players:
+        for seat, name in enumerate(PLAYERS):
+            raw = name.encode() + b'\x00'
+            ptr = image.alloc(len(raw), 8)
+            image.write(ptr, raw)
+            extra = (0, 0)
+            if name == mc.HERO_NAME:
+                cards = image.alloc(8, 8)
+                image.write(cards, HERO_CARDS.encode() + b'\x00')
+                extra = (cards, len(HERO_CARDS))
+            rows.append((0x02, seat, 0, 0, (ptr, len(name)), extra))
+    rows += [(0x01, 0, 0x70, 2, (0, 0), (0, 0)), (0x01, 1, 0x50, 5, (0, 0), (0, 0)),
+             (0x01, 3, 0x46, 0, (0, 0), (0, 0)), (0x01, 4, 0x43, 5, (0, 0), (0, 0))]
+    blob = b''.join(entry(hand_id, seq, *row) for seq, row in enumerate(rows, 1))
+    blob += entry(hand_id - 7, 1, 0x0A)      # stale slot after the live entries
+    start = image.alloc(16 + len(blob), 16)
+    image.write(start + 6, mc.BUFFER_SIGNATURE + blob)
+    return start + 16, len(rows)
+
+
+def build_image(heap_mb=64, regions=64, seed=0, hand_id=HAND_ID, step=0, fill=0.25,
+                stale=3, decoy_magic=200, decoy_containers=60, decoy_signatures=200):
+    """(regions [[base, bytearray]], truth dict) of one synthetic process image.
+
+    seed fixes the region layout, noise, container address and decoys; step
+    only moves the live buffer, so images of one seed with step 0, 1, ... are
+    one process at successive hands.
+    """
+    rng = random.Random(seed)
+    noise = rng.randbytes(1 << 20)
+    image = _Image(rng)
+    image.add_region(MODULE_BASE, MODULE_SIZE, 0.5, noise)
+    for base, size in _heap_layout(rng, heap_mb << 20, regions):
+        image.add_region(base, size, fill, noise)
+    image.add_region(REST_BASE, REST_SIZE, fill, noise)
+
+    container_addr = image.alloc(mc.CONTAINER_SIZE, 16)
+    image.write(MODULE_BASE + MODULE_PTR_OFFSET, struct.pack('<I', container_addr))
+    containers, signatures = [], []
+    for _ in range(stale):
+        old_hid = hand_id - rng.randrange(10, 5000)
+        buf, n = _plant_buffer(image, old_hid, players=False)
+        addr = image.alloc(mc.CONTAINER_SIZE, 16)
+        image.write(addr, container(buf, n))
+        containers.append((addr, buf, n))
+        signatures.append((buf, old_hid))
+
+    for _ in range(decoy_magic):
+        image.write(image.alloc(8, 4), mc.CONTAINER_MAGIC)
+    for i in range(decoy_containers):
+        buf, n = _plant_buffer(image, hand_id - 1, players=False)
+        signatures.append((buf, hand_id - 1))
+        image.write(image.alloc(mc.CONTAINER_SIZE, 16), container(buf, n, BROKEN_FIELDS[i % len(BROKEN_FIELDS)]))
+    for i in range(decoy_signatures):
+        in_heap = i % 10 != 0
+        addr = image.alloc(10 + mc.ENTRY_SIZE + 9, 16, heap=in_heap)
+        kind = i % 4
+        if kind == 0:   # hand_id out of range
+            blob = mc.BUFFER_SIGNATURE + entry(hand_id * 2, 1, 0x0A)
+        elif kind == 1:   # not the first entry
+            blob = mc.BUFFER_SIGNATURE + entry(hand_id, 2, 0x01)
+        else:   # older hand (kind 3: overlapping 00 88 00.. prefix) - a valid candidate
+            prefix = mc.BUFFER_SIGNATURE[:9] if kind == 3 else b''
+            blob = prefix + mc.BUFFER_SIGNATURE + entry(hand_id - 2 - i, 1, 0x0A)
+            signatures.append((addr + len(prefix) + 10, hand_id - 2 - i))
+        image.write(addr, blob)
+
+    live = random.Random(f'{seed}:{step}')
+    image.rng = live
+    buf_addr, n_entries = _plant_buffer(image, hand_id)
+    image.write(container_addr, container(buf_addr, n_entries))
+    containers.append((container_addr, buf_addr, n_entries))
+    signatures.append((buf_addr, hand_id))
+
+    in_heap = lambda addr: mc.HEAP_RANGE[0] <= addr < mc.HEAP_RANGE[1]
+    truth = {
+        'hand_id': hand_id, 'buf_addr': buf_addr, 'container_addr': container_addr,
+        'n_entries': n_entries, 'hero_cards': HERO_CARDS,
+        'module_ptr': MODULE_BASE + MODULE_PTR_OFFSET,
+        'containers': sorted(containers),
+        'heap_signatures': sorted(s for s in signatures if in_heap(s[0])),
+        'signatures': sorted(signatures),
+    }
+    return image.regions, truth
+
+
+def write_image(out_dir, name, pid=None, **kw):
+    """Write name.bin / name.json (tagged dump format); returns the meta with _bin_path."""
+    regions, truth = build_image(**kw)
+    os.makedirs(out_dir, exist_ok=True)
+    bin_path = os.path.join(out_dir, f'{name}.bin')
+    meta_regions, offset = [], 0
+    with open(bin_path, 'wb') as f:
+        for base, data in regions:
+            f.write(data)
+            meta_regions.append({'base': base, 'size': len(data), 'file_offset': offset})
+            offset += len(data)
+    meta = {
+        'dump_id': name, 'timestamp': name, 'pid': pid or 4000 + kw.get('seed', 0),
+        'module_base': MODULE_BASE, 'regions': meta_regions, 'bytes_total': offset,
+        'hand_id': truth['hand_id'], 'hero_cards': [HERO_CARDS[:2], HERO_CARDS[2:]],
+        'community_cards': [], 'pot': None,
+        'opponents': [{'name': n, 'has_cards': True} for n in PLAYERS if n != mc.HERO_NAME],
+        'synthetic': {k: [list(v) for v in vs] if isinstance(vs, list) else vs for k, vs in truth.items()},
+    }
+    with open(os.path.join(out_dir, f'{name}.json'), 'w') as f:
+        json.dump(meta, f)
+    meta['_bin_path'] = bin_path
+    return meta
+
+
+def write_session(out_dir, dumps, seed=0, hand_id=HAND_ID, prefix='dump_synth', **kw):
+    """dumps images of one process (same seed), one hand apart; metas in time order."""
+    return [write_image(out_dir, f'{prefix}_{seed}_{step:02d}', seed=seed, step=step,
+                        hand_id=hand_id + step, **kw) for step in range(dumps)]
+
+
+def bench_image(meta, repeat=3, pointer_scan=False):
+    """Scan throughput on one image: {name: (seconds, MB/s, matches truth)}."""
+    truth = meta['synthetic']
+    rows = {}
+    with mc.DumpReader(meta['_bin_path'], meta['regions']) as reader:
+        heap = [(base, len(data)) for base, data in reader.iter_regions(mc.HEAP_RANGE, min_size=0x200)]
+        everything = [(r['base'], r['size']) for r in reader.regions]
+        heap_mb = sum(size for _, size in heap) / 1e6
+        all_mb = sum(size for _, size in everything) / 1e6
+
+        def timed(name, mb, fn, check):
+            best, result = mc._best_time(fn, repeat)
+            rows[name] = (best, mb / best, check(result))
+
+        timed('container + 0x88 (heap)', heap_mb, lambda: mc.scan_buffers(heap, reader.read),
+              lambda r: [list(c) for c in r[0]] == truth['containers'] and
+              [list(s) for s in r[1]] == truth['heap_signatures'])
+        timed('0x88 only (all regions)', all_mb, lambda: mc.scan_buffers(everything, reader.read, containers=False),
+              lambda r: [list(s) for s in r[1]] == truth['signatures'])
+        timed('find_buffer_in_dump', heap_mb,
+              lambda: mc.find_buffer_in_dump(meta['_bin_path'], meta['regions'], reader=reader),
+              lambda r: r[0] == truth['buf_addr'] and mc.extract_hand_data(r[1])['hero_cards'] == truth['hero_cards'])
+        if pointer_scan:
+            import cmd_pointer_scan as ps
+            with ps.DumpSnapshot(meta, truth['buf_addr']) as snap:
+                timed('pointer scan level 1', all_mb,
+                      lambda: ps.scan_level(snap, snap, [truth['buf_addr']], [truth['buf_addr']], 1),
+                      lambda r: truth['container_addr'] + 0xE4 in r[1])
+    return rows
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Write synthetic memory dumps')
+    parser.add_argument('out_dir')
+    parser.add_argument('--heap-mb', type=int, default=64)
+    parser.add_argument('--regions', type=int, default=64, help='heap regions')
+    parser.add_argument('--dumps', type=int, default=1, help='images of one process, one hand apart')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--decoys', type=int, default=200, help='bare magic and bad 0x88 hits each')
+    parser.add_argument('--bench', action='store_true', help='time the scanners on the first image')
+    parser.add_argument('--pointer-scan', action='store_true', help='include cmd_pointer_scan level 1')
+    args = parser.parse_args(argv)
+
+    t = time.perf_counter()
+    metas = write_session(args.out_dir, args.dumps, seed=args.seed, heap_mb=args.heap_mb, regions=args.regions,
+                          decoy_magic=args.decoys, decoy_signatures=args.decoys)
+    for meta in metas:
+        truth = meta['synthetic']
+        print(f"{meta['dump_id']}: {meta['bytes_total'] / 1e6:.0f} MB, {len(meta['regions'])} regions, "
+              f"container 0x{truth['container_addr']:08X} -> buf 0x{truth['buf_addr']:08X} "
+              f"hand {truth['hand_id']}")
+    print(f"Written in {time.perf_counter() - t:.1f}s")
+    if args.bench:
+        for name, (seconds, mb_s, ok) in bench_image(metas[0], pointer_scan=args.pointer_scan).items():
+            print(f"  {name:<26} {seconds * 1000:8.1f} ms {mb_s:8.0f} MB/s  {'ok' if ok else 'MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Fuzzy player-name index - finds names whose SequenceMatcher ratio beats a
+threshold without scoring every name in the database.
+
+Candidates come from a character-bigram inverted index plus a length filter.
+Both filters are necessary conditions for ratio > threshold, so results are
+identical to a full scan:
+
+  ratio = 2M / (la + lb), M = matched chars <= LCS
+  => edit distance k <= la + lb - 2M < (1 - t) * (la + lb)
+  => shared bigrams >= max(la, lb) - 1 - 2k        (q-gram lemma)
+  and 2 * min(la, lb) / (la + lb) >= ratio > t     (length filter)
+
+Only surviving candidates are scored with SequenceMatcher (lowercased).
+
+    index = NameIndex(stats.keys())
+    index.best_match('Jorgebcn7G')      # -> 'Jorgebcn76' or None
+"""
+
+import math
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Iterable, List, Optional, Tuple
+
+FUZZY_THRESHOLD = 0.82
+
+
+def _bigrams(s: str) -> Counter:
+    return Counter(s[i:i + 2] for i in range(len(s) - 1))
+
+
+class NameIndex:
+    """Bigram index over a list of names; ids are insertion order."""
+
+    def __init__(self, names: Iterable[str] = (), threshold: float = FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self.names: List[str] = []
+        self.lower: List[str] = []
+        self._postings = defaultdict(list)   # bigram -> [(id, count)]
+        self._by_len = defaultdict(list)     # len(lower) -> [id]
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name: str) -> int:
+        idx = len(self.names)
+        low = name.lower()
+        self.names.append(name)
+        self.lower.append(low)
+        for gram, count in _bigrams(low).items():
+            self._postings[gram].append((idx, count))
+        self._by_len[len(low)].append(idx)
+        return idx
+
+    # ── Filters (loose side of float rounding - never drop a true match) ──
+
+    def _length_ok(self, la: int, lb: int) -> bool:
+        return la + lb > 0 and 2 * min(la, lb) / (la + lb) >= self.threshold - 1e-9
+
+    def _min_shared(self, la: int, lb: int) -> int:
+        max_edits = math.ceil((1 - self.threshold) * (la + lb) + 1e-9) - 1
+        return max(la, lb) - 1 - 2 * max_edits
+
+    def candidates(self, query: str) -> List[int]:
+        """Ids of names that can possibly reach ratio > threshold, ascending."""
+        low = query.lower()
+        la = len(low)
+        shared = defaultdict(int)
+        for gram, qcount in _bigrams(low).items():
+            for idx, count in self._postings.get(gram, ()):
+                shared[idx] += min(qcount, count)
+
+        out = [idx for idx, n in shared.items()
+               if self._length_ok(la, len(self.lower[idx]))
+               and n >= self._min_shared(la, len(self.lower[idx]))]
+        # Very short names can match without sharing any bigram
+        for lb, ids in self._by_len.items():
+            if self._length_ok(la, lb) and self._min_shared(la, lb) <= 0:
+                out.extend(idx for idx in ids if idx not in shared)
+        out.sort()
+        return out
+
+    def matches(self, query: str) -> List[Tuple[int, float]]:
+        """(id, ratio) for every name with ratio > threshold, ascending id."""
+        low = query.lower()
+        sm = SequenceMatcher(None, low, '')
+        out = []
+        for idx in self.candidates(query):
+            sm.set_seq2(self.lower[idx])
+            if sm.real_quick_ratio() <= self.threshold or sm.quick_ratio() <= self.threshold:
+                continue
+            ratio = sm.ratio()
+            if ratio > self.threshold:
+                out.append((idx, ratio))
+        return out
+
+    def best_match(self, query: str) -> Optional[str]:
+        """Highest-ratio name above threshold (earliest on ties), else None."""
+        best, best_ratio = None, self.threshold
+        for idx, ratio in self.matches(query):
+            if ratio > best_ratio:
+                best, best_ratio = idx, ratio
+        return self.names[best] if best is not None else None
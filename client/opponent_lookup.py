@@ -1,50 +1,100 @@
 """
 Opponent lookup - get stats and advice for players at the table.
+
+Stats come from the SQLite player store (per-player reads, migrated from
+player_stats.json on first use). Names are matched exactly, then
+case-insensitively (precomputed lowercase key map), then fuzzily through a
+bigram NameIndex built once per set of names. Match results live in a
+bounded LRU that is cleared when the index is rebuilt.
+
+get_stats() reads a matched player in the chosen view: 'lifetime' (default),
+'decayed' or 'recent' (last N hands) - see recent_stats.
 """
 
-import json
 import os
-from difflib import SequenceMatcher
+from collections import OrderedDict
 from typing import Dict, List, Optional
 
-STATS_FILE = os.path.join(os.path.dirname(__file__), 'player_stats.json')
+import player_store
+from name_index import NameIndex
+
+STATS_FILE = player_store.JSON_PATH
+STORE_DB = player_store.DEFAULT_DB
 FUZZY_THRESHOLD = 0.82  # 82% similarity to match
+MATCH_CACHE_SIZE = 2048  # OCR'd names remembered (LRU)
+STATS_VIEW = 'lifetime'  # or 'decayed' / 'recent' for current form
 
-_stats_cache = None
-_fuzzy_cache = {}  # Cache fuzzy matches
+_stats_cache = None  # PlayerStore
+_stats_version = None
+_indexed_stats = None  # stats dict the index/key map below were built from
+_indexed_names = frozenset()
+_name_index = None
+_lower_keys = {}  # lowercase name -> first DB key with that spelling
+_match_cache = OrderedDict()  # OCR name -> matched DB key or None
+_MISS = object()
 
 def load_player_stats() -> Dict:
-    """Load player stats from JSON file."""
-    global _stats_cache
-    if _stats_cache is not None:
+    """Open the player store (mapping name -> stats). Re-indexes names when the player set changes."""
+    global _stats_cache, _stats_version
+    if _stats_cache is None:
+        if not os.path.exists(STORE_DB) and not os.path.exists(STATS_FILE):
+            return {}
+        _stats_cache = player_store.open_store(STORE_DB, STATS_FILE)
+        _stats_version = _stats_cache.data_version()
+        _build_index(_stats_cache)
         return _stats_cache
-    if not os.path.exists(STATS_FILE):
-        return {}
-    with open(STATS_FILE) as f:
-        _stats_cache = json.load(f)
+    version = _stats_cache.data_version()
+    if version != _stats_version:
+        # Another process wrote; re-index if players were added, removed or renamed
+        _stats_version = version
+        if frozenset(_stats_cache) != _indexed_names:
+            _build_index(_stats_cache)
     return _stats_cache
 
+def _build_index(stats: Dict) -> None:
+    global _indexed_stats, _indexed_names, _name_index, _lower_keys
+    names = list(stats)
+    _indexed_stats = stats
+    _indexed_names = frozenset(names)
+    _name_index = NameIndex(names, FUZZY_THRESHOLD)
+    _lower_keys = {}
+    for key in names:
+        _lower_keys.setdefault(key.lower(), key)
+    _match_cache.clear()
+
 def fuzzy_match(name: str, stats: Dict) -> Optional[str]:
     """Find best fuzzy match for a name in stats DB."""
-    if name in _fuzzy_cache:
-        return _fuzzy_cache[name]
-    
     if name in stats:
-        _fuzzy_cache[name] = name
         return name
-    
-    best_match = None
-    best_ratio = FUZZY_THRESHOLD
-    
-    for db_name in stats.keys():
-        ratio = SequenceMatcher(None, name.lower(), db_name.lower()).ratio()
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = db_name
-    
-    _fuzzy_cache[name] = best_match
+    if stats is not _indexed_stats:
+        _build_index(stats)
+    
+    cached = _match_cache.get(name, _MISS)
+    if cached is not _MISS and (cached is None or cached in stats):
+        _match_cache.move_to_end(name)
+        return cached
+    
+    # Same spelling ignoring case is ratio 1.0 - the best possible match
+    best_match = _lower_keys.get(name.lower())
+    if best_match is None:
+        best_match = _name_index.best_match(name)
+    
+    if best_match is not None and best_match not in stats:
+        best_match = None  # index older than the store
+    _match_cache[name] = best_match
+    if len(_match_cache) > MATCH_CACHE_SIZE:
+        _match_cache.popitem(last=False)
     return best_match
 
+def get_stats(stats: Dict, name: str, view: str = None) -> Dict:
+    """Stats for a matched name in the given view (falls back to lifetime)."""
+    view = view or STATS_VIEW
+    if view != 'lifetime' and hasattr(stats, 'view_stats'):
+        s = stats.view_stats(name, view)
+        if s:
+            return s
+    return stats[name]
+
 def get_advice(archetype: str) -> str:
     """Get short exploitation advice."""
     return {
@@ -55,7 +105,7 @@ def get_advice(archetype: str) -> str:
         'maniac': "TRAP - let them hang themselves"
     }.get(archetype, "Play solid")
 
-def lookup_opponents(player_names: List[str]) -> List[Dict]:
+def lookup_opponents(player_names: List[str], view: str = None) -> List[Dict]:
     """Look up stats for a list of player names (with fuzzy matching)."""
     stats = load_player_stats()
     results = []
@@ -63,7 +113,7 @@ def lookup_opponents(player_names: List[str]) -> List[Dict]:
     for name in player_names:
         matched_name = fuzzy_match(name, stats)
         if matched_name:
-            s = stats[matched_name]
+            s = get_stats(stats, matched_name, view)
             results.append({
                 'name': name,
                 'matched_name': matched_name if matched_name != name else None,
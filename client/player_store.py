@@ -0,0 +1,311 @@
+"""
+Player stats store - SQLite (WAL) with one row per player.
+
+Rows hold both the derived stats (same shape as a player_stats.json entry)
+and the raw counters they come from, so counters can be bumped atomically
+and a single row re-derived without touching anyone else.
+
+    store = open_store()                 # migrates player_stats.json on first use
+    store['Jorgebcn76']                  # {'hands': 157, 'vpip': 25.5, ...}
+    store.find_normalized('jorgebcn76')  # case-insensitive key lookup
+    store.add_counters({'Jorgebcn76': {'hands': 1, 'vpip': 1}})
+    store.view_stats('Jorgebcn76', 'recent')  # last-100-hands stats (recent_stats)
+
+PlayerStore is a read-only Mapping of players with enough hands for stats
+(archetype set); reads are per player, nothing is loaded up front. WAL lets
+the helper bar read while build_player_stats or the online tracker write.
+player_recent keeps each player's decayed / last-N-hands counters as JSON.
+player_live logs the live tracker's counters per (player, hand_id) until a
+rebuild from hand histories counts that hand itself.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'player_stats.db')
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'player_stats.json')
+
+# Raw counter columns (build_player_stats.COUNTER_KEYS that feed the stats)
+COUNTERS = ('hands', 'vpip', 'pfr', 'three_bet_opps', 'three_bets', 'af_actions', 'af_passive')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY,
+    norm TEXT NOT NULL,
+    hands INTEGER NOT NULL DEFAULT 0,
+    vpip REAL,
+    pfr REAL,
+    three_bet REAL,
+    af REAL,
+    archetype TEXT,
+    advice TEXT,
+    aliases TEXT,
+    n_hands INTEGER NOT NULL DEFAULT 0,
+    n_vpip INTEGER NOT NULL DEFAULT 0,
+    n_pfr INTEGER NOT NULL DEFAULT 0,
+    n_three_bet_opps INTEGER NOT NULL DEFAULT 0,
+    n_three_bets INTEGER NOT NULL DEFAULT 0,
+    n_af_actions INTEGER NOT NULL DEFAULT 0,
+    n_af_passive INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS players_norm ON players(norm);
+CREATE TABLE IF NOT EXISTS player_recent (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_live (
+    name TEXT NOT NULL,
+    hand_id INTEGER NOT NULL,
+    n_hands INTEGER NOT NULL DEFAULT 0,
+    n_vpip INTEGER NOT NULL DEFAULT 0,
+    n_pfr INTEGER NOT NULL DEFAULT 0,
+    n_three_bet_opps INTEGER NOT NULL DEFAULT 0,
+    n_three_bets INTEGER NOT NULL DEFAULT 0,
+    n_af_actions INTEGER NOT NULL DEFAULT 0,
+    n_af_passive INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, hand_id)
+);
+"""
+
+_STAT_COLS = 'hands, vpip, pfr, three_bet, af, archetype, advice, aliases'
+_N_COLS = ', '.join('n_' + c for c in COUNTERS)
+_UPSERT = (f'INSERT INTO {{table}} ({{cols}}, {_N_COLS}) VALUES ({{marks}}, {", ".join("?" * len(COUNTERS))})'
+           ' ON CONFLICT({key}) DO UPDATE SET ' + ', '.join(f'n_{c} = n_{c} + excluded.n_{c}' for c in COUNTERS))
+
+
+def normalize(name: str) -> str:
+    return name.lower()
+
+
+def _row_stats(row) -> Dict:
+    hands, vpip, pfr, three_bet, af, archetype, advice, aliases = row
+    s = {'hands': hands, 'vpip': vpip, 'pfr': pfr, '3bet': three_bet, 'af': af,
+         'archetype': archetype, 'advice': advice}
+    if aliases:
+        s['aliases'] = json.loads(aliases)
+    return s
+
+
+def seed_counters(s: Dict) -> Dict[str, int]:
+    """Approximate raw counters from derived stats (JSON migration has no counters).
+
+    Reproduces the percentages and AF so later counter updates blend in with
+    the migrated sample instead of replacing it.
+    """
+    hands = s['hands']
+    return {'hands': hands,
+            'vpip': round(s['vpip'] * hands / 100),
+            'pfr': round(s['pfr'] * hands / 100),
+            'three_bet_opps': hands,
+            'three_bets': round(s.get('3bet', 0.0) * hands / 100),
+            'af_actions': round(s['af'] * hands),
+            'af_passive': hands}
+
+
+def _stats_row(name: str, s: Dict, counters: Optional[Dict] = None):
+    aliases = json.dumps(s['aliases']) if s.get('aliases') else None
+    counters = counters or seed_counters(s)
+    return ((name, normalize(name), s['hands'], s['vpip'], s['pfr'], s.get('3bet', 0.0), s['af'],
+             s['archetype'], s.get('advice'), aliases)
+            + tuple(counters.get(c, 0) for c in COUNTERS))
+
+
+class PlayerStore(Mapping):
+    """Mapping name -> stats dict backed by SQLite; plus counter upserts."""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self.conn.execute(sql, args).fetchall()
+
+    # ── Reads ────────────────────────────────────────────────────────
+
+    def __getitem__(self, name: str) -> Dict:
+        rows = self._query(f'SELECT {_STAT_COLS} FROM players WHERE name = ? AND archetype IS NOT NULL',
+                           (name,))
+        if not rows:
+            raise KeyError(name)
+        return _row_stats(rows[0])
+
+    def __contains__(self, name) -> bool:
+        return bool(self._query('SELECT 1 FROM players WHERE name = ? AND archetype IS NOT NULL', (name,)))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([r[0] for r in self._query('SELECT name FROM players WHERE archetype IS NOT NULL'
+                                               ' ORDER BY rowid')])
+
+    def __len__(self) -> int:
+        return self._query('SELECT COUNT(*) FROM players WHERE archetype IS NOT NULL')[0][0]
+
+    def find_normalized(self, name: str) -> Optional[str]:
+        """First stored name equal to name ignoring case (indexed)."""
+        rows = self._query('SELECT name FROM players WHERE norm = ? AND archetype IS NOT NULL'
+                           ' ORDER BY rowid LIMIT 1', (normalize(name),))
+        return rows[0][0] if rows else None
+
+    def counters(self, name: str) -> Optional[Dict[str, int]]:
+        rows = self._query(f'SELECT {_N_COLS} FROM players WHERE name = ?', (name,))
+        return dict(zip(COUNTERS, rows[0])) if rows else None
+
+    def recent(self, name: str) -> Optional[Dict]:
+        """RecentCounters.to_json() state for name, or None."""
+        rows = self._query('SELECT data FROM player_recent WHERE name = ?', (name,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def view_stats(self, name: str, view: str = 'lifetime') -> Optional[Dict]:
+        """Stats for name from the 'lifetime', 'decayed' or 'recent' counters (None if unknown)."""
+        from build_player_stats import derive_view  # build_player_stats imports this module
+        from recent_stats import RecentCounters
+        counters = self.counters(name)
+        if counters is None:
+            return None
+        data = self.recent(name) if view != 'lifetime' else None
+        return derive_view(counters, RecentCounters.from_json(data) if data else None, view)
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits - cheap staleness check."""
+        return self._query('PRAGMA data_version')[0][0]
+
+    # ── Writes ───────────────────────────────────────────────────────
+
+    def replace_all(self, stats: Dict[str, Dict], counters: Optional[Dict[str, Dict]] = None,
+                    recent: Optional[Dict[str, Dict]] = None) -> None:
+        """Replace every row in one transaction (full rebuild / migration)."""
+        counters = counters or {}
+        rows = [_stats_row(name, s, counters.get(name)) for name, s in stats.items()]
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM players')
+            self.conn.execute('DELETE FROM player_recent')
+            self.conn.executemany(f'INSERT INTO players (name, norm, {_STAT_COLS}, {_N_COLS})'
+                                  f' VALUES ({", ".join("?" * (10 + len(COUNTERS)))})', rows)
+            self._write_recent(recent)
+
+    def rebuild(self, stats: Dict[str, Dict], counters: Dict[str, Dict],
+                recent: Optional[Dict[str, Dict]] = None, hand_ids=()) -> int:
+        """replace_all for a rebuild from hand histories, keeping live-tracked hands.
+
+        hand_ids are the hands the rebuild counted. Live hands among them are
+        dropped from player_live; the rest are added back onto the rebuilt
+        counters, and players seen only live keep their rows (and recent state).
+        Returns the number of live hands kept.
+        """
+        covered = set(hand_ids)
+        rows = [_stats_row(name, s, counters.get(name)) for name, s in stats.items()]
+        with self._lock, self.conn:
+            live = self.conn.execute(f'SELECT name, hand_id, {_N_COLS} FROM player_live').fetchall()
+            kept = [r for r in live if r[1] not in covered]
+            extra = {}
+            for name, _, *values in kept:
+                e = extra.setdefault(name, dict.fromkeys(COUNTERS, 0))
+                for c, v in zip(COUNTERS, values):
+                    e[c] += v
+            live_only = {n for n in extra if n not in stats and not (recent and n in recent)}
+            keep_recent = [r for r in self.conn.execute('SELECT name, data FROM player_recent')
+                           if r[0] in live_only] if live_only else []
+
+            self.conn.execute('DELETE FROM players')
+            self.conn.execute('DELETE FROM player_recent')
+            self.conn.executemany(f'INSERT INTO players (name, norm, {_STAT_COLS}, {_N_COLS})'
+                                  f' VALUES ({", ".join("?" * (10 + len(COUNTERS)))})', rows)
+            self._write_recent(recent)
+            self.conn.executemany('INSERT INTO player_recent (name, data) VALUES (?, ?)', keep_recent)
+            for name, delta in extra.items():
+                self._add(name, delta)
+            self.conn.executemany('DELETE FROM player_live WHERE name = ? AND hand_id = ?',
+                                  [r[:2] for r in live if r[1] in covered])
+        return len({r[1] for r in kept})
+
+    def _write_recent(self, recent):
+        if recent:
+            self.conn.executemany('INSERT OR REPLACE INTO player_recent (name, data) VALUES (?, ?)',
+                                  [(name, json.dumps(r, separators=(',', ':'))) for name, r in recent.items()])
+
+    def _add(self, name, delta):
+        """Add one player's counter deltas and re-derive the row (caller holds the transaction)."""
+        from build_player_stats import derive_player  # build_player_stats imports this module
+
+        self.conn.execute(_UPSERT.format(table='players', key='name', cols='name, norm', marks='?, ?'),
+                          (name, normalize(name)) + tuple(delta.get(c, 0) for c in COUNTERS))
+        row = self.conn.execute(f'SELECT {_N_COLS} FROM players WHERE name = ?', (name,)).fetchone()
+        derived = derive_player(dict(zip(COUNTERS, row)))
+        if derived:
+            self.conn.execute('UPDATE players SET hands = ?, vpip = ?, pfr = ?, three_bet = ?, af = ?,'
+                              ' archetype = ?, advice = ? WHERE name = ?',
+                              (derived['hands'], derived['vpip'], derived['pfr'], derived['3bet'],
+                               derived['af'], derived['archetype'], derived['advice'], name))
+        return derived
+
+    def add_counters(self, deltas: Dict[str, Dict[str, int]], recent: Optional[Dict[str, Dict]] = None,
+                     hands: Optional[Dict[tuple, Dict[str, int]]] = None) -> Dict[str, Optional[Dict]]:
+        """Atomically add counter deltas per player and re-derive those rows.
+
+        recent optionally replaces players' RecentCounters state in the same transaction.
+        hands optionally logs the same deltas split per (name, hand_id) in player_live,
+        so rebuild() keeps them until the hand histories include those hands.
+        Returns {name: derived stats or None (below the hands minimum)}.
+        """
+        out = {}
+        with self._lock, self.conn:
+            for name, delta in deltas.items():
+                out[name] = self._add(name, delta)
+            if hands:
+                self.conn.executemany(
+                    _UPSERT.format(table='player_live', key='name, hand_id', cols='name, hand_id', marks='?, ?'),
+                    [key + tuple(delta.get(c, 0) for c in COUNTERS) for key, delta in hands.items()])
+            self._write_recent(recent)
+        return out
+
+
+def migrate_json(store: PlayerStore, json_path: str = JSON_PATH) -> int:
+    """Load player_stats.json into the store. Returns number of players."""
+    with open(json_path) as f:
+        stats = json.load(f)
+    store.replace_all(stats)
+    return len(stats)
+
+
+def open_store(db_path: str = DEFAULT_DB, json_path: str = JSON_PATH) -> PlayerStore:
+    """Open the store, migrating from player_stats.json if the store is empty."""
+    store = PlayerStore(db_path)
+    empty = not store._query('SELECT 1 FROM players LIMIT 1')
+    if empty and json_path and os.path.exists(json_path):
+        migrate_json(store, json_path)
+    return store
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Player stats store')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--migrate', metavar='JSON', nargs='?', const=JSON_PATH,
+                        help='(re)load stats from player_stats.json')
+    parser.add_argument('names', nargs='*', help='players to look up')
+    args = parser.parse_args()
+
+    with open_store(args.db) as store:
+        if args.migrate:
+            print(f"Migrated {migrate_json(store, args.migrate)} players from {args.migrate}")
+        print(f"{len(store)} players in {args.db}")
+        for name in args.names:
+            key = name if name in store else store.find_normalized(name)
+            print(f"  {name}: {store[key] if key else 'not found'}")
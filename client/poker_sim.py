@@ -10,6 +10,7 @@ from poker_logic import (
     RANKS, SUITS, RANK_VAL, STRATEGIES, expand_range,
     hand_to_str, analyze_hand, postflop_action, preflop_action
 )
+from hand_trace import TraceWriter
 
 POSITIONS = ['UTG', 'MP', 'CO', 'BTN', 'SB', 'BB']
 
@@ -27,10 +28,18 @@ class Player:
         self.cards = None
         self.hand_str = None
 
-def simulate_hand(players, dealer_pos):
-    """Simulate one hand with full postflop play and proper stack limits."""
-    deck = make_deck()
-    random.shuffle(deck)
+def simulate_hand(players, dealer_pos, details=None, deck=None):
+    """Simulate one hand with full postflop play and proper stack limits.
+    
+    details: optional dict, filled with 'board' and 'actions' in the same
+    shape as pokerkit_adapter.run_hand(track_details=True) for hand traces.
+    deck: optional preset deck of (rank, suit) tuples, dealt from the end.
+    """
+    if deck is None:
+        deck = make_deck()
+        random.shuffle(deck)
+    else:
+        deck = list(deck)
     
     # Deal hole cards
     for p in players:
@@ -81,6 +90,16 @@ def simulate_hand(players, dealer_pos):
                 all_in[player.name] = True
         return actual
     
+    def record(player, action, street, to_call, amount):
+        if details is not None:
+            base = player.base_strategy if hasattr(player, 'base_strategy') else player.name
+            details['actions'].append((players.index(player), base, action, to_call,
+                                       sum(invested.values()) - amount, street, amount))
+    
+    if details is not None:
+        details['board'] = []
+        details['actions'] = []
+    
     for p in action_order:
         if not active[p.name] or all_in[p.name]:
             continue
@@ -88,6 +107,8 @@ def simulate_hand(players, dealer_pos):
         p.stats['hands'] += 1
         base = p.base_strategy if hasattr(p, 'base_strategy') else p.name
         
+        before = invested[p.name]
+        to_call = max(invested.values()) - before
         if opener is None:
             facing = 'none'
             action, _ = preflop_action(p.hand_str, pos, p.strategy, facing)
@@ -96,6 +117,7 @@ def simulate_hand(players, dealer_pos):
             if base == 'fish' and action == 'raise' and random.random() < 0.15:
                 bet_amount(p, 1.0)  # Limp
                 p.stats['vpip'] += 1
+                record(p, 'call' if to_call > 0 else 'check', 'preflop', to_call, invested[p.name] - before)
                 continue
             
             if action == 'raise':
@@ -103,8 +125,12 @@ def simulate_hand(players, dealer_pos):
                 bet_amount(p, open_size)
                 p.stats['vpip'] += 1
                 p.stats['pfr'] += 1
+                record(p, 'raise', 'preflop', to_call, invested[p.name] - before)
             elif pos != 'BB':
                 active[p.name] = False
+                record(p, 'fold', 'preflop', to_call, 0)
+            else:
+                record(p, 'check', 'preflop', to_call, 0)
         else:
             facing = 'open'
             action, _ = preflop_action(p.hand_str, pos, p.strategy, facing, positions[opener.name])
@@ -122,17 +148,22 @@ def simulate_hand(players, dealer_pos):
                 p.stats['vpip'] += 1
             else:
                 active[p.name] = False
+            record(p, action if action in ('raise', 'call') else 'fold', 'preflop',
+                   to_call, invested[p.name] - before)
     
     # Handle 3-bet response
     if three_bettor and opener and active[opener.name] and not all_in[opener.name]:
         action, _ = preflop_action(opener.hand_str, positions[opener.name], opener.strategy, '3bet')
         three_bet_amt = invested[three_bettor.name]
+        before = invested[opener.name]
         if action == 'raise':
             bet_amount(opener, three_bet_amt * 2.5)  # 4-bet
         elif action == 'call':
             bet_amount(opener, three_bet_amt)
         else:
             active[opener.name] = False
+        record(opener, action if action in ('raise', 'call') else 'fold', 'preflop',
+               three_bet_amt - before, invested[opener.name] - before)
     
     pot = sum(invested.values())
     active_players = [p for p in players if active[p.name]]
@@ -162,6 +193,8 @@ def simulate_hand(players, dealer_pos):
         active_players = [p for p in players if active[p.name] and not all_in[p.name]]
         if len([p for p in players if active[p.name]]) <= 1:
             break
+        if details is not None:
+            details['board'] = list(board)  # only cards dealt to a live hand
         # If everyone is all-in, just deal remaining cards
         if len(active_players) == 0:
             continue
@@ -200,6 +233,7 @@ def simulate_hand(players, dealer_pos):
                 
                 needs_action[p.name] = False
                 acted_this_orbit = True
+                before = invested[p.name]
                 
                 if action == 'fold':
                     active[p.name] = False
@@ -238,6 +272,18 @@ def simulate_hand(players, dealer_pos):
                         pot += actual_call
                         if stacks[p.name] <= 0:
                             all_in[p.name] = True
+                
+                if details is not None:
+                    put_in = invested[p.name] - before
+                    if action == 'fold':
+                        taken = 'fold'
+                    elif put_in <= 0:
+                        taken = 'check'
+                    elif put_in > to_call:
+                        taken = 'raise' if to_call > 0 else 'bet'
+                    else:
+                        taken = 'call'
+                    record(p, taken, street_name, to_call, put_in)
             
             # Safety: if no one acted, we're done
             if not acted_this_orbit:
@@ -307,9 +353,14 @@ def get_table_configs():
     ]
 
 
-def run_simulation(num_hands=100000):
-    """Run simulation on realistic 2NL tables."""
+def run_simulation(num_hands=100000, trace_path=None):
+    """Run simulation on realistic 2NL tables.
+    
+    trace_path: optional hand_trace file to append every hand to. Records
+    carry seed 0: poker_sim hands are not replayable from a seed.
+    """
     random.seed(None)
+    trace = TraceWriter(trace_path) if trace_path else None
     
     bot_strategies = ['optimal_stats', 'value_lord', 'kiro_optimal', 'kiro_lord', 'sonnet']
     tables = get_table_configs()
@@ -341,7 +392,16 @@ def run_simulation(num_hands=100000):
                     players.append(p)
                 
                 for i in range(hands_per_table):
-                    simulate_hand(players, i % 6)
+                    if trace:
+                        before = [p.profit for p in players]
+                        details = {}
+                        simulate_hand(players, i % 6, details)
+                        trace.add_hand([p.base_strategy for p in players], [p.cards for p in players],
+                                       details['board'], details['actions'],
+                                       [p.profit - b for p, b in zip(players, before)],
+                                       hero_idx=len(players) - 1)
+                    else:
+                        simulate_hand(players, i % 6)
                 
                 bot_player = players[-1]
                 profit += bot_player.profit
@@ -352,6 +412,9 @@ def run_simulation(num_hands=100000):
         
         print("  Complete", flush=True)
     
+    if trace:
+        trace.close()
+    
     # Print results
     print("\n" + "=" * 60)
     print(f"RESULTS ({num_hands:,} hands, 3 trials avg)")
@@ -371,9 +434,15 @@ def run_simulation(num_hands=100000):
 
 if __name__ == '__main__':
     import sys
-    num_hands = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    args = sys.argv[1:]
+    trace_path = None
+    if '--trace' in args:
+        i = args.index('--trace')
+        trace_path = args[i + 1]
+        del args[i:i + 2]
+    num_hands = int(args[0]) if args else 100000
     print("="*80)
     print("POKER STRATEGY SIMULATOR (with postflop)")
     print("="*80)
     print(flush=True)
-    run_simulation(num_hands)
+    run_simulation(num_hands, trace_path)
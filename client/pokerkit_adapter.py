@@ -4,9 +4,14 @@ Adapter to run OnyxPoker strategies in PokerKit simulation.
 Uses PokerKit for game mechanics, our strategies make decisions.
 """
 
+import contextlib
+import heapq
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from pokerkit import Automation, NoLimitTexasHoldem
 from poker_logic import preflop_action, postflop_action
+from hand_trace import TraceWriter
 
 
 def get_street(board):
@@ -76,22 +81,37 @@ def strategy_decision(state, player_idx, strategy, is_aggressor=True, all_strate
     return action, size
 
 
-def run_hand(strategies, verbose=False, track_details=False):
-    """Run single hand, return payoffs (or (payoffs, details) if track_details)."""
+_GAME = None  # prebuilt NoLimitTexasHoldem state factory (one per process)
+
+
+def get_game():
+    """Return the shared 0.01/0.02 game definition; states are stamped out per hand."""
+    global _GAME
+    if _GAME is None:
+        _GAME = NoLimitTexasHoldem(
+            automations=(
+                Automation.ANTE_POSTING, Automation.BET_COLLECTION,
+                Automation.BLIND_OR_STRADDLE_POSTING, Automation.HOLE_CARDS_SHOWING_OR_MUCKING,
+                Automation.HAND_KILLING, Automation.CHIPS_PUSHING, Automation.CHIPS_PULLING,
+            ),
+            ante_trimming_status=True, raw_antes=0,
+            raw_blinds_or_straddles=(0.01, 0.02), min_bet=0.02,
+        )
+    return _GAME
+
+
+def run_hand(strategies, verbose=False, track_details=False, deck=None):
+    """Run single hand, return payoffs (or (payoffs, details) if track_details).
+    
+    deck: optional preset deck ('As' strings); seat i gets deck[2i:2i+2],
+    the board is dealt from deck[2n:2n+5].
+    """
     n = len(strategies)
-    state = NoLimitTexasHoldem.create_state(
-        automations=(
-            Automation.ANTE_POSTING, Automation.BET_COLLECTION,
-            Automation.BLIND_OR_STRADDLE_POSTING, Automation.HOLE_CARDS_SHOWING_OR_MUCKING,
-            Automation.HAND_KILLING, Automation.CHIPS_PUSHING, Automation.CHIPS_PULLING,
-        ),
-        ante_trimming_status=True, raw_antes=0,
-        raw_blinds_or_straddles=(0.01, 0.02), min_bet=0.02,
-        raw_starting_stacks=(2.0,) * n, player_count=n,
-    )
+    state = get_game()(raw_starting_stacks=(2.0,) * n, player_count=n)
     
-    deck = [f"{r}{s}" for r in 'AKQJT98765432' for s in 'hdcs']
-    random.shuffle(deck)
+    if deck is None:
+        deck = [f"{r}{s}" for r in 'AKQJT98765432' for s in 'hdcs']
+        random.shuffle(deck)
     for i in range(n):
         state.deal_hole(''.join(deck[i*2:(i+1)*2]))
     
@@ -119,8 +139,8 @@ def run_hand(strategies, verbose=False, track_details=False):
         action, size = strategy_decision(state, idx, strategies[idx], opener == idx, all_strategies=strategies)
         to_call = float(state.checking_or_calling_amount or 0)
         
-        if details:
-            details['actions'].append((idx, strategies[idx], action, to_call, float(state.total_pot_amount)))
+        pot_before = float(state.total_pot_amount)
+        amount = 0.0  # chips put in by this action
         
         if action == 'fold':
             if to_call > 0:
@@ -128,6 +148,7 @@ def run_hand(strategies, verbose=False, track_details=False):
             else:
                 state.check_or_call()
         elif action in ('call', 'check'):
+            amount = min(to_call, float(state.stacks[idx]))
             state.check_or_call()
         elif action in ('raise', 'bet'):
             pot = float(state.total_pot_amount)
@@ -136,106 +157,263 @@ def run_hand(strategies, verbose=False, track_details=False):
             raise_to = max(raise_to, float(min_raise) if min_raise else 0.04)
             raise_to = min(raise_to, 2.0)
             try:
+                amount = raise_to - float(state.bets[idx])
                 state.complete_bet_or_raise_to(raise_to)
                 if opener is None: opener = idx
             except:
+                amount = min(to_call, float(state.stacks[idx]))
                 state.check_or_call()
         else:
+            amount = min(to_call, float(state.stacks[idx]))
             state.check_or_call()
+        
+        if details:
+            details['actions'].append((idx, strategies[idx], action, to_call, pot_before,
+                                       get_street(details['board']), amount))
     
     payoffs = list(state.payoffs)
     return (payoffs, details) if track_details else payoffs
 
 
-def random_5nl_table():
+@contextlib.contextmanager
+def seeded_random(seed):
+    """Seed the module-global RNG (deals and strategy decisions draw from it)
+    for the block, then restore the caller's RNG state. seed None: no-op."""
+    if seed is None:
+        yield
+        return
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+
+
+def random_5nl_table(rng=random):
     """Generate random 5-player table matching real 2NL composition.
     Updated Jan 20 2026 from analyze_table_composition.py:
     Real: 34% fish, 26% nit, 15% rock, 10% lag, 9% tag, 6% maniac
     """
     archetypes = ['fish', 'nit', 'rock', 'lag', 'tag', 'maniac']
     weights = [0.34, 0.26, 0.15, 0.10, 0.09, 0.06]
-    return [random.choices(archetypes, weights)[0] for _ in range(5)]
+    return [rng.choices(archetypes, weights)[0] for _ in range(5)]
 
 
-def simulate(hero, num_hands=1000, show_progress=True):
-    """Run simulation, return BB/100 and detailed stats for hero strategy."""
-    results = []  # per-hand BB results
-    
-    for i in range(num_hands):
-        opponents = random_5nl_table()
-        table = [hero] + opponents
-        random.shuffle(table)
-        hero_idx = table.index(hero)
-        
-        try:
-            payoffs = run_hand(table)
-            bb_result = payoffs[hero_idx] / 0.02  # convert to BB
-            results.append(bb_result)
-        except:
-            pass
-        
-        if show_progress and (i + 1) % 1000 == 0:
-            print(f"  {i + 1}/{num_hands} hands...", flush=True)
-    
-    import statistics
-    hands = len(results)
-    total_bb = sum(results)
+def _new_stats():
+    """Mergeable per-hand BB accumulator (sums instead of a results list)."""
+    return {'hands': 0, 'total_bb': 0.0, 'sumsq': 0.0, 'wins': 0, 'win_bb': 0.0,
+            'losses': 0, 'loss_bb': 0.0, 'max_win': None, 'max_loss': None}
+
+
+def _add_result(acc, bb):
+    acc['hands'] += 1
+    acc['total_bb'] += bb
+    acc['sumsq'] += bb * bb
+    if bb > 0:
+        acc['wins'] += 1
+        acc['win_bb'] += bb
+    elif bb < 0:
+        acc['losses'] += 1
+        acc['loss_bb'] += bb
+    acc['max_win'] = bb if acc['max_win'] is None else max(acc['max_win'], bb)
+    acc['max_loss'] = bb if acc['max_loss'] is None else min(acc['max_loss'], bb)
+
+
+def merge_stats(parts):
+    """Merge accumulators from several workers into one."""
+    acc = _new_stats()
+    for p in parts:
+        for k in ('hands', 'total_bb', 'sumsq', 'wins', 'win_bb', 'losses', 'loss_bb'):
+            acc[k] += p[k]
+        for k, pick in (('max_win', max), ('max_loss', min)):
+            if p[k] is not None:
+                acc[k] = p[k] if acc[k] is None else pick(acc[k], p[k])
+    return acc
+
+
+def summarize(acc):
+    """Accumulator -> the simulate() result dict."""
+    hands = acc['hands']
+    total_bb = acc['total_bb']
     bb100 = (total_bb / hands * 100) if hands else 0
-    
-    # Detailed stats
-    stdev = statistics.stdev(results) if hands > 1 else 0
-    wins = [r for r in results if r > 0]
-    losses = [r for r in results if r < 0]
-    
+    var = (acc['sumsq'] - total_bb * total_bb / hands) / (hands - 1) if hands > 1 else 0
+    stdev = max(var, 0) ** 0.5
     return {
         'hands': hands,
         'bb100': bb100,
         'total_bb': total_bb,
         'stdev': stdev,
         'stdev_100': stdev * 10,  # stdev per 100 hands
-        'win_rate': len(wins) / hands * 100 if hands else 0,
-        'avg_win': sum(wins) / len(wins) if wins else 0,
-        'avg_loss': sum(losses) / len(losses) if losses else 0,
-        'max_win': max(results) if results else 0,
-        'max_loss': min(results) if results else 0,
+        'win_rate': acc['wins'] / hands * 100 if hands else 0,
+        'avg_win': acc['win_bb'] / acc['wins'] if acc['wins'] else 0,
+        'avg_loss': acc['loss_bb'] / acc['losses'] if acc['losses'] else 0,
+        'max_win': acc['max_win'] or 0,
+        'max_loss': acc['max_loss'] or 0,
     }
 
 
-def simulate_disasters(hero, num_hands=1000, top_n=10):
-    """Run simulation and return worst hands with details."""
-    from poker_logic import analyze_hand
-    all_hands = []
+def _simulate_chunk(args):
+    """Play `count` hands for hero and return a stats accumulator."""
+    hero, count, seed, trace_path, show_progress = args
+    acc = _new_stats()
+    trace = TraceWriter(trace_path) if trace_path else None
     
-    for i in range(num_hands):
-        opponents = random_5nl_table()
-        table = [hero] + opponents
+    with seeded_random(seed):
+        for i in range(count):
+            try:
+                if trace:
+                    # Each traced hand gets its own seed so play_seeded_hand can replay it
+                    hand_seed = random.getrandbits(63)
+                    table, hero_idx, payoffs, details = play_seeded_hand(hero, hand_seed, track_details=True)
+                    trace.add_hand(table, details['holes'], details['board'], details['actions'],
+                                   payoffs, hero_idx, seed=hand_seed, bb=0.02)
+                else:
+                    table = [hero] + random_5nl_table()
+                    random.shuffle(table)
+                    hero_idx = table.index(hero)
+                    payoffs = run_hand(table)
+                _add_result(acc, payoffs[hero_idx] / 0.02)  # convert to BB
+            except:
+                pass
+            
+            if show_progress and (i + 1) % 1000 == 0:
+                print(f"  {i + 1}/{count} hands...", flush=True)
+    
+    if trace:
+        trace.close()
+    return acc
+
+
+def simulate(hero, num_hands=1000, show_progress=True, trace_path=None, workers=1, seed=None):
+    """Run simulation, return BB/100 and detailed stats for hero strategy.
+    
+    workers > 1 splits the hands over a process pool; each chunk gets its own
+    seed derived from `seed` and the chunk stats are merged exactly.
+    trace_path: optional hand_trace file to append every hand to (single
+    process only, the trace has one writer), each with its replay seed.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or trace_path:
+        return summarize(_simulate_chunk((hero, num_hands, seed, trace_path, show_progress)))
+    
+    rng = random.Random(seed)
+    chunk = max(250, -(-num_hands // (workers * 4)))
+    jobs = [(hero, min(chunk, num_hands - start), rng.getrandbits(63), None, False)
+            for start in range(0, num_hands, chunk)]
+    parts = []
+    done = 0
+    with ProcessPoolExecutor(workers) as pool:
+        for job, part in zip(jobs, pool.map(_simulate_chunk, jobs)):
+            parts.append(part)
+            done += job[1]
+            if show_progress:
+                print(f"  {done}/{num_hands} hands...", flush=True)
+    return summarize(merge_stats(parts))
+
+
+def play_seeded_hand(hero, seed, track_details=False):
+    """Deal and play one hand from a seed. Same seed -> same table, cards and decisions.
+    
+    Returns (table, hero_idx, payoffs) or (table, hero_idx, payoffs, details).
+    The caller's global RNG state is left as it was.
+    """
+    with seeded_random(seed):
+        table = [hero] + random_5nl_table()
         random.shuffle(table)
         hero_idx = table.index(hero)
-        
-        try:
+        if track_details:
             payoffs, details = run_hand(table, track_details=True)
-            bb = payoffs[hero_idx] / 0.02
-            details['hero_idx'] = hero_idx
-            details['hero_pos'] = get_position(hero_idx, 6)
-            all_hands.append((bb, details))
+            return table, hero_idx, payoffs, details
+        return table, hero_idx, run_hand(table)
+
+
+def _disaster_pass(args):
+    """Payoff-only pass over seeds [start, start+count). Returns (worst, total_bb, hands).
+    
+    worst: up to top_n (bb, seed) pairs with the biggest hero losses.
+    """
+    hero, base_seed, start, count, top_n = args
+    heap = []  # (-bb, seed): heap[0] is the mildest loss kept
+    total_bb = 0.0
+    hands = 0
+    for i in range(start, start + count):
+        seed = (base_seed << 32) + i
+        try:
+            _, hero_idx, payoffs = play_seeded_hand(hero, seed)
         except:
-            pass
-        
-        if (i + 1) % 500 == 0:
-            print(f"  {i + 1}/{num_hands}...", flush=True)
+            continue
+        bb = payoffs[hero_idx] / 0.02
+        total_bb += bb
+        hands += 1
+        if len(heap) < top_n:
+            heapq.heappush(heap, (-bb, seed))
+        elif -bb > heap[0][0]:
+            heapq.heapreplace(heap, (-bb, seed))
+    return [(-nbb, seed) for nbb, seed in heap], total_bb, hands
+
+
+def simulate_disasters(hero, num_hands=1000, top_n=10, trace_path=None, workers=None, seed=None):
+    """Run simulation and return worst hands with details.
     
-    all_hands.sort(key=lambda x: x[0])
+    First pass plays every hand payoffs-only across a process pool, keeping a
+    bounded heap of the top_n worst (bb, seed) per chunk. Only those seeds are
+    replayed with full detail tracking. trace_path appends the replayed
+    disasters (with their seeds) to a hand_trace file.
+    """
+    from poker_logic import analyze_hand
+    base_seed = random.randrange(1 << 31) if seed is None else seed
+    workers = workers or os.cpu_count() or 1
+    chunk = max(500, min(20000, num_hands // (workers * 4) or 1))
+    jobs = [(hero, base_seed, start, min(chunk, num_hands - start), top_n)
+            for start in range(0, num_hands, chunk)]
+    
+    worst = []
+    total = 0.0
+    played = 0
+    done = 0
+    if workers > 1 and len(jobs) > 1:
+        pool = ProcessPoolExecutor(workers)
+        results = pool.map(_disaster_pass, jobs)
+    else:
+        pool = None
+        results = map(_disaster_pass, jobs)
+    try:
+        for job, (chunk_worst, chunk_bb, chunk_hands) in zip(jobs, results):
+            worst = heapq.nsmallest(top_n, worst + chunk_worst)
+            total += chunk_bb
+            played += chunk_hands
+            done += job[3]
+            print(f"  {done}/{num_hands}...", flush=True)
+    finally:
+        if pool:
+            pool.shutdown()
+    
+    # Second pass: replay only the disasters with details
+    all_hands = []
+    trace = TraceWriter(trace_path) if trace_path else None
+    for bb, hand_seed in worst:
+        table, hero_idx, payoffs, details = play_seeded_hand(hero, hand_seed, track_details=True)
+        details['hero_idx'] = hero_idx
+        details['hero_pos'] = get_position(hero_idx, 6)
+        details['seed'] = hand_seed
+        all_hands.append((payoffs[hero_idx] / 0.02, details))
+        if trace:
+            trace.add_hand(table, details['holes'], details['board'], details['actions'],
+                           payoffs, hero_idx, seed=hand_seed, bb=0.02)
+    if trace:
+        trace.close()
     
     print(f"\n{'='*60}")
     print(f"TOP {top_n} DISASTER HANDS ({hero})")
     print(f"{'='*60}\n")
     
-    for i, (bb, d) in enumerate(all_hands[:top_n]):
+    for i, (bb, d) in enumerate(all_hands):
         hero_hole = d['holes'][d['hero_idx']]
         board = d['board']
         hero_actions = [a for a in d['actions'] if a[0] == d['hero_idx']]
         
-        print(f"{i+1}. Lost {abs(bb):.1f} BB | {d['hero_pos']}")
+        print(f"{i+1}. Lost {abs(bb):.1f} BB | {d['hero_pos']} | seed {d['seed']}")
         print(f"   Hole: {' '.join(hero_hole)}")
         print(f"   Board: {' '.join(board) if board else '(preflop)'}")
         if board:
@@ -243,7 +421,7 @@ def simulate_disasters(hero, num_hands=1000, top_n=10):
             print(f"   Final: {analysis['desc']}")
         # Show actions with context
         action_strs = []
-        for idx, strat, act, tc, pot in hero_actions:
+        for idx, strat, act, tc, pot, *_ in hero_actions:
             if tc > 0:
                 action_strs.append(f"{act}(${tc:.2f}/{pot:.2f})")
             else:
@@ -251,8 +429,8 @@ def simulate_disasters(hero, num_hands=1000, top_n=10):
         print(f"   Actions: {' -> '.join(action_strs)}")
         print()
     
-    total = sum(bb for bb, _ in all_hands)
-    print(f"Overall: {total:+.1f} BB ({total/len(all_hands)*100:+.1f} BB/100)")
+    print(f"Overall: {total:+.1f} BB ({total/played*100 if played else 0:+.1f} BB/100)")
+    return all_hands
 
 
 if __name__ == '__main__':
@@ -264,12 +442,27 @@ if __name__ == '__main__':
     if disasters:
         args.remove('--disasters')
     
+    # Parse --trace PATH (append hands to a binary hand trace: every hand, or
+    # with --disasters only the replayed top-N hands)
+    trace_path = None
+    if '--trace' in args:
+        i = args.index('--trace')
+        trace_path = args[i + 1]
+        del args[i:i + 2]
+    
+    # Parse --workers N (process pool size, default: 1 process, 0 = all cores)
+    workers = 1
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    
     num = int(args[0]) if args else 1000
     strat = args[1] if len(args) > 1 else 'value_lord'
     
     if disasters:
         print(f"Running {num} hands, finding disasters for {strat}...\n")
-        simulate_disasters(strat, num)
+        simulate_disasters(strat, num, trace_path=trace_path, workers=workers)
     else:
         strategies = [strat] if strat else ['value_lord', 'kiro_optimal', 'kiro_lord', 'sonnet']
         
@@ -279,7 +472,7 @@ if __name__ == '__main__':
         
         for bot in strategies:
             print(f"\nTesting {bot}...", flush=True)
-            r = simulate(bot, num)
+            r = simulate(bot, num, trace_path=trace_path, workers=workers)
             print(f"\n  === {bot} Results ===")
             print(f"  BB/100:     {r['bb100']:+.2f}")
             print(f"  Total BB:   {r['total_bb']:+.1f}")
@@ -0,0 +1,86 @@
+"""
+Recent-form counters for one player - an exponentially decayed copy of the
+raw stats counters plus a ring buffer of the last WINDOW hands.
+
+Lifetime counters let a player who changed style drag stale history along;
+these two views follow current play. Both update in O(1) per hand / per
+counter bump and hold a fixed amount of state per player:
+
+  decayed  every hand the player is dealt multiplies all counters by DECAY
+           (half-life HALF_LIFE of that player's hands) before adding
+  recent   per-hand counter rows for the last WINDOW hands, with running
+           sums (the oldest row is subtracted when it falls out)
+
+    r = RecentCounters()
+    r.add_hand({'hands': 1, 'vpip': 1, 'pfr': 0, ...})   # one hand's deltas
+    r.counters('recent')                                 # {'hands': 1, ...}
+
+build_player_stats.derive_view turns either view into VPIP/PFR/AF and an
+archetype. to_json()/from_json() are what player_counters.json and the
+player store keep.
+"""
+
+from collections import deque
+from typing import Dict
+
+from player_store import COUNTERS
+
+HALF_LIFE = 200  # player hands until old actions count half
+DECAY = 0.5 ** (1 / HALF_LIFE)
+WINDOW = 100     # hands in the recent ring buffer
+VIEWS = ('lifetime', 'decayed', 'recent')
+
+_INDEX = {k: i for i, k in enumerate(COUNTERS)}
+
+
+class RecentCounters:
+    """Decayed counters and last-WINDOW-hands ring for one player."""
+    __slots__ = ('decayed', 'ring', 'window')
+
+    def __init__(self, window: int = WINDOW):
+        self.decayed = [0.0] * len(COUNTERS)
+        self.ring = deque(maxlen=window)    # per-hand rows, oldest first
+        self.window = [0] * len(COUNTERS)   # sum of ring rows
+
+    def start_hand(self) -> None:
+        """Open a new hand: decay old counts and start a fresh ring row."""
+        self.decayed = [v * DECAY for v in self.decayed]
+        if len(self.ring) == self.ring.maxlen:
+            for i, v in enumerate(self.ring[0]):
+                self.window[i] -= v
+        self.ring.append([0] * len(COUNTERS))
+
+    def add(self, key: str, n: int = 1) -> None:
+        """Add to a counter in the current hand (call start_hand() once per hand first)."""
+        i = _INDEX[key]
+        if not self.ring:
+            self.start_hand()
+        self.decayed[i] += n
+        self.ring[-1][i] += n
+        self.window[i] += n
+
+    def add_hand(self, delta: Dict[str, int]) -> None:
+        """Apply one hand's counter deltas (accumulate_hand output for one player)."""
+        if delta.get('hands'):
+            self.start_hand()
+        for key in COUNTERS:
+            if delta.get(key):
+                self.add(key, delta[key])
+
+    def counters(self, view: str) -> Dict:
+        """Counters dict for the 'decayed' or 'recent' view."""
+        values = self.decayed if view == 'decayed' else self.window
+        return dict(zip(COUNTERS, values))
+
+    def to_json(self) -> Dict:
+        return {'decayed': self.decayed, 'ring': [list(row) for row in self.ring]}
+
+    @classmethod
+    def from_json(cls, data: Dict, window: int = WINDOW) -> 'RecentCounters':
+        r = cls(window)
+        r.decayed = [float(v) for v in data['decayed']]
+        for row in data['ring'][-window:]:
+            r.ring.append(list(row))
+            for i, v in enumerate(row):
+                r.window[i] += v
+        return r
@@ -20,6 +20,18 @@ TESTS = {
         ('Poker Rules (24 tests)', 'python3 test_poker_rules.py', 'All poker rules verified'),
         ('Strategy Audit (30 tests)', 'python3 audit_strategies.py', 'All tests pass'),
         ('Strategy Engine (55 tests)', 'python3 test_strategy_engine.py', None),
+        ('Hand Trace (3 tests)', 'python3 test_hand_trace.py', 'Total: 3/3 tests passed'),
+        ('HH Parser (4 tests)', 'python3 test_hh_parser.py', 'Total: 4/4 tests passed'),
+        ('Hand Cache (3 tests)', 'python3 test_hand_cache.py', 'Total: 3/3 tests passed'),
+        ('Hand Query (2 tests)', 'python3 test_hand_query.py', 'Total: 2/2 tests passed'),
+        ('Player Stats (6 tests)', 'python3 test_player_stats.py', 'Total: 6/6 tests passed'),
+        ('Live Stats (3 tests)', 'python3 test_live_stats.py', 'Total: 3/3 tests passed'),
+        ('Memory Dump (8 tests)', 'python3 test_memory_dump.py', 'Total: 8/8 tests passed'),
+        ('Memory Events (2 tests)', 'python3 test_memory_events.py', 'Total: 2/2 tests passed'),
+        ('Memory Synth (2 tests)', 'python3 test_memory_synth.py', 'Total: 2/2 tests passed'),
+        ('PokerKit Adapter (2 tests)', 'python3 test_pokerkit_adapter.py', 'Total: 2/2 tests passed'),
+        ('Engine Crosscheck (4 tests)', 'python3 test_engine_crosscheck.py', 'Total: 4/4 tests passed'),
+        ('Strategy Eval Cache (2 tests)', 'python3 test_strategy_eval.py', 'Total: 2/2 tests passed'),
     ],
     'extended': [
         ('Postflop value_lord', 'python3 test_postflop.py value_lord', None),
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Cross-engine harness tests - paired z-test and McNemar test on hand-computed
+vectors (discordant cutoff, Bonferroni threshold), hand_metrics on a built
+details dict, one deal played through both engines with the same cards per
+seat, and seeded crosscheck() runs that repeat.
+Usage: python3 test_engine_crosscheck.py
+"""
+
+import contextlib
+import io
+import math
+import random
+
+import engine_crosscheck as ec
+from poker_logic import STRATEGIES
+from poker_sim import simulate_hand, Player
+from pokerkit_adapter import run_hand
+
+HERO = 'value_lord'
+
+
+def _close(a, b):
+    return abs(a - b) < 1e-9
+
+
+def test_paired_tests():
+    print("=" * 60)
+    print("TEST: PAIRED Z-TEST AND MCNEMAR ON HAND-COMPUTED VECTORS")
+    print("=" * 60)
+    # d = [1, 2, 3, 4]: mean 2.5, sample var 5/3, se sqrt(5/12)
+    mx, my, z, p = ec.paired_mean_test([1, 2, 3, 4], [0, 0, 0, 0])
+    z_exp = 2.5 / math.sqrt(5 / 12)
+    ok_paired = _close(mx, 2.5) and _close(my, 0) and _close(z, z_exp) and \
+        _close(p, math.erfc(z_exp / math.sqrt(2)))
+    mx, my, z, p = ec.paired_mean_test([3, 5, 7], [2, 4, 6])   # constant difference: no variance
+    ok_paired &= (mx, my, z, p) == (5, 4, 0.0, 1.0)
+
+    # b = 12 (x only), c = 4 (y only), 4 concordant pairs: z = 8 / sqrt(16) = 2
+    xs = [True] * 12 + [False] * 4 + [True, True, False, False]
+    ys = [False] * 12 + [True] * 4 + [True, True, False, False]
+    rx, ry, z, p = ec.mcnemar_test(xs, ys)
+    ok_mcnemar = _close(rx, 14 / 20) and _close(ry, 6 / 20) and _close(z, 2.0) and \
+        _close(p, math.erfc(2 / math.sqrt(2)))
+    # b + c = 9 < MIN_DISCORDANT: no verdict however lopsided
+    rx, ry, z, p = ec.mcnemar_test([True] * 9 + [False], [False] * 10)
+    ok_cutoff = ec.MIN_DISCORDANT == 10 and (z, p) == (0.0, 1.0) and _close(rx, 0.9) and ry == 0
+    rx, ry, z, p = ec.mcnemar_test([True] * 10, [False] * 10)
+    ok_cutoff &= _close(z, math.sqrt(10))
+
+    # compare(): unfinished deals dropped, BB and rates scaled to per-100 / percent
+    sim = [(1.0, True, False, True), None, (-1.0, False, False, False), (2.0, True, True, False)]
+    pk = [(0.0, True, False, False), (5.0, True, True, True), (-2.0, False, False, False), None]
+    rep = ec.compare(sim, pk)
+    ok_compare = rep['deals'] == 2 and rep['bb100'][:2] == (0.0, -100.0) and \
+        rep['vpip'][:2] == (50.0, 50.0) and rep['wtsd'][:2] == (50.0, 0.0)
+    print(f"  Paired z-test == hand-computed z and p: {'PASS' if ok_paired else 'FAIL'}")
+    print(f"  McNemar b=12 c=4 -> z=2: {'PASS' if ok_mcnemar else 'FAIL'}")
+    print(f"  McNemar needs {ec.MIN_DISCORDANT} discordant pairs: {'PASS' if ok_cutoff else 'FAIL'}")
+    print(f"  compare() pairs completed deals only: {'PASS' if ok_compare else 'FAIL'}")
+    return ok_paired and ok_mcnemar and ok_cutoff and ok_compare
+
+
+def test_hand_metrics():
+    print("\n" + "=" * 60)
+    print("TEST: HAND_METRICS ON BUILT DETAILS")
+    print("=" * 60)
+    # (seat, strategy, action, to_call, pot, street, amount)
+    limp_call_showdown = {'board': ['Ah', 'Kd', '7c', '2s', '9h'], 'actions': [
+        (2, 'fish', 'call', 0.02, 0.03, 'preflop', 0.02),
+        (3, 'nit', 'raise', 0.02, 0.05, 'preflop', 0.10),
+        (0, 'fish', 'fold', 0.01, 0.15, 'preflop', 0.0),
+        (1, 'tag', 'fold', 0.08, 0.15, 'preflop', 0.0),
+        (2, 'fish', 'call', 0.08, 0.15, 'preflop', 0.08),
+        (2, 'fish', 'check', 0.0, 0.23, 'flop', 0.0),
+        (3, 'nit', 'check', 0.0, 0.23, 'flop', 0.0),
+        (2, 'fish', 'fold', 0.0, 0.23, 'turn', 0.0),   # fold with nothing to call is a check
+        (3, 'nit', 'check', 0.0, 0.23, 'turn', 0.0),
+    ]}
+    ok_limp = ec.hand_metrics(limp_call_showdown, 2, -5.0) == (-5.0, True, False, True) and \
+        ec.hand_metrics(limp_call_showdown, 0, -0.5) == (-0.5, False, False, False)
+
+    raise_fold_turn = {'board': ['Ah', 'Kd', '7c', '2s'], 'actions': [
+        (2, 'value_lord', 'raise', 0.02, 0.03, 'preflop', 0.06),
+        (5, 'lag', 'call', 0.06, 0.09, 'preflop', 0.06),
+        (2, 'value_lord', 'bet', 0.0, 0.15, 'flop', 0.10),
+        (5, 'lag', 'raise', 0.10, 0.25, 'flop', 0.30),
+        (2, 'value_lord', 'call', 0.20, 0.55, 'flop', 0.20),
+        (2, 'value_lord', 'check', 0.0, 0.75, 'turn', 0.0),
+        (5, 'lag', 'bet', 0.0, 0.75, 'turn', 0.50),
+        (2, 'value_lord', 'fold', 0.50, 1.25, 'turn', 0.0),
+    ]}
+    ok_raise = ec.hand_metrics(raise_fold_turn, 2, -18.0) == (-18.0, True, True, False) and \
+        ec.hand_metrics(raise_fold_turn, 5, 18.0) == (18.0, True, False, False)   # no river, no showdown
+
+    # A preflop "raise" capped to a call (amount == to_call) is not a PFR
+    capped = {'board': [], 'actions': [(4, 'fish', 'raise', 0.06, 0.09, 'preflop', 0.06)]}
+    ok_capped = ec.hand_metrics(capped, 4, 0.0) == (0.0, True, False, False)
+    print(f"  Limp-call, checked down -> VPIP, WTSD: {'PASS' if ok_limp else 'FAIL'}")
+    print(f"  Raise, fold turn -> VPIP, PFR, no WTSD: {'PASS' if ok_raise else 'FAIL'}")
+    print(f"  Raise for a call only is not PFR: {'PASS' if ok_capped else 'FAIL'}")
+    return ok_limp and ok_raise and ok_capped
+
+
+def test_same_deal():
+    print("\n" + "=" * 60)
+    print("TEST: ONE DEAL THROUGH BOTH ENGINES")
+    print("=" * 60)
+    ok_holes = ok_board = ok_seats = True
+    rivers = 0
+    for seed in range(20):
+        table, deck = ec.make_deal(HERO, seed)
+        again = ec.make_deal(HERO, seed)
+        ok_holes &= (table, deck) == again and len(table) == 6 and sorted(deck) == sorted(ec.DECK)
+
+        players = []
+        for i, strat in enumerate(table):
+            p = Player(f"{strat}_{i}", STRATEGIES.get(strat, STRATEGIES['value_lord']))
+            p.base_strategy = strat
+            players.append(p)
+        random.seed(seed)
+        sim = {}
+        simulate_hand(players, ec.SIM_DEALER_POS, sim, deck=[(c[0], c[1]) for c in reversed(deck)])
+        random.seed(seed)
+        _, pk = run_hand(table, track_details=True, deck=deck)
+
+        sim_holes = [[r + s for r, s in p.cards] for p in players]
+        ok_holes &= sim_holes == pk['holes'] == [deck[2 * i:2 * i + 2] for i in range(6)]
+        sim_board = [r + s for r, s in sim['board']]
+        ok_board &= sim_board == deck[12:12 + len(sim_board)] and pk['board'] == deck[12:12 + len(pk['board'])]
+        rivers += len(sim_board) == len(pk['board']) == 5
+        # SIM_DEALER_POS: seat 0 SB, seat 1 BB, so UTG (seat 2) acts first in both
+        ok_seats &= sim['actions'][0][0] == pk['actions'][0][0] == 2
+    ok_board &= rivers > 0
+    print(f"  Same hole cards per seat (20 deals): {'PASS' if ok_holes else 'FAIL'}")
+    print(f"  Same board, {rivers} deals reach the river in both: {'PASS' if ok_board else 'FAIL'}")
+    print(f"  Seat mapping: UTG is seat 2 in both engines: {'PASS' if ok_seats else 'FAIL'}")
+    return ok_holes and ok_board and ok_seats
+
+
+def test_seeded_crosscheck():
+    print("\n" + "=" * 60)
+    print("TEST: SEEDED CROSSCHECK REPEATS")
+    print("=" * 60)
+    runs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for workers in (1, 2):
+            r = ec.crosscheck(HERO, 200, workers=workers, batch=100, seed=5, stop_early=False)
+            runs.append({k: v for k, v in r.items() if k not in ('wall', 'throughput')})
+    ok_repeat = runs[0] == runs[1] and runs[0]['deals'] > 190
+    ok_threshold = _close(runs[0]['threshold'], 0.01 / (2 * len(ec.METRICS)))   # 2 looks x 4 metrics
+    print(f"  Same numbers single-process and pooled: {'PASS' if ok_repeat else 'FAIL'}")
+    print(f"  Bonferroni threshold = alpha / (looks x metrics): {'PASS' if ok_threshold else 'FAIL'}")
+    return ok_repeat and ok_threshold
+
+
+if __name__ == '__main__':
+    results = [
+        ("Paired Tests", test_paired_tests()),
+        ("Hand Metrics", test_hand_metrics()),
+        ("Same Deal", test_same_deal()),
+        ("Seeded Crosscheck", test_seeded_crosscheck()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Parsed hand cache tests - equality with the parser, incremental updates, filters.
+Usage: python3 test_hand_cache.py
+"""
+
+import os
+import tempfile
+
+import hh_parser
+from hand_cache import HandCache
+from test_hh_parser import SAMPLE
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_matches_parser():
+    print("=" * 60)
+    print("TEST: MATCHES PARSER")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        hh = os.path.join(tmp, 'hh')
+        os.mkdir(hh)
+        _write(os.path.join(hh, 'HH a.txt'), SAMPLE)
+        _write(os.path.join(hh, 'HH b.txt'), SAMPLE.replace('#2540000000', '#2540000009'))
+        expected = list(hh_parser.iter_hands(hh))
+        with HandCache(os.path.join(tmp, 'cache.db')) as cache:
+            cache.update(hh)
+            got = list(cache.iter_hands(hh))
+    ok = got == expected and len(got) == 4
+    print(f"  {len(got)} cached hands equal parsed hands: {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def test_incremental():
+    print("\n" + "=" * 60)
+    print("TEST: INCREMENTAL UPDATE")
+    print("=" * 60)
+    first, second = SAMPLE.split('\n\n\n')
+    with tempfile.TemporaryDirectory() as tmp:
+        hh = os.path.join(tmp, 'hh')
+        os.mkdir(hh)
+        a, b = os.path.join(hh, 'HH a.txt'), os.path.join(hh, 'HH b.txt')
+        _write(a, first)
+        _write(b, SAMPLE.replace('#2540000000', '#2540000009'))
+        db = os.path.join(tmp, 'cache.db')
+        with HandCache(db) as cache:
+            runs = [cache.update(hh)]
+        with HandCache(db) as cache:
+            runs.append(cache.update(hh))
+            _write(a, first + '\n\n\n' + second)     # session grew
+            os.remove(b)
+            runs.append(cache.update(hh))
+            ids = [h.hand_id for h in cache.iter_hands(hh)]
+            total = cache.count()
+    ok_counts = runs == [(2, 0), (0, 2), (1, 0)]
+    ok_ids = ids == [254000000001, 254000000002] and total == 2
+    print(f"  (parsed, cached) per run {runs}: {'PASS' if ok_counts else 'FAIL'}")
+    print(f"  Changed file re-parsed, deleted file dropped: {'PASS' if ok_ids else 'FAIL'}")
+    return ok_counts and ok_ids
+
+
+def test_filters():
+    print("\n" + "=" * 60)
+    print("TEST: INDEXED FILTERS")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'HH a.txt')
+        _write(path, SAMPLE)
+        with HandCache(os.path.join(tmp, 'cache.db')) as cache:
+            cache.update(path)
+            by_player = [h.hand_id for h in cache.iter_hands(path, player='rock solid')]
+            by_pos = [h.hand_id for h in cache.iter_hands(path, player='idealistslp', position='BTN')]
+            by_bb = list(cache.iter_hands(path, bb=0.10))
+    ok = by_player == [254000000001] and by_pos == [254000000002] and by_bb == []
+    print(f"  player / position / stakes: {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+if __name__ == '__main__':
+    results = [
+        ("Matches Parser", test_matches_parser()),
+        ("Incremental Update", test_incremental()),
+        ("Indexed Filters", test_filters()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
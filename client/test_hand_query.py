@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Hand query engine tests - indexed filters, ranges and aggregations return
+the same hands (same order) and totals as list comprehensions.
+Usage: python3 test_hand_query.py
+"""
+
+import random
+
+from hand_query import HandIndex, hand_class
+
+POSITIONS = ['UTG', 'MP', 'CO', 'BTN', 'SB', 'BB']
+HANDS = ['AA', '72o', 'AKs', 'T9s', 'KJo', '55']
+ACTIONS = [None, 'fold', 'call', 'raise']
+
+
+def _random_hands(n, seed=5):
+    rng = random.Random(seed)
+    hands = []
+    for i in range(n):
+        bb = rng.choice([0.05, 0.10, 0.25])
+        board = rng.choice([[], ['Ah', 'Kd', '2c'], ['Ah', 'Kd', '2c', '3s', '9h']])
+        postflop = [{'street': s, 'action': rng.choice(['bet', 'check', 'call', 'villain_bet', 'fold']),
+                     'amount': 0.1} for s in ('flop', 'turn', 'river')[:max(0, len(board) - 2)]
+                    if rng.random() < 0.7]
+        profit = rng.choice([0.0, round(rng.uniform(-30, 30) * bb, 2)])
+        hands.append({'hand_id': 1000 + i, 'bb': bb, 'hero_position': rng.choice(POSITIONS),
+                      'hand_str': rng.choice(HANDS), 'board': board, 'postflop_actions': postflop,
+                      'hero_preflop_action': rng.choice(ACTIONS), 'num_opponents_at_flop': rng.randint(1, 4),
+                      'hero_profit': profit, 'profit_bb': profit / bb})
+    return hands
+
+
+def _flop_action(h):
+    return next((a['action'] for a in h['postflop_actions']
+                 if a['street'] == 'flop' and not a['action'].startswith('villain_')), None)
+
+
+def test_filters_match_scan():
+    print("=" * 60)
+    print("TEST: FILTERS == LIST COMPREHENSIONS")
+    print("=" * 60)
+    hands = _random_hands(2000)
+    idx = HandIndex(hands)
+    rng = random.Random(1)
+    ok_where = ok_ops = True
+    for _ in range(200):
+        pos = tuple(rng.sample(POSITIONS, rng.randint(1, 3)))
+        bb = rng.choice([0.05, 0.10, 0.25])
+        cls = rng.choice(['pair', 'suited', 'offsuit'])
+        flop = rng.choice(['bet', 'check', None])
+        min_bb = rng.choice([0, 5, 10, 20])
+        q = idx.where(position=pos, bb=bb).where(hand_class=cls, flop=flop) & idx.swing(min_bb)
+        expected = [h for h in hands if h['hero_position'] in pos and h['bb'] == bb and hand_class(h) == cls
+                    and _flop_action(h) == flop and abs(h['profit_bb']) >= min_bb]
+        ok_where &= q.hands() == expected and len(q) == len(expected)
+
+        played = idx.where(played=True)
+        either = ~played | idx.where(position=pos)
+        expected = [h for h in hands if h['hero_preflop_action'] in (None, 'fold') or h['hero_position'] in pos]
+        ok_ops &= either.hands() == expected
+    lo, hi = -3.5, 7.25
+    ok_range = idx.between('profit_bb', lo, hi).hands() == [h for h in hands if lo <= h['profit_bb'] <= hi]
+    print(f"  where()/swing() == scan (200 random queries): {'PASS' if ok_where else 'FAIL'}")
+    print(f"  ~ and | compose: {'PASS' if ok_ops else 'FAIL'}")
+    print(f"  between() inclusive bounds: {'PASS' if ok_range else 'FAIL'}")
+    return ok_where and ok_ops and ok_range
+
+
+def test_aggregations():
+    print("\n" + "=" * 60)
+    print("TEST: GROUP BY / SUMMARY")
+    print("=" * 60)
+    hands = _random_hands(1500, seed=9)
+    idx = HandIndex(hands, {'seat_group': lambda h: 'blinds' if h['hero_position'] in ('SB', 'BB') else 'field'})
+    groups = idx.where(saw_flop=True).group_by('opponents_at_flop')
+    ok_groups = all(g.hands() == [h for h in hands if h['board'] and h['num_opponents_at_flop'] == n]
+                    for n, g in groups.items()) and sorted(groups) == [1, 2, 3, 4]
+    ok_summary = True
+    for value, g in idx.all().group_by('seat_group').items():
+        sel = [h for h in hands if (h['hero_position'] in ('SB', 'BB')) == (value == 'blinds')]
+        profit_bb = sum(h['profit_bb'] for h in sel)
+        ok_summary &= g.summary() == {'hands': len(sel), 'profit': sum(h['hero_profit'] for h in sel),
+                                      'profit_bb': profit_bb, 'bb_100': profit_bb / len(sel) * 100}
+    buckets = idx.all().group_by('profit_bucket')
+    ok_buckets = sum(len(g) for g in buckets.values()) == len(hands) and \
+        all(abs(h['profit_bb']) >= 20 for h in buckets['big_loss']) and \
+        all(h['profit_bb'] == 0 for h in buckets['even'])
+    print(f"  group_by(opponents_at_flop) == scan: {'PASS' if ok_groups else 'FAIL'}")
+    print(f"  summary() totals (custom field) == scan: {'PASS' if ok_summary else 'FAIL'}")
+    print(f"  Profit buckets partition hands: {'PASS' if ok_buckets else 'FAIL'}")
+    return ok_groups and ok_summary and ok_buckets
+
+
+if __name__ == '__main__':
+    results = [
+        ("Filters == Scan", test_filters_match_scan()),
+        ("Aggregations", test_aggregations()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
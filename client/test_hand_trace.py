@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Hand trace format tests - round trip (no unseen board cards), loss filter,
+index rebuild, append.
+Usage: python3 test_hand_trace.py
+"""
+
+import os
+import random
+import tempfile
+
+from hand_trace import TraceWriter, TraceReader, filter_hands, read_index
+from poker_sim import simulate_hand, Player
+from poker_logic import STRATEGIES
+
+
+def _sim_hands(n, seed=7):
+    """Run n poker_sim hands, return list of (strategies, holes, details, payoffs)."""
+    random.seed(seed)
+    strats = ['fish', 'nit', 'tag', 'lag', 'maniac', 'the_lord']
+    players = []
+    for s in strats:
+        p = Player(s, STRATEGIES[s])
+        p.base_strategy = s
+        players.append(p)
+    hands = []
+    for i in range(n):
+        before = [p.profit for p in players]
+        details = {}
+        simulate_hand(players, i % 6, details)
+        hands.append((strats, [p.cards for p in players], details,
+                      [p.profit - b for p, b in zip(players, before)]))
+    return hands
+
+
+def _write(path, hands, block_hands=64):
+    with TraceWriter(path, block_hands=block_hands) as w:
+        for strats, holes, d, pay in hands:
+            w.add_hand(strats, holes, d['board'], d['actions'], pay, hero_idx=5)
+
+
+def test_round_trip():
+    print("=" * 60)
+    print("TEST: ROUND TRIP")
+    print("=" * 60)
+    hands = _sim_hands(300)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sim.oxt')
+        _write(path, hands)
+        got = list(TraceReader(path).iter_hands())
+    ok = len(got) == len(hands)
+    for (strats, holes, d, pay), h in zip(hands, got):
+        ok = ok and h['strategies'] == strats
+        ok = ok and h['holes'] == [[r + s for r, s in hole] for hole in holes]
+        ok = ok and h['board'] == [r + s for r, s in d['board']]
+        ok = ok and all(abs(a - b) < 0.006 for a, b in zip(h['payoffs'], pay))
+        ok = ok and [a[:3] for a in h['actions']] == [a[:3] for a in d['actions']]
+        ok = ok and [a[5] for a in h['actions']] == [a[5] for a in d['actions']]
+
+    # A hand won by folds shows only the board of the street it ended on
+    street_cards = {'preflop': 0, 'flop': 3, 'turn': 4, 'river': 5}
+    ok_board = True
+    folded_out = 0
+    for strats, holes, d, pay in hands:
+        folded = {a[0] for a in d['actions'] if a[2] == 'fold'}
+        if d['board'] and len(set(range(6)) - folded) == 1:
+            folded_out += 1
+            ok_board &= len(d['board']) == street_cards[d['actions'][-1][5]]
+    ok_board &= folded_out > 0
+    print(f"  {len(got)} hands decoded: {'PASS' if ok else 'FAIL'}")
+    print(f"  Folded-out hands trace no unseen board cards ({folded_out}): {'PASS' if ok_board else 'FAIL'}")
+    return ok and ok_board
+
+
+def test_loss_filter():
+    print("\n" + "=" * 60)
+    print("TEST: LOSS FILTER")
+    print("=" * 60)
+    hands = _sim_hands(600, seed=11)
+    expected = [i for i, (s, _, _, pay) in enumerate(hands) if pay[5] <= -20]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sim.oxt')
+        _write(path, hands)
+        got = [h['hand_no'] for h in filter_hands(path, 'the_lord', 20)]
+        none = list(filter_hands(path, 'value_max', 1))
+    ok = got == expected and none == []
+    print(f"  the_lord lost 20+ BB: {len(got)} hands (expected {len(expected)}): {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def test_index_rebuild_and_append():
+    print("\n" + "=" * 60)
+    print("TEST: INDEX REBUILD + APPEND")
+    print("=" * 60)
+    hands = _sim_hands(200, seed=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sim.oxt')
+        _write(path, hands[:130])
+        _write(path, hands[130:])
+        blocks = read_index(path)
+        os.remove(path + '.idx')
+        rebuilt = read_index(path)
+        nums = [h['hand_no'] for h in TraceReader(path).iter_hands()]
+    ok_index = blocks == rebuilt
+    ok_append = nums == list(range(200))
+    print(f"  Sidecar index matches rebuilt index: {'PASS' if ok_index else 'FAIL'}")
+    print(f"  Appended run continues numbering: {'PASS' if ok_append else 'FAIL'}")
+    return ok_index and ok_append
+
+
+if __name__ == '__main__':
+    results = [
+        ("Round Trip", test_round_trip()),
+        ("Loss Filter", test_loss_filter()),
+        ("Index Rebuild + Append", test_index_rebuild_and_append()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
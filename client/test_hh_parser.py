@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Hand history parser tests - fields, profit accounting, streaming split, parallel ingestion.
+Usage: python3 test_hh_parser.py
+"""
+
+import os
+import tempfile
+
+import hh_parser
+
+SAMPLE = """\
+PokerStars Zoom Hand #254000000001:  Hold'em No Limit (€0.02/€0.05) - 2026/01/10 12:00:00 CET [2026/01/10 6:00:00 ET]
+Table 'Asterope' 6-max Seat #1 is the button
+Seat 1: fishy_joe (€5 in chips)
+Seat 2: NicSticker (€4.87 in chips)
+Seat 3: idealistslp (€5.12 in chips)
+Seat 4: rock solid (€6.40 in chips)
+Seat 5: LagMonster (€5.55 in chips)
+Seat 6: nitwit99 (€2.10 in chips)
+NicSticker: posts small blind €0.02
+idealistslp: posts big blind €0.05
+*** HOLE CARDS ***
+Dealt to idealistslp [Ah Kd]
+rock solid: folds
+LagMonster: raises €0.10 to €0.15
+nitwit99: folds
+fishy_joe: calls €0.15
+NicSticker: folds
+idealistslp: raises €0.45 to €0.60
+LagMonster: calls €0.45
+fishy_joe: calls €0.45
+*** FLOP *** [Ac 7d 2h]
+idealistslp: bets €0.90
+LagMonster: raises €1.80 to €2.70
+fishy_joe: folds
+idealistslp: calls €1.80
+*** TURN *** [Ac 7d 2h] [Js]
+idealistslp: checks
+LagMonster: bets €1.50
+idealistslp: calls €1.50
+*** RIVER *** [Ac 7d 2h Js] [4c]
+idealistslp: checks
+LagMonster: bets €0.75 and is all-in
+idealistslp: calls €0.75
+*** SHOW DOWN ***
+LagMonster: shows [7s 7c] (three of a kind, Sevens)
+idealistslp: shows [Ah Kd] (a pair of Aces)
+LagMonster collected €11.52 from pot
+*** SUMMARY ***
+Total pot €12.02 | Rake €0.50
+Board [Ac 7d 2h Js 4c]
+Seat 1: fishy_joe (button) folded on the Flop
+Seat 2: NicSticker (small blind) folded before Flop
+Seat 3: idealistslp (big blind) showed [Ah Kd] and lost with a pair of Aces
+Seat 4: rock solid folded before Flop (didn't bet)
+Seat 5: LagMonster showed [7s 7c] and won (€11.52) with three of a kind, Sevens
+Seat 6: nitwit99 folded before Flop (didn't bet)
+
+
+
+PokerStars Zoom Hand #254000000002:  Hold'em No Limit (€0.02/€0.05) - 2026/01/10 12:01:00 CET [2026/01/10 6:01:00 ET]
+Table 'Asterope' 6-max Seat #1 is the button
+Seat 1: idealistslp (€5 in chips)
+Seat 2: NicSticker (€4.85 in chips)
+Seat 3: nitwit99 (€2.10 in chips)
+Seat 4: fishy_joe (€3.00 in chips)
+NicSticker: posts small blind €0.02
+nitwit99: posts big blind €0.05
+*** HOLE CARDS ***
+Dealt to idealistslp [9s 9h]
+fishy_joe: calls €0.05
+idealistslp: raises €0.15 to €0.20
+NicSticker: folds
+nitwit99: folds
+fishy_joe: calls €0.15
+*** FLOP *** [Kd 8c 3s]
+fishy_joe: checks
+idealistslp: bets €0.30
+fishy_joe: folds
+Uncalled bet (€0.30) returned to idealistslp
+idealistslp collected €0.45 from pot
+idealistslp: doesn't show hand
+*** SUMMARY ***
+Total pot €0.47 | Rake €0.02
+Board [Kd 8c 3s]
+Seat 1: idealistslp (button) collected (€0.45)
+Seat 2: NicSticker (small blind) folded before Flop
+Seat 3: nitwit99 (big blind) folded before Flop
+Seat 4: fishy_joe folded on the Flop
+"""
+
+
+def test_fields():
+    print("=" * 60)
+    print("TEST: HAND FIELDS")
+    print("=" * 60)
+    hand = hh_parser.parse_hand_text(SAMPLE.split('\n\n\n')[0])
+    ok = (hand.hand_id == 254000000001 and hand.zoom and hand.bb == 0.05
+          and hand.table == 'Asterope' and hand.button == 1)
+    ok = ok and hh_parser.players(hand) == ['fishy_joe', 'NicSticker', 'idealistslp',
+                                            'rock solid', 'LagMonster', 'nitwit99']
+    ok = ok and hand.hero_cards == ('Ah', 'Kd') and hand.board == ['Ac', '7d', '2h', 'Js', '4c']
+    ok = ok and hand.flop_players == ['fishy_joe', 'idealistslp', 'LagMonster']
+    raisers, callers = hh_parser.preflop_actors(hand)
+    ok = ok and raisers == {'LagMonster', 'idealistslp'} and callers == {'LagMonster', 'fishy_joe'}
+    ok = ok and hh_parser.position(hand, 'idealistslp') == 'BB'
+    allin = [a for a in hand.actions if a.all_in]
+    ok = ok and len(allin) == 1 and allin[0].player == 'LagMonster' and allin[0].street == 'river'
+    print(f"  Header, seats, cards, board, actions: {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def test_profit():
+    print("\n" + "=" * 60)
+    print("TEST: PROFIT")
+    print("=" * 60)
+    lost, won = [hh_parser.parse_hand_text(t) for t in SAMPLE.split('\n\n\n')]
+    # Showdown loss: 0.60 preflop + 2.70 flop + 1.50 turn + 0.75 river
+    ok_loss = abs(hh_parser.profit(lost, 'idealistslp') + 5.55) < 1e-9
+    # Uncontested win: 0.20 + 0.30 - 0.30 returned, collected 0.45
+    ok_win = abs(hh_parser.profit(won, 'idealistslp') - 0.25) < 1e-9
+    print(f"  Showdown loss -5.55: {'PASS' if ok_loss else 'FAIL'}")
+    print(f"  Uncalled bet + collected +0.25: {'PASS' if ok_win else 'FAIL'}")
+    return ok_loss and ok_win
+
+
+def test_streaming_split():
+    print("\n" + "=" * 60)
+    print("TEST: STREAMING SPLIT")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        # BOM, CRLF line endings and no blank lines between hands
+        path = os.path.join(tmp, 'HH test.txt')
+        with open(path, 'w', encoding='utf-8-sig', newline='\r\n') as f:
+            f.write(SAMPLE.replace('\n\n\n', '\n') * 3)
+        hands = list(hh_parser.iter_hands(tmp, prefix='HH'))
+        skipped = list(hh_parser.iter_hands(tmp, prefix='XX'))
+    ids = [h.hand_id for h in hands]
+    ok = ids == [254000000001, 254000000002] * 3 and skipped == []
+    ok = ok and all(h.source == path for h in hands)
+    print(f"  {len(hands)} hands streamed: {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def test_parallel_ingestion():
+    print("\n" + "=" * 60)
+    print("TEST: PARALLEL INGESTION")
+    print("=" * 60)
+    first, second = SAMPLE.split('\n\n\n')
+    with tempfile.TemporaryDirectory() as tmp:
+        # Later hand in the first file so hand_id order differs from file order
+        for i, text in enumerate([second, first, SAMPLE.replace('#2540000000', '#2540000009')]):
+            with open(os.path.join(tmp, f'HH {i}.txt'), 'w', encoding='utf-8') as f:
+                f.write(text)
+        serial = sorted(hh_parser.iter_hands(tmp), key=lambda h: h.hand_id)
+        parallel = list(hh_parser.iter_hands_parallel(tmp, workers=2))
+        single = list(hh_parser.iter_hands_parallel(tmp, workers=1))
+    ok = parallel == serial == single and len(parallel) == 4
+    ok = ok and [h.hand_id for h in parallel] == sorted(h.hand_id for h in parallel)
+    print(f"  2 workers == serial, ordered by hand_id: {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+if __name__ == '__main__':
+    results = [
+        ("Hand Fields", test_fields()),
+        ("Profit", test_profit()),
+        ("Streaming Split", test_streaming_split()),
+        ("Parallel Ingestion", test_parallel_ingestion()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
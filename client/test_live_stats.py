@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Live stats tests - memory action stream counters match build_player_stats
+counting, repeated buffer polls are deduped by (hand_id, seq), background
+flush adds deltas onto the player store and rebuilds keep live-only hands,
+late SEATED names (stream retries) still attribute the seat's actions.
+Usage: python3 test_live_stats.py
+"""
+
+import os
+import random
+import tempfile
+
+import build_player_stats as bps
+import live_stats
+import player_store
+
+NAMES = ['fishy_joe', 'NicSticker', 'rock solid', 'LagMonster', 'nitwit99', 'idealistslp']
+CODES = {verb: code for code, verb in live_stats.VERBS.items()}
+
+
+def _random_hands(n, seed=3):
+    """Stats-input hands plus the memory buffer entries describing each one."""
+    rng = random.Random(seed)
+    hands, buffers = [], []
+    for i in range(n):
+        seated = rng.sample(NAMES, rng.randint(3, 6))
+        preflop = [(p, rng.choice(['folds', 'calls', 'raises', 'checks'])) for p in seated]
+        # Limpers / callers sometimes act again when the action comes back round
+        preflop += [(p, rng.choice(['folds', 'calls', 'raises'])) for p, v in preflop
+                    if v in ('calls', 'checks') and rng.random() < 0.4]
+        postflop = [(p, rng.choice(['checks', 'bets', 'calls', 'raises', 'folds']), 'flop')
+                    for p in seated if rng.random() < 0.4]
+        hand_id = 5000 + i
+        hands.append({'hand_id': hand_id, 'players': {p: {'seat': k, 'stack': 5.0} for k, p in enumerate(seated)},
+                      'preflop_actions': preflop, 'postflop_actions': postflop})
+
+        seat_of = {p: k for k, p in enumerate(seated)}
+        rows = [(0x0A, 0, 0, None)]
+        rows += [(0x02, k, 0, p) for k, p in enumerate(seated)]
+        rows += [(0x01, 1, 0x70, None), (0x01, 2, 0x50, None)]   # blinds are not counted
+        rows += [(0x01, seat_of[p], CODES[v], None) for p, v in preflop]
+        rows.append((0x05, 0, 0, None))
+        rows += [(0x01, seat_of[p], CODES[v], None) for p, v, _ in postflop]
+        rows.append((0x06, 0, 0x77, None))
+        buffers.append([{'hand_id': hand_id, 'seq': seq, 'msg_type': t, 'seat': s,
+                         'action_code': c, 'amount': 0, 'name': name}
+                        for seq, (t, s, c, name) in enumerate(rows)])
+    return hands, buffers
+
+
+def _expected(hands):
+    counters = {}
+    for h in hands:
+        bps.accumulate_hand(counters, h)
+    return {p: {k: c[k] for k in player_store.COUNTERS} for p, c in counters.items()}
+
+
+def test_stream_matches_recount():
+    print("=" * 60)
+    print("TEST: STREAM COUNTERS == RECOUNT (with repeated polls)")
+    print("=" * 60)
+    hands, buffers = _random_hands(300)
+    tracker = live_stats.LiveStatsTracker(store_path=None)
+    applied = 0
+    for entries in buffers:
+        # The poll re-reads the whole buffer as it grows
+        for end in range(1, len(entries) + 1, 3):
+            applied += tracker.feed(entries[:end])
+        applied += tracker.feed(entries)
+    expected = _expected(hands)
+    ok_counts = {p: c for p, c in tracker.totals.items()} == expected
+    ok_dedupe = applied == sum(len(e) for e in buffers) and tracker.feed(buffers[-1]) == 0
+    ok_derived = all(tracker.player_stats(p) == bps.derive_player(c) for p, c in expected.items())
+    state = bps.new_counter_state()
+    bps.apply_hands(state, hands)
+    ok_recent = all(tracker.player_stats(p, 'recent') == bps.derive_view(c, state['recent'][p], 'recent')
+                    for p, c in state['players'].items())
+    # One ring row and one decay step per player per hand, however often they act preflop
+    for p, r in state['recent'].items():
+        live = tracker.recent[p]
+        ok_recent &= list(live.ring) == list(r.ring) and \
+            all(abs(a - b) < 1e-9 for a, b in zip(live.decayed, r.decayed))
+    print(f"  Counters equal accumulate_hand: {'PASS' if ok_counts else 'FAIL'}")
+    print(f"  Each (hand_id, seq) applied once: {'PASS' if ok_dedupe else 'FAIL'}")
+    print(f"  Archetypes re-derived per event: {'PASS' if ok_derived else 'FAIL'}")
+    print(f"  Recent / decayed views match offline counters: {'PASS' if ok_recent else 'FAIL'}")
+    return ok_counts and ok_dedupe and ok_derived and ok_recent
+
+
+def test_flush_to_store():
+    print("\n" + "=" * 60)
+    print("TEST: BACKGROUND FLUSH TO PLAYER STORE")
+    print("=" * 60)
+    hands, buffers = _random_hands(200, seed=8)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'player_stats.db')
+        # Lifetime counters from the first 120 hands already in the store
+        base = _expected(hands[:120])
+        store = player_store.PlayerStore(db)
+        store.replace_all(bps.derive_stats(base), base)
+
+        tracker = live_stats.LiveStatsTracker(store_path=db, flush_interval=0.01)
+        tracker.start()
+        for entries in buffers[120:]:
+            tracker.feed(entries)
+        tracker.on_event(9999, 1, live_stats.MSG_SEATED, 0, 0, 'fresh_face')   # seen only live
+        tracker.on_event(9999, 2, live_stats.MSG_ACTION, 0, CODES['calls'])
+        tracker.stop()
+
+        expected = bps.derive_stats(_expected(hands))
+        ok_live = all(tracker.player_stats(p) == s for p, s in expected.items())
+        ok_store = all(store[p] == s for p, s in expected.items()) and not tracker.pending
+        opp = tracker.overlay([{'name': 'fishy', 'db_name': 'fishy_joe', 'hands': 1, 'archetype': 'unknown'}])
+        ok_overlay = opp[0]['archetype'] == expected['fishy_joe']['archetype']
+
+        # Rebuilds from histories that lag the live hands keep the live-only part
+        ok_rebuild = True
+        for covered, live_left in ((150, 51), (200, 1)):
+            state = bps.new_counter_state()
+            bps.apply_hands(state, hands[:covered])
+            kept = store.rebuild(bps.derive_stats(state['players']), state['players'], None, state['hand_ids'])
+            ok_rebuild &= kept == live_left and all(store[p] == s for p, s in expected.items()) and \
+                store.counters('fresh_face') == {k: int(k in ('hands', 'vpip')) for k in player_store.COUNTERS}
+        store.close()
+    print(f"  Live stats start from store counters: {'PASS' if ok_live else 'FAIL'}")
+    print(f"  Flushed rows equal full recount: {'PASS' if ok_store else 'FAIL'}")
+    print(f"  Overlay uses matched store name: {'PASS' if ok_overlay else 'FAIL'}")
+    print(f"  Rebuild keeps live hands the histories lack: {'PASS' if ok_rebuild else 'FAIL'}")
+    return ok_live and ok_store and ok_overlay and ok_rebuild
+
+
+def test_late_seat_name():
+    print("\n" + "=" * 60)
+    print("TEST: SEATED NAME READ ON RETRY")
+    print("=" * 60)
+    import memory_events
+    from test_memory_events import BUF, FakeMemory, _strings
+    from test_memory_dump import _entry
+
+    tracker = live_stats.LiveStatsTracker(store_path=None)
+    tracker.on_event(7000, 1, 0x02, 3, 0, None)
+    ok_direct = tracker.on_event(7000, 1, 0x02, 3, 0, 'villain') and \
+        not tracker.on_event(7000, 1, 0x02, 3, 0, 'villain')
+    tracker.on_event(7000, 2, 0x01, 3, CODES['raises'])
+    ok_direct &= tracker.totals.get('villain', {}).get('pfr') == 1
+
+    # Through EventStream: the name pointer is unreadable on the first poll
+    memory = FakeMemory()
+    ptrs = _strings(memory)
+    hand_id = 254_000_000_777
+    rows = [_entry(1, 0x0A, hand_id=hand_id),
+            _entry(2, 0x02, 3, name_ptr=ptrs['fishy_joe'], hand_id=hand_id),
+            _entry(3, 0x01, 3, CODES['raises'], 10, hand_id=hand_id)]
+    memory.unreadable.add(ptrs['fishy_joe'])
+    memory.write(BUF, b''.join(rows[:2]))
+    stream = memory_events.EventStream(memory, BUF)
+    tracker = live_stats.LiveStatsTracker(store_path=None)
+    tracker.feed_events(stream.poll())
+    memory.unreadable.clear()
+    memory.write(BUF, b''.join(rows))
+    events = stream.poll()
+    tracker.feed_events(events)
+    counters = tracker.totals.get('fishy_joe', {})
+    ok_stream = [ev.kind for ev in events] == ['seated', 'action'] and \
+        (counters.get('hands'), counters.get('vpip'), counters.get('pfr')) == (1, 1, 1)
+    print(f"  Repeated SEATED seq with a new name applied once: {'PASS' if ok_direct else 'FAIL'}")
+    print(f"  Retried SEATED event names the seat's actions: {'PASS' if ok_stream else 'FAIL'}")
+    return ok_direct and ok_stream
+
+
+if __name__ == '__main__':
+    results = [
+        ("Stream == Recount", test_stream_matches_recount()),
+        ("Flush To Store", test_flush_to_store()),
+        ("Late Seat Name", test_late_seat_name()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Offline dump reading tests - DumpReader against plain file reads, buffer
+discovery (container and 0x88 fallback), history-ordered and
+fingerprint-skipping rescans and bulk buffer decoding on a synthetic dump.
+Usage: python3 test_memory_dump.py
+"""
+
+import json
+import os
+import random
+import struct
+import tempfile
+
+import memory_calibrator as mc
+import memory_synth
+
+HEAP = 0x0A000000
+MODULE = 0x00C00000
+CONTAINER = HEAP + 0x1000
+BUF = HEAP + 0x3008          # first entry; container +0xE4 holds BUF - 8
+STRINGS = HEAP + 0x5000
+HAND_ID = 254_000_000_123
+PLAYERS = [(0, 'fishy_joe', None), (1, mc.HERO_NAME, 'AhKd'), (2, 'NicSticker', None)]
+
+
+def _entry(seq, msg_type, seat=0, action=0, amount=0, name_ptr=0, extra_ptr=0, hand_id=HAND_ID,
+           name_len=0, extra_len=0):
+    return memory_synth.entry(hand_id, seq, msg_type, seat, action, amount, (name_ptr, name_len),
+                              (extra_ptr, extra_len))
+
+
+def _heap(with_container=True, hand_id=HAND_ID):
+    """64KB heap region: container, signature + buffer, strings."""
+    heap = bytearray(random.Random(2).randbytes(0x10000))
+    strings, ptrs = bytearray(), {}
+    for text in [n for _, n, _ in PLAYERS] + ['AhKd']:
+        ptrs[text] = STRINGS + len(strings)
+        strings += text.encode() + b'\x00'
+    heap[STRINGS - HEAP:STRINGS - HEAP + len(strings)] = strings
+
+    rows = [_entry(1, 0x0A, hand_id=hand_id)]
+    rows += [_entry(2 + i, 0x02, seat, name_ptr=ptrs[name], extra_ptr=ptrs[cards] if cards else 0,
+                    name_len=len(name), extra_len=len(cards or ''), hand_id=hand_id)
+             for i, (seat, name, cards) in enumerate(PLAYERS)]
+    rows += [_entry(5, 0x01, 0, 0x70, 2, hand_id=hand_id), _entry(6, 0x01, 1, 0x50, 5, hand_id=hand_id),
+             _entry(7, 0x01, 2, 0x46, hand_id=hand_id)]
+    rows.append(_entry(1, 0x0A, hand_id=hand_id - 7))  # stale slot after the live entries
+    off = BUF - HEAP
+    heap[off - 10:off] = mc.BUFFER_SIGNATURE
+    heap[off:off + len(rows) * mc.ENTRY_SIZE] = b''.join(rows)
+
+    if with_container:
+        c = CONTAINER - HEAP
+        heap[c + 0x38:c + 0x3C] = bytes([0xB4, 0x07, 0x8C, 0x01])
+        struct.pack_into('<I', heap, c + 0x44, 0x3C)
+        heap[c + 0x54:c + 0x58] = mc.CONTAINER_MAGIC
+        heap[c + 0x6C:c + 0x84] = mc.CONTAINER_ANCHOR
+        struct.pack_into('<III', heap, c + 0xE0, 1, BUF - 8, BUF - 8 + 7 * mc.ENTRY_SIZE)
+        # Pointers to the container from the module and the heap
+        struct.pack_into('<I', heap, 0x40, CONTAINER)
+    # Overlapping signature decoy: 00 88 00*7 00 88 00*8 followed by an older hand
+    decoy = 0x8000
+    heap[decoy:decoy + 19] = mc.BUFFER_SIGNATURE[:9] + mc.BUFFER_SIGNATURE
+    heap[decoy + 19:decoy + 19 + mc.ENTRY_SIZE] = _entry(1, 0x0A, hand_id=hand_id - 1)
+    return bytes(heap)
+
+
+def _write_dump(tmp, name, with_container=True, hand_id=HAND_ID):
+    module = bytearray(random.Random(1).randbytes(0x3000))
+    struct.pack_into('<I', module, 0x204, CONTAINER)
+    module[0x301:0x305] = struct.pack('<I', CONTAINER)   # unaligned - not a pointer
+    chunks = [(MODULE, bytes(module)), (HEAP, _heap(with_container, hand_id)), (0x7FF00000, b'\x00' * 0x1000)]
+    regions, offset = [], 0
+    bin_path = os.path.join(tmp, name + '.bin')
+    with open(bin_path, 'wb') as f:
+        for base, data in reversed(chunks):   # file order != address order
+            f.write(data)
+            regions.append({'base': base, 'size': len(data), 'file_offset': offset})
+            offset += len(data)
+    with open(os.path.join(tmp, name + '.json'), 'w') as f:
+        json.dump({'dump_id': name, 'regions': regions}, f)
+    return bin_path, regions
+
+
+def _file_read(bin_path, regions, addr, size):
+    """Reference: the seek/read a dump read used to be."""
+    for r in regions:
+        if r['base'] <= addr < r['base'] + r['size']:
+            off = addr - r['base']
+            with open(bin_path, 'rb') as f:
+                f.seek(r['file_offset'] + off)
+                return f.read(min(size, r['size'] - off))
+    return None
+
+
+def test_reader_matches_file():
+    print("=" * 60)
+    print("TEST: DUMPREADER == FILE READS")
+    print("=" * 60)
+    rng = random.Random(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path, regions = _write_dump(tmp, 'dump_a')
+        with mc.DumpReader(bin_path, regions) as reader:
+            ok_read = True
+            for _ in range(2000):
+                r = rng.choice(regions)
+                addr = r['base'] + rng.randint(-0x100, r['size'] + 0x100)
+                size = rng.choice([1, 4, 0x40, 0x400])
+                got = reader.read(addr, size)
+                want = _file_read(bin_path, regions, addr, size)
+                ok_read &= (got is None and want is None) or (got is not None and bytes(got) == want)
+            ok_str = reader.read_str(STRINGS) == 'fishy_joe' and \
+                reader.read_str(STRINGS + 9) is None and reader.read_str(0x500) is None
+            ok_u32 = reader.read_u32(MODULE + 0x204) == CONTAINER and reader.read_u32(MODULE + 0x2FFE) is None
+            pointers = reader.find_all(struct.pack('<I', CONTAINER), align=4)
+            ok_find = pointers == [MODULE + 0x204, HEAP + 0x40] and \
+                reader.find_all(struct.pack('<I', CONTAINER))[:3] == [MODULE + 0x204, MODULE + 0x301, HEAP + 0x40]
+    print(f"  2000 random reads equal seek/read: {'PASS' if ok_read else 'FAIL'}")
+    print(f"  read_str / read_u32 bounds: {'PASS' if ok_str and ok_u32 else 'FAIL'}")
+    print(f"  find_all returns addresses (aligned filter): {'PASS' if ok_find else 'FAIL'}")
+    return ok_read and ok_str and ok_u32 and ok_find
+
+
+def test_find_buffer():
+    print("\n" + "=" * 60)
+    print("TEST: BUFFER DISCOVERY ON SYNTHETIC DUMP")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, with_container in (('container', True), ('fallback', False)):
+            bin_path, regions = _write_dump(tmp, name, with_container)
+            buf_addr, entries = mc.find_buffer_in_dump(bin_path, regions)
+            results[name] = (buf_addr, mc.extract_hand_data(entries) if entries else None)
+            if with_container:
+                container_addr = mc.find_buffer_in_dump._last_container_addr
+        candidates = mc._signature_candidates(HEAP, _heap(False))
+    buf_addr, hd = results['container']
+    ok_container = buf_addr == BUF and container_addr == CONTAINER and hd['hero_cards'] == 'AhKd' and \
+        hd['players'] == {s: n for s, n, _ in PLAYERS} and len(hd['entries']) == 7
+    buf_addr, hd = results['fallback']
+    ok_fallback = buf_addr == BUF and hd and hd['hand_id'] == HAND_ID and len(hd['entries']) == 7
+    ok_overlap = sorted(candidates) == [(BUF, HAND_ID), (HEAP + 0x8000 + 19, HAND_ID - 1)]
+    print(f"  Container scan -> buffer, names, cards: {'PASS' if ok_container else 'FAIL'}")
+    print(f"  0x88 fallback picks highest hand_id: {'PASS' if ok_fallback else 'FAIL'}")
+    print(f"  Overlapping signatures both found: {'PASS' if ok_overlap else 'FAIL'}")
+    return ok_container and ok_fallback and ok_overlap
+
+
+def _decode_per_entry(buf_addr, read_bytes, read_str, max_entries=30):
+    """Reference: one read + decode_entry per entry."""
+    entries = []
+    for i in range(max_entries):
+        data = read_bytes(buf_addr + i * mc.ENTRY_SIZE, mc.ENTRY_SIZE)
+        if not data or len(data) < mc.ENTRY_SIZE:
+            break
+        e = mc.decode_entry(data, read_str)
+        if entries and e['hand_id'] != entries[0]['hand_id']:
+            break
+        entries.append(e)
+    return entries
+
+
+def test_bulk_decode():
+    print("\n" + "=" * 60)
+    print("TEST: BULK DECODE_BUFFER")
+    print("=" * 60)
+    calls = {'bytes': 0, 'str': 0}
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path, regions = _write_dump(tmp, 'dump_b')
+        with mc.DumpReader(bin_path, regions) as reader:
+            def read_bytes(addr, size):
+                calls['bytes'] += 1
+                return reader.read(addr, size)
+
+            def read_str(addr, maxlen=64):
+                calls['str'] += 1
+                return reader.read_str(addr, maxlen)
+
+            def span_fails(addr, size):   # live read across an unreadable page
+                return None if size > mc.ENTRY_SIZE else reader.read(addr, size)
+
+            expected = _decode_per_entry(BUF, reader.read, reader.read_str)
+            cache = mc.StringCache()
+            first = mc.decode_buffer(BUF, read_bytes, read_str, str_cache=cache)
+            reads_first = dict(calls)
+            again = mc.decode_buffer(BUF, read_bytes, read_str, str_cache=cache)
+            fallback = mc.decode_buffer(BUF, span_fails, reader.read_str)
+            stale = mc.decode_buffer(BUF + 7 * mc.ENTRY_SIZE, reader.read, reader.read_str, str_cache=cache)
+    ok_equal = first == expected and again == expected and fallback == expected and len(expected) == 7
+    ok_reads = reads_first == {'bytes': 1, 'str': 4} and calls == {'bytes': 2, 'str': 4}
+    ok_hand = cache.hand_id == HAND_ID - 7 and not cache.strings and len(stale) == 1
+    print(f"  Bulk == per-entry decode (and one-by-one fallback): {'PASS' if ok_equal else 'FAIL'}")
+    print(f"  One read per poll, strings cached {reads_first} -> {calls}: {'PASS' if ok_reads else 'FAIL'}")
+    print(f"  Cache dropped on hand change: {'PASS' if ok_hand else 'FAIL'}")
+    return ok_equal and ok_reads and ok_hand
+
+
+def test_string_cache():
+    print("\n" + "=" * 60)
+    print("TEST: STRING CACHE KEYED BY (POINTER, LENGTH)")
+    print("=" * 60)
+    memory = {STRINGS: 'fishy_joe', STRINGS + 0x40: 'AhKd'}
+    reads = []
+
+    def read_str(ptr, maxlen=64):
+        reads.append(ptr)
+        return memory.get(ptr)
+
+    cache = mc.StringCache()
+    cache.for_hand(HAND_ID)
+    first = [cache.read(read_str, STRINGS, 64, 9), cache.read(read_str, STRINGS + 0x40, 16, 4)]
+    again = [cache.read(read_str, STRINGS, 64, 9) for _ in range(10)]
+    ok_hits = first == ['fishy_joe', 'AhKd'] and again == ['fishy_joe'] * 10 and len(reads) == 2
+
+    # Same pointer, other length in the entry: string was replaced -> read again
+    memory[STRINGS] = 'NicSticker'
+    ok_reuse = cache.read(read_str, STRINGS, 64, 10) == 'NicSticker' and len(reads) == 3 and \
+        cache.read(read_str, STRINGS, 64, 10) == 'NicSticker' and len(reads) == 3
+
+    # Read doesn't match the entry's length (being rewritten): returned, not kept
+    memory[STRINGS + 0x80] = 'half'
+    ok_partial = cache.read(read_str, STRINGS + 0x80, 64, 9) == 'half' and \
+        cache.read(read_str, STRINGS + 0x80, 64, 9) == 'half' and len(reads) == 5
+    ok_none = cache.read(read_str, STRINGS + 0xC0, 64, 3) is None and STRINGS + 0xC0 not in cache.strings
+
+    stats = cache.stats()
+    ok_stats = (stats['hits'], stats['misses'], stats['invalidated']) == (11, 6, 1)
+    cache.for_hand(HAND_ID + 1)
+    ok_hand = not cache.strings
+
+    # Decoding a dump: each name/card pointer is read once per hand
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path, regions = _write_dump(tmp, 'dump_c')
+        with mc.DumpReader(bin_path, regions) as reader:
+            counted = []
+            read = lambda ptr, maxlen=64: counted.append(ptr) or reader.read_str(ptr, maxlen)
+            dump_cache = mc.StringCache()
+            for _ in range(5):
+                entries = mc.decode_buffer(BUF, reader.read, read, str_cache=dump_cache)
+    ok_dump = len(counted) == 4 and dump_cache.stats()['hits'] == 16 and \
+        [e['name'] for e in entries[1:4]] == [n for _, n, _ in PLAYERS] and entries[2]['extra'] == 'AhKd'
+    print(f"  Repeated (ptr, len) reads served from cache: {'PASS' if ok_hits else 'FAIL'}")
+    print(f"  Pointer with new length re-read: {'PASS' if ok_reuse else 'FAIL'}")
+    print(f"  Length-mismatched / unreadable strings not cached: {'PASS' if ok_partial and ok_none else 'FAIL'}")
+    print(f"  Hit/miss/invalidated counters: {'PASS' if ok_stats else 'FAIL'}")
+    print(f"  Dropped on hand change: {'PASS' if ok_hand else 'FAIL'}")
+    print(f"  5 dump decodes, 4 string reads: {'PASS' if ok_dump else 'FAIL'}")
+    return ok_hits and ok_reuse and ok_partial and ok_none and ok_stats and ok_hand and ok_dump
+
+
+def _container_layouts(base, data):
+    """Reference: every magic hit checked field by field."""
+    hits, i = [], data.find(mc.CONTAINER_MAGIC)
+    while i >= 0:
+        sb = i - mc.CONTAINER_MAGIC_OFFSET
+        if sb >= 0 and sb + mc.CONTAINER_SIZE <= len(data) and \
+                data[sb + 0x6C:sb + 0x84] == mc.CONTAINER_ANCHOR and \
+                data[sb + 0x38:sb + 0x3C] == bytes([0xB4, 0x07, 0x8C, 0x01]) and \
+                struct.unpack_from('<III', data, sb + 0x44)[0] == 0x3C and \
+                struct.unpack_from('<I', data, sb + 0xE0)[0] == 1:
+            bp, ep = struct.unpack_from('<II', data, sb + 0xE4)
+            if bp >= 0x100000 and 3 <= (ep - bp) // mc.ENTRY_SIZE <= 200:
+                hits.append((base + sb, bp + 8, (ep - bp) // mc.ENTRY_SIZE))
+        i = data.find(mc.CONTAINER_MAGIC, i + 1)
+    return hits
+
+
+def test_container_scan():
+    print("\n" + "=" * 60)
+    print("TEST: CHUNKED PARALLEL CONTAINER / 0x88 SCAN")
+    print("=" * 60)
+    heap = bytearray(_heap(True))
+    rng = random.Random(6)
+    real = heap[CONTAINER - HEAP:CONTAINER - HEAP + mc.CONTAINER_SIZE]
+    for off in range(0x9000, 0xF000, 0x400):   # copies with one field broken, or straddling a chunk edge
+        c = bytearray(real)
+        broken = rng.choice([0x38, 0x44, 0x6C, 0xE0, 0xE4, None])
+        if broken is not None:
+            c[broken] ^= 0xFF
+        start = off + rng.choice([0, 0x3F0, 0x100 - 0x54])
+        heap[start:start + len(c)] = c
+    heap[0xFFB0:0xFFB4] = mc.CONTAINER_MAGIC      # container would run past the region
+    heap = bytes(heap)
+    expected = _container_layouts(HEAP, heap)
+    results = {}
+    for chunk in (0x1000, 0x333, mc.SCAN_CHUNK):
+        for workers in (1, 4):
+            results[chunk, workers] = mc.scan_containers([(HEAP, len(heap))], lambda a, n: heap[a - HEAP:a - HEAP + n],
+                                                         workers, chunk)
+    ok_equal = all(r == expected for r in results.values()) and (CONTAINER, BUF, 7) in expected
+    ok_rejects = len(expected) < len(range(0x9000, 0xF000, 0x400)) + 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path, regions = _write_dump(tmp, 'dump_d')
+        with mc.DumpReader(bin_path, regions) as reader:
+            found = mc._find_buffer_via_container([(HEAP, 0x10000)], reader.read, workers=4)
+    ok_find = found == (BUF, 7, HAND_ID, CONTAINER)
+
+    # Both patterns in one pass: 0x88 candidates (incl. the overlapping decoy) across chunk edges
+    read = lambda a, n: heap[a - HEAP:a - HEAP + n]
+    ok_merged = all(mc.scan_buffers([(HEAP, len(heap))], read, workers, chunk) ==
+                    (expected, mc._signature_candidates(HEAP, heap))
+                    for chunk in (0x1000, 0x8000 + 7, 0x800B) for workers in (1, 4))
+
+    # Container miss: the fallback reads each byte once, not heap + everything again
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path, regions = _write_dump(tmp, 'dump_e', with_container=False)
+        with mc.DumpReader(bin_path, regions) as reader:
+            scanned = []
+            read_bytes = reader.read
+            reader.read = lambda a, n: scanned.append(n) or read_bytes(a, n)
+            buf_addr, entries = mc.find_buffer_in_dump(bin_path, regions, reader=reader)
+    total = sum(r['size'] for r in regions)
+    big_reads = sum(n for n in scanned if n > 30 * mc.ENTRY_SIZE)
+    ok_once = buf_addr == BUF and len(entries) == 7 and total <= big_reads <= total + mc.CONTAINER_SIZE * 4
+    print(f"  {len(expected)} valid layouts; chunk sizes x workers == field-by-field scan: {'PASS' if ok_equal else 'FAIL'}")
+    print(f"  Broken anchor/+0x38/+0x44/+0xE0/pointers rejected: {'PASS' if ok_rejects else 'FAIL'}")
+    print(f"  Dump scan picks the live container: {'PASS' if ok_find else 'FAIL'}")
+    print(f"  Container + 0x88 candidates from one pass: {'PASS' if ok_merged else 'FAIL'}")
+    print(f"  Fallback reads {big_reads} of {total} bytes once: {'PASS' if ok_once else 'FAIL'}")
+    return ok_equal and ok_rejects and ok_find and ok_merged and ok_once
+
+
+def _plant(region, base, hand_id, off=0x1000):
+    """Container at base+off whose buffer holds 5 entries of hand_id."""
+    buf = base + off + 0x208
+    region[off:off + mc.CONTAINER_SIZE] = memory_synth.container(buf, 5)
+    region[buf - base:buf - base + 5 * mc.ENTRY_SIZE] = b''.join(_entry(i, 0x01, hand_id=hand_id)
+                                                                for i in range(1, 6))
+    return base + off
+
+
+def test_locality_rescan():
+    print("\n" + "=" * 60)
+    print("TEST: HISTORY-ORDERED CONTAINER RESCAN")
+    print("=" * 60)
+    size = 0x10000
+    bases = [HEAP + i * 0x100000 for i in range(16)]
+    rng = random.Random(8)
+    memory = {b: bytearray(rng.randbytes(size)) for b in bases}
+    scanned = []
+
+    def read(addr, n):
+        for b, data in memory.items():
+            if b <= addr < b + size:
+                if n > mc.CONTAINER_SIZE:
+                    scanned.append(b)
+                return bytes(data[addr - b:addr - b + n])
+        return None
+    heap = [(b, size) for b in reversed(bases)]   # iter order != address order
+    accept = lambda best: {'hand_id': best[2]}
+    history = mc.ScanHistory()
+
+    # Cold: no history, every region scanned, newest hand wins over a stale copy
+    _plant(memory[bases[2]], bases[2], HAND_ID - 5)
+    live = _plant(memory[bases[11]], bases[11], HAND_ID)
+    best, _, hand = mc._locate_container(heap, read, history, accept, workers=1)
+    ok_cold = best[3] == live and hand is None and len(set(scanned)) == 16
+    history.record(best[3], mc._region_of(heap, best[3]), best[2])
+
+    # Order: previous hit regions (latest first), then by distance from the container
+    history.record(bases[2] + 0x1000, bases[2], HAND_ID - 5)
+    history.record(live, bases[11], HAND_ID)
+    order = [b for b, _ in history.order(heap)]
+    ok_order = order[:2] == [bases[11], bases[2]] and set(order[2:4]) == {bases[10], bases[12]} and \
+        sorted(order) == bases
+
+    # Container reallocated in the same heap: found there, the other 15 regions not read
+    memory[bases[11]][0x1000 + 0x54] ^= 0xFF
+    moved = _plant(memory[bases[11]], bases[11], HAND_ID + 1, off=0x4000)
+    scanned.clear()
+    best, _, hand = mc._locate_container(heap, read, history, accept, workers=1)
+    ok_early = best[3] == moved and hand == {'hand_id': HAND_ID + 1} and set(scanned) == {bases[11]}
+    early_regions = len(set(scanned))
+    history.record(moved, mc._region_of(heap, moved), best[2])
+
+    # An older hand in a remembered region, or a hit accept() rejects, doesn't stop the scan
+    _plant(memory[bases[11]], bases[11], HAND_ID, off=0x4000)
+    newer = _plant(memory[bases[0]], bases[0], HAND_ID + 2)
+    best, _, hand = mc._locate_container(heap, read, history, accept, workers=1)
+    ok_stale = best[3] == newer and hand == {'hand_id': HAND_ID + 2}
+    best, _, hand = mc._locate_container(heap, read, history, lambda best: None, workers=1)
+    ok_reject = best[3] == newer and hand is None
+    print(f"  Cold scan: all regions, newest hand: {'PASS' if ok_cold else 'FAIL'}")
+    print(f"  Hit regions first, then nearest: {'PASS' if ok_order else 'FAIL'}")
+    print(f"  Moved container found in {early_regions} of 16 regions: {'PASS' if ok_early else 'FAIL'}")
+    print(f"  Older hand_id / rejected hit keeps scanning: {'PASS' if ok_stale and ok_reject else 'FAIL'}")
+    return ok_cold and ok_order and ok_early and ok_stale and ok_reject
+
+
+class _RegionReader(mc.MemoryReader):
+    """In-memory process: {base: bytearray} regions."""
+    handle = True
+
+    def __init__(self, memory):
+        self.memory = memory
+
+    def attach(self):
+        return True
+
+    def read(self, addr, n):
+        for b, data in self.memory.items():
+            if b <= addr < b + len(data):
+                return bytes(data[addr - b:addr - b + n])
+        return None
+
+    def iter_regions(self):
+        for b, data in self.memory.items():
+            yield b, len(data)
+
+
+def _plant_hand(region, base, hand_id, off=0x1000):
+    """Container at base+off whose buffer holds a hand with hero seated and dealt AhKd."""
+    buf, strings = base + off + 0x208, off + 0x800
+    region[strings:strings + 17] = mc.HERO_NAME.encode().ljust(12, b'\x00') + b'AhKd\x00'
+    rows = [_entry(1, 0x0A, hand_id=hand_id),
+            _entry(2, 0x02, 1, name_ptr=base + strings, extra_ptr=base + strings + 12, hand_id=hand_id,
+                   name_len=len(mc.HERO_NAME), extra_len=4),
+            _entry(3, 0x01, 0, 0x70, 2, hand_id=hand_id)]
+    region[off:off + mc.CONTAINER_SIZE] = memory_synth.container(buf, len(rows))
+    region[buf - base:buf - base + len(rows) * mc.ENTRY_SIZE] = b''.join(rows)
+    return base + off
+
+
+def test_region_map():
+    print("\n" + "=" * 60)
+    print("TEST: FINGERPRINTED REGION MAP (REPEATED SCANS)")
+    print("=" * 60)
+    rng = random.Random(11)
+    sizes = [0x3000, 0x40000, 0x100000, 0x10000, 0x200000]
+    bases = [HEAP + i * 0x400000 for i in range(len(sizes))]
+    memory = {b: bytearray(rng.randbytes(n)) for b, n in zip(bases, sizes)}
+    reads = []
+
+    def read(addr, n):
+        for b, data in memory.items():
+            if b <= addr < b + len(data):
+                reads.append(n)
+                return bytes(data[addr - b:addr - b + n])
+        return None
+    regions = lambda: [(b, len(memory[b])) for b in memory]
+    for b in bases[1:4]:   # 0x88 candidates (hand in range) in three regions
+        off = len(memory[b]) // 2
+        memory[b][off - 10:off] = mc.BUFFER_SIGNATURE
+        memory[b][off:off + mc.ENTRY_SIZE] = _entry(1, 0x0A, hand_id=HAND_ID - b % 97)
+    live = _plant(memory[bases[2]], bases[2], HAND_ID)
+    rmap = mc.RegionMap()
+
+    first = rmap.scan(regions(), read, workers=1)
+    ok_first = first == mc.scan_buffers(regions(), read, workers=1) and first[0][0][0] == live and \
+        len(first[1]) == 3
+
+    # Nothing changed: only the container's region is read in full, the rest is sampled
+    reads.clear()
+    again = rmap.scan(regions(), read, workers=1)
+    sampled = sum(sizes) - sizes[2]
+    ok_skip = again == first and sum(reads) - sizes[2] <= len(sizes) * mc.SAMPLE_PAGES * mc.PAGE_SIZE < sampled
+
+    # A container appears in a hashed page of a clean region; a region is added, one unmapped
+    moved = _plant(memory[bases[4]], bases[4], HAND_ID + 1, off=0)
+    memory[HEAP + 0x1400000] = bytearray(rng.randbytes(0x8000))
+    del memory[bases[0]]
+    rmap.prune(regions())
+    changed = rmap.scan(regions(), read, workers=1)
+    ok_changed = changed == mc.scan_buffers(regions(), read, workers=1) and \
+        {c[0] for c in changed[0]} == {live, moved} and bases[0] not in rmap.regions
+
+    # Signature-only scans cache too, but don't mark regions as container-free
+    sig_map = mc.RegionMap()
+    sig_map.scan(regions(), read, workers=1, containers=False)
+    ok_sig = sig_map.scan(regions(), read, workers=1)[0] == changed[0]
+    rmap.clear()
+    skipped = rmap.bytes_skipped
+    ok_clear = rmap.scan(regions(), read, workers=1) == changed and rmap.bytes_skipped == skipped
+
+    # scan_live: the new container lands in an unsampled page of a skipped region while an
+    # older container is still readable - the older hand must not be returned and cached
+    mb = 0x100000
+    region_a, region_b, region_d = HEAP, HEAP + 2 * mb, HEAP + 4 * mb
+    reader = _RegionReader({b: bytearray(mb) for b in (region_a, region_b, region_d)})
+    _plant_hand(reader.memory[region_a], region_a, HAND_ID + 1)
+    live = _plant_hand(reader.memory[region_b], region_b, HAND_ID + 5)
+    mc.use_reader(reader)
+    try:
+        hands = [mc.scan_live()]
+        reader.memory[region_b][live - region_b:live - region_b + mc.CONTAINER_SIZE] = bytes(mc.CONTAINER_SIZE)
+        newest = _plant_hand(reader.memory[region_d], region_d, HAND_ID + 9, off=0x10000)
+        hands += [mc.scan_live(), mc.scan_live()]
+        ok_unsampled = [h['hand_id'] for h in hands] == [HAND_ID + 5, HAND_ID + 9, HAND_ID + 9] and \
+            mc._cached_container_addr == newest
+    finally:
+        mc.use_reader(None)
+    print(f"  First scan == scan_buffers: {'PASS' if ok_first else 'FAIL'}")
+    print(f"  Unchanged regions sampled, not reread: {'PASS' if ok_skip else 'FAIL'}")
+    print(f"  New container / new region found, unmapped pruned: {'PASS' if ok_changed else 'FAIL'}")
+    print(f"  Signature-only entries rescanned for containers: {'PASS' if ok_sig else 'FAIL'}")
+    print(f"  clear() forces a full scan: {'PASS' if ok_clear else 'FAIL'}")
+    print(f"  Container in an unsampled page: rescan, not an older hand: {'PASS' if ok_unsampled else 'FAIL'}")
+    return ok_first and ok_skip and ok_changed and ok_sig and ok_clear and ok_unsampled
+
+
+def test_replay_pipeline():
+    print("\n" + "=" * 60)
+    print("TEST: LIVE PIPELINE ON REPLAYED DUMPS")
+    print("=" * 60)
+    import memory_events
+    with tempfile.TemporaryDirectory() as tmp:
+        metas = []
+        for i, hand_id in enumerate([HAND_ID, HAND_ID, HAND_ID + 1]):
+            bin_path, regions = _write_dump(tmp, f'dump_t{i}', hand_id=hand_id)
+            metas.append({'dump_id': f'dump_t{i}', 'regions': regions, '_bin_path': bin_path, 'pid': 4242})
+        replay = mc.ReplayReader(metas)
+        mc.use_reader(replay)
+        hand = mc.scan_live()
+        ok_scan = hand['hand_id'] == HAND_ID and hand['hero_cards'] == 'AhKd' and hand['buf_addr'] == BUF and \
+            hand['container_addr'] == CONTAINER and mc._reader.pid == 4242
+        stream = memory_events.live_stream(BUF)
+        ok_stream = len(stream.poll()) == 7
+
+        # Next dump, same hand: cached container, buffer unchanged, nothing new to poll
+        replay.advance()
+        again = mc.rescan_buffer(BUF, HAND_ID)
+        ok_same = again['actions'] == hand['actions'] and stream.poll() == [] and \
+            mc.scan_live()['hand_id'] == HAND_ID and mc._region_map.bytes_skipped == 0
+
+        # Next dump, new hand: the container redirects, the stream starts over
+        replay.advance()
+        moved = mc.rescan_buffer(BUF, HAND_ID)
+        events = stream.poll()
+        ok_new = moved['hand_id_changed'] and moved['hand_id'] == HAND_ID + 1 and \
+            events[0].kind == 'new_hand' and stream.state.hand_id == HAND_ID + 1 and not replay.advance()
+
+        # F9 dump of the replayed process == the dump it replays
+        dump_dir, mc.DUMP_DIR = mc.DUMP_DIR, tmp
+        try:
+            dump_id = mc.save_dump('replayed')
+        finally:
+            mc.DUMP_DIR = dump_dir
+        with open(os.path.join(tmp, dump_id + '.json')) as f:
+            saved = json.load(f)
+        with mc.DumpReader(os.path.join(tmp, dump_id + '.bin'), saved['regions']) as copy:
+            ok_dump = saved['pid'] == 4242 and sorted(r['base'] for r in saved['regions']) == \
+                sorted(r['base'] for r in metas[2]['regions']) and \
+                all(bytes(copy.read(r['base'], r['size'])) == replay.read(r['base'], r['size'])
+                    for r in metas[2]['regions'])
+        replay.close()
+        mc.use_reader(None)
+        ok_linux = mc.IS_WINDOWS or (mc.scan_live() is None and mc.save_dump() is None)
+
+        results = mc.cmd_bench_live(metas, repeat=1, polls=10)
+        ok_bench = [results[m['dump_id']]['hand_id'] for m in metas] == [HAND_ID, HAND_ID, HAND_ID + 1] and \
+            len(results['session']) == 3 and not isinstance(mc._reader, mc.ReplayReader)
+        mc.use_reader(None)
+    print(f"  scan_live on a replayed dump: {'PASS' if ok_scan else 'FAIL'}")
+    print(f"  live_stream polls the replayed buffer: {'PASS' if ok_stream else 'FAIL'}")
+    print(f"  Unchanged step: rescan/cached scan, idle poll: {'PASS' if ok_same else 'FAIL'}")
+    print(f"  New hand step: container redirect, new events: {'PASS' if ok_new else 'FAIL'}")
+    print(f"  save_dump of the replay == replayed dump: {'PASS' if ok_dump else 'FAIL'}")
+    print(f"  No process on Linux -> None: {'PASS' if ok_linux else 'FAIL'}")
+    print(f"  bench_live over the sequence: {'PASS' if ok_bench else 'FAIL'}")
+    return ok_scan and ok_stream and ok_same and ok_new and ok_dump and ok_linux and ok_bench
+
+
+if __name__ == '__main__':
+    results = [
+        ("DumpReader == File", test_reader_matches_file()),
+        ("Find Buffer", test_find_buffer()),
+        ("Bulk Decode", test_bulk_decode()),
+        ("String Cache", test_string_cache()),
+        ("Container Scan", test_container_scan()),
+        ("Locality Rescan", test_locality_rescan()),
+        ("Region Map", test_region_map()),
+        ("Replay Pipeline", test_replay_pipeline()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Memory event stream tests - polling a growing buffer yields each entry once
+as a typed event, the incremental hand state equals extract_hand_data and
+the betting summary equals the full re-parse helper_bar used to do; new
+hands, container moves and late strings are followed.
+Usage: python3 test_memory_events.py
+"""
+
+import random
+import struct
+
+import memory_calibrator as mc
+import memory_events as me
+from test_memory_dump import _entry
+
+BASE = 0x0A000000
+CONTAINER = BASE + 0x100
+BUF = BASE + 0x1008
+STRINGS = BASE + 0x8000
+HAND_ID = 254_000_000_500
+NAMES = ['fishy_joe', 'NicSticker', 'rock solid', 'LagMonster', 'nitwit99', mc.HERO_NAME]
+ACTS = {'BET': 0x42, 'CALL': 0x43, 'RAISE': 0x45, 'FOLD': 0x46, 'CHECK': 0x63}
+
+
+class FakeMemory:
+    """Flat process memory: read/read_str like ProcessReader, counting reads."""
+
+    def __init__(self, size=0x10000):
+        self.mem = bytearray(size)
+        self.reads = 0
+        self.unreadable = set()
+
+    def write(self, addr, data):
+        self.mem[addr - BASE:addr - BASE + len(data)] = data
+
+    def read(self, addr, size):
+        self.reads += 1
+        off = addr - BASE
+        if not 0 <= off < len(self.mem):
+            return None
+        return bytes(self.mem[off:off + size])
+
+    def read_str(self, addr, maxlen=64):
+        if addr in self.unreadable:
+            return None
+        data = self.read(addr, maxlen)
+        end = data.find(b'\x00') if data else -1
+        return data[:end].decode('ascii') if end > 0 else None
+
+
+def _strings(memory):
+    ptrs, off = {}, STRINGS
+    for text in NAMES + ['AhKd', 'Qs7c2d', '9h', 'Tc']:
+        ptrs[text] = off
+        memory.write(off, text.encode() + b'\x00')
+        off += len(text) + 1
+    return ptrs
+
+
+def _random_hand(rng, ptrs, hand_id):
+    """Entry bytes of one hand: seats, blinds, random streets and board cards."""
+    seated = rng.sample(range(6), rng.randint(3, 6))
+    if 5 not in seated:
+        seated[0] = 5
+    names = {s: NAMES[s] for s in seated}
+    rows = [(0x0A, 0, 0, 0, 0, 0)]
+    rows += [(0x02, s, 0, 0, ptrs[n], ptrs['AhKd'] if n == mc.HERO_NAME else 0) for s, n in names.items()]
+    rows += [(0x01, seated[1], 0x70, 2, 0, 0), (0x01, seated[2], 0x50, 5, 0, 0)]
+    for street, board in enumerate(['', 'Qs7c2d', '9h', 'Tc']):
+        if street:
+            if rng.random() < 0.3:
+                break
+            rows.append((0x05, 0, 0, 0, 0, 0))
+            rows.append((0x02, 255, 0, 0, 0, ptrs[board]))
+        for _ in range(rng.randint(1, 14 if street == 0 else 5)):
+            act = rng.choice(list(ACTS))
+            amount = rng.choice([5, 10, 15, 40]) if act in ('BET', 'CALL', 'RAISE') else 0
+            rows.append((0x01, rng.choice(seated), ACTS[act], amount, 0, 0))
+    rows.append((0x06, seated[0], 0x77, 0, 0, 0))
+    return [_entry(seq, t, seat, action, amount, name_ptr, extra_ptr, hand_id=hand_id)
+            for seq, (t, seat, action, amount, name_ptr, extra_ptr) in enumerate(rows, 1)]
+
+
+def _reparse(actions, board):
+    """The pot / to-call / aggressor parse helper_bar ran on every update."""
+    hero = mc.HERO_NAME
+    pot_cents = 0
+    current_street_start = 0
+    hero_acted_this_street = False
+    hero_last_action = None
+    deal_found = False
+    for i, (name, act, amt) in enumerate(actions):
+        if act == 'DEAL':
+            current_street_start = i + 1
+            deal_found = True
+    if not deal_found and len(actions) > 10:
+        current_street_start = len(actions) - 10
+    for i, (name, act, amt) in enumerate(actions):
+        if act not in ('DEAL',):
+            pot_cents += amt
+        if i >= current_street_start and name == hero and act in ('BET', 'RAISE', 'CALL', 'CHECK'):
+            hero_acted_this_street = True
+            hero_last_action = act
+    pot = pot_cents / 100.0 if pot_cents > 0 else 0.07
+    to_call = 0.0
+    last_villain_bet = 0
+    hero_street_total = 0
+    for i, (name, act, amt) in enumerate(actions):
+        if i < current_street_start:
+            continue
+        if name == hero and act in ('BET', 'RAISE', 'CALL'):
+            hero_street_total += amt / 100.0
+        elif act in ('BET', 'RAISE'):
+            last_villain_bet = amt / 100.0
+    if last_villain_bet > hero_street_total:
+        to_call = last_villain_bet - hero_street_total
+    is_facing_raise = False
+    if hero_acted_this_street and to_call > 0:
+        hero_last_idx = -1
+        for i, (name, act, amt) in enumerate(actions):
+            if i >= current_street_start and name == hero and act in ('BET', 'RAISE', 'CALL', 'CHECK'):
+                hero_last_idx = i
+        is_facing_raise = any(i > hero_last_idx and a[1] == 'RAISE' for i, a in enumerate(actions))
+    last_raiser = None
+    search_start = 0 if not board else current_street_start
+    for i, (name, act, amt) in enumerate(actions):
+        if i < search_start:
+            continue
+        if act == 'DEAL':
+            break
+        if act == 'RAISE':
+            last_raiser = name
+    active = {name for name, act, amt in actions if name and name != hero and act != 'FOLD'}
+    return {'pot': pot, 'to_call': to_call, 'is_aggressor': last_raiser == hero,
+            'is_facing_raise': is_facing_raise, 'num_players': len(active) + 1,
+            'hero_acted': hero_acted_this_street, 'hero_last': hero_last_action}
+
+
+def test_stream_matches_full_decode():
+    print("=" * 60)
+    print("TEST: STREAM STATE == FULL DECODE (growing buffers)")
+    print("=" * 60)
+    rng = random.Random(7)
+    memory = FakeMemory()
+    ptrs = _strings(memory)
+    stream = me.EventStream(memory, BUF)
+    ok_state = ok_betting = ok_once = ok_kinds = True
+    polls = steps = 0
+    for h in range(150):
+        hand_id = HAND_ID + h
+        rows = _random_hand(rng, ptrs, hand_id)
+        end = 0
+        while end < len(rows):
+            end = min(len(rows), end + rng.randint(0, 3))
+            memory.write(BUF, b''.join(rows[:end]) + _entry(1, 0x0A, hand_id=hand_id - 50))
+            before = stream.last
+            events = stream.poll()
+            polls += 1
+            if end == 0:
+                continue
+            steps += 1
+            first = 0 if not before or before[0] != hand_id else before[1]
+            ok_once &= [ev.seq for ev in events] == list(range(first + 1, end + 1))
+            ok_kinds &= all(ev.kind == me.KINDS[ev.msg_type] for ev in events) and \
+                (first > 0 or events[0].kind == 'new_hand')
+
+            expected = mc.extract_hand_data(mc.decode_buffer(BUF, memory.read, memory.read_str, 64))
+            hd = stream.state.hand_data()
+            ok_state &= all(hd[k] == expected[k] for k in ('hand_id', 'hero_cards', 'players', 'actions',
+                                                            'community_cards', 'hero_seat', 'bb_seat', 'position'))
+            ok_state &= hd['entry_count'] == end
+            ok_betting &= hd['betting'] == _reparse(expected['actions'], expected['community_cards']) == \
+                me.betting_summary(expected['actions'], bool(expected['community_cards']))
+    print(f"  {steps} polls with new entries over 150 hands")
+    print(f"  Each entry emitted once, in seq order: {'PASS' if ok_once else 'FAIL'}")
+    print(f"  Event kinds typed from msg_type: {'PASS' if ok_kinds else 'FAIL'}")
+    print(f"  Hand state == extract_hand_data: {'PASS' if ok_state else 'FAIL'}")
+    print(f"  Betting summary == full re-parse: {'PASS' if ok_betting else 'FAIL'}")
+    return ok_once and ok_kinds and ok_state and ok_betting
+
+
+def test_follow_and_retry():
+    print("\n" + "=" * 60)
+    print("TEST: CONTAINER MOVE, LATE STRINGS, LOST BUFFER")
+    print("=" * 60)
+    memory = FakeMemory()
+    ptrs = _strings(memory)
+    rows = _random_hand(random.Random(3), ptrs, HAND_ID)
+    memory.write(CONTAINER + 0xE0, struct.pack('<III', 1, BUF - 8, BUF - 8 + len(rows) * mc.ENTRY_SIZE))
+    memory.write(BUF, b''.join(rows[:6]))
+    stream = me.EventStream(memory, BUF, CONTAINER)
+    stream.poll()
+
+    # The buffer grows into a new allocation: same hand, stream continues at entry 6
+    moved = BUF + 0x2000
+    memory.write(moved, b''.join(rows))
+    memory.write(CONTAINER + 0xE4, struct.pack('<II', moved - 8, moved - 8 + len(rows) * mc.ENTRY_SIZE))
+    events = stream.poll()
+    ok_move = stream.buf_addr == moved and [ev.seq for ev in events] == list(range(7, len(rows) + 1))
+    memory.reads = 0
+    ok_idle = stream.poll() == [] and memory.reads == 2   # container pointer + buffer span
+
+    # Hero's name unreadable when the SEATED entry is first decoded
+    memory.unreadable.add(ptrs[mc.HERO_NAME])
+    memory.write(moved, b''.join(_random_hand(random.Random(3), ptrs, HAND_ID + 1)))
+    stream.poll()
+    missing = stream.state.hero_cards is None and mc.HERO_NAME not in stream.state.players.values()
+    memory.unreadable.clear()
+    events = stream.poll()
+    expected = mc.extract_hand_data(mc.decode_buffer(moved, memory.read, memory.read_str, 64))
+    hd = stream.state.hand_data()
+    ok_retry = missing and [ev.kind for ev in events] == ['seated'] and hd['hero_cards'] == 'AhKd' and \
+        hd['actions'] == expected['actions'] and \
+        hd['betting'] == _reparse(expected['actions'], expected['community_cards'])
+
+    # Entries without any player names look like garbage: buffer lost
+    memory.write(moved, b''.join(_entry(i, 0x01, 3, 0x43, 5, hand_id=HAND_ID + 2) for i in range(1, 6)))
+    ok_lost = stream.poll() is None and stream.state is None
+    memory.write(moved, b'\x00' * 0x40)
+    ok_lost &= stream.poll() is None
+    print(f"  Buffer moved by container, state kept: {'PASS' if ok_move else 'FAIL'}")
+    print(f"  Idle poll = 2 reads, no events: {'PASS' if ok_idle else 'FAIL'}")
+    print(f"  Late name/cards retried, actions renamed: {'PASS' if ok_retry else 'FAIL'}")
+    print(f"  Nameless / invalid buffer -> None: {'PASS' if ok_lost else 'FAIL'}")
+    return ok_move and ok_idle and ok_retry and ok_lost
+
+
+if __name__ == '__main__':
+    results = [
+        ("Stream == Full Decode", test_stream_matches_full_decode()),
+        ("Follow And Retry", test_follow_and_retry()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Synthetic memory image tests - on generated dumps with decoys the scanners
+return exactly the planted containers and 0x88 candidates, pick the live
+buffer (also when the container is gone), and the live path and pointer
+scan follow one synthetic process across hands.
+Usage: python3 test_memory_synth.py
+"""
+
+import tempfile
+
+import cmd_pointer_scan as ps
+import memory_calibrator as mc
+import memory_synth
+
+SMALL = dict(heap_mb=6, regions=24, decoy_magic=300, decoy_containers=60, decoy_signatures=300)
+
+
+def test_candidate_validation():
+    print("=" * 60)
+    print("TEST: SCANNERS == PLANTED CANDIDATES (DECOYS REJECTED)")
+    print("=" * 60)
+    ok_scan = ok_best = ok_find = ok_fallback = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in range(3):
+            meta = memory_synth.write_image(tmp, f'synth_{seed}', seed=seed, **SMALL)
+            truth = meta['synthetic']
+            with mc.DumpReader(meta['_bin_path'], meta['regions']) as reader:
+                heap = [(base, len(data)) for base, data in reader.iter_regions(mc.HEAP_RANGE, min_size=0x200)]
+                everything = [(r['base'], r['size']) for r in reader.regions]
+                for workers, chunk in ((1, mc.SCAN_CHUNK), (4, 0x10000 + 3)):
+                    containers, signatures = mc.scan_buffers(heap, reader.read, workers, chunk)
+                    ok_scan &= [list(c) for c in containers] == truth['containers'] and \
+                        [list(s) for s in signatures] == truth['heap_signatures']
+                    ok_scan &= [list(s) for s in mc.scan_buffers(everything, reader.read, workers, chunk,
+                                                                 containers=False)[1]] == truth['signatures']
+                ok_best &= mc._best_container(containers, reader.read) == \
+                    (truth['buf_addr'], truth['n_entries'], truth['hand_id'], truth['container_addr'])
+                buf_addr, entries = mc.find_buffer_in_dump(meta['_bin_path'], meta['regions'], reader=reader)
+                hand = mc.extract_hand_data(entries)
+                ok_find &= buf_addr == truth['buf_addr'] and hand['hero_cards'] == truth['hero_cards'] and \
+                    hand['hand_id'] == truth['hand_id'] and len(hand['players']) == 6
+
+        # No live container: the 0x88 fallback still picks the live buffer over older ones
+        regions, truth = memory_synth.build_image(seed=7, **SMALL)
+        for base, data in regions:
+            off = truth['container_addr'] - base
+            if 0 <= off < len(data):
+                data[off + mc.CONTAINER_MAGIC_OFFSET] ^= 0xFF
+        memory = {base: bytes(data) for base, data in regions}
+
+        def read(addr, n):
+            for base, data in memory.items():
+                if base <= addr < base + len(data):
+                    return data[addr - base:addr - base + n]
+            return None
+        heap = [(base, len(data)) for base, data in memory.items() if mc.HEAP_RANGE[0] <= base < mc.HEAP_RANGE[1]]
+        containers, signatures = mc.scan_buffers(heap, read)
+        best = max(signatures, key=lambda c: c[1])
+        ok_fallback = truth['container_addr'] not in [c[0] for c in containers] and \
+            mc._best_container(containers, read)[2] < truth['hand_id'] and \
+            best == (truth['buf_addr'], truth['hand_id'])
+    print(f"  Containers / 0x88 candidates == planted (3 seeds, chunks x workers): {'PASS' if ok_scan else 'FAIL'}")
+    print(f"  Stale containers lose to the live hand_id: {'PASS' if ok_best else 'FAIL'}")
+    print(f"  find_buffer_in_dump -> live buffer, hero cards: {'PASS' if ok_find else 'FAIL'}")
+    print(f"  Container gone: 0x88 fallback picks the live buffer: {'PASS' if ok_fallback else 'FAIL'}")
+    return ok_scan and ok_best and ok_find and ok_fallback
+
+
+def test_synthetic_session():
+    print("\n" + "=" * 60)
+    print("TEST: ONE SYNTHETIC PROCESS OVER THREE HANDS")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        metas = memory_synth.write_session(tmp, 3, seed=3, heap_mb=2, regions=6, decoy_magic=50,
+                                           decoy_containers=12, decoy_signatures=50)
+        truths = [m['synthetic'] for m in metas]
+        ok_layout = len({t['container_addr'] for t in truths}) == 1 and len({t['buf_addr'] for t in truths}) == 3
+
+        # Replayed through the live path: one full scan, then container redirects
+        replay = mc.ReplayReader(metas)
+        mc.use_reader(replay)
+        hand = mc.scan_live()
+        hands = [hand['hand_id']]
+        while replay.advance():
+            hand = mc.rescan_buffer(hand['buf_addr'], hand['hand_id'])
+            hands.append(hand['hand_id'] if hand.get('hand_id_changed') else None)
+        ok_live = hands == [t['hand_id'] for t in truths] and hand['buf_addr'] == truths[-1]['buf_addr']
+        replay.close()
+        mc.use_reader(None)
+
+        # Pointer scan across two dumps: buffer <- container+0xE4 (heap) <- module static pointer
+        with ps.DumpSnapshot(metas[0], truths[0]['buf_addr']) as a, \
+                ps.DumpSnapshot(metas[2], truths[2]['buf_addr']) as b:
+            mod_hits, heap_hits = ps.scan_level(a, b, [a.buf_addr], [b.buf_addr], 1)
+            field = truths[0]['container_addr'] + 0xE4
+            mod_hits2, _ = ps.scan_level(a, b, [field], [field], 2)
+        ok_chain = not mod_hits and heap_hits == [field] and \
+            mod_hits2 == [(memory_synth.MODULE_PTR_OFFSET, 0xE4)] and a.reader._mm.closed and b.reader._mm.closed
+    print(f"  Fixed container, buffer moves each hand: {'PASS' if ok_layout else 'FAIL'}")
+    print(f"  scan_live + rescan_buffer follow the hands: {'PASS' if ok_live else 'FAIL'}")
+    print(f"  Pointer scan finds module+0x{memory_synth.MODULE_PTR_OFFSET:X} -> +0xE4 -> buffer: "
+          f"{'PASS' if ok_chain else 'FAIL'}")
+    return ok_layout and ok_live and ok_chain
+
+
+if __name__ == '__main__':
+    results = [
+        ("Candidate Validation", test_candidate_validation()),
+        ("Synthetic Session", test_synthetic_session()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
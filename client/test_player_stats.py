@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Player stats tests - incremental counters match a full recount, dedupe,
+persistence, changed files applied in play order, indexed name consolidation
+and opponent lookup match the all-pairs versions, SQLite player store
+migration and counter upserts, decayed / recent-N views.
+Usage: python3 test_player_stats.py
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+from difflib import SequenceMatcher
+
+import build_player_stats as bps
+import hh_parser
+import opponent_lookup
+import player_store
+import recent_stats
+from test_hh_parser import SAMPLE
+
+NAMES = ['fishy_joe', 'NicSticker', 'rock solid', 'LagMonster', 'nitwit99', 'idealistslp']
+
+
+def _random_hands(n, seed=5):
+    """Synthetic stats-input hands (same shape as parse_single_hand output)."""
+    rng = random.Random(seed)
+    hands = []
+    for i in range(n):
+        seated = rng.sample(NAMES, rng.randint(3, 6))
+        preflop = [(p, rng.choice(['folds', 'calls', 'raises', 'checks'])) for p in seated]
+        postflop = [(p, rng.choice(['checks', 'bets', 'calls', 'raises', 'folds']), 'flop')
+                    for p in seated if rng.random() < 0.4]
+        hands.append({'hand_id': 1000 + i, 'players': {p: {'seat': k, 'stack': 5.0} for k, p in enumerate(seated)},
+                      'preflop_actions': preflop, 'postflop_actions': postflop})
+    return hands
+
+
+def test_incremental_matches_full():
+    print("=" * 60)
+    print("TEST: INCREMENTAL == FULL RECOUNT")
+    print("=" * 60)
+    hands = _random_hands(400)
+    full = bps.calculate_stats(hands)
+    state = bps.new_counter_state()
+    applied = [bps.apply_hands(state, hands[:150]),
+               bps.apply_hands(state, hands[100:300]),   # overlaps: 50 duplicates
+               bps.apply_hands(state, hands[250:])]
+    ok_stats = bps.derive_stats(state['players']) == full
+    ok_dedupe = applied == [150, 150, 100]
+    print(f"  Derived stats equal full recount: {'PASS' if ok_stats else 'FAIL'}")
+    print(f"  Duplicate hand_ids skipped {applied}: {'PASS' if ok_dedupe else 'FAIL'}")
+    return ok_stats and ok_dedupe
+
+
+def test_persistence():
+    print("\n" + "=" * 60)
+    print("TEST: COUNTER PERSISTENCE")
+    print("=" * 60)
+    hands = _random_hands(200, seed=9)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'counters.json')
+        state = bps.new_counter_state()
+        bps.apply_hands(state, hands[:120])
+        state['files']['/x/HH a.txt'] = [10, 1.5]
+        bps.save_counters(state, path)
+        state = bps.load_counters(path)
+        again = bps.apply_hands(state, hands)
+        ok = again == 80 and state['files'] == {'/x/HH a.txt': [10, 1.5]}
+        ok = ok and bps.derive_stats(state['players']) == bps.calculate_stats(hands)
+
+        # Two changed files whose hands interleave: applied in hand_id order, not file order
+        first, second = SAMPLE.split('\n\n\n')
+        hh = os.path.join(tmp, 'hh')
+        os.mkdir(hh)
+        for name, ids in (('HH a.txt', ('01', '03')), ('HH b.txt', ('02', '04'))):
+            with open(os.path.join(hh, name), 'w', encoding='utf-8') as f:
+                f.write(first.replace('#254000000001', '#2540000000' + ids[0]) + '\n\n\n' +
+                        second.replace('#254000000002', '#2540000000' + ids[1]))
+        refreshed = bps.new_counter_state()
+        applied = bps.refresh_counters(refreshed, hh, db_path=os.path.join(tmp, 'cache.db'))
+        in_order = bps.new_counter_state()
+        bps.apply_hands(in_order, sorted((bps.parse_single_hand(h) for h in hh_parser.iter_hands(hh)),
+                                         key=lambda h: h['hand_id']))
+        ok_order = applied == 4 and len(refreshed['files']) == 2 and \
+            all(list(refreshed['recent'][p].ring) == list(r.ring) for p, r in in_order['recent'].items()) and \
+            bps.refresh_counters(refreshed, hh, db_path=os.path.join(tmp, 'cache.db')) == 0
+    print(f"  Reloaded counters continue where they stopped: {'PASS' if ok else 'FAIL'}")
+    print(f"  Changed files applied in hand_id order: {'PASS' if ok_order else 'FAIL'}")
+    return ok and ok_order
+
+
+def _consolidate_all_pairs(stats):
+    """Previous O(n^2) consolidate_names, kept as the reference."""
+    names = list(stats.keys())
+    merged, name_map = {}, {}
+    for name in sorted(names, key=lambda n: -stats[n]['hands']):
+        if name in name_map:
+            continue
+        similar = [name]
+        for other in names:
+            if other == name or other in name_map:
+                continue
+            if SequenceMatcher(None, name.lower(), other.lower()).ratio() > bps.FUZZY_THRESHOLD:
+                similar.append(other)
+                name_map[other] = name
+        name_map[name] = name
+        merged[name] = similar
+    return merged
+
+
+def _ocr_names(n, seed=3):
+    """Random names plus OCR-style variants (swapped look-alikes, dropped/added chars, case)."""
+    rng = random.Random(seed)
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789_'
+    lookalike = {'l': '1', '1': 'l', 'o': '0', '0': 'o', 'i': 'l', 's': '5', 'g': '9', 'b': '6'}
+    names = []
+    for _ in range(n):
+        base = ''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 14)))
+        names.append(base)
+        for _ in range(rng.randint(0, 3)):
+            v = list(base)
+            op = rng.random()
+            k = rng.randrange(len(v))
+            if op < 0.4:
+                v[k] = lookalike.get(v[k], rng.choice(alphabet))
+            elif op < 0.6 and len(v) > 2:
+                del v[k]
+            elif op < 0.8:
+                v.insert(k, rng.choice(alphabet))
+            else:
+                v = [c.upper() if rng.random() < 0.5 else c for c in v]
+            names.append(''.join(v))
+    return names
+
+
+def test_consolidate_matches_all_pairs():
+    print("\n" + "=" * 60)
+    print("TEST: INDEXED NAME CONSOLIDATION")
+    print("=" * 60)
+    rng = random.Random(1)
+    names = list(dict.fromkeys(_ocr_names(180)))
+    stats_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'player_stats.json')
+    if os.path.exists(stats_path):
+        with open(stats_path) as f:
+            names += [n for n in list(json.load(f))[:300] if n not in names]
+    stats = {n: {'hands': rng.randint(5, 500), 'vpip': 30.0, 'pfr': 10.0, '3bet': 5.0, 'af': 1.5}
+             for n in names}
+
+    t = time.perf_counter()
+    expected = _consolidate_all_pairs(stats)
+    t_ref = time.perf_counter() - t
+    t = time.perf_counter()
+    got = bps.consolidate_names(stats)
+    t_new = time.perf_counter() - t
+
+    ok = list(got) == list(expected)
+    ok = ok and all(got[c].get('aliases', []) == v[1:] for c, v in expected.items())
+    merges = sum(len(v) - 1 for v in expected.values())
+    print(f"  {len(names)} names, {merges} merges: all-pairs {t_ref:.2f}s, indexed {t_new:.2f}s")
+    print(f"  Same canonical names and aliases: {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def test_opponent_lookup_matches_scan():
+    print("\n" + "=" * 60)
+    print("TEST: INDEXED OPPONENT LOOKUP")
+    print("=" * 60)
+    names = list(dict.fromkeys(_ocr_names(300, seed=8)))
+    stats = {n: {'hands': 10} for n in names[::2]}       # every other variant is "OCR'd"
+    queries = names[1::2] + ['nobody_at_all', names[0].upper()]
+
+    def scan(name):
+        if name in stats:
+            return name
+        best, best_ratio = None, opponent_lookup.FUZZY_THRESHOLD
+        for db_name in stats:
+            ratio = SequenceMatcher(None, name.lower(), db_name.lower()).ratio()
+            if ratio > best_ratio:
+                best, best_ratio = db_name, ratio
+        return best
+
+    expected = [scan(q) for q in queries]
+    old_size = opponent_lookup.MATCH_CACHE_SIZE
+    opponent_lookup.MATCH_CACHE_SIZE = 50
+    try:
+        got = [opponent_lookup.fuzzy_match(q, stats) for q in queries]
+        again = [opponent_lookup.fuzzy_match(q, stats) for q in queries]
+        bounded = len(opponent_lookup._match_cache) <= 50
+    finally:
+        opponent_lookup.MATCH_CACHE_SIZE = old_size
+    ok = got == expected == again
+    print(f"  {len(queries)} lookups equal full scan ({sum(1 for e in expected if e)} matched): "
+          f"{'PASS' if ok else 'FAIL'}")
+    print(f"  Match cache bounded: {'PASS' if bounded else 'FAIL'}")
+    return ok and bounded
+
+
+def test_player_store():
+    print("\n" + "=" * 60)
+    print("TEST: PLAYER STORE")
+    print("=" * 60)
+    hands = _random_hands(300, seed=4)
+    stats = bps.calculate_stats(hands[:200])
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'player_stats.json')
+        db = os.path.join(tmp, 'player_stats.db')
+        with open(json_path, 'w') as f:
+            json.dump(stats, f)
+        store = player_store.open_store(db, json_path)
+        reader = player_store.PlayerStore(db)       # second connection (WAL reader)
+        ok_migrate = dict(store.items()) == stats and store.find_normalized('ROCK SOLID') == 'rock solid'
+        version = reader.data_version()
+
+        # Counters from a full recount, then atomic deltas for 100 more hands
+        state = bps.new_counter_state()
+        bps.apply_hands(state, hands[:200])
+        store.replace_all(stats, state['players'])
+        before = {k: dict(v) for k, v in state['players'].items()}
+        bps.apply_hands(state, hands[200:])
+        deltas = {p: {k: c[k] - before.get(p, {}).get(k, 0) for k in player_store.COUNTERS}
+                  for p, c in state['players'].items()}
+        store.add_counters(deltas)
+        expected = bps.calculate_stats(hands)
+        ok_upsert = all(reader[p] == s for p, s in expected.items())
+        ok_reader = reader.data_version() != version and 'nobody' not in reader
+
+        # opponent_lookup re-indexes when a rebuild renames a player (same player count)
+        saved = opponent_lookup.STORE_DB, opponent_lookup.STATS_FILE, opponent_lookup._stats_cache
+        opponent_lookup.STORE_DB, opponent_lookup.STATS_FILE, opponent_lookup._stats_cache = db, json_path, None
+        try:
+            looked_up = opponent_lookup.load_player_stats()
+            victim = next(iter(expected))
+            before_rename = opponent_lookup.fuzzy_match(victim.upper(), looked_up)
+            store.replace_all({('zz_' + p if p == victim else p): s for p, s in expected.items()})
+            looked_up = opponent_lookup.load_player_stats()
+            after = opponent_lookup.fuzzy_match(victim.upper(), looked_up)
+            renamed = opponent_lookup.fuzzy_match('ZZ_' + victim.upper(), looked_up)
+            ok_rename = before_rename == victim and after != victim and renamed == 'zz_' + victim and \
+                opponent_lookup.get_stats(looked_up, renamed) == expected[victim]
+            looked_up.close()
+        finally:
+            opponent_lookup.STORE_DB, opponent_lookup.STATS_FILE, opponent_lookup._stats_cache = saved
+            opponent_lookup._build_index({})
+        store.close()
+        reader.close()
+    print(f"  JSON migration + normalized lookup: {'PASS' if ok_migrate else 'FAIL'}")
+    print(f"  Counter upserts re-derive rows == full recount: {'PASS' if ok_upsert else 'FAIL'}")
+    print(f"  Second connection sees commits: {'PASS' if ok_reader else 'FAIL'}")
+    print(f"  Lookup re-indexes renamed players: {'PASS' if ok_rename else 'FAIL'}")
+    return ok_migrate and ok_upsert and ok_reader and ok_rename
+
+
+def test_recent_views():
+    print("\n" + "=" * 60)
+    print("TEST: DECAYED + RECENT-N VIEWS")
+    print("=" * 60)
+    hands = _random_hands(600, seed=13)
+    state = bps.new_counter_state()
+    bps.apply_hands(state, hands[:350])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'counters.json')
+        bps.save_counters(state, path)
+        state = bps.load_counters(path)
+        bps.apply_hands(state, hands)
+
+        # Reference: per-hand deltas replayed from scratch
+        history = {}
+        for h in hands:
+            deltas = {}
+            bps.accumulate_hand(deltas, h)
+            for p, d in deltas.items():
+                history.setdefault(p, []).append(d)
+        ok_window, ok_decay = True, True
+        for p, rows in history.items():
+            r = state['recent'][p]
+            last = [d for d in rows if d['hands']][-recent_stats.WINDOW:]
+            window = {k: sum(d[k] for d in last) for k in player_store.COUNTERS}
+            ok_window &= r.counters('recent') == window and len(r.ring) <= recent_stats.WINDOW
+            decayed = dict.fromkeys(player_store.COUNTERS, 0.0)
+            for d in rows:
+                decayed = {k: v * recent_stats.DECAY + d[k] for k, v in decayed.items()}
+            ok_decay &= all(abs(decayed[k] - v) < 1e-6 for k, v in r.counters('decayed').items())
+
+        db = os.path.join(tmp, 'player_stats.db')
+        store = player_store.PlayerStore(db)
+        stats = bps.derive_stats(state['players'])
+        store.replace_all(stats, state['players'], {p: state['recent'][p].to_json() for p in stats})
+        name = 'LagMonster'
+        expected = bps.derive_view(state['players'][name], state['recent'][name], 'recent')
+        ok_store = (store.view_stats(name, 'recent') == expected and expected['hands'] == recent_stats.WINDOW
+                    and store.view_stats(name, 'lifetime') == stats[name])
+        store.close()
+    print(f"  Ring buffer == last {recent_stats.WINDOW} hands: {'PASS' if ok_window else 'FAIL'}")
+    print(f"  Decayed counters == replay: {'PASS' if ok_decay else 'FAIL'}")
+    print(f"  Store serves each view: {'PASS' if ok_store else 'FAIL'}")
+    return ok_window and ok_decay and ok_store
+
+
+if __name__ == '__main__':
+    results = [
+        ("Incremental == Full", test_incremental_matches_full()),
+        ("Persistence", test_persistence()),
+        ("Indexed Consolidation", test_consolidate_matches_all_pairs()),
+        ("Indexed Opponent Lookup", test_opponent_lookup_matches_scan()),
+        ("Player Store", test_player_store()),
+        ("Recent Views", test_recent_views()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Strategy decision cache tests - cached reports equal direct evaluation,
+warm runs evaluate nothing, a changed strategy is re-evaluated alone,
+parallel prefetch equals serial.
+Usage: python3 test_strategy_eval.py
+"""
+
+import os
+import tempfile
+
+import analyse_real_logs as arl
+import hh_parser
+from test_hh_parser import SAMPLE
+
+STRATEGIES = ['value_lord', 'the_lord', 'sonnet', 'nit']
+
+
+def _hands(tmp, copies=6):
+    hh = os.path.join(tmp, 'hh')
+    os.mkdir(hh)
+    with open(os.path.join(hh, 'HH a.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n\n\n'.join(SAMPLE.replace('#25400000000', f'#2540000{i:04d}') for i in range(copies)))
+    hands = [arl.parse_hand(rec) for rec in hh_parser.iter_hands(hh)]
+    return [h for h in hands if h]
+
+
+def _direct(hand, strategy):
+    """judge_hand findings with every decision evaluated, no cache."""
+    return arl.judge_hand(arl.Decisions(), hand, strategy)
+
+
+def test_cache_reuse():
+    print("=" * 60)
+    print("TEST: CACHED == DIRECT, WARM RUN, INVALIDATION")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        hands = _hands(tmp)
+        db = os.path.join(tmp, 'eval.db')
+        expected = [_direct(h, s) for h in hands for s in STRATEGIES]
+
+        with arl.StrategyEvaluator(STRATEGIES, db, workers=1) as ev:
+            cold = ev.prefetch(hands, arl.judge_hand)
+            got = [arl.judge_hand(ev, h, s) for h in hands for s in STRATEGIES]
+        with arl.StrategyEvaluator(STRATEGIES, db, workers=1) as ev:
+            warm = ev.prefetch(hands, arl.judge_hand)
+            got_warm = [arl.judge_hand(ev, h, s) for h in hands for s in STRATEGIES]
+
+        real = arl.strategy_fingerprint
+        arl.strategy_fingerprint = lambda s: real(s) + ('x' if s == 'nit' else '')
+        try:
+            with arl.StrategyEvaluator(STRATEGIES, db, workers=1) as ev:
+                changed = ev.prefetch(hands, arl.judge_hand)
+                invalidated = ev.invalidated
+        finally:
+            arl.strategy_fingerprint = real
+
+    pairs = len(hands) * len(STRATEGIES)
+    ok_equal = got == expected and got_warm == expected
+    ok_warm = cold == (0, pairs) and warm == (pairs, 0)
+    ok_invalidate = invalidated == ['nit'] and changed == (pairs - len(hands), len(hands))
+    print(f"  {len(hands)} hands x {len(STRATEGIES)} strategies, findings equal direct: {'PASS' if ok_equal else 'FAIL'}")
+    print(f"  Warm run evaluates nothing {cold} -> {warm}: {'PASS' if ok_warm else 'FAIL'}")
+    print(f"  Changed strategy re-evaluated alone {changed}: {'PASS' if ok_invalidate else 'FAIL'}")
+    return ok_equal and ok_warm and ok_invalidate
+
+
+def test_parallel_matches_serial():
+    print("\n" + "=" * 60)
+    print("TEST: PARALLEL PREFETCH == SERIAL")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        hands = _hands(tmp)
+        known = []
+        for workers in (1, 2):
+            with arl.StrategyEvaluator(STRATEGIES, os.path.join(tmp, f'eval{workers}.db'), workers=workers) as ev:
+                ev.prefetch(hands, arl.first_fold)
+                known.append(ev.known)
+    ok = known[0] == known[1] and len(known[0]) == len(hands) * len(STRATEGIES)
+    print(f"  2 workers store the same decisions as 1: {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+if __name__ == '__main__':
+    results = [
+        ("Cache Reuse", test_cache_reuse()),
+        ("Parallel == Serial", test_parallel_matches_serial()),
+    ]
+    passed = sum(1 for _, r in results if r)
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    if passed != len(results):
+        raise SystemExit(1)